@@ -0,0 +1,79 @@
+"""
+Energy drift versus timestep for the symplectic integrators available in Sarkas.
+
+Every integrator is run for the same amount of simulated time with several timesteps. The maximum relative deviation
+of the total energy from its initial value in the production phase is plotted against the timestep and against the
+number of force evaluations per unit of simulated time. The latter is the fair comparison: velocity Verlet needs one
+force evaluation per step while Forest-Ruth and McLachlan need three and four.
+
+Run it from this directory with
+
+    python energy_drift_benchmark.py
+
+"""
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from sarkas.processes import Simulation
+
+input_file = os.path.join('input_files', 'LJ_energy_drift.yaml')
+
+# Force evaluations per step of each integrator.
+integrators = {'verlet': 1, 'forest_ruth': 3, 'mclachlan': 4}
+# Timesteps in units of the input file timestep. Forest-Ruth is unstable at 4 and velocity Verlet at 6.
+dt_factors = np.array([0.5, 1.0, 2.0, 3.0])
+
+base_dt = 1.0e-14
+# Simulated times of the equilibration and production phases. The same for every run.
+equilibration_time = 1000 * base_dt
+production_time = 2000 * base_dt
+# Berendsen relaxation time and first thermostating time, the input file values in units of base_dt.
+berendsen_time = 10.0 * base_dt
+relaxation_time = 2 * base_dt
+# Number of energy samples per run.
+no_samples = 100
+
+drift = {}
+for integrator, force_calls in integrators.items():
+    drift[integrator] = np.zeros(len(dt_factors))
+
+    for i, factor in enumerate(dt_factors):
+        dt = factor * base_dt
+        eq_steps = int(round(equilibration_time / dt))
+        steps = int(round(production_time / dt))
+        args = {
+            'Integrator': {'type': integrator,
+                           'dt': dt,
+                           'equilibration_steps': eq_steps,
+                           'eq_dump_step': eq_steps,
+                           'production_steps': steps,
+                           'prod_dump_step': max(steps // no_samples, 1)},
+            'Thermostat': {'berendsen_tau': berendsen_time / dt,
+                           'relaxation_timestep': max(int(round(relaxation_time / dt)), 1)},
+            'IO': {'job_dir': 'LJ_{}_dt{:.1f}'.format(integrator, factor)}
+        }
+        sim = Simulation(input_file)
+        sim.setup(read_yaml=True, other_inputs=args)
+        sim.run()
+
+        energy = pd.read_csv(sim.io.prod_energy_filename, index_col=False)['Total Energy'].to_numpy()
+        drift[integrator][i] = np.max(abs(energy - energy[0]) / abs(energy[0]))
+        print('{:>12} dt = {:.2e} s  force calls/ps = {:8.0f}  max |dE/E| = {:.3e}'.format(
+            integrator, dt, force_calls * 1.0e-12 / dt, drift[integrator][i]))
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+for integrator, force_calls in integrators.items():
+    dts = dt_factors * base_dt
+    ax1.loglog(dts / base_dt, drift[integrator], 'o-', label=integrator)
+    ax2.loglog(force_calls * 1.0e-12 / dts, drift[integrator], 'o-', label=integrator)
+
+ax1.set(xlabel=r'$\Delta t$ [{:.0e} s]'.format(base_dt), ylabel=r'max $|\Delta E / E_0|$')
+ax2.set(xlabel='Force evaluations per ps', ylabel=r'max $|\Delta E / E_0|$')
+ax1.legend()
+ax2.legend()
+fig.tight_layout()
+fig.savefig('energy_drift_benchmark.png')
+plt.show()
@@ -1,13 +1,15 @@
 """
 Module containing the three basic classes: Parameters, Particles, Species.
 """
+import copy
 import numpy as np
-import os.path
 import sys
 import scipy.constants as const
 
 from scipy.spatial.distance import pdist
 
+from sarkas.utilities.trajectory import load_checkpoint
+
 
 class Parameters:
     """
@@ -684,6 +686,14 @@ class Particles:
     names : numpy.ndarray
         Species' names. Shape = (``total_num_ptcls``).
 
+    index : numpy.ndarray
+        Initial index of each particle. It differs from ``arange(total_num_ptcls)`` only after absorbed particles have
+        been removed by :meth:`compact`.
+
+    absorbed_pos : numpy.ndarray
+        Positions at which particles have been absorbed. Shape = (initial ``total_num_ptcls``, 3). None until the
+        first call to :meth:`compact`.
+
     rdf_nbins : int
         Number of bins for radial pair distribution.
 
@@ -741,6 +751,12 @@ class Particles:
 
         self.names = None
         self.id = None
+        self.index = None
+
+        self.absorbed_pos = None
+        self.absorbed_cntr = None
+        self.checkpoint_id = None
+        self.checkpoint_names = None
 
         self.species_init_vel = None
         self.species_thermal_velocity = None
@@ -798,6 +814,7 @@ class Particles:
 
         self.names = np.empty(self.total_num_ptcls, dtype=params.species_names.dtype)
         self.id = np.zeros(self.total_num_ptcls, dtype=int)
+        self.index = np.arange(self.total_num_ptcls)
 
         self.species_init_vel = np.zeros((params.num_species, 3))
         self.species_thermal_velocity = np.zeros((params.num_species, 3))
@@ -983,33 +1000,23 @@ class Particles:
 
         """
         if phase == 'equilibration':
-            file_name = os.path.join(self.eq_dump_dir, "checkpoint_" + str(it) + ".npz")
-            data = np.load(file_name, allow_pickle=True)
-            self.id = data["id"]
-            self.names = data["names"]
-            self.pos = data["pos"]
-            self.vel = data["vel"]
-            self.acc = data["acc"]
-
+            dump_dir = self.eq_dump_dir
         elif phase == 'production':
-            file_name = os.path.join(self.prod_dump_dir, "checkpoint_" + str(it) + ".npz")
-            data = np.load(file_name, allow_pickle=True)
-            self.id = data["id"]
-            self.names = data["names"]
-            self.pos = data["pos"]
-            self.vel = data["vel"]
-            self.acc = data["acc"]
-            self.pbc_cntr = data["cntr"]
-            self.rdf_hist = data["rdf_hist"]
-
+            dump_dir = self.prod_dump_dir
         elif phase == 'magnetization':
-            file_name = os.path.join(self.mag_dump_dir, "checkpoint_" + str(it) + ".npz")
-            data = np.load(file_name, allow_pickle=True)
-            self.id = data["id"]
-            self.names = data["names"]
-            self.pos = data["pos"]
-            self.vel = data["vel"]
-            self.acc = data["acc"]
+            dump_dir = self.mag_dump_dir
+
+        data = load_checkpoint(dump_dir, it)
+        restart_fields = ['pos', 'vel', 'acc'] + (['cntr', 'rdf_hist'] if phase == 'production' else [])
+        assert all(key in data and data[key].dtype == np.float64 for key in restart_fields), \
+            "The dump of step {} is not a restart checkpoint. Restart from a multiple of restart_step.".format(it)
+
+        self.id = data["id"]
+        self.names = data["names"]
+        self.pos = data["pos"]
+        self.vel = data["vel"]
+        self.acc = data["acc"]
+        if phase in ['production', 'magnetization']:
             self.pbc_cntr = data["cntr"]
             self.rdf_hist = data["rdf_hist"]
 
@@ -1348,7 +1355,8 @@ class Particles:
         """
         K = np.zeros(self.num_species)
         T = np.zeros(self.num_species)
-        const = 2.0 / (self.kB * self.species_num * self.dimensions)
+        # Species completely absorbed by the boundaries have zero temperature
+        const = 2.0 / (self.kB * np.maximum(self.species_num, 1) * self.dimensions)
         kinetic = 0.5 * self.masses * (self.vel * self.vel).transpose()
 
         species_start = 0
@@ -1399,10 +1407,115 @@ class Particles:
         momentum = self.masses * self.vel.transpose()
         for ic, nums in enumerate(self.species_num):
             species_end += nums
+            if nums == 0:
+                continue
             P = np.sum(momentum[:, species_start:species_end], axis=1)
             self.vel[species_start:species_end, :] -= P / (nums * self.masses[species_end - 1])
             species_start = species_end
 
+    def compact(self):
+        """
+        Remove the particles absorbed by the boundaries, i.e. the particles lying on a face of the box, from the
+        particles' arrays. The order of the remaining particles, hence the species' contiguous blocks, is preserved.
+
+        Returns
+        -------
+        no_absorbed : int
+            Number of removed particles.
+
+        Notes
+        -----
+        ``index`` maps the rows of the compacted arrays to the initial particles. The last positions and box crossings
+        of the removed particles are stored in ``absorbed_pos`` and ``absorbed_cntr`` so that
+        :meth:`checkpoint_data` returns arrays of the initial size.
+
+        """
+        absorbed = np.any((self.pos <= 0.0) | (self.pos >= self.box_lengths), axis=1)
+        no_absorbed = absorbed.sum()
+        if no_absorbed == 0:
+            return 0
+
+        if self.absorbed_pos is None:
+            # First compaction: all the particles are still in the arrays
+            self.absorbed_pos = np.copy(self.pos)
+            self.absorbed_cntr = np.copy(self.pbc_cntr)
+            self.checkpoint_id = np.copy(self.id)
+            self.checkpoint_names = np.copy(self.names)
+
+        self.absorbed_pos[self.index[absorbed]] = self.pos[absorbed]
+        self.absorbed_cntr[self.index[absorbed]] = self.pbc_cntr[absorbed]
+
+        active = ~absorbed
+        for key in ['pos', 'vel', 'acc', 'pbc_cntr', 'masses', 'charges', 'cyclotron_frequencies', 'names', 'id',
+                    'index']:
+            if self.__dict__[key] is not None:
+                self.__dict__[key] = self.__dict__[key][active]
+
+        self.total_num_ptcls = self.pos.shape[0]
+        self.species_num = np.bincount(self.id, minlength=self.num_species)
+
+        return no_absorbed
+
+    def checkpoint_data(self):
+        """
+        Particles' data to be saved in a checkpoint. If absorbed particles have been removed by :meth:`compact` the
+        arrays are expanded to the initial number of particles, with the absorbed particles at rest on the box's faces.
+
+        Returns
+        -------
+        id : numpy.ndarray
+            Species id of each particle.
+
+        names : numpy.ndarray
+            Species name of each particle.
+
+        pos : numpy.ndarray
+            Particles' positions.
+
+        vel : numpy.ndarray
+            Particles' velocities.
+
+        acc : numpy.ndarray
+            Particles' accelerations.
+
+        cntr : numpy.ndarray
+            Particles' box crossings.
+
+        """
+        if self.absorbed_pos is None:
+            return self.id, self.names, self.pos, self.vel, self.acc, self.pbc_cntr
+
+        pos = np.copy(self.absorbed_pos)
+        pos[self.index] = self.pos
+        vel = np.zeros(pos.shape)
+        vel[self.index] = self.vel
+        acc = np.zeros(pos.shape)
+        acc[self.index] = self.acc
+        cntr = np.copy(self.absorbed_cntr)
+        cntr[self.index] = self.pbc_cntr
+
+        return self.checkpoint_id, self.checkpoint_names, pos, vel, acc, cntr
+
+    def snapshot(self):
+        """
+        Copy of the particles' data needed by a dump. Arrays modified in place during the simulation are copied,
+        the others are shared.
+
+        Returns
+        -------
+        snap : sarkas.core.Particles
+            Shallow copy of the particles with copies of the positions, velocities, accelerations, box crossings,
+            rdf histogram and absorbed particles' data.
+
+        """
+        snap = copy.copy(self)
+        for key in ['pos', 'vel', 'acc', 'pbc_cntr', 'rdf_hist', 'absorbed_pos', 'absorbed_cntr']:
+            value = getattr(self, key)
+            if value is not None:
+                setattr(snap, key, np.copy(value))
+
+        return snap
+
 
 class Species:
     """
@@ -2,6 +2,7 @@
 Module handling the potential class.
 """
 import numpy as np
+import pyfftw
 from sarkas.potentials.force_pm import force_optimized_green_function as gf_opt
 from sarkas.potentials import force_pm, force_pp
 import fdint
@@ -237,6 +238,13 @@ class Potential:
         self.QFactor = params.QFactor
         self.total_net_charge = params.total_net_charge
         self.measure = params.measure
+        # Placeholder histogram for force calculations that do not measure the rdf. See update_subset.
+        self.subset_rdf_hist = np.zeros((1, params.num_species, params.num_species))
+
+        # Arrays in which the force kernels work in place
+        if not self.method == 'FMM':
+            self.workspace = ForceWorkspace()
+            self.workspace.setup(params, self)
 
     @staticmethod
     def calc_electron_properties(params):
@@ -332,9 +340,12 @@ class Potential:
             Particles data.
 
         """
-        ptcls.potential_energy, ptcls.acc = force_pp.update(ptcls.pos, ptcls.id, ptcls.masses, self.box_lengths,
-                                           self.rc, self.matrix, self.force,
-                                           self.measure, ptcls.rdf_hist)
+        # The kernel accumulates into ptcls.acc
+        ptcls.acc.fill(0.0)
+        ptcls.potential_energy = force_pp.update_accumulate(ptcls.pos, ptcls.id, ptcls.masses, self.box_lengths,
+                                                            self.rc, self.matrix, self.force,
+                                                            self.measure, ptcls.rdf_hist,
+                                                            ptcls.acc, self.workspace.head, self.workspace.ls)
 
         if not (self.type == "LJ"):
             # Mie Energy of charged systems
@@ -352,9 +363,11 @@ class Potential:
             Particles data.
 
         """
-        ptcls.potential_energy, ptcls.acc = force_pp.update_0D(ptcls.pos, ptcls.id, ptcls.masses, self.box_lengths,
-                                               self.rc, self.matrix, self.force,
-                                               self.measure, ptcls.rdf_hist)
+        # The kernel accumulates into ptcls.acc
+        ptcls.acc.fill(0.0)
+        ptcls.potential_energy = force_pp.update_0D_accumulate(ptcls.pos, ptcls.id, ptcls.masses, self.box_lengths,
+                                                               self.rc, self.matrix, self.force,
+                                                               self.measure, ptcls.rdf_hist, ptcls.acc)
         if not (self.type == "LJ"):
             # Mie Energy of charged systems
             # J-M.Caillol, J Chem Phys 101 6080(1994) https: // doi.org / 10.1063 / 1.468422
@@ -370,11 +383,9 @@ class Potential:
             Particles' data
 
         """
-        U_long, acc_l_r = force_pm.update(ptcls.pos, ptcls.charges, ptcls.masses,
-                                          self.pppm_mesh, self.box_lengths, self.pppm_green_function,
-                                          self.pppm_kx,
-                                          self.pppm_ky,
-                                          self.pppm_kz, self.pppm_cao)
+        # The long range accelerations are added directly to ptcls.acc
+        U_long = force_pm.update_accumulate(ptcls.pos, ptcls.charges, ptcls.masses, self.box_lengths,
+                                            self.pppm_cao, self.workspace, ptcls.acc)
         # Ewald Self-energy
         U_long += self.QFactor * self.pppm_alpha_ewald / np.sqrt(np.pi)
         # Neutrality condition
@@ -382,8 +393,6 @@ class Potential:
 
         ptcls.potential_energy += U_long
 
-        ptcls.acc += acc_l_r
-
     def update_pppm(self, ptcls):
         """Calculate particles' potential and accelerations using pppm method.
 
@@ -396,6 +405,55 @@ class Potential:
         self.update_linked_list(ptcls)
         self.update_pm(ptcls)
 
+    def update_subset(self, pos, p_id, masses, charges):
+        """
+        Calculate the accelerations of a subset of particles interacting only among themselves.
+        This is used by the subcycled integrator to evolve the light species with frozen heavy-species contributions.
+
+        Parameters
+        ----------
+        pos : numpy.ndarray
+            Positions of the subset's particles.
+
+        p_id : numpy.ndarray
+            Species identifier of the subset's particles.
+
+        masses : numpy.ndarray
+            Masses of the subset's particles.
+
+        charges : numpy.ndarray
+            Charges of the subset's particles.
+
+        Returns
+        -------
+        U : float
+            Potential energy of the subset.
+
+        acc : numpy.ndarray
+            Accelerations of the subset's particles. This is the ``subset_acc`` array of the workspace, hence it is
+            overwritten at the next call.
+
+        """
+        acc = self.workspace.subset_acc
+        if acc is None or acc.shape != pos.shape:
+            # Allocated at the first call and after the removal of absorbed particles
+            acc = self.workspace.subset_acc = np.zeros(pos.shape)
+        else:
+            acc.fill(0.0)
+
+        # The kernels accumulate into the subset's accelerations
+        if self.linked_list_on:
+            U = force_pp.update_accumulate(pos, p_id, masses, self.box_lengths, self.rc, self.matrix, self.force,
+                                           False, self.subset_rdf_hist, acc, self.workspace.head, self.workspace.ls)
+        else:
+            U = force_pp.update_0D_accumulate(pos, p_id, masses, self.box_lengths, self.rc, self.matrix, self.force,
+                                              False, self.subset_rdf_hist, acc)
+
+        if self.pppm_on:
+            U += force_pm.update_accumulate(pos, charges, masses, self.box_lengths, self.pppm_cao, self.workspace, acc)
+
+        return U, acc
+
     def pppm_setup(self, params):
         """Calculate the P3M parameters.
 
@@ -455,3 +513,145 @@ class Potential:
     #     ptcls.acc = - np.transpose(ptcls.charges * out_fmm.grad.real / ptcls.mass) / params.fourpie0
     #
     #     return potential_energy
+
+
+class ForceWorkspace:
+    """
+    Preallocated arrays in which the force kernels work in place, so that no memory is allocated at each timestep.
+
+    Attributes
+    ----------
+    head : numpy.ndarray
+        Head particle of each cell of the linked cell-list.
+
+    ls : numpy.ndarray
+        List of particle indices in a given cell of the linked cell-list.
+
+    subset_acc : numpy.ndarray
+        Accelerations of the particles' subset of :meth:`Potential.update_subset`.
+
+    mesh_sizes : numpy.ndarray
+        Number of mesh points in each direction.
+
+    mesh_spacings : numpy.ndarray
+        Distance between mesh points in each direction.
+
+    box_volume : float
+        Volume of the simulation box.
+
+    wx : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`x` axis.
+
+    wy : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`y` axis.
+
+    wz : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`z` axis.
+
+    rho_r : numpy.ndarray
+        Charge density on the mesh. Input array of ``fft_rho``.
+
+    rho_k : numpy.ndarray
+        Charge density in Fourier space. Output array of ``fft_rho``.
+
+    E_kx : numpy.ndarray
+        Electric field along :math:`k_x` in Fourier space. Input array of ``ifft_E_x``.
+
+    E_x : numpy.ndarray
+        Electric field along :math:`x` on the mesh. Output array of ``ifft_E_x``.
+
+    G_k : numpy.ndarray
+        Optimized Green's function in FFT ordering, i.e. with the DC value at [0, 0, 0].
+
+    G_kx : numpy.ndarray
+        ``G_k`` times :math:`k_x` in FFT ordering.
+
+    E_norm : float
+        Normalization of the electric field on the mesh.
+
+    fft_rho : pyfftw.FFTW
+        FFTW plan of the charge density's FFT.
+
+    ifft_E_x : pyfftw.FFTW
+        FFTW plan of the :math:`x` component of the electric field's IFFT.
+
+    """
+
+    def __init__(self):
+        self.head = None
+        self.ls = None
+        self.subset_acc = None
+        self.mesh_sizes = None
+        self.mesh_spacings = None
+        self.box_volume = None
+
+    def setup(self, params, potential):
+        """
+        Allocate the arrays and create the FFTW plans.
+
+        Parameters
+        ----------
+        params : sarkas.core.Parameters
+            Simulation's parameters.
+
+        potential : sarkas.potentials.core.Potential
+            Potential class.
+
+        """
+        self.box_volume = params.box_volume
+        # Linked cell-list arrays
+        cells_per_dim = (params.box_lengths / potential.rc).astype(np.int64)
+        self.head = np.zeros(cells_per_dim.prod(), dtype=np.int64)
+        self.ls = np.zeros(params.total_num_ptcls, dtype=np.int64)
+
+        if potential.pppm_on:
+            self.mesh_sizes = np.copy(potential.pppm_mesh)
+            self.mesh_spacings = params.box_lengths / self.mesh_sizes
+            self.E_norm = 1.0 / np.prod(self.mesh_spacings)
+
+            self.wx = np.zeros(potential.pppm_cao)
+            self.wy = np.zeros(potential.pppm_cao)
+            self.wz = np.zeros(potential.pppm_cao)
+
+            # The Green's function and the k vectors are shifted back to FFT ordering once, instead of shifting the
+            # charge density and the electric field at each timestep.
+            self.G_k = np.fft.ifftshift(potential.pppm_green_function)
+            self.G_kx = np.fft.ifftshift(potential.pppm_kx * potential.pppm_green_function)
+            self.G_ky = np.fft.ifftshift(potential.pppm_ky * potential.pppm_green_function)
+            self.G_kz = np.fft.ifftshift(potential.pppm_kz * potential.pppm_green_function)
+
+            shape = (self.mesh_sizes[2], self.mesh_sizes[1], self.mesh_sizes[0])
+            self.rho_r = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.rho_k = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_kx = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_ky = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_kz = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_x = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_y = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.E_z = pyfftw.empty_aligned(shape, dtype='complex128')
+
+            self.create_fftw_plans()
+
+    def create_fftw_plans(self):
+        """Create the FFTW plans working on the mesh arrays."""
+        axes = (0, 1, 2)
+        self.fft_rho = pyfftw.FFTW(self.rho_r, self.rho_k, axes=axes, direction='FFTW_FORWARD')
+        self.ifft_E_x = pyfftw.FFTW(self.E_kx, self.E_x, axes=axes, direction='FFTW_BACKWARD')
+        self.ifft_E_y = pyfftw.FFTW(self.E_ky, self.E_y, axes=axes, direction='FFTW_BACKWARD')
+        self.ifft_E_z = pyfftw.FFTW(self.E_kz, self.E_z, axes=axes, direction='FFTW_BACKWARD')
+
+    def __getstate__(self):
+        # FFTW plans cannot be pickled. They are created again when unpickling.
+        state = self.__dict__.copy()
+        for plan in ['fft_rho', 'ifft_E_x', 'ifft_E_y', 'ifft_E_z']:
+            state.pop(plan, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.mesh_sizes is not None:
+            shape = self.rho_r.shape
+            # Unpickled arrays are not guaranteed to be aligned
+            for name in ['rho_r', 'rho_k', 'E_kx', 'E_ky', 'E_kz', 'E_x', 'E_y', 'E_z']:
+                self.__dict__[name] = pyfftw.empty_aligned(shape, dtype='complex128')
+            self.create_fftw_plans()
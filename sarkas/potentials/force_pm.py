@@ -3,7 +3,7 @@ Module for handling the Particle-Mesh part of the force and potential calculatio
 """
 
 import numpy as np
-from numba import jit, njit
+from numba import njit
 import pyfftw
 
 # These "ignore" are needed because numba does not support pyfftw yet
@@ -173,7 +173,28 @@ def assgnmnt_func(cao, x):
 
     """
     W = np.zeros(cao)
+    fill_assgnmnt_func(cao, x, W)
 
+    return W
+
+
+@njit
+def fill_assgnmnt_func(cao, x, W):
+    """
+    Same as :func:`assgnmnt_func` but the charge assignment function is written in place into ``W``.
+
+    Parameters
+    ----------
+    cao : int
+        Charge assignment order.
+
+    x : float
+        Distance to closest mesh point if cao is even.
+
+    W : numpy.ndarray
+        Charge Assignment Function. Shape = (``cao``).
+
+    """
     if cao == 1:
 
         W[0] = 1
@@ -232,8 +253,6 @@ def assgnmnt_func(cao, x):
 
         W[6] = (1. + 12. * x + 60. * x ** 2 + 160. * x ** 3 + 240. * x ** 4 + 192. * x ** 5 + 64. * x ** 6) / 46080.
 
-    return W
-
 
 @njit
 def calc_charge_dens(pos, charges, N, cao, mesh_sz, h_array):
@@ -268,6 +287,50 @@ def calc_charge_dens(pos, charges, N, cao, mesh_sz, h_array):
     """
 
     rho_r = np.zeros((mesh_sz[2], mesh_sz[1], mesh_sz[0]))
+    wx = np.zeros(cao)
+    wy = np.zeros(cao)
+    wz = np.zeros(cao)
+    assign_charges(pos, charges, cao, mesh_sz, h_array, rho_r, wx, wy, wz)
+
+    return rho_r
+
+
+@njit
+def assign_charges(pos, charges, cao, mesh_sz, h_array, rho_r, wx, wy, wz):
+    """
+    Same as :func:`calc_charge_dens` but the charge density is written in place into ``rho_r``.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    charges: numpy.ndarray
+        Particles' charges.
+
+    cao: int
+        Charge assignment order.
+
+    mesh_sz: numpy.ndarray
+        Mesh points per direction.
+
+    h_array: numpy.ndarray
+        Distances between mesh points per dimension.
+
+    rho_r: numpy.ndarray
+        Charge density distributed on mesh. Real or complex.
+
+    wx : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`x` axis. Shape = (``cao``).
+
+    wy : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`y` axis. Shape = (``cao``).
+
+    wz : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`z` axis. Shape = (``cao``).
+
+    """
+    rho_r[:, :, :] = 0.0
 
     # Mid point calculation
     if cao % 2 == 0:
@@ -279,7 +342,7 @@ def calc_charge_dens(pos, charges, N, cao, mesh_sz, h_array):
         mid = 0.0
         pshift = int(cao / float(2.0))
 
-    for ipart in range(N):
+    for ipart in range(pos.shape[0]):
 
         # ix = x-coord of the (left) closest mesh point
         # (ix + 0.5)*h_array[0] = midpoint between the two mesh points closest to the particle
@@ -295,9 +358,9 @@ def calc_charge_dens(pos, charges, N, cao, mesh_sz, h_array):
         iz = int(pos[ipart, 2] / h_array[2])
         z = pos[ipart, 2] / h_array[2] - (iz + mid)
 
-        wx = assgnmnt_func(cao, x)
-        wy = assgnmnt_func(cao, y)
-        wz = assgnmnt_func(cao, z)
+        fill_assgnmnt_func(cao, x, wx)
+        fill_assgnmnt_func(cao, y, wy)
+        fill_assgnmnt_func(cao, z, wz)
 
         izn = iz - pshift  # min. index along z-axis
 
@@ -344,7 +407,6 @@ def calc_charge_dens(pos, charges, N, cao, mesh_sz, h_array):
 
             izn += 1
 
-    return rho_r
 
 
 @njit
@@ -425,11 +487,65 @@ def calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sz, h_ar
           Acceleration from Electric Field.
 
     """
-    E_x_p = np.zeros(N)
-    E_y_p = np.zeros(N)
-    E_z_p = np.zeros(N)
-
     acc = np.zeros_like(pos)
+    wx = np.zeros(cao)
+    wy = np.zeros(cao)
+    wz = np.zeros(cao)
+    accumulate_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, cao, masses, mesh_sz, h_array, 1.0, acc, wx, wy, wz)
+
+    return acc
+
+
+@njit
+def accumulate_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, cao, masses, mesh_sz, h_array, norm, acc, wx, wy, wz):
+    """
+    Same as :func:`calc_acc_pm` but the long range accelerations are added in place to ``acc``.
+
+    Parameters
+    ----------
+    E_x_r : numpy.ndarray
+        Electric field along x-axis. Only the real part is used.
+
+    E_y_r : numpy.ndarray
+        Electric field along y-axis. Only the real part is used.
+
+    E_z_r : numpy.ndarray
+        Electric field along z-axis. Only the real part is used.
+
+    pos : numpy.ndarray
+        Particles' positions.
+
+    charges : numpy.ndarray
+        Particles' charges.
+
+    cao : int
+        Charge assignment order.
+
+    masses : numpy.ndarray
+        Particles' masses.
+
+    mesh_sz: numpy.ndarray
+        Mesh points per direction.
+
+    h_array: numpy.ndarray
+        Distances between mesh points per dimension.
+
+    norm : float
+        Normalization factor of the electric field.
+
+    acc : numpy.ndarray
+        Particles' accelerations. The long range accelerations are added to it.
+
+    wx : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`x` axis. Shape = (``cao``).
+
+    wy : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`y` axis. Shape = (``cao``).
+
+    wz : numpy.ndarray
+        Buffer for the charge assignment function along the :math:`z` axis. Shape = (``cao``).
+
+    """
 
     # Mid point calculation
     if cao % 2 == 0:
@@ -443,7 +559,7 @@ def calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sz, h_ar
         # Number of points to the left of the chosen one
         pshift = int(cao / float(2.0))
 
-    for ipart in range(N):
+    for ipart in range(pos.shape[0]):
 
         ix = int(pos[ipart, 0] / h_array[0])
         x = pos[ipart, 0] / h_array[0] - (ix + mid)
@@ -454,9 +570,14 @@ def calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sz, h_ar
         iz = int(pos[ipart, 2] / h_array[2])
         z = pos[ipart, 2] / h_array[2] - (iz + mid)
 
-        wx = assgnmnt_func(cao, x)
-        wy = assgnmnt_func(cao, y)
-        wz = assgnmnt_func(cao, z)
+        fill_assgnmnt_func(cao, x, wx)
+        fill_assgnmnt_func(cao, y, wy)
+        fill_assgnmnt_func(cao, z, wz)
+
+        q_over_m = norm * charges[ipart] / masses[ipart]
+        E_x_p = 0.0
+        E_y_p = 0.0
+        E_z_p = 0.0
 
         izn = iz - pshift  # min. index along z-axis
 
@@ -496,10 +617,10 @@ def calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sz, h_ar
                     # else:
                     #     r_j = ixn
 
-                    q_over_m = charges[ipart] / masses[ipart]
-                    E_x_p[ipart] += q_over_m * E_x_r[r_g, r_i, r_j] * wz[g] * wy[i] * wx[j]
-                    E_y_p[ipart] += q_over_m * E_y_r[r_g, r_i, r_j] * wz[g] * wy[i] * wx[j]
-                    E_z_p[ipart] += q_over_m * E_z_r[r_g, r_i, r_j] * wz[g] * wy[i] * wx[j]
+                    w = wz[g] * wy[i] * wx[j]
+                    E_x_p += E_x_r[r_g, r_i, r_j].real * w
+                    E_y_p += E_y_r[r_g, r_i, r_j].real * w
+                    E_z_p += E_z_r[r_g, r_i, r_j].real * w
 
                     ixn += 1
 
@@ -507,15 +628,13 @@ def calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sz, h_ar
 
             izn += 1
 
-    acc[:, 0] = E_x_p
-    acc[:, 1] = E_y_p
-    acc[:, 2] = E_z_p
-
-    return acc
+        acc[ipart, 0] += q_over_m * E_x_p
+        acc[ipart, 1] += q_over_m * E_y_p
+        acc[ipart, 2] += q_over_m * E_z_p
 
 
-# FFTW version
-@jit  # Numba does not support pyfftw yet, however, this decorator still speeds up the function.
+# FFTW version. Numba does not support pyfftw, hence this function is not compiled. The integrators use
+# update_accumulate.
 def update(pos, charges, masses, mesh_sizes, box_lengths, G_k, kx_v, ky_v, kz_v, cao):
     """ 
     Calculate the long range part of particles' accelerations.
@@ -610,3 +729,116 @@ def update(pos, charges, masses, mesh_sizes, box_lengths, G_k, kx_v, ky_v, kz_v,
     acc_f = calc_acc_pm(E_x_r, E_y_r, E_z_r, pos, charges, N, cao, masses, mesh_sizes, mesh_spacings)
 
     return U_f, acc_f
+
+
+@njit
+def calc_field_energy(rho_k, G_k, G_kx, G_ky, G_kz, E_kx, E_ky, E_kz):
+    """
+    Calculate the Electric field in Fourier space and the long range part of the potential energy.
+    The electric field is written in place into the ``E_k`` arrays.
+
+    Parameters
+    ----------
+    rho_k : numpy.ndarray
+        Charge density in Fourier space.
+
+    G_k : numpy.ndarray
+        Optimized Green's function.
+
+    G_kx : numpy.ndarray
+        Optimized Green's function times :math:`k_x`.
+
+    G_ky : numpy.ndarray
+        Optimized Green's function times :math:`k_y`.
+
+    G_kz : numpy.ndarray
+        Optimized Green's function times :math:`k_z`.
+
+    E_kx : numpy.ndarray
+       Electric Field along kx-axis.
+
+    E_ky : numpy.ndarray
+       Electric Field along ky-axis.
+
+    E_kz : numpy.ndarray
+       Electric Field along kz-axis.
+
+    Returns
+    -------
+    U_k : float
+        :math:`\\sum_k |\\rho(k)|^2 G(k)`.
+
+    Notes
+    -----
+    All the arrays must be ordered in the same way. There is no need to shift the DC value at the center of the
+    arrays since all the operations are element-wise.
+
+    """
+    U_k = 0.0
+    for nz in range(rho_k.shape[0]):
+        for ny in range(rho_k.shape[1]):
+            for nx in range(rho_k.shape[2]):
+                rho = rho_k[nz, ny, nx]
+                U_k += (rho.real * rho.real + rho.imag * rho.imag) * G_k[nz, ny, nx]
+                # Potential from Poisson eq. times -i
+                minus_i_phi = -1j * rho
+                E_kx[nz, ny, nx] = G_kx[nz, ny, nx] * minus_i_phi
+                E_ky[nz, ny, nx] = G_ky[nz, ny, nx] * minus_i_phi
+                E_kz[nz, ny, nx] = G_kz[nz, ny, nx] * minus_i_phi
+
+    return U_k
+
+
+def update_accumulate(pos, charges, masses, box_lengths, cao, workspace, acc):
+    """
+    Same as :func:`update` but all the arrays and the FFTW plans are taken from ``workspace``
+    and the long range accelerations are added in place to ``acc``.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    charges: numpy.ndarray
+        Particles' charges.
+
+    masses: numpy.ndarray
+        Particles' masses.
+
+    box_lengths: numpy.ndarray
+        Box length in each direction.
+
+    cao : int
+        Charge order parameter.
+
+    workspace : sarkas.potentials.core.ForceWorkspace
+        Preallocated arrays and FFTW plans.
+
+    acc : numpy.ndarray
+        Particles' accelerations. The long range accelerations are added to it.
+
+    Returns
+    -------
+    U_f : float
+        Long range part of the potential.
+
+    """
+    ws = workspace
+    # Calculate charge density on mesh directly into the input array of the FFT
+    assign_charges(pos, charges, cao, ws.mesh_sizes, ws.mesh_spacings, ws.rho_r, ws.wx, ws.wy, ws.wz)
+    # Calculate fft. The output is rho_k
+    ws.fft_rho()
+
+    U_f = 0.5 * calc_field_energy(ws.rho_k, ws.G_k, ws.G_kx, ws.G_ky, ws.G_kz,
+                                  ws.E_kx, ws.E_ky, ws.E_kz) / ws.box_volume
+
+    # Compute IFFTs. The outputs are E_x, E_y, E_z
+    ws.ifft_E_x()
+    ws.ifft_E_y()
+    ws.ifft_E_z()
+
+    # I am worried that this normalization is not needed
+    accumulate_acc_pm(ws.E_x, ws.E_y, ws.E_z, pos, charges, cao, masses, ws.mesh_sizes, ws.mesh_spacings,
+                      ws.E_norm, acc, ws.wx, ws.wy, ws.wz)
+
+    return U_f
@@ -48,13 +48,61 @@ def update_0D(pos, id_ij, mass_ij, Lv, rc, potential_matrix, force, measure, rdf
     acc_s_r : array
         Particles' accelerations.
 
+    """
+    acc_s_r = np.zeros_like(pos)  # Vector of accelerations
+    U_s_r = update_0D_accumulate(pos, id_ij, mass_ij, Lv, rc, potential_matrix, force, measure, rdf_hist, acc_s_r)
+
+    return U_s_r, acc_s_r
+
+
+@njit
+def update_0D_accumulate(pos, id_ij, mass_ij, Lv, rc, potential_matrix, force, measure, rdf_hist, acc_s_r):
+    """
+    Same as :func:`update_0D` but the accelerations are added in place to ``acc_s_r``.
+
+    Parameters
+    ----------
+    force: func
+        Force function.
+
+    potential_matrix: array
+        Potential parameters.
+
+    rc: float
+        Cut-off radius.
+
+    Lv: array
+        Array of box sides' lentgh.
+
+    mass_ij: array
+        Mass of each particle.
+
+    id_ij: array
+        Id of each particle
+
+    pos: array
+        Particles' positions.
+
+    measure : bool
+        Boolean for rdf calculation.
+
+    rdf_hist : array
+        Radial Distribution function array.
+
+    acc_s_r : array
+        Particles' accelerations. The short-ranged accelerations are added to it.
+
+    Returns
+    -------
+    U_s_r : float
+        Potential.
+
     """
     L = Lv[0]
     Lh = L / 2.
     N = pos.shape[0]  # Number of particles
 
     U_s_r = 0.0  # Short-ranges potential energy accumulator
-    acc_s_r = np.zeros_like(pos)  # Vector of accelerations
 
     rdf_nbins = rdf_hist.shape[0]
     dr_rdf = L / float(2.0 * rdf_nbins)
@@ -116,7 +164,7 @@ def update_0D(pos, id_ij, mass_ij, Lv, rc, potential_matrix, force, measure, rdf
                 acc_s_r[j, 1] -= acc_jy
                 acc_s_r[j, 2] -= acc_jz
 
-    return U_s_r, acc_s_r
+    return U_s_r
 
 
 @njit
@@ -168,24 +216,91 @@ def update(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure,
     https://en.wikipedia.org/wiki/Ewald_summation or
     "Computer Simulation of Liquids by Allen and Tildesley" for more information.
     """
+    # Declare parameters
+    N = pos.shape[0]  # Number of particles
+    ls = np.arange(N)  # List of particle indices in a given cell
+
+    # The number of cells in each dimension
+    cells_per_dim = (box_lengths / rc).astype(np.int64)
+    # Total number of cells in volume
+    Ncell = cells_per_dim.prod()
+    head = np.arange(Ncell)  # List of head particles
+
     acc_s_r = np.zeros_like(pos)
+    U_s_r = update_accumulate(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure, rdf_hist,
+                              acc_s_r, head, ls)
+
+    return U_s_r, acc_s_r
+
+
+@njit
+def update_accumulate(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure, rdf_hist, acc_s_r, head, ls):
+    """
+    Same as :func:`update` but the accelerations are added in place to ``acc_s_r`` and the linked cell-list arrays
+    are passed by the caller, so that no memory is allocated.
+
+    Parameters
+    ----------
+    force: float, float
+        Potential and force values.
+
+    potential_matrix: array
+        Potential parameters.
+
+    rc: float
+        Cut-off radius.
+
+    box_lengths: array
+        Array of box sides' length.
+
+    p_mass: array
+        Mass of each particle.
+
+    p_id: array
+        Id of each particle
+
+    pos: array
+        Particles' positions.
+
+    measure : bool
+        Boolean for rdf calculation.
+
+    rdf_hist : array
+        Radial Distribution function array.
+
+    acc_s_r : array
+        Particles' accelerations. The short-ranged accelerations are added to it.
+
+    head : array
+        Head particle of each cell. Shape = (number of cells).
+
+    ls : array
+        List of particle indices in a given cell. Shape = (number of particles).
 
+    Returns
+    -------
+    U_s_r : float
+        Short-ranged component of the potential energy of the system.
+
+    """
     # Declare parameters
     N = pos.shape[0]  # Number of particles
-    d = pos.shape[1]  # Number of dimensions
-    rshift = np.zeros(d)  # Shifts for array flattening
+    # Shifts for array flattening. Scalars instead of an array to avoid memory allocation.
+    rshift_x = 0.0
+    rshift_y = 0.0
+    rshift_z = 0.0
 
     # Initialize
     U_s_r = 0.0  # Short-ranges potential energy accumulator
-    ls = np.arange(N)  # List of particle indices in a given cell
 
     # The number of cells in each dimension
-    cells_per_dim = (box_lengths / rc).astype(np.int64)
-    cell_length_per_dim = box_lengths / cells_per_dim
+    cells_x = int(box_lengths[0] / rc)
+    cells_y = int(box_lengths[1] / rc)
+    cells_z = int(box_lengths[2] / rc)
+    cell_length_x = box_lengths[0] / cells_x
+    cell_length_y = box_lengths[1] / cells_y
+    cell_length_z = box_lengths[2] / cells_z
 
-    # Total number of cells in volume
-    Ncell = cells_per_dim.prod()
-    head = np.arange(Ncell)  # List of head particles
     empty = -50  # value for empty list and head arrays
     head.fill(empty)  # Make head list empty until population
 
@@ -195,12 +310,13 @@ def update(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure,
     # Loop over all particles and place them in cells
     for i in range(N):
         # Determine what cell, in each direction, the i-th particle is in
-        cx = int(pos[i, 0] / cell_length_per_dim[0])  # X cell
-        cy = int(pos[i, 1] / cell_length_per_dim[1])  # Y cell
-        cz = int(pos[i, 2] / cell_length_per_dim[2])  # Z cell
+        # Particles absorbed by the boundaries lie on the box's upper faces, i.e. in the last cell.
+        cx = min(int(pos[i, 0] / cell_length_x), cells_x - 1)  # X cell
+        cy = min(int(pos[i, 1] / cell_length_y), cells_y - 1)  # Y cell
+        cz = min(int(pos[i, 2] / cell_length_z), cells_z - 1)  # Z cell
 
         # Determine cell in 3D volume for i-th particle
-        c = cx + cy * cells_per_dim[0] + cz * cells_per_dim[0] * cells_per_dim[1]
+        c = cx + cy * cells_x + cz * cells_x * cells_y
         # List of particle indices occupying a given cell
         ls[i] = head[c]
 
@@ -208,65 +324,65 @@ def update(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure,
         head[c] = i
 
     # Loop over all cells in x, y, and z direction
-    for cx in range(cells_per_dim[0]):
-        for cy in range(cells_per_dim[1]):
-            for cz in range(cells_per_dim[2]):
+    for cx in range(cells_x):
+        for cy in range(cells_y):
+            for cz in range(cells_z):
 
                 # Compute the cell in 3D volume
-                c = cx + cy * cells_per_dim[0] + cz * cells_per_dim[0] * cells_per_dim[1]
+                c = cx + cy * cells_x + cz * cells_x * cells_y
 
                 # Loop over all cell pairs (N-1 and N+1)
                 for cz_N in range(cz - 1, cz + 2):
                     # z cells
                     # Check periodicity: needed for 0th cell
                     # if cz_N < 0:
-                    #     cz_shift = cells_per_dim[2]
-                    #     rshift[2] = -box_lengths[2]
+                    #     cz_shift = cells_z
+                    #     rshift_z = -box_lengths[2]
                     # # Check periodicity: needed for Nth cell
-                    # elif cz_N >= cells_per_dim[2]:
-                    #     cz_shift = -cells_per_dim[2]
-                    #     rshift[2] = box_lengths[2]
+                    # elif cz_N >= cells_z:
+                    #     cz_shift = -cells_z
+                    #     rshift_z = box_lengths[2]
                     # else:
                     #     cz_shift = 0
-                    #     rshift[2] = 0.0
-                    cz_shift = 0 + cells_per_dim[2] * (cz_N < 0) - cells_per_dim[2] * (cz_N >= cells_per_dim[2])
-                    rshift[2] = 0.0 - box_lengths[2] * (cz_N < 0) + box_lengths[2]*(cz_N >= cells_per_dim[2])
+                    #     rshift_z = 0.0
+                    cz_shift = 0 + cells_z * (cz_N < 0) - cells_z * (cz_N >= cells_z)
+                    rshift_z = 0.0 - box_lengths[2] * (cz_N < 0) + box_lengths[2]*(cz_N >= cells_z)
 
                     for cy_N in range(cy - 1, cy + 2):
                         # y cells
                         # Check periodicity
                         # if cy_N < 0:
-                        #     cy_shift = cells_per_dim[1]
-                        #     rshift[1] = -box_lengths[1]
-                        # elif cy_N >= cells_per_dim[1]:
-                        #     cy_shift = -cells_per_dim[1]
-                        #     rshift[1] = box_lengths[1]
+                        #     cy_shift = cells_y
+                        #     rshift_y = -box_lengths[1]
+                        # elif cy_N >= cells_y:
+                        #     cy_shift = -cells_y
+                        #     rshift_y = box_lengths[1]
                         # else:
                         #     cy_shift = 0
-                        #     rshift[1] = 0.0
+                        #     rshift_y = 0.0
 
-                        cy_shift = 0 + cells_per_dim[1] * (cy_N < 0) - cells_per_dim[1] * (cy_N >= cells_per_dim[1])
-                        rshift[1] = 0.0 - box_lengths[1] * (cy_N < 0) + box_lengths[1] * (cy_N >= cells_per_dim[1])
+                        cy_shift = 0 + cells_y * (cy_N < 0) - cells_y * (cy_N >= cells_y)
+                        rshift_y = 0.0 - box_lengths[1] * (cy_N < 0) + box_lengths[1] * (cy_N >= cells_y)
 
                         for cx_N in range(cx - 1, cx + 2):
                             # x cells
                             # Check periodicity
                             # if cx_N < 0:
-                            #     cx_shift = cells_per_dim[0]
-                            #     rshift[0] = -box_lengths[0]
-                            # elif cx_N >= cells_per_dim[0]:
-                            #     cx_shift = -cells_per_dim[0]
-                            #     rshift[0] = box_lengths[0]
+                            #     cx_shift = cells_x
+                            #     rshift_x = -box_lengths[0]
+                            # elif cx_N >= cells_x:
+                            #     cx_shift = -cells_x
+                            #     rshift_x = box_lengths[0]
                             # else:
                             #     cx_shift = 0
-                            #     rshift[0] = 0.0
+                            #     rshift_x = 0.0
 
-                            cx_shift = 0 + cells_per_dim[0] * (cx_N < 0) - cells_per_dim[0] * (cx_N >= cells_per_dim[0])
-                            rshift[0] = 0.0 - box_lengths[0] * (cx_N < 0) + box_lengths[0] * (cx_N >= cells_per_dim[0])
+                            cx_shift = 0 + cells_x * (cx_N < 0) - cells_x * (cx_N >= cells_x)
+                            rshift_x = 0.0 - box_lengths[0] * (cx_N < 0) + box_lengths[0] * (cx_N >= cells_x)
 
                             # Compute the location of the N-th cell based on shifts
-                            c_N = (cx_N + cx_shift) + (cy_N + cy_shift) * cells_per_dim[0] \
-                                  + (cz_N + cz_shift) * cells_per_dim[0] * cells_per_dim[1]
+                            c_N = (cx_N + cx_shift) + (cy_N + cy_shift) * cells_x \
+                                  + (cz_N + cz_shift) * cells_x * cells_y
 
                             i = head[c]
                             # First compute interaction of head particle with neighboring cell head particles
@@ -282,9 +398,9 @@ def update(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure,
                                     if i < j:
 
                                         # Compute the difference in positions for the i-th and j-th particles
-                                        dx = pos[i, 0] - (pos[j, 0] + rshift[0])
-                                        dy = pos[i, 1] - (pos[j, 1] + rshift[1])
-                                        dz = pos[i, 2] - (pos[j, 2] + rshift[2])
+                                        dx = pos[i, 0] - (pos[j, 0] + rshift_x)
+                                        dy = pos[i, 1] - (pos[j, 1] + rshift_y)
+                                        dz = pos[i, 2] - (pos[j, 2] + rshift_z)
 
                                         # Compute distance between particles i and j
                                         r = np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
@@ -317,4 +433,5 @@ def update(pos, p_id, p_mass, box_lengths, rc, potential_matrix, force, measure,
 
                                 # Check if head particle interacts with other cells
                                 i = ls[i]
-    return U_s_r, acc_s_r
+    return U_s_r
+
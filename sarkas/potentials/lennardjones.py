@@ -86,7 +86,7 @@ def lj_force(r, pot_matrix_ij):
 
     """
 
-    rs = pot_matrix[4]
+    rs = pot_matrix_ij[4]
     if r < rs:
         r = rs
 
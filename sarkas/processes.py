@@ -11,8 +11,10 @@ from matplotlib.colors import LogNorm
 import os
 
 # Sarkas modules
+from sarkas.utilities.energy_log import remove_energy
 from sarkas.utilities.io import InputOutput
 from sarkas.utilities.timing import SarkasTimer
+from sarkas.utilities.trajectory import dump_size
 from sarkas.potentials.core import Potential
 from sarkas.time_evolution.integrators import Integrator
 from sarkas.time_evolution.thermostats import Thermostat
@@ -154,6 +156,11 @@ class Process:
                     self.diff_flux = sk_obs.DiffusionFlux()
                     if sub_dict:
                         self.diff_flux.from_dict(sub_dict)
+                if key == 'PressureTensor':
+                    self.observables_list.append('pressure_tensor')
+                    self.pressure_tensor = sk_obs.PressureTensor()
+                    if sub_dict:
+                        self.pressure_tensor.from_dict(sub_dict)
 
         if 'TransportCoefficients' in dics.keys():
             self.transport_dict = dics["TransportCoefficients"].copy()
@@ -281,6 +288,10 @@ class Process:
                                 self.ec = sk_obs.ElectricCurrent()
                                 if sub_dict:
                                     self.ec.from_dict(sub_dict)
+                            if key == 'PressureTensor':
+                                self.pressure_tensor = sk_obs.PressureTensor()
+                                if sub_dict:
+                                    self.pressure_tensor.from_dict(sub_dict)
 
         if self.__name__ == 'postprocessing':
 
@@ -338,16 +349,24 @@ class PostProcess(Process):
         self.io = py_copy.copy(simulation.io)
 
     def run(self):
-        """Calculate all the observables from the YAML input file."""
-
-        for obs in self.observables_list:
-            if obs in self.__dict__.keys():
-                self.__dict__[obs].setup(self.parameters)
-                if obs == 'therm':
-                    self.therm.temp_energy_plot(self)
-                else:
-                    self.io.postprocess_info(self, write_to_file=True, observable=obs)
-                    self.__dict__[obs].compute()
+        """
+        Calculate all the observables from the YAML input file. The per-dump quantities of all the observables are
+        computed first in a single pass over the dumps, see :class:`sarkas.tools.observables.FramePipeline`.
+        """
+        observables = [obs for obs in self.observables_list if obs in self.__dict__.keys()]
+        pipeline = sk_obs.FramePipeline(verbose=self.parameters.verbose)
+        for obs in observables:
+            self.__dict__[obs].setup(self.parameters)
+            if obs != 'therm':
+                self.__dict__[obs].register(pipeline)
+        pipeline.run()
+
+        for obs in observables:
+            if obs == 'therm':
+                self.therm.temp_energy_plot(self)
+            else:
+                self.io.postprocess_info(self, write_to_file=True, observable=obs)
+                self.__dict__[obs].compute()
 
         if hasattr(self, 'transport_dict'):
             from sarkas.tools.transport import TransportCoefficient as TC
@@ -468,21 +487,26 @@ class PreProcess(Process):
 
             self.time_acceleration()
             self.time_integrator_loop()
+            self.io.flush_dumps()
 
             # Estimate size of dump folder
-            # Grab one file from the dump directory and get the size of it.
-            eq_dump_size = os.stat(os.path.join(self.io.eq_dump_dir, os.listdir(self.io.eq_dump_dir)[0])).st_size
+            # Get the size of one dump.
+            eq_dump_size = dump_size(self.io.eq_dump_dir)
             eq_dump_fldr_size = eq_dump_size * (self.integrator.equilibration_steps / self.integrator.eq_dump_step)
-            # Grab one file from the dump directory and get the size of it.
-            prod_dump_size = os.stat(os.path.join(self.io.eq_dump_dir, os.listdir(self.io.eq_dump_dir)[0])).st_size
+            # Get the size of one dump.
+            prod_dump_size = dump_size(self.io.prod_dump_dir)
             prod_dump_fldr_size = prod_dump_size * (self.integrator.production_steps / self.integrator.prod_dump_step)
+            # Add the dump streams saved at their own cadence
+            prod_streams = self.io.dump_schemas['production']['streams'].values()
+            for stream in prod_streams:
+                prod_dump_fldr_size += dump_size(stream['dump_dir']) * (
+                        self.integrator.production_steps / stream['dump_step'])
             # Prepare arguments to pass for print out
             sizes = np.array([[eq_dump_size, eq_dump_fldr_size],
                               [prod_dump_size, prod_dump_fldr_size]])
             # Check for electrostatic equilibration
             if self.integrator.electrostatic_equilibration:
-                dump = self.integrator.mag_dump_step
-                mag_dump_size = os.stat(os.path.join(self.io.mag_dump_dir, 'checkpoint_' + str(dump) + '.npz')).st_size
+                mag_dump_size = dump_size(self.io.mag_dump_dir)
                 mag_dump_fldr_size = mag_dump_size * (
                         self.integrator.magnetization_steps / self.integrator.mag_dump_step)
                 sizes = np.array([[eq_dump_size, eq_dump_fldr_size],
@@ -493,8 +517,8 @@ class PreProcess(Process):
 
             if remove:
                 # Delete the energy files created during the estimation runs
-                os.remove(self.io.eq_energy_filename)
-                os.remove(self.io.prod_energy_filename)
+                remove_energy(self.io.eq_energy_filename)
+                remove_energy(self.io.prod_energy_filename)
 
                 # Delete dumps created during the estimation runs
                 for npz in os.listdir(self.io.eq_dump_dir):
@@ -503,8 +527,12 @@ class PreProcess(Process):
                 for npz in os.listdir(self.io.prod_dump_dir):
                     os.remove(os.path.join(self.io.prod_dump_dir, npz))
 
+                for stream in prod_streams:
+                    for npz in os.listdir(stream['dump_dir']):
+                        os.remove(os.path.join(stream['dump_dir'], npz))
+
                 if self.integrator.electrostatic_equilibration:
-                    os.remove(self.io.mag_energy_filename)
+                    remove_energy(self.io.mag_energy_filename)
                     # Remove dumps
                     for npz in os.listdir(self.io.mag_dump_dir):
                         os.remove(os.path.join(self.io.mag_dump_dir, npz))
@@ -1159,6 +1187,8 @@ class Simulation(Process):
         # Check if this is restart
         if self.parameters.load_method in ["equilibration_restart", "eq_restart"]:
             it_start = self.parameters.restart_step
+            # Remove the particles absorbed before the checkpoint
+            self.integrator.compact(self.particles)
         else:
             it_start = 0
             self.io.dump('equilibration', self.particles, 0)
@@ -1166,9 +1196,17 @@ class Simulation(Process):
         # Start timer, equilibrate, and print run time.
         self.timer.start()
         self.integrator.equilibrate(it_start, self.particles, self.io)
+        self.io.flush_dumps()
         time_eq = self.timer.stop()
         self.io.time_stamp("Equilibration", self.timer.time_division(time_eq))
 
+        # Store the number of steps actually done if the equilibration stopped at convergence
+        if self.integrator.equilibration_steps != self.parameters.equilibration_steps:
+            if self.parameters.verbose:
+                print('Equilibration converged after {} steps'.format(self.integrator.equilibration_steps))
+            self.parameters.equilibration_steps = self.integrator.equilibration_steps
+            self.io.save_pickle(self)
+
         # Check for magnetization phase
         if self.integrator.electrostatic_equilibration:
             if self.parameters.verbose:
@@ -1176,6 +1214,7 @@ class Simulation(Process):
 
             if self.parameters.load_method in ["magnetization_restart", "mag_restart"]:
                 it_start = self.parameters.restart_step
+                self.integrator.compact(self.particles)
             else:
                 it_start = 0
                 self.io.dump('magnetization', self.particles, it_start)
@@ -1183,6 +1222,7 @@ class Simulation(Process):
             # Start timer, magnetize, and print run time.
             self.timer.start()
             self.integrator.magnetize(it_start, self.particles, self.io)
+            self.io.flush_dumps()
             time_eq = self.timer.stop()
             self.io.time_stamp("Magnetization", self.timer.time_division(time_eq))
 
@@ -1194,6 +1234,8 @@ class Simulation(Process):
         # Check for simulation restart.
         if self.parameters.load_method in ["prod_restart", "production_restart"]:
             it_start = self.parameters.restart_step
+            # Remove the particles absorbed before the checkpoint
+            self.integrator.compact(self.particles)
         else:
             it_start = 0
             # Restart the pbc counter.
@@ -1206,12 +1248,52 @@ class Simulation(Process):
         # Update measurement flag for rdf.
         self.potential.measure = True
 
+        insitu = self.insitu_setup(it_start)
+        if insitu is not None and it_start == 0:
+            insitu.accumulate(0, self.particles)
+
         # Start timer, produce data, and print run time.
         self.timer.start()
+        self.integrator.insitu_pipeline = insitu
         self.integrator.produce(it_start, self.particles, self.io)
+        self.integrator.insitu_pipeline = None
+        self.io.flush_dumps()
+        if insitu is not None:
+            insitu.save()
         time_end = self.timer.stop()
         self.io.time_stamp("Production", self.timer.time_division(time_end))
 
+    def insitu_setup(self, it_start):
+        """
+        Setup the observables of the YAML input file flagged with ``insitu``, whose per-dump quantities are computed
+        during the production phase. See :class:`sarkas.tools.observables.InSituPipeline`.
+
+        Parameters
+        ----------
+        it_start : int
+            First production step.
+
+        Returns
+        -------
+        pipeline : sarkas.tools.observables.InSituPipeline
+            Pipeline handed to the integrator. None if no observable is flagged.
+
+        """
+        observables = [self.__dict__[obs] for obs in getattr(self, 'observables_list', [])
+                       if obs in self.__dict__.keys() and getattr(self.__dict__[obs], 'insitu', False)]
+        if not observables:
+            return None
+
+        pipeline = sk_obs.InSituPipeline(self.integrator.insitu_step, self.parameters.production_steps,
+                                         self.parameters.dt)
+        for observable in observables:
+            # The production dumps are being written: the pipeline sets the dumps of the observable
+            observable.insitu_pipeline = pipeline
+            observable.setup(self.parameters, phase='production')
+            observable.setup_insitu(pipeline, it_start)
+
+        return pipeline
+
     def run(self) -> None:
         """Run the simulation."""
         time0 = self.timer.current()
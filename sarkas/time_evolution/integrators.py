@@ -5,6 +5,9 @@ Module of various types of time_evolution
 import numpy as np
 from numba import njit
 from IPython import get_ipython
+from sarkas.potentials.force_pp import update_accumulate
+from sarkas.time_evolution.thermostats import berendsen
+from sarkas.tools.observables import calc_statistical_efficiency
 
 if get_ipython().__class__.__name__ == 'ZMQInteractiveShell':
     from tqdm import tqdm_notebook as tqdm
@@ -41,6 +44,13 @@ class Integrator:
     prod_dump_step: int
         Production dump interval.
 
+    insitu_step: int
+        Interval of timesteps between two computations of the observables' per-dump quantities during the production
+        phase. Default = ``prod_dump_step``.
+
+    insitu_pipeline: sarkas.tools.observables.InSituPipeline
+        Observables' quantities computed during the production phase. Default = None.
+
     species_num: numpy.ndarray
         Number of particles of each species. copy of ``parameters.species_num``.
 
@@ -57,7 +67,13 @@ class Integrator:
         Integrator type.
 
     update: func
-        Integrator choice. 'verlet', 'verlet_langevin', 'magnetic_verlet' or 'magnetic_boris'.
+        Integrator choice. 'verlet', 'verlet_langevin', 'magnetic_verlet', 'magnetic_boris', 'subcycled_verlet',
+        'forest_ruth', 'mclachlan', 'magnetic_forest_ruth' or 'magnetic_mclachlan'.
+
+    species_substeps: numpy.ndarray
+        Number of substeps per timestep of each species. Used only by the 'subcycled_verlet' integrator.
+        Default = ceil(max(species_plasma_frequencies) / min(species_plasma_frequencies)) for the species with the
+        highest plasma frequency, 1 for all the others.
 
     update_accelerations: func
         Link to the correct potential update function.
@@ -65,6 +81,56 @@ class Integrator:
     thermostate: func
         Link to the correct thermostat function.
 
+    fused_thermostat: bool
+        Flag for computing the species' temperatures in the verlet second half kick and rescaling the velocities
+        without a further kinetic energy reduction. Set for the 'verlet' integrator in non-magnetized simulations.
+
+    species_kinetic_temperatures: numpy.ndarray
+        Species' temperatures computed by the fused verlet kernel. Used by the fused thermostat.
+
+    thermostat_diagnostics: func
+        Link to the function returning the thermostat's diagnostics. See :meth:`log_diagnostics`.
+
+    thermostat_columns: list
+        Names of the thermostat's diagnostics.
+
+    compiled_loop: bool
+        Flag for running blocks of timesteps, between two dumps, entirely inside a numba function. Available only
+        for the 'verlet' integrator, periodic boundary conditions, the PP method and non-magnetized simulations.
+        Default = False.
+
+    adaptive_dt: bool
+        Flag for choosing the timestep of each equilibration (and magnetization) step from the particles' largest speed
+        and acceleration. Dumps are still saved every ``eq_dump_step * dt`` and the production phase uses ``dt``.
+        Default = False.
+
+    adaptive_dt_eta: float
+        Safety factor of the adaptive timestep, i.e. the largest fraction of ``a_ws`` a particle can travel in a
+        timestep. Default = 0.1.
+
+    adaptive_dt_min: float
+        Smallest adaptive timestep. Default = 1.0e-3 * dt.
+
+    adaptive_dt_max: float
+        Largest adaptive timestep. Default = dt.
+
+    equilibration_convergence: bool
+        Flag for stopping the equilibration as soon as the temperature and the potential energy, sampled at every
+        equilibration dump, are converged. See :meth:`equilibration_converged`. Default = False.
+
+    convergence_window: int
+        Number of equilibration dumps used for the convergence check. Default = 20.
+
+    convergence_blocks: int
+        Number of blocks in which the window is divided. Default = 4.
+
+    convergence_tolerance: float
+        Relative tolerance of the drift and of the block averages' spread. Default = 1.0e-2.
+
+    compaction: bool
+        Flag for removing the absorbed particles from the particles' arrays at every dump in simulations with absorbing
+        boundary conditions. See :meth:`compact`. Default = True.
+
     enforce_bc: func
         Link to the function enforcing boundary conditions. 'periodic' or 'absorbing'.
 
@@ -82,6 +148,8 @@ class Integrator:
         self.prod_dump_step = None
         self.eq_dump_step = None
         self.mag_dump_steps = None
+        self.insitu_step = None
+        self.insitu_pipeline = None
         self.update = None
         self.species_num = None
         self.box_lengths = None
@@ -89,8 +157,23 @@ class Integrator:
         self.boundary_conditions = None
         self.enforce_bc = None
         self.verbose = False
+        self.species_substeps = None
+        self.fused_thermostat = False
+        self.kinetic_reduction = False
+        self.compiled_loop = False
+        self.adaptive_dt = False
+        self.adaptive_dt_eta = 0.1
+        self.adaptive_dt_min = None
+        self.adaptive_dt_max = None
+        self.equilibration_convergence = False
+        self.convergence_window = 20
+        self.convergence_blocks = 4
+        self.convergence_tolerance = 1.0e-2
+        self.compaction = True
         self.supported_boundary_conditions = ['periodic', 'absorbing']
-        self.supported_integrators = ['verlet', 'verlet_langevin', 'magnetic_verlet', 'magnetic_boris']
+        self.supported_integrators = ['verlet', 'verlet_langevin', 'magnetic_verlet', 'magnetic_boris',
+                                      'subcycled_verlet', 'forest_ruth', 'mclachlan',
+                                      'magnetic_forest_ruth', 'magnetic_mclachlan']
 
     # def __repr__(self):
     #     sortedDict = dict(sorted(self.__dict__.items(), key=lambda x: x[0].lower()))
@@ -156,6 +239,9 @@ class Integrator:
             else:
                 self.eq_dump_step = int(0.1 * self.equilibration_steps)
 
+        if self.insitu_step is None:
+            self.insitu_step = self.prod_dump_step
+
         assert self.boundary_conditions.lower() in self.supported_boundary_conditions, 'Wrong choice of boundary condition.'
 
         # Assign integrator.enforce_bc to the correct method
@@ -163,6 +249,8 @@ class Integrator:
             self.enforce_bc = self.periodic
         elif self.boundary_conditions.lower() == "absorbing":
             self.enforce_bc = self.absorbing
+            # Needed for updating the number of particles of each species after a compaction
+            self.thermostat = thermostat
 
         assert self.type.lower() in self.supported_integrators, 'Wrong integrator choice.'
 
@@ -170,70 +258,35 @@ class Integrator:
         if self.type.lower() == "verlet":
             self.update = self.verlet
 
+        elif self.type.lower() == "subcycled_verlet":
+            self.subcycling_setup(params, potential)
+            self.update = self.subcycled_verlet
+
         elif self.type.lower() == "verlet_langevin":
 
-            self.sigma = np.sqrt(
-                2. * self.langevin_gamma * params.kB * params.species_temperatures / params.species_masses)
-            self.c1 = (1. - 0.5 * self.langevin_gamma * self.dt)
-            self.c2 = 1. / (1. + 0.5 * self.langevin_gamma * self.dt)
+            # langevin_gamma can be a single value or one value per species
+            self.species_langevin_gamma = np.ones(params.num_species) * np.array(self.langevin_gamma, dtype=float)
+            self.sigma = np.sqrt(2. * self.species_langevin_gamma * params.kB * params.species_temperatures
+                                 / params.species_masses)
+            self.langevin_coefficients()
+            # Buffer of the random numbers
+            self.langevin_beta = np.zeros((params.total_num_ptcls, params.dimensions))
             self.update = self.verlet_langevin
 
         elif self.type.lower() == "magnetic_verlet":
-
-            # Create the unit vector of the magnetic field
-            self.magnetic_field_uvector = params.magnetic_field / np.linalg.norm(params.magnetic_field)
-            self.omega_c = np.zeros((params.total_num_ptcls, params.dimensions))
-
-            sp_start = 0
-            sp_end = 0
-            for ic, sp_np in enumerate(params.species_num):
-                sp_end += sp_np
-                self.omega_c[sp_start: sp_end, :] = params.species_cyclotron_frequencies[ic]
-                sp_start += sp_np
-
-            # Calculate functions for magnetic integrator
-            # This could be used when the generalization to Forest-Ruth and MacLachlan algorithms will be implemented
-            # In a magnetic Velocity-Verlet the coefficient is 1/2, see eq.~(78) in :cite:`Chin2008`
-            self.magnetic_helpers(0.5)
-
-            # array to temporary store velocities
-            # Luciano: I have the vague doubt that allocating memory for these arrays is faster than calculating them
-            # each time step
-            self.v_B = np.zeros((params.total_num_ptcls, params.dimensions))
-            self.v_F = np.zeros((params.total_num_ptcls, params.dimensions))
-
-            if np.dot(self.magnetic_field_uvector, np.array([0.0, 0.0, 1.0])) == 1.0:
-                self.update = self.magnetic_verlet_zdir
-            else:
-                self.update = self.magnetic_verlet
+            self.magnetic_setup(params)
+            self.update = self.magnetic_verlet
 
         elif self.type.lower() == "magnetic_boris":
+            self.magnetic_setup(params)
+            self.update = self.magnetic_boris
 
-            # Create the unit vector of the magnetic field
-            self.magnetic_field_uvector = params.magnetic_field / np.linalg.norm(params.magnetic_field)
-            self.omega_c = np.zeros((params.total_num_ptcls, params.dimensions))
-
-            sp_start = 0
-            sp_end = 0
-            for ic, sp_np in enumerate(params.species_num):
-                sp_end += sp_np
-                self.omega_c[sp_start: sp_end, :] = params.species_cyclotron_frequencies[ic]
-                sp_start += sp_np
-
-            # In a leapfrog-type algorithm the coefficient is different for the acceleration and magnetic rotation
-            # see eq.~(79) in :cite:`Chin2008`
-            # self.magnetic_helpers(1.0)
-
-            if np.dot(self.magnetic_field_uvector, np.array([0.0, 0.0, 1.0])) == 1.0:
-                self.update = self.magnetic_boris_zdir
+        elif self.type.lower() in ['forest_ruth', 'mclachlan', 'magnetic_forest_ruth', 'magnetic_mclachlan']:
+            self.splitting_setup(params)
+            if self.type.lower().startswith('magnetic'):
+                self.update = self.magnetic_splitting
             else:
-                self.update = self.magnetic_boris
-
-            # array to temporary store velocities
-            # Luciano: I have the vague doubt that allocating memory for these arrays is faster than calculating them
-            # each time step
-            self.v_B = np.zeros((params.total_num_ptcls, params.dimensions))
-            self.v_F = np.zeros((params.total_num_ptcls, params.dimensions))
+                self.update = self.splitting
 
         if params.magnetized:
             self.magnetized = True
@@ -264,6 +317,23 @@ class Integrator:
             self.update_accelerations = potential.update_fmm
 
         self.thermostate = thermostat.update
+        self.thermostat_diagnostics = thermostat.diagnostics
+        self.thermostat_columns = thermostat.diagnostic_columns
+
+        if self.type.lower() == "verlet" and not params.magnetized:
+            # The second half kick computes the temperatures needed by the thermostat in the same pass.
+            # The buffer is shared with the thermostat for its diagnostics.
+            self.fused_thermostat = True
+            self.species_kinetic_temperatures = thermostat.species_kinetic_temperatures
+            self.temperature_constants = 2.0 / (params.kB * params.species_num * params.dimensions)
+            self.thermostat_rescale = thermostat.rescale
+            self.thermostate = self.fused_thermostate
+
+        if self.compiled_loop:
+            self.compiled_loop_setup(params, thermostat, potential)
+
+        if self.adaptive_dt:
+            self.adaptive_dt_setup(params)
 
     def equilibrate(self, it_start, ptcls, checkpoint):
         """
@@ -280,24 +350,89 @@ class Integrator:
         checkpoint: sarkas.utilities.InputOutput
             IO class for saving dumps.
 
-        """
+        Notes
+        -----
+        If ``equilibration_convergence`` is set the loop stops at the first dump at which
+        :meth:`equilibration_converged` is True and ``equilibration_steps`` is set to the steps actually done.
 
-        for it in tqdm(range(it_start, self.equilibration_steps), disable=not self.verbose):
-            # Calculate the Potential energy and update particles' data
-            self.update(ptcls)
-            if (it + 1) % self.eq_dump_step == 0:
-                checkpoint.dump('equilibration', ptcls, it + 1)
-            self.thermostate(ptcls, it)
+        """
+        self.convergence_samples = []
+
+        if self.compiled_loop:
+            it_end = self.compiled_evolution(it_start, self.equilibration_steps, self.eq_dump_step, 'equilibration',
+                                             ptcls, checkpoint)
+        elif self.adaptive_dt:
+            self.kinetic_reduction = self.fused_thermostat
+            it_end = self.adaptive_evolution(it_start, self.equilibration_steps, self.eq_dump_step, 'equilibration',
+                                             ptcls, checkpoint)
+        else:
+            self.kinetic_reduction = self.fused_thermostat
+            it_end = self.equilibration_steps
+            log = checkpoint.energy_format == 'hdf5'
+            for it in tqdm(range(it_start, self.equilibration_steps), disable=not self.verbose):
+                # Calculate the Potential energy and update particles' data
+                self.update(ptcls)
+                converged = False
+                if (it + 1) % self.eq_dump_step == 0:
+                    checkpoint.dump('equilibration', ptcls, it + 1)
+                    converged = self.equilibration_convergence and self.equilibration_converged(ptcls)
+                    self.compact(ptcls)
+                self.thermostate(ptcls, it)
+                if log:
+                    self.log_diagnostics('equilibration', ptcls, (it + 1) * self.dt, checkpoint)
+                if converged:
+                    it_end = it + 1
+                    break
+
+        self.kinetic_reduction = False
+        self.equilibration_steps = it_end
         ptcls.remove_drift()
 
+    def equilibration_converged(self, ptcls):
+        """
+        Store the current temperature and potential energy and check whether the last ``convergence_window`` samples
+        are converged according to :func:`block_convergence`.
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles' class.
+
+        Returns
+        -------
+        : bool
+            True if both the temperature and the potential energy are converged.
+
+        """
+        K, T = ptcls.kinetic_temperature()
+        self.convergence_samples.append([self.species_num @ T / self.species_num.sum(), ptcls.potential_energy])
+        if len(self.convergence_samples) < self.convergence_window:
+            return False
+        elif len(self.convergence_samples) > self.convergence_window:
+            del self.convergence_samples[0]
+
+        samples = np.array(self.convergence_samples)
+
+        return all(block_convergence(samples[:, i], self.convergence_blocks, self.convergence_tolerance)
+                   for i in range(samples.shape[1]))
+
     def magnetize(self, it_start, ptcls, checkpoint):
         self.update = self.magnetic_integrator
+        if self.adaptive_dt:
+            self.adaptive_evolution(it_start, self.magnetization_steps, self.mag_dump_step, 'magnetization',
+                                    ptcls, checkpoint)
+            return
+
+        log = checkpoint.energy_format == 'hdf5'
         for it in tqdm(range(it_start, self.magnetization_steps), disable=not self.verbose):
             # Calculate the Potential energy and update particles' data
             self.update(ptcls)
             if (it + 1) % self.mag_dump_step == 0:
                 checkpoint.dump('magnetization', ptcls, it + 1)
+                self.compact(ptcls)
             self.thermostate(ptcls, it)
+            if log:
+                self.log_diagnostics('magnetization', ptcls, (it + 1) * self.dt, checkpoint)
 
     def produce(self, it_start, ptcls, checkpoint):
         """
@@ -314,101 +449,205 @@ class Integrator:
         checkpoint: sarkas.utilities.InputOutput
             IO class for saving dumps.
 
+        Notes
+        -----
+        The particles' data is handed to ``checkpoint`` every ``io_step`` of the production dump schema. This is
+        ``prod_dump_step`` unless the schema has dump streams with a different cadence. If ``insitu_pipeline`` is set
+        the observables' quantities are computed every ``insitu_step``.
+
         """
+        dump_step = checkpoint.dump_schemas['production']['io_step']
+        if self.compiled_loop:
+            self.compiled_evolution(it_start, self.production_steps, dump_step, 'production', ptcls, checkpoint)
+            return
+
+        log = checkpoint.energy_format == 'hdf5'
+        insitu = self.insitu_pipeline
         for it in tqdm(range(it_start, self.production_steps), disable=(not self.verbose)):
 
             # Move the particles and calculate the potential
             self.update(ptcls)
-            if (it + 1) % self.prod_dump_step == 0:
+            if insitu is not None and (it + 1) % self.insitu_step == 0:
+                insitu.accumulate(it + 1, ptcls)
+            if (it + 1) % dump_step == 0:
                 # Save particles' data for restart
                 checkpoint.dump('production', ptcls, it + 1)
+                self.compact(ptcls)
+            if log:
+                self.log_diagnostics('production', ptcls, (it + 1) * self.dt, checkpoint)
 
-    def verlet_langevin(self, ptcls):
+    def compiled_loop_setup(self, params, thermostat, potential):
         """
-        Update particles class using the velocity verlet algorithm and Langevin damping.
+        Check that the compiled loop can be used and copy the parameters needed by :func:`verlet_block`.
 
         Parameters
         ----------
-        ptcls: sarkas.core.Particles
-            Particles data.
+        params: sarkas.core.parameters
+            Parameters class.
+
+        thermostat: sarkas.time_evolution.thermostat
+            Thermostat class
 
+        potential: sarkas.potentials.core.Potential
+            Potential class.
 
         """
-        beta = ptcls.gaussian(0., 1., ptcls.pos.shape[0])
-        sp_start = 0  # start index for species loop
-        sp_end = 0
-        for ic, num in enumerate(self.species_num):
-            sp_end += num
-            ptcls.pos[sp_start:sp_end, :] += self.c1 * self.dt * ptcls.vel[sp_start:sp_end, :] \
-                                             + 0.5 * self.dt ** 2 * ptcls.acc[sp_start:sp_end, :] \
-                                             + 0.5 * self.sigma[ic] * self.dt ** 1.5 * beta
+        msg = 'The compiled loop is available only for the verlet integrator.'
+        assert self.type.lower() == "verlet", msg
+        msg = 'The compiled loop is available only for periodic boundary conditions.'
+        assert self.boundary_conditions.lower() == "periodic", msg
+        msg = 'The compiled loop is available only for the PP method with linked cell-list.'
+        assert not potential.method == 'FMM' and not potential.pppm_on and potential.linked_list_on, msg
+        assert not params.magnetized, 'The compiled loop is not available for magnetized simulations.'
+        assert thermostat.type == "berendsen", 'The compiled loop is available only for the Berendsen thermostat.'
+
+        self.potential = potential
+        self.thermostat_temperatures = np.copy(thermostat.temperatures)
+        self.thermostat_relaxation_timestep = thermostat.relaxation_timestep
+        self.thermostat_relaxation_rate = thermostat.relaxation_rate
+        # Mie Energy of charged systems. See Potential.update_linked_list
+        if potential.type == "LJ":
+            self.mie_factor = 0.0
+        else:
+            self.mie_factor = 2.0 * np.pi / (3.0 * params.box_volume * params.fourpie0)
 
-        # Enforce boundary condition
-        self.enforce_bc(ptcls)
+    def compiled_evolution(self, it_start, steps, dump_step, phase, ptcls, checkpoint):
+        """
+        Loop over the timesteps calling :func:`verlet_block` for all the timesteps between two dumps.
 
-        acc_old = np.copy(ptcls.acc)
-        self.update_accelerations(ptcls)
+        Parameters
+        ----------
+        it_start: int
+            Initial step.
 
-        sp_start = 0
-        sp_end = 0
-        for ic, num in enumerate(self.species_num):
-            sp_end += num
+        steps: int
+            Total number of steps of the phase.
 
-            ptcls.vel[sp_start:sp_end, :] = self.c1 * self.c2 * ptcls.vel[sp_start:sp_end, :] \
-                                            + 0.5 * self.c2 * self.dt * (ptcls.acc[sp_start:sp_end, :]
-                                                                         + acc_old[sp_start:sp_end, :]) \
-                                            + self.c2 * self.sigma[ic] * np.sqrt(self.dt) * beta
-            sp_start = sp_end
+        dump_step: int
+            Dump interval.
+
+        phase: str
+            Simulation phase. 'equilibration' or 'production'. The thermostat is applied only in the equilibration.
+
+        ptcls: sarkas.core.Particles
+            Particles' class.
+
+        checkpoint: sarkas.utilities.InputOutput
+            IO class for saving dumps.
+
+        Returns
+        -------
+        it: int
+            Last step. Smaller than ``steps`` only if the equilibration converged before.
 
-    def verlet(self, ptcls):
         """
-        Update particles' class based on velocity verlet algorithm.
-        More information can be found here: https://en.wikipedia.org/wiki/Verlet_integration
-        or on the Sarkas website.
+        thermostat_on = phase == 'equilibration'
+        pot = self.potential
+        log = checkpoint.energy_format == 'hdf5'
+        insitu = self.insitu_pipeline if phase == 'production' else None
+
+        with tqdm(total=steps - it_start, disable=not self.verbose) as pbar:
+            it = it_start
+            while it < steps:
+                # Run all the steps up to the next dump or in-situ computation
+                it_next = min((it // dump_step + 1) * dump_step, steps)
+                if insitu is not None:
+                    it_next = min(it_next, (it // self.insitu_step + 1) * self.insitu_step)
+                ptcls.potential_energy = verlet_block(
+                    ptcls.pos, ptcls.vel, ptcls.acc, ptcls.pbc_cntr, ptcls.id, ptcls.masses, ptcls.charges,
+                    self.box_lengths, self.dt, it_next - it, it,
+                    pot.rc, pot.matrix, pot.force, pot.measure, ptcls.rdf_hist,
+                    pot.workspace.head, pot.workspace.ls, self.mie_factor,
+                    self.species_num, self.temperature_constants, self.species_kinetic_temperatures,
+                    thermostat_on, self.thermostat_temperatures, self.thermostat_relaxation_timestep,
+                    self.thermostat_relaxation_rate)
+
+                converged = False
+                if insitu is not None and it_next % self.insitu_step == 0:
+                    insitu.accumulate(it_next, ptcls)
+                if it_next % dump_step == 0:
+                    checkpoint.dump(phase, ptcls, it_next)
+                    converged = thermostat_on and self.equilibration_convergence and self.equilibration_converged(ptcls)
+                # The thermostat of the last step of the block is applied after the dump, as in the python loop
+                if thermostat_on:
+                    self.thermostate(ptcls, it_next - 1)
+                # One row of diagnostics per block
+                if log:
+                    self.log_diagnostics(phase, ptcls, it_next * self.dt, checkpoint)
+
+                pbar.update(it_next - it)
+                it = it_next
+                if converged:
+                    break
+
+        return it
+
+    def log_diagnostics(self, phase, ptcls, time, checkpoint):
+        """
+        Hand the time, the timestep, the potential energy and, in the thermostatted phases, the thermostat's
+        diagnostics of the current step to the energy log of ``checkpoint``.
 
         Parameters
         ----------
+        phase: str
+            Simulation phase.
+
         ptcls: sarkas.core.Particles
-            Particles data.
+            Particles' class.
 
-        """
-        # First half step velocity update
-        ptcls.vel += 0.5 * ptcls.acc * self.dt
-        # Full step position update
-        ptcls.pos += ptcls.vel * self.dt
+        time: float
+            Current time.
 
-        # Enforce boundary condition
-        self.enforce_bc(ptcls)
+        checkpoint: sarkas.utilities.InputOutput
+            IO class for saving dumps.
 
-        # Compute total potential energy and acceleration for second half step velocity update
-        self.update_accelerations(ptcls)
+        """
+        columns = ["Time", "dt", "Potential Energy"]
+        values = [time, self.dt, ptcls.potential_energy]
+        if phase != 'production':
+            columns += self.thermostat_columns
+            values = np.concatenate((values, self.thermostat_diagnostics()))
 
-        # Second half step velocity update
-        ptcls.vel += 0.5 * ptcls.acc * self.dt
+        checkpoint.log_step(phase, values, columns)
 
-    def magnetic_helpers(self, coefficient):
-        """Calculate the trigonometric functions of the magnetic integrators.
+    def adaptive_dt_setup(self, params):
+        """
+        Check that the adaptive timestep can be used and assign its default bounds.
 
         Parameters
         ----------
-        coefficient: float
-            Timestep coefficient.
+        params: sarkas.core.parameters
+            Parameters class.
 
-        Notes
-        -----
-        This is useful for the Leapfrog magnetic algorithm and future Forest-Ruth and MacLachlan algorithms.
+        """
+        assert not self.compiled_loop, 'The adaptive timestep is not available with the compiled loop.'
+
+        self.a_ws = params.a_ws
+        if self.adaptive_dt_max is None:
+            self.adaptive_dt_max = self.dt
+        if self.adaptive_dt_min is None:
+            self.adaptive_dt_min = 1.0e-3 * self.dt
+
+    def set_timestep(self, dt):
+        """
+        Change the timestep and recalculate the coefficients of the integrator that depend on it.
+
+        Parameters
+        ----------
+        dt: float
+            New timestep.
 
         """
-        theta = self.omega_c * self.dt * coefficient
-        self.sdt = np.sin(theta)
-        self.cdt = np.cos(theta)
-        self.ccodt = 1.0 - self.cdt
-        self.ssodt = 1.0 - self.sdt / theta
+        self.dt = dt
+
+        if self.type.lower() == "verlet_langevin":
+            self.langevin_coefficients()
+        elif self.type.lower().startswith('magnetic'):
+            self.magnetic_helpers()
 
-    def magnetic_verlet_zdir(self, ptcls):
+    def adaptive_timestep(self, ptcls):
         """
-        Update particles' class based on velocity verlet method in the case of a
-        constant magnetic field along the :math:`z` axis. For more info see eq. (78) of Ref. :cite:`Chin2008`
+        Calculate the timestep from the fastest particle and the largest acceleration.
 
         Parameters
         ----------
@@ -417,253 +656,373 @@ class Integrator:
 
         Returns
         -------
-        potential_energy : float
-             Total potential energy.
+        dt: float
+            Timestep. :math:`\\eta \\min( a_{ws}/v_{\\max}, \\sqrt{a_{ws}/a_{\\max}} )` bounded by
+            ``adaptive_dt_min`` and ``adaptive_dt_max``.
 
-        Notes
-        -----
-        This integrator is faster than `magnetic_verlet` but valid only for a magnetic field in the :math:`z`-direction.
-        This is the preferred choice in this case.
-        """
-
-        # First half step of velocity update
-        # # Magnetic rotation x - velocity
-        # (B x v)_x  = -v_y, (B x B x v)_x = -v_x
-        self.v_B[:, 0] = ptcls.vel[:, 1] * self.sdt[:, 0] + ptcls.vel[:, 0] * self.cdt[:, 0]
-        # Magnetic rotation y - velocity
-        # (B x v)_y  = v_x, (B x B x v)_y = -v_y
-        self.v_B[:, 1] = - ptcls.vel[:, 0] * self.sdt[:, 0] + ptcls.vel[:, 1] * self.cdt[:, 1]
-
-        # Magnetic + Const force field x - velocity
-        # (B x a)_x  = -a_y, (B x B x a)_x = -a_x
-        self.v_F[:, 0] = self.ccodt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1] \
-                         + self.sdt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0]
-        # Magnetic + Const force field y - velocity
-        # (B x a)_y  = a_x, (B x B x a)_y = -a_y
-        self.v_F[:, 1] = - self.ccodt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0] \
-                         + self.sdt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1]
-
-        ptcls.vel[:, 0] = self.v_B[:, 0] + self.v_F[:, 0]
-        ptcls.vel[:, 1] = self.v_B[:, 1] + self.v_F[:, 1]
-        ptcls.vel[:, 2] += 0.5 * self.dt * ptcls.acc[:, 2]
-
-        # Position update
-        ptcls.pos += ptcls.vel * self.dt
+        """
+        v_max, a_max = max_speed_acceleration(ptcls.vel, ptcls.acc)
 
-        # Enforce boundary condition
-        self.enforce_bc(ptcls)
+        dt = self.adaptive_dt_max
+        if v_max > 0.0:
+            dt = min(dt, self.adaptive_dt_eta * self.a_ws / v_max)
+        if a_max > 0.0:
+            dt = min(dt, self.adaptive_dt_eta * np.sqrt(self.a_ws / a_max))
 
-        # Compute total potential energy and acceleration for second half step velocity update
-        potential_energy = self.update_accelerations(ptcls)
-
-        # # Magnetic rotation x - velocity
-        # (B x v)_x  = -v_y, (B x B x v)_x = -v_x
-        self.v_B[:, 0] = ptcls.vel[:, 1] * self.sdt[:, 0] + ptcls.vel[:, 0] * self.cdt[:, 0]
-        # Magnetic rotation y - velocity
-        # (B x v)_y  = v_x, (B x B x v)_y = -v_y
-        self.v_B[:, 1] = - ptcls.vel[:, 0] * self.sdt[:, 0] + ptcls.vel[:, 1] * self.cdt[:, 1]
-
-        # Magnetic + Const force field x - velocity
-        # (B x a)_x  = -a_y, (B x B x a)_x = -a_x
-        self.v_F[:, 0] = self.ccodt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1] \
-                         + self.sdt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0]
-        # Magnetic + Const force field y - velocity
-        # (B x a)_y  = a_x, (B x B x a)_y = -a_y
-        self.v_F[:, 1] = - self.ccodt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0] \
-                         + self.sdt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1]
-
-        ptcls.vel[:, 0] = self.v_B[:, 0] + self.v_F[:, 0]
-        ptcls.vel[:, 1] = self.v_B[:, 1] + self.v_F[:, 1]
-        ptcls.vel[:, 2] += 0.5 * self.dt * ptcls.acc[:, 2]
-
-        return potential_energy
+        return max(dt, self.adaptive_dt_min)
 
-    def magnetic_verlet(self, ptcls):
+    def adaptive_evolution(self, it_start, steps, dump_step, phase, ptcls, checkpoint):
         """
-        Update particles' class based on velocity verlet method in the case of an arbitrary direction of the
-        constant magnetic field. For more info see eq. (78) of Ref. :cite:`Chin2008`
+        Evolve the system for the time ``steps * dt`` with a timestep chosen at every step by
+        :meth:`adaptive_timestep`.
 
         Parameters
         ----------
+        it_start: int
+            Initial step.
+
+        steps: int
+            Total number of steps of the phase.
+
+        dump_step: int
+            Dump interval.
+
+        phase: str
+            Simulation phase. 'equilibration' or 'magnetization'.
+
         ptcls: sarkas.core.Particles
-            Particles data.
+            Particles' class.
+
+        checkpoint: sarkas.utilities.InputOutput
+            IO class for saving dumps.
 
         Returns
         -------
-        potential_energy : float
-             Total potential energy.
+        : int
+            Equivalent fixed timestep number reached. Smaller than ``steps`` only if the equilibration converged before.
 
         Notes
         -----
-        :cite:`Chin2008` equations are written for a negative charge. This allows him to write
-        :math:`\dot{\mathbf v} = \omega_c \hat{B} \\times \mathbf v`. In the case of positive charges we will have
-        :math:`\dot{\mathbf v} = - \omega_c \hat{B} \\times \mathbf v`. Hence the reason of the different signs in the
-        formulas below compared to Chin's.
+        The timesteps are shortened so that the dumps fall on the times ``it * dt`` with ``it`` a multiple of
+        ``dump_step``, exactly as in a fixed timestep run. Hence dumps and energy files are indexed and read as usual.
+        The thermostat parameters are in units of the fixed timestep, hence the thermostat is applied only after the
+        steps reaching or crossing a time ``it * dt``, once per crossing, and it receives the fixed timestep number of
+        the step ending there, as in a fixed timestep run.
+        At the end of the phase the input timestep is restored for the following phases.
 
-        Warnings
-        --------
-        This integrator is valid for a magnetic field in an arbitrary direction. However, while the integrator works for
-        an arbitrary direction, methods in `sarkas.tool.observables` work only for a magnetic field in the
-        :math:`z` - direction. Hence, if you choose to use this integrator remember to change your physical observables.
+        """
+        fixed_dt = self.dt
+        time = it_start * fixed_dt
+        it_dump = (it_start // dump_step + 1) * dump_step
+        it_thermostat = it_start
+        self.adaptive_steps = 0
+        log = checkpoint.energy_format == 'hdf5'
+
+        with tqdm(total=steps - it_start, disable=not self.verbose) as pbar:
+            while time < steps * fixed_dt:
+                it_next = min(it_dump, steps)
+                remaining = it_next * fixed_dt - time
+
+                dt = self.adaptive_timestep(ptcls)
+                # Land exactly on the next dump. Split the remaining time in two steps instead of making a tiny one.
+                last = dt >= remaining
+                if last:
+                    dt = remaining
+                elif dt > 0.5 * remaining:
+                    dt = 0.5 * remaining
+
+                if dt != self.dt:
+                    self.set_timestep(dt)
+                self.update(ptcls)
+                self.adaptive_steps += 1
+
+                converged = False
+                if last:
+                    time = it_next * fixed_dt
+                    if it_next == it_dump:
+                        checkpoint.dump(phase, ptcls, it_dump)
+                        it_dump += dump_step
+                        self.compact(ptcls)
+                        converged = (phase == 'equilibration' and self.equilibration_convergence
+                                     and self.equilibration_converged(ptcls))
+                else:
+                    time += dt
+
+                # round and not int, time / fixed_dt can fall just below an integer
+                it = int(round(time / fixed_dt))
+                if it > it_thermostat:
+                    self.thermostate(ptcls, it - 1)
+                    it_thermostat = it
+                if log:
+                    self.log_diagnostics(phase, ptcls, time, checkpoint)
+                pbar.update(min(time / fixed_dt, steps) - pbar.n)
+                if converged:
+                    break
+
+        self.set_timestep(fixed_dt)
+
+        return int(round(time / fixed_dt))
+
+    def langevin_coefficients(self):
+        """Calculate the per-particle coefficients of the ``verlet_langevin`` integrator for the current timestep."""
+
+        gamma = self.species_langevin_gamma
+        self.c1 = (1. - 0.5 * gamma * self.dt)
+        self.c2 = 1. / (1. + 0.5 * gamma * self.dt)
+        self.langevin_c1 = np.repeat(self.c1, self.species_num)
+        self.langevin_c2 = np.repeat(self.c2, self.species_num)
+        self.langevin_pos_noise = np.repeat(0.5 * self.sigma * self.dt ** 1.5, self.species_num)
+        self.langevin_vel_noise = np.repeat(self.c2 * self.sigma * np.sqrt(self.dt), self.species_num)
 
+    def verlet_langevin(self, ptcls):
         """
-        # Calculate the cross products
-        b_cross_v = np.cross(self.magnetic_field_uvector, ptcls.vel)
-        b_cross_b_cross_v = np.cross(self.magnetic_field_uvector, b_cross_v)
-        b_cross_a = np.cross(self.magnetic_field_uvector, ptcls.acc)
-        b_cross_b_cross_a = np.cross(self.magnetic_field_uvector, b_cross_a)
+        Update particles class using the velocity verlet algorithm and Langevin damping.
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
 
-        # First half step of velocity update
-        ptcls.vel += - self.sdt * b_cross_v + self.ccodt * b_cross_b_cross_v
+        Notes
+        -----
+        The same random numbers enter the position and the velocity update of a timestep. This correlation is needed
+        for sampling the correct configurational distribution, see Ref. :cite:`Gronbech-Jensen2013`.
+        The random numbers are drawn into a preallocated buffer and the updates are done in place by numba kernels.
 
-        ptcls.vel += 0.5 * ptcls.acc * self.dt - self.ccodt / self.omega_c * b_cross_a \
-                   + 0.5 * self.dt * self.ssodt * b_cross_b_cross_a
+        """
+        ptcls.rnd_gen.standard_normal(out=self.langevin_beta)
 
-        # Position update
-        ptcls.pos += ptcls.vel * self.dt
+        # Full step position update and the part of the velocity update depending on the old accelerations
+        langevin_first_half(ptcls.pos, ptcls.vel, ptcls.acc, self.langevin_beta, self.dt,
+                            self.langevin_c1, self.langevin_c2, self.langevin_pos_noise, self.langevin_vel_noise)
 
         # Enforce boundary condition
         self.enforce_bc(ptcls)
 
-        # Compute total potential energy and acceleration for second half step velocity update
-        potential_energy = self.update_accelerations(ptcls)
+        self.update_accelerations(ptcls)
 
-        # Re-calculate the cross products
-        b_cross_v = np.cross(self.magnetic_field_uvector, ptcls.vel)
-        b_cross_b_cross_v = np.cross(self.magnetic_field_uvector, b_cross_v)
-        b_cross_a = np.cross(self.magnetic_field_uvector, ptcls.acc)
-        b_cross_b_cross_a = np.cross(self.magnetic_field_uvector, b_cross_a)
+        # Part of the velocity update depending on the new accelerations
+        langevin_second_half(ptcls.vel, ptcls.acc, self.dt, self.langevin_c2)
 
-        # Second half step velocity update
-        ptcls.vel += - self.sdt * b_cross_v + self.ccodt * b_cross_b_cross_v
+    def verlet(self, ptcls):
+        """
+        Update particles' class based on velocity verlet algorithm.
+        More information can be found here: https://en.wikipedia.org/wiki/Verlet_integration
+        or on the Sarkas website.
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        Notes
+        -----
+        The velocity and position updates are done in place by numba kernels. In the case of periodic boundary
+        conditions the first half kick, the drift and the periodic wrap are fused in a single loop over the particles.
+        During the equilibration phase the second half kick computes also the species' temperatures needed by the
+        thermostat, see ``fused_thermostat``.
+
+        """
+        # First half step velocity update and full step position update
+        if self.boundary_conditions.lower() == "periodic":
+            kick_drift_pbc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.pbc_cntr, self.box_lengths, self.dt)
+        else:
+            kick_drift(ptcls.pos, ptcls.vel, ptcls.acc, self.dt)
+            # Enforce boundary condition
+            self.enforce_bc(ptcls)
 
-        ptcls.vel += 0.5 * ptcls.acc * self.dt - self.ccodt / self.omega_c * b_cross_a \
-                   + 0.5 * self.dt * self.ssodt * b_cross_b_cross_a
+        # Compute total potential energy and acceleration for second half step velocity update
+        self.update_accelerations(ptcls)
 
-        return potential_energy
+        # Second half step velocity update
+        if self.kinetic_reduction:
+            kick_temperature(ptcls.vel, ptcls.acc, self.dt, ptcls.masses, self.species_num,
+                             self.temperature_constants, self.species_kinetic_temperatures)
+        else:
+            kick(ptcls.vel, ptcls.acc, self.dt)
 
-    def magnetic_boris_zdir(self, ptcls):
+    def fused_thermostate(self, ptcls, it):
         """
-        Update particles' class using the Boris algorithm in the case of a
-        constant magnetic field along the :math:`z` axis. For more info see eqs. (80) - (81) of Ref. :cite:`Chin2008`
+        Rescale particles' velocities using the species' temperatures computed in the verlet second half kick.
 
         Parameters
         ----------
         ptcls: sarkas.core.Particles
             Particles data.
 
-        Returns
-        -------
-        potential_energy : float
-             Total potential energy.
-
-        """
-        # First half step of velocity update: Apply exp(eV_BF)
-        # epsilon/2 V_F
-        self.magnetic_helpers(0.5)
-        # Magnetic + Const force field x - velocity
-        # (B x a)_x  = -a_y, (B x B x a)_x = -a_x
-        self.v_F[:, 0] = self.ccodt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1] \
-                         + self.sdt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0]
-        # Magnetic + Const force field y - velocity
-        # (B x a)_y  = a_x, (B x B x a)_y = -a_y
-        self.v_F[:, 1] = - self.ccodt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0] \
-                         + self.sdt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1]
-
-        ptcls.vel[:, 0] += self.v_F[:, 0]
-        ptcls.vel[:, 1] += self.v_F[:, 1]
-        ptcls.vel[:, 2] += 0.5 * self.dt * ptcls.acc[:, 2]
-
-        # epsilon V_B
-        self.magnetic_helpers(1.0)
-        # Magnetic rotation x - velocity
-        # (B x v)_x  = -v_y, (B x B x v)_x = -v_x
-        self.v_B[:, 0] = ptcls.vel[:, 1] * self.sdt[:, 0] + ptcls.vel[:, 0] * self.cdt[:, 0]
-        # Magnetic rotation y - velocity
-        # (B x v)_y  = v_x, (B x B x v)_y = -v_y
-        self.v_B[:, 1] = - ptcls.vel[:, 0] * self.sdt[:, 0] + ptcls.vel[:, 1] * self.cdt[:, 1]
-
-        ptcls.vel[:, 0] = np.copy(self.v_B[:, 0])
-        ptcls.vel[:, 1] = np.copy(self.v_B[:, 1])
-
-        # # epsilon/2 V_F
-        self.magnetic_helpers(0.5)
-        # Magnetic + Const force field x - velocity
-        # (B x a)_x  = -a_y, (B x B x a)_x = -a_x
-        self.v_F[:, 0] = self.ccodt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1] \
-                         + self.sdt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0]
-        # Magnetic + Const force field y - velocity
-        # (B x a)_y  = a_x, (B x B x a)_y = -a_y
-        self.v_F[:, 1] = - self.ccodt[:, 0] / self.omega_c[:, 0] * ptcls.acc[:, 0] \
-                         + self.sdt[:, 1] / self.omega_c[:, 1] * ptcls.acc[:, 1]
-
-        ptcls.vel[:, 0] += self.v_F[:, 0]
-        ptcls.vel[:, 1] += self.v_F[:, 1]
-        ptcls.vel[:, 2] += 0.5 * self.dt * ptcls.acc[:, 2]
-
-        # Full step position update
-        ptcls.pos += ptcls.vel * self.dt
+        it : int
+            Current timestep.
 
-        # Enforce boundary condition
-        self.enforce_bc(ptcls)
+        """
+        self.thermostat_rescale(ptcls.vel, self.species_kinetic_temperatures, it)
 
-        # Compute total potential energy and acceleration for second half step velocity update
-        potential_energy = self.update_accelerations(ptcls)
+    def subcycling_setup(self, params, potential):
+        """
+        Assign the attributes needed by the subcycled integrator.
+
+        Parameters
+        ----------
+        params: sarkas.core.parameters
+            Parameters class.
 
-        return potential_energy
+        potential: sarkas.potentials.core.Potential
+            Potential class.
 
-    def magnetic_boris(self, ptcls):
+        Notes
+        -----
+        Species with one substep are the heavy species, all the others are the light species. The light species must
+        share the same number of substeps and be listed consecutively in the input file so that they occupy a
+        contiguous block of the particles' arrays.
+
+        """
+        assert not potential.method == 'FMM', 'The subcycled integrator is not supported by the FMM method.'
+
+        if self.species_substeps is None:
+            # Resolve the fastest species' plasma oscillations with the same w_p dt as the slowest species.
+            # Only the fastest species are subcycled so that the light species share the same number of substeps.
+            wp_ratios = np.ceil(params.species_plasma_frequencies / params.species_plasma_frequencies.min())
+            self.species_substeps = np.where(wp_ratios == wp_ratios.max(), wp_ratios, 1).astype(int)
+        elif not isinstance(self.species_substeps, np.ndarray):
+            self.species_substeps = np.array(self.species_substeps, dtype=int)
+
+        msg = 'species_substeps must have one entry per species.'
+        assert len(self.species_substeps) == params.num_species, msg
+        assert (self.species_substeps >= 1).all(), 'species_substeps must be positive integers.'
+
+        light = self.species_substeps > 1
+        assert light.any(), 'No species to subcycle. Use the verlet integrator instead.'
+        assert not light.all(), 'At least one species must have species_substeps = 1.'
+        msg = 'All the subcycled species must have the same number of substeps.'
+        assert len(np.unique(self.species_substeps[light])) == 1, msg
+
+        self.substeps = int(self.species_substeps[light][0])
+
+        msg = 'The subcycled species must be listed consecutively in the input file.'
+        assert (np.diff(np.where(light)[0]) == 1).all(), msg
+
+        self.subcycling_ranges()
+
+        self.update_subset_accelerations = potential.update_subset
+
+    def subcycling_ranges(self):
+        """Calculate the indices of the light and heavy particles from the number of particles of each species."""
+
+        light = self.species_substeps > 1
+        species_start = np.zeros(len(self.species_num) + 1, dtype=int)
+        species_start[1:] = np.cumsum(self.species_num)
+        light_species = np.where(light)[0]
+
+        # Light particles are a contiguous block, hence a slice, i.e. a view, of the particles' arrays.
+        self.light_ptcls = slice(species_start[light_species[0]], species_start[light_species[-1] + 1])
+        self.heavy_ptcls = np.concatenate([np.arange(species_start[ic], species_start[ic + 1])
+                                           for ic in np.where(~light)[0]])
+        # The light-light accelerations refer to the old arrays
+        self.acc_fast = None
+
+    def subcycled_verlet(self, ptcls):
         """
-        Update particles' class using the Boris algorithm in the case of a
-        constant magnetic field along the :math:`z` axis. For more info see eqs. (80) - (81) of Ref. :cite:`Chin2008`
+        Update particles' class based on a species-subcycled velocity verlet algorithm.
+        The heavy species are advanced with a single velocity verlet step of length ``dt``, while the light species
+        are advanced with ``substeps`` velocity verlet steps of length ``dt / substeps`` under the light-light forces
+        only. The contribution of the heavy species to the light particles' accelerations is frozen during the
+        substeps and applied as two half kicks of length ``dt / 2`` at the beginning and at the end of the outer step,
+        where all the cross-species forces are recalculated (impulse r-RESPA, see Ref. :cite:`Tuckerman1992`).
 
         Parameters
         ----------
         ptcls: sarkas.core.Particles
             Particles data.
 
-        Returns
-        -------
-        potential_energy : float
-             Total potential energy.
+        Notes
+        -----
+        Each timestep costs one full force calculation plus ``substeps`` force calculations among the light
+        particles only, instead of ``substeps`` full force calculations needed by a velocity verlet with timestep
+        ``dt / substeps``. The light-light accelerations of the last substep are kept in ``acc_fast`` for the next
+        timestep. They are recalculated only after :meth:`compact`.
 
         """
+        light = self.light_ptcls
+        heavy = self.heavy_ptcls
+        dt_sub = self.dt / self.substeps
+
+        # Split the light particles' accelerations into the light-light (fast) and the heavy (slow) contributions.
+        # The fast accelerations at the current positions are those of the last substep of the previous timestep.
+        if self.acc_fast is None:
+            _, self.acc_fast = self.update_subset_accelerations(ptcls.pos[light], ptcls.id[light],
+                                                                ptcls.masses[light], ptcls.charges[light])
+        acc_fast = self.acc_fast
+
+        # First half step velocity update with the slow accelerations
+        ptcls.vel[light] += 0.5 * self.dt * (ptcls.acc[light] - acc_fast)
+        ptcls.vel[heavy] += 0.5 * self.dt * ptcls.acc[heavy]
+
+        # Heavy species: full step position update
+        ptcls.pos[heavy] += self.dt * ptcls.vel[heavy]
+
+        # Light species: velocity verlet substeps with the fast accelerations
+        for sub in range(self.substeps):
+            ptcls.vel[light] += 0.5 * dt_sub * acc_fast
+            ptcls.pos[light] += dt_sub * ptcls.vel[light]
+
+            # Enforce boundary condition
+            self.enforce_bc(ptcls)
+
+            _, acc_fast = self.update_subset_accelerations(ptcls.pos[light], ptcls.id[light], ptcls.masses[light],
+                                                           ptcls.charges[light])
+            if sub < self.substeps - 1:
+                ptcls.vel[light] += 0.5 * dt_sub * acc_fast
+
+        # Compute total potential energy and acceleration for all the particles at the outer step
+        self.update_accelerations(ptcls)
 
-        # First half step of velocity update: Apply exp(eV_BF)
-        # epsilon/2 V_F
-        self.magnetic_helpers(0.5)
-        b_cross_a = np.cross(self.magnetic_field_uvector, ptcls.acc)
-        b_cross_b_cross_a = np.cross(self.magnetic_field_uvector, b_cross_a)
-        ptcls.vel += ptcls.acc * 0.5 * self.dt - self.ccodt/self.omega_c * b_cross_a \
-                     + 0.5 * self.dt * self.ssodt * b_cross_b_cross_a
+        # Second half step velocity update
+        ptcls.vel[light] += 0.5 * dt_sub * acc_fast + 0.5 * self.dt * (ptcls.acc[light] - acc_fast)
+        ptcls.vel[heavy] += 0.5 * self.dt * ptcls.acc[heavy]
 
-        # epsilon V_B
-        self.magnetic_helpers(1.0)
-        b_cross_v = np.cross(self.magnetic_field_uvector, ptcls.vel)
-        b_cross_b_cross_v = np.cross(self.magnetic_field_uvector, b_cross_v)
-        ptcls.vel += - self.sdt * b_cross_v + self.ccodt * b_cross_b_cross_v
+        self.acc_fast = acc_fast
 
-        # # epsilon/2 V_F
-        self.magnetic_helpers(0.5)
-        b_cross_a = np.cross(self.magnetic_field_uvector, ptcls.acc)
-        b_cross_b_cross_a = np.cross(self.magnetic_field_uvector, b_cross_a)
-        ptcls.vel += ptcls.acc * 0.5 * self.dt - self.ccodt/self.omega_c * b_cross_a \
-                     + 0.5 * self.dt * self.ssodt * b_cross_b_cross_a
+    def splitting_setup(self, params):
+        """
+        Assign the coefficients of the fourth order symplectic integrators.
 
-        # Full step position update
-        ptcls.pos += ptcls.vel * self.dt
+        Parameters
+        ----------
+        params: sarkas.core.parameters
+            Parameters class.
 
-        # Enforce boundary condition
-        self.enforce_bc(ptcls)
+        Notes
+        -----
+        The integrators are written in their velocity form, i.e. a timestep is the sequence
+        :math:`e^{a_1 dt V} e^{b_1 dt T} e^{a_2 dt V} \cdots e^{b_n dt T} e^{a_{n+1} dt V}` where :math:`V` updates
+        the velocities and :math:`T` the positions. Since the last velocity update uses the accelerations at the final
+        positions, each timestep costs :math:`n` force calculations: 3 for Forest-Ruth, 4 for McLachlan.
 
-        # Compute total potential energy and acceleration for second half step velocity update
-        potential_energy = self.update_accelerations(ptcls)
+        The Forest-Ruth coefficients are given in Ref. :cite:`Forest1990`. The McLachlan coefficients are the
+        optimized velocity version of the four stages splitting found in Ref. :cite:`Omelyan2002` (VEFRL) following
+        Ref. :cite:`McLachlan1995`. The latter has an error about two orders of magnitude smaller than Forest-Ruth at
+        the cost of one additional force calculation.
 
-        return potential_energy
+        In the magnetic case :math:`V` is the exact velocity update in a constant magnetic field and constant force
+        used by ``magnetic_verlet``, see Ref. :cite:`Chin2008`.
 
-    def periodic(self, ptcls):
         """
-        Applies periodic boundary conditions by calling enforce_pbc
+        if self.type.lower() in ['forest_ruth', 'magnetic_forest_ruth']:
+            theta = 1.0 / (2.0 - 2.0 ** (1.0 / 3.0))
+            self.kick_coefficients = np.array([0.5 * theta, 0.5 * (1.0 - theta), 0.5 * (1.0 - theta), 0.5 * theta])
+            self.drift_coefficients = np.array([theta, 1.0 - 2.0 * theta, theta])
+        else:
+            xi = 0.1644986515575760
+            lam = -0.2094333910398989e-1
+            chi = 0.1235692651138917e1
+            self.kick_coefficients = np.array([xi, chi, 1.0 - 2.0 * (chi + xi), chi, xi])
+            self.drift_coefficients = np.array([0.5 * (1.0 - 2.0 * lam), lam, lam, 0.5 * (1.0 - 2.0 * lam)])
+
+        if self.type.lower().startswith('magnetic'):
+            self.magnetic_setup(params)
+
+    def splitting(self, ptcls):
+        """
+        Update particles' class based on the Forest-Ruth or McLachlan fourth order symplectic integrators.
 
         Parameters
         ----------
@@ -671,12 +1030,24 @@ class Integrator:
             Particles data.
 
         """
+        for kick_c, drift_c in zip(self.kick_coefficients[:-1], self.drift_coefficients):
+            # Velocity and position updates
+            scaled_add(ptcls.vel, ptcls.acc, kick_c * self.dt)
+            scaled_add(ptcls.pos, ptcls.vel, drift_c * self.dt)
 
-        enforce_pbc(ptcls.pos, ptcls.pbc_cntr, self.box_lengths)
+            # Enforce boundary condition
+            self.enforce_bc(ptcls)
 
-    def absorbing(self, ptcls):
+            # Compute total potential energy and acceleration for the next velocity update
+            self.update_accelerations(ptcls)
+
+        # Last velocity update
+        scaled_add(ptcls.vel, ptcls.acc, self.kick_coefficients[-1] * self.dt)
+
+    def magnetic_splitting(self, ptcls):
         """
-        Applies absorbing boundary conditions by calling enforce_abc
+        Update particles' class based on the Forest-Ruth or McLachlan fourth order symplectic integrators in the case
+        of a constant magnetic field.
 
         Parameters
         ----------
@@ -684,21 +1055,257 @@ class Integrator:
             Particles data.
 
         """
+        for (rotation, propagation), drift_c in zip(self.kick_helpers[:-1], self.drift_coefficients):
+            # Velocity and position updates
+            if self.boundary_conditions.lower() == "periodic":
+                magnetic_push_drift_pbc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.pbc_cntr, ptcls.id,
+                                        rotation, propagation, self.box_lengths, drift_c * self.dt)
+            else:
+                magnetic_push_drift(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.id, rotation, propagation,
+                                    drift_c * self.dt)
+                # Enforce boundary condition
+                self.enforce_bc(ptcls)
 
-        enforce_abc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.charges, self.box_lengths)
+            # Compute total potential energy and acceleration for the next velocity update
+            self.update_accelerations(ptcls)
 
-    def pretty_print(self, frequency, restart, restart_step):
-        """Print integrator attributes in a user friendly way."""
+        # Last velocity update
+        rotation, propagation = self.kick_helpers[-1]
+        magnetic_push(ptcls.vel, ptcls.acc, ptcls.id, rotation, propagation)
 
-        if self.magnetized and self.electrostatic_equilibration:
-            print("Type: {}".format(self.magnetic_integrator.__name__))
+    def magnetic_setup(self, params):
+        """
+        Assign the magnetic field direction and the species' cyclotron frequencies and calculate the matrices of the
+        magnetic velocity updates.
+
+        Parameters
+        ----------
+        params: sarkas.core.parameters
+            Parameters class.
+
+        """
+        # Create the unit vector of the magnetic field
+        self.magnetic_field_uvector = params.magnetic_field / np.linalg.norm(params.magnetic_field)
+        self.species_cyclotron_frequencies = np.copy(params.species_cyclotron_frequencies)
+        self.magnetic_helpers()
+
+    def magnetic_helpers(self):
+        """
+        Calculate the matrices of the velocity updates of the magnetic integrator for the current timestep.
+
+        Notes
+        -----
+        In a magnetic Velocity-Verlet the coefficient is 1/2, see eq.~(78) in :cite:`Chin2008`. In a leapfrog-type
+        algorithm (Boris) the coefficient is 1/2 for the acceleration and 1 for the magnetic rotation, see eq.~(79) in
+        :cite:`Chin2008`. The Forest-Ruth and McLachlan algorithms need a pair of matrices for each velocity update.
+
+        """
+        if self.type.lower() == "magnetic_verlet":
+            self.rotation, self.propagation = self.magnetic_matrices(0.5)
+        elif self.type.lower() == "magnetic_boris":
+            self.rotation = self.magnetic_matrices(1.0)[0]
+            self.propagation = self.magnetic_matrices(0.5)[1]
         else:
-            print("Type: {}".format(self.type))
+            self.kick_helpers = [self.magnetic_matrices(c) for c in self.kick_coefficients]
 
-        wp_dt = frequency * self.dt
+    def magnetic_matrices(self, coefficient):
+        """
+        Calculate the matrices of the exact velocity update in a constant magnetic field and a constant force field
+        for a time :math:`\\tau` = ``coefficient * dt``. See eq. (78) of Ref. :cite:`Chin2008`.
+
+        Parameters
+        ----------
+        coefficient: float
+            Timestep coefficient.
+
+        Returns
+        -------
+        rotation: numpy.ndarray
+            Rotation matrix of each species. Shape = (``num_species``, 3, 3).
+
+        propagation: numpy.ndarray
+            Matrix multiplying the acceleration of each species. Shape = (``num_species``, 3, 3).
+
+        Notes
+        -----
+        The velocity update is :math:`\\mathbf v \\rightarrow R \\mathbf v + P \\mathbf a` with
+
+        .. math::
+            R = I - \\sin\\theta K + (1 - \\cos\\theta) K^2, \\quad
+            P = \\tau I - \\frac{1 - \\cos\\theta}{\\omega_c} K + \\tau \\left ( 1 - \\frac{\\sin \\theta}{\\theta}
+            \\right ) K^2,
+
+        where :math:`\\theta = \\omega_c \\tau` and :math:`K \\mathbf v = \\hat{B} \\times \\mathbf v`.
+
+        :cite:`Chin2008` equations are written for a negative charge. This allows him to write
+        :math:`\\dot{\\mathbf v} = \\omega_c \\hat{B} \\times \\mathbf v`. In the case of positive charges we will
+        have :math:`\\dot{\\mathbf v} = - \\omega_c \\hat{B} \\times \\mathbf v`. Hence the reason of the different
+        signs in the formulas above compared to Chin's.
+
+        """
+        bx, by, bz = self.magnetic_field_uvector
+        # Matrix of the cross product with the magnetic field direction
+        k_mat = np.array([[0.0, -bz, by],
+                          [bz, 0.0, -bx],
+                          [-by, bx, 0.0]])
+        k2_mat = k_mat @ k_mat
+        tau = coefficient * self.dt
+
+        num_species = len(self.species_cyclotron_frequencies)
+        rotation = np.zeros((num_species, 3, 3))
+        propagation = np.zeros((num_species, 3, 3))
+        for sp, omega_c in enumerate(self.species_cyclotron_frequencies):
+            theta = omega_c * tau
+            if theta == 0.0:
+                # Neutral species
+                rotation[sp] = np.eye(3)
+                propagation[sp] = tau * np.eye(3)
+                continue
+            rotation[sp] = np.eye(3) - np.sin(theta) * k_mat + (1.0 - np.cos(theta)) * k2_mat
+            propagation[sp] = tau * np.eye(3) - (1.0 - np.cos(theta)) / omega_c * k_mat \
+                + tau * (1.0 - np.sin(theta) / theta) * k2_mat
+
+        return rotation, propagation
+
+    def magnetic_verlet(self, ptcls):
+        """
+        Update particles' class based on velocity verlet method in the case of a constant magnetic field.
+        For more info see eq. (78) of Ref. :cite:`Chin2008`
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        Notes
+        -----
+        The velocity updates are done in place by :func:`magnetic_push_drift` and :func:`magnetic_push` with the
+        matrices calculated by :meth:`magnetic_matrices`, hence the cost outside the force calculation is the same for
+        any direction of the magnetic field and close to that of ``verlet``.
+
+        Warnings
+        --------
+        This integrator is valid for a magnetic field in an arbitrary direction. However, while the integrator works for
+        an arbitrary direction, methods in `sarkas.tool.observables` work only for a magnetic field in the
+        :math:`z` - direction. Hence, if you choose to use this integrator remember to change your physical observables.
+
+        """
+        # First half step of velocity update and full step position update
+        if self.boundary_conditions.lower() == "periodic":
+            magnetic_push_drift_pbc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.pbc_cntr, ptcls.id,
+                                    self.rotation, self.propagation, self.box_lengths, self.dt)
+        else:
+            magnetic_push_drift(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.id, self.rotation, self.propagation, self.dt)
+            # Enforce boundary condition
+            self.enforce_bc(ptcls)
+
+        # Compute total potential energy and acceleration for second half step velocity update
+        self.update_accelerations(ptcls)
+
+        # Second half step velocity update
+        magnetic_push(ptcls.vel, ptcls.acc, ptcls.id, self.rotation, self.propagation)
+
+    def magnetic_boris(self, ptcls):
+        """
+        Update particles' class using the Boris algorithm in the case of a constant magnetic field.
+        For more info see eqs. (80) - (81) of Ref. :cite:`Chin2008`
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        """
+        # Half force update, full magnetic rotation, half force update and full step position update
+        if self.boundary_conditions.lower() == "periodic":
+            boris_push_drift_pbc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.pbc_cntr, ptcls.id,
+                                 self.rotation, self.propagation, self.box_lengths, self.dt)
+        else:
+            boris_push_drift(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.id, self.rotation, self.propagation, self.dt)
+            # Enforce boundary condition
+            self.enforce_bc(ptcls)
+
+        # Compute total potential energy and acceleration for the next step
+        self.update_accelerations(ptcls)
+
+    def compact(self, ptcls):
+        """
+        Remove the absorbed particles from the particles' arrays and update the number of particles of each species
+        here and in the thermostat. Done only in simulations with absorbing boundary conditions and ``compaction``.
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        Notes
+        -----
+        It is called only in between timesteps since integrators, e.g. ``subcycled_verlet``, keep particles' indices
+        during a timestep.
+
+        """
+        if not (self.compaction and self.boundary_conditions.lower() == "absorbing"):
+            return
+
+        if ptcls.compact() == 0:
+            return
+
+        self.species_num = np.copy(ptcls.species_num)
+        self.thermostat.set_species_num(ptcls.species_num)
+
+        if self.fused_thermostat:
+            self.temperature_constants = 2.0 / (self.kB * np.maximum(self.species_num, 1) * ptcls.dimensions)
+
+        if self.type.lower() == "verlet_langevin":
+            self.langevin_coefficients()
+            self.langevin_beta = np.zeros(ptcls.pos.shape)
+        elif self.type.lower() == "subcycled_verlet":
+            self.subcycling_ranges()
+
+    def periodic(self, ptcls):
+        """
+        Applies periodic boundary conditions by calling enforce_pbc
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        """
+
+        enforce_pbc(ptcls.pos, ptcls.pbc_cntr, self.box_lengths)
+
+    def absorbing(self, ptcls):
+        """
+        Applies absorbing boundary conditions by calling enforce_abc
+
+        Parameters
+        ----------
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        """
+
+        enforce_abc(ptcls.pos, ptcls.vel, ptcls.acc, ptcls.charges, self.box_lengths)
+
+    def pretty_print(self, frequency, restart, restart_step):
+        """Print integrator attributes in a user friendly way."""
+
+        if self.magnetized and self.electrostatic_equilibration:
+            print("Type: {}".format(self.magnetic_integrator.__name__))
+        else:
+            print("Type: {}".format(self.type))
+
+        wp_dt = frequency * self.dt
         print('Time step = {:.6e} [s]'.format(self.dt))
         print('Total plasma frequency = {:.6e} [Hz]'.format(frequency))
         print('w_p dt = {:.4f} ~ 1/{}'.format(wp_dt, int(1.0/wp_dt) ))
+        if self.adaptive_dt:
+            print('Adaptive equilibration time step: eta = {}, {:.6e} [s] <= dt <= {:.6e} [s]'.format(
+                self.adaptive_dt_eta, self.adaptive_dt_min, self.adaptive_dt_max))
+        if self.type.lower() == "subcycled_verlet":
+            print('Substeps per species = {}'.format(self.species_substeps))
+            print('Substep = {:.6e} [s]'.format(self.dt / self.substeps))
         # if potential_type in ['Yukawa', 'EGS', 'Coulomb', 'Moliere']:
         #     # if simulation.parameters.magnetized:
         #     #     if simulation.parameters.num_species > 1:
@@ -930,3 +1537,672 @@ def remove_drift(vel, nums, masses):
             species_end = species_start + nums[ic]
             vel[species_start:species_end, :] -= P[ic, :] / (float(nums[ic]) * masses[ic])
             species_start = species_end
+
+
+@njit
+def kick_drift_pbc(pos, vel, acc, cntr, BoxVector, dt):
+    """
+    First half step velocity update, full step position update and periodic boundary conditions in a single loop.
+    Arrays are updated in place.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    cntr: numpy.ndarray
+        Counter for the number of times each particle get folded back into the main simulation box
+
+    BoxVector: numpy.ndarray
+        Box Dimensions.
+
+    dt: float
+        Timestep.
+
+    """
+    half_dt = 0.5 * dt
+    for p in range(pos.shape[0]):
+        for d in range(pos.shape[1]):
+            vel[p, d] += half_dt * acc[p, d]
+            pos[p, d] += dt * vel[p, d]
+
+            # If particle is outside of box in positive direction, wrap to negative side
+            if pos[p, d] > BoxVector[d]:
+                pos[p, d] -= BoxVector[d]
+                cntr[p, d] += 1
+            # If particle is outside of box in negative direction, wrap to positive side
+            if pos[p, d] < 0.0:
+                pos[p, d] += BoxVector[d]
+                cntr[p, d] -= 1
+
+
+@njit
+def kick_drift(pos, vel, acc, dt):
+    """
+    First half step velocity update and full step position update in a single loop. Arrays are updated in place.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    dt: float
+        Timestep.
+
+    """
+    half_dt = 0.5 * dt
+    for p in range(pos.shape[0]):
+        for d in range(pos.shape[1]):
+            vel[p, d] += half_dt * acc[p, d]
+            pos[p, d] += dt * vel[p, d]
+
+
+@njit
+def kick(vel, acc, dt):
+    """
+    Half step velocity update. Velocities are updated in place.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    dt: float
+        Timestep.
+
+    """
+    half_dt = 0.5 * dt
+    for p in range(vel.shape[0]):
+        for d in range(vel.shape[1]):
+            vel[p, d] += half_dt * acc[p, d]
+
+
+@njit
+def kick_temperature(vel, acc, dt, masses, nums, const, T):
+    """
+    Half step velocity update and calculation of the species' temperatures in a single loop.
+    Velocities and temperatures are updated in place.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    dt: float
+        Timestep.
+
+    masses: numpy.ndarray
+        Mass of each particle.
+
+    nums: numpy.ndarray
+        Number of particles of each species.
+
+    const: numpy.ndarray
+        Conversion factor from kinetic energy to temperature of each species, i.e. 2 / (kB * N * dimensions).
+
+    T : numpy.ndarray
+        Temperature of each species.
+
+    """
+    half_dt = 0.5 * dt
+    species_start = 0
+    for ic in range(len(nums)):
+        species_end = species_start + nums[ic]
+        kinetic = 0.0
+        for p in range(species_start, species_end):
+            v2 = 0.0
+            for d in range(vel.shape[1]):
+                vel[p, d] += half_dt * acc[p, d]
+                v2 += vel[p, d] * vel[p, d]
+            kinetic += 0.5 * masses[p] * v2
+        T[ic] = const[ic] * kinetic
+        species_start = species_end
+
+
+@njit
+def verlet_block(pos, vel, acc, cntr, p_id, masses, charges, box_lengths, dt, nsteps, it_start,
+                 rc, potential_matrix, force, measure, rdf_hist, head, ls, mie_factor,
+                 nums, const, T, thermostat_on, T_desired, therm_timestep, tau):
+    """
+    Evolve the system for ``nsteps`` timesteps using the velocity verlet algorithm, periodic boundary conditions,
+    the linked cell-list algorithm for the forces and, optionally, the Berendsen thermostat.
+    All the arrays are updated in place.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    cntr: numpy.ndarray
+        Counter for the number of times each particle get folded back into the main simulation box.
+
+    p_id: numpy.ndarray
+        Species id of each particle.
+
+    masses: numpy.ndarray
+        Mass of each particle.
+
+    charges: numpy.ndarray
+        Charge of each particle.
+
+    box_lengths: numpy.ndarray
+        Box Dimensions.
+
+    dt: float
+        Timestep.
+
+    nsteps: int
+        Number of timesteps.
+
+    it_start: int
+        Timestep number of the first step.
+
+    rc: float
+        Cut-off radius.
+
+    potential_matrix: numpy.ndarray
+        Potential parameters.
+
+    force: func
+        Force function.
+
+    measure : bool
+        Boolean for rdf calculation.
+
+    rdf_hist : numpy.ndarray
+        Radial Distribution function array.
+
+    head : numpy.ndarray
+        Head particle of each cell of the linked cell-list.
+
+    ls : numpy.ndarray
+        List of particle indices in a given cell of the linked cell-list.
+
+    mie_factor: float
+        Prefactor of the Mie energy of charged systems. Zero for neutral systems.
+
+    nums: numpy.ndarray
+        Number of particles of each species.
+
+    const: numpy.ndarray
+        Conversion factor from kinetic energy to temperature of each species.
+
+    T : numpy.ndarray
+        Temperature of each species at the end of the last step.
+
+    thermostat_on: bool
+        Flag for the Berendsen thermostat.
+
+    T_desired : numpy.ndarray
+        Thermostat temperature of each species.
+
+    therm_timestep : int
+        Timestep at which to turn on the thermostat.
+
+    tau : float
+        Berendsen relaxation rate.
+
+    Returns
+    -------
+    U : float
+        Potential energy at the end of the last step.
+
+    Notes
+    -----
+    The thermostat is applied at every step except the last one, so that the caller can save the particles' data
+    before the thermostat as done in :meth:`Integrator.equilibrate`.
+
+    """
+    U = 0.0
+    for step in range(nsteps):
+        # First half step velocity update, full step position update and periodic boundary conditions
+        kick_drift_pbc(pos, vel, acc, cntr, box_lengths, dt)
+
+        # Compute total potential energy and acceleration for second half step velocity update
+        acc[:, :] = 0.0
+        U = update_accumulate(pos, p_id, masses, box_lengths, rc, potential_matrix, force, measure, rdf_hist,
+                              acc, head, ls)
+        dipole_x = 0.0
+        dipole_y = 0.0
+        dipole_z = 0.0
+        for p in range(pos.shape[0]):
+            dipole_x += charges[p] * pos[p, 0]
+            dipole_y += charges[p] * pos[p, 1]
+            dipole_z += charges[p] * pos[p, 2]
+        U += mie_factor * (dipole_x * dipole_x + dipole_y * dipole_y + dipole_z * dipole_z)
+
+        # Second half step velocity update
+        if thermostat_on:
+            kick_temperature(vel, acc, dt, masses, nums, const, T)
+            if step < nsteps - 1:
+                berendsen(vel, T_desired, T, nums, therm_timestep, tau, it_start + step)
+        else:
+            kick(vel, acc, dt)
+
+    return U
+
+
+@njit
+def langevin_first_half(pos, vel, acc, beta, dt, c1, c2, pos_noise, vel_noise):
+    """
+    Full step position update and first part of the velocity update of the Langevin integrator.
+    Arrays are updated in place.
+
+    Parameters
+    ----------
+    pos: numpy.ndarray
+        Particles' positions.
+
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations at the beginning of the timestep.
+
+    beta : numpy.ndarray
+        Normally distributed random numbers.
+
+    dt: float
+        Timestep.
+
+    c1 : numpy.ndarray
+        :math:`1 - \gamma dt/2` of each particle.
+
+    c2 : numpy.ndarray
+        :math:`1/(1 + \gamma dt/2)` of each particle.
+
+    pos_noise : numpy.ndarray
+        Amplitude of the position noise of each particle.
+
+    vel_noise : numpy.ndarray
+        Amplitude of the velocity noise of each particle.
+
+    """
+    half_dt_sq = 0.5 * dt * dt
+    for p in range(pos.shape[0]):
+        c1c2 = c1[p] * c2[p]
+        half_c2_dt = 0.5 * c2[p] * dt
+        for d in range(pos.shape[1]):
+            pos[p, d] += c1[p] * dt * vel[p, d] + half_dt_sq * acc[p, d] + pos_noise[p] * beta[p, d]
+            vel[p, d] = c1c2 * vel[p, d] + half_c2_dt * acc[p, d] + vel_noise[p] * beta[p, d]
+
+
+@njit
+def langevin_second_half(vel, acc, dt, c2):
+    """
+    Second part of the velocity update of the Langevin integrator. Velocities are updated in place.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations at the end of the timestep.
+
+    dt: float
+        Timestep.
+
+    c2 : numpy.ndarray
+        :math:`1/(1 + \gamma dt/2)` of each particle.
+
+    """
+    for p in range(vel.shape[0]):
+        half_c2_dt = 0.5 * c2[p] * dt
+        for d in range(vel.shape[1]):
+            vel[p, d] += half_c2_dt * acc[p, d]
+
+
+@njit
+def scaled_add(y, x, a):
+    """
+    In place update ``y += a * x``.
+
+    Parameters
+    ----------
+    y : numpy.ndarray
+        Array to update, e.g. particles' positions or velocities.
+
+    x : numpy.ndarray
+        Array to add, e.g. particles' velocities or accelerations.
+
+    a : float
+        Scale factor, e.g. a fraction of the timestep.
+
+    """
+    for p in range(y.shape[0]):
+        for d in range(y.shape[1]):
+            y[p, d] += a * x[p, d]
+
+
+@njit
+def max_speed_acceleration(vel, acc):
+    """
+    Calculate the largest speed and the largest acceleration magnitude in a single pass.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    Returns
+    -------
+    v_max : float
+        Largest speed.
+
+    a_max : float
+        Largest acceleration magnitude.
+
+    """
+    v2_max = 0.0
+    a2_max = 0.0
+    for p in range(vel.shape[0]):
+        v2 = 0.0
+        a2 = 0.0
+        for d in range(vel.shape[1]):
+            v2 += vel[p, d] * vel[p, d]
+            a2 += acc[p, d] * acc[p, d]
+        if v2 > v2_max:
+            v2_max = v2
+        if a2 > a2_max:
+            a2_max = a2
+
+    return np.sqrt(v2_max), np.sqrt(a2_max)
+
+
+def block_convergence(observable, no_blocks, tolerance):
+    """
+    Check whether a time series is converged.
+
+    Parameters
+    ----------
+    observable : numpy.ndarray
+        Time series, e.g. temperature or potential energy at each dump.
+
+    no_blocks : int
+        Number of blocks in which ``observable`` is divided.
+
+    tolerance : float
+        Relative tolerance.
+
+    Returns
+    -------
+    : bool
+        True if the drift of the linear fit over the whole series and the standard deviation of the block averages,
+        calculated by :func:`sarkas.tools.observables.calc_statistical_efficiency`, are both smaller than
+        ``tolerance`` times the average.
+
+    """
+    no_samples = len(observable)
+    run_avg = observable.mean()
+    run_std = observable.std()
+    if run_std == 0.0:
+        return True
+
+    tau_blk, sigma2_blk, stat_eff = calc_statistical_efficiency(observable, run_avg, run_std,
+                                                                no_blocks + 1, no_samples)
+    slope = np.polyfit(np.arange(no_samples), observable, 1)[0]
+    drift = abs(slope) * (no_samples - 1)
+
+    return drift < tolerance * abs(run_avg) and np.sqrt(sigma2_blk[no_blocks]) < tolerance * abs(run_avg)
+
+
+@njit
+def magnetic_push(vel, acc, p_id, rotation, propagation):
+    """
+    In place velocity update ``v = R v + P a`` in a constant magnetic field with the matrices of each particle's
+    species. See :meth:`Integrator.magnetic_matrices`.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities. Updated in place.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    p_id : numpy.ndarray
+        Particles' species id.
+
+    rotation : numpy.ndarray
+        Rotation matrix of each species. Shape = (``num_species``, 3, 3).
+
+    propagation : numpy.ndarray
+        Acceleration matrix of each species. Shape = (``num_species``, 3, 3).
+
+    """
+    for p in range(vel.shape[0]):
+        sp = p_id[p]
+        vx, vy, vz = vel[p, 0], vel[p, 1], vel[p, 2]
+        ax, ay, az = acc[p, 0], acc[p, 1], acc[p, 2]
+        for d in range(3):
+            vel[p, d] = rotation[sp, d, 0] * vx + rotation[sp, d, 1] * vy + rotation[sp, d, 2] * vz \
+                + propagation[sp, d, 0] * ax + propagation[sp, d, 1] * ay + propagation[sp, d, 2] * az
+
+
+@njit
+def magnetic_push_drift(pos, vel, acc, p_id, rotation, propagation, dt):
+    """
+    In place velocity update ``v = R v + P a`` followed by the position update ``x += v dt``.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Updated in place.
+
+    vel : numpy.ndarray
+        Particles' velocities. Updated in place.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    p_id : numpy.ndarray
+        Particles' species id.
+
+    rotation : numpy.ndarray
+        Rotation matrix of each species. Shape = (``num_species``, 3, 3).
+
+    propagation : numpy.ndarray
+        Acceleration matrix of each species. Shape = (``num_species``, 3, 3).
+
+    dt : float
+        Time of the position update.
+
+    """
+    for p in range(vel.shape[0]):
+        sp = p_id[p]
+        vx, vy, vz = vel[p, 0], vel[p, 1], vel[p, 2]
+        ax, ay, az = acc[p, 0], acc[p, 1], acc[p, 2]
+        for d in range(3):
+            vel[p, d] = rotation[sp, d, 0] * vx + rotation[sp, d, 1] * vy + rotation[sp, d, 2] * vz \
+                + propagation[sp, d, 0] * ax + propagation[sp, d, 1] * ay + propagation[sp, d, 2] * az
+            pos[p, d] += vel[p, d] * dt
+
+
+@njit
+def boris_push_drift(pos, vel, acc, p_id, rotation, propagation, dt):
+    """
+    In place Boris velocity update ``v = R (v + P a) + P a`` followed by the position update ``x += v dt``.
+    See eqs. (80) - (81) of Ref. :cite:`Chin2008`.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Updated in place.
+
+    vel : numpy.ndarray
+        Particles' velocities. Updated in place.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    p_id : numpy.ndarray
+        Particles' species id.
+
+    rotation : numpy.ndarray
+        Rotation matrix of each species for a full timestep. Shape = (``num_species``, 3, 3).
+
+    propagation : numpy.ndarray
+        Acceleration matrix of each species for half timestep. Shape = (``num_species``, 3, 3).
+
+    dt : float
+        Timestep.
+
+    """
+    for p in range(vel.shape[0]):
+        sp = p_id[p]
+        ax, ay, az = acc[p, 0], acc[p, 1], acc[p, 2]
+        # Half step force update
+        fx = propagation[sp, 0, 0] * ax + propagation[sp, 0, 1] * ay + propagation[sp, 0, 2] * az
+        fy = propagation[sp, 1, 0] * ax + propagation[sp, 1, 1] * ay + propagation[sp, 1, 2] * az
+        fz = propagation[sp, 2, 0] * ax + propagation[sp, 2, 1] * ay + propagation[sp, 2, 2] * az
+        vx = vel[p, 0] + fx
+        vy = vel[p, 1] + fy
+        vz = vel[p, 2] + fz
+        # Full magnetic rotation and second half step force update
+        vel[p, 0] = rotation[sp, 0, 0] * vx + rotation[sp, 0, 1] * vy + rotation[sp, 0, 2] * vz + fx
+        vel[p, 1] = rotation[sp, 1, 0] * vx + rotation[sp, 1, 1] * vy + rotation[sp, 1, 2] * vz + fy
+        vel[p, 2] = rotation[sp, 2, 0] * vx + rotation[sp, 2, 1] * vy + rotation[sp, 2, 2] * vz + fz
+
+        for d in range(3):
+            pos[p, d] += vel[p, d] * dt
+
+
+@njit
+def magnetic_push_drift_pbc(pos, vel, acc, cntr, p_id, rotation, propagation, BoxVector, dt):
+    """
+    Same as :func:`magnetic_push_drift` with periodic boundary conditions enforced in the same loop.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Updated in place.
+
+    vel : numpy.ndarray
+        Particles' velocities. Updated in place.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    cntr: numpy.ndarray
+        Counter for the number of times each particle get folded back into the main simulation box
+
+    p_id : numpy.ndarray
+        Particles' species id.
+
+    rotation : numpy.ndarray
+        Rotation matrix of each species. Shape = (``num_species``, 3, 3).
+
+    propagation : numpy.ndarray
+        Acceleration matrix of each species. Shape = (``num_species``, 3, 3).
+
+    BoxVector: numpy.ndarray
+        Box Dimensions.
+
+    dt : float
+        Time of the position update.
+
+    """
+    for p in range(vel.shape[0]):
+        sp = p_id[p]
+        vx, vy, vz = vel[p, 0], vel[p, 1], vel[p, 2]
+        ax, ay, az = acc[p, 0], acc[p, 1], acc[p, 2]
+        for d in range(3):
+            vel[p, d] = rotation[sp, d, 0] * vx + rotation[sp, d, 1] * vy + rotation[sp, d, 2] * vz \
+                + propagation[sp, d, 0] * ax + propagation[sp, d, 1] * ay + propagation[sp, d, 2] * az
+            pos[p, d] += vel[p, d] * dt
+
+            if pos[p, d] > BoxVector[d]:
+                pos[p, d] -= BoxVector[d]
+                cntr[p, d] += 1
+            if pos[p, d] < 0.0:
+                pos[p, d] += BoxVector[d]
+                cntr[p, d] -= 1
+
+
+@njit
+def boris_push_drift_pbc(pos, vel, acc, cntr, p_id, rotation, propagation, BoxVector, dt):
+    """
+    Same as :func:`boris_push_drift` with periodic boundary conditions enforced in the same loop.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Updated in place.
+
+    vel : numpy.ndarray
+        Particles' velocities. Updated in place.
+
+    acc : numpy.ndarray
+        Particles' accelerations.
+
+    cntr: numpy.ndarray
+        Counter for the number of times each particle get folded back into the main simulation box
+
+    p_id : numpy.ndarray
+        Particles' species id.
+
+    rotation : numpy.ndarray
+        Rotation matrix of each species for a full timestep. Shape = (``num_species``, 3, 3).
+
+    propagation : numpy.ndarray
+        Acceleration matrix of each species for half timestep. Shape = (``num_species``, 3, 3).
+
+    BoxVector: numpy.ndarray
+        Box Dimensions.
+
+    dt : float
+        Timestep.
+
+    """
+    for p in range(vel.shape[0]):
+        sp = p_id[p]
+        ax, ay, az = acc[p, 0], acc[p, 1], acc[p, 2]
+        # Half step force update
+        fx = propagation[sp, 0, 0] * ax + propagation[sp, 0, 1] * ay + propagation[sp, 0, 2] * az
+        fy = propagation[sp, 1, 0] * ax + propagation[sp, 1, 1] * ay + propagation[sp, 1, 2] * az
+        fz = propagation[sp, 2, 0] * ax + propagation[sp, 2, 1] * ay + propagation[sp, 2, 2] * az
+        vx = vel[p, 0] + fx
+        vy = vel[p, 1] + fy
+        vz = vel[p, 2] + fz
+        # Full magnetic rotation and second half step force update
+        vel[p, 0] = rotation[sp, 0, 0] * vx + rotation[sp, 0, 1] * vy + rotation[sp, 0, 2] * vz + fx
+        vel[p, 1] = rotation[sp, 1, 0] * vx + rotation[sp, 1, 1] * vy + rotation[sp, 1, 2] * vz + fy
+        vel[p, 2] = rotation[sp, 2, 0] * vx + rotation[sp, 2, 1] * vy + rotation[sp, 2, 2] * vz + fz
+
+        for d in range(3):
+            pos[p, d] += vel[p, d] * dt
+
+            if pos[p, d] > BoxVector[d]:
+                pos[p, d] -= BoxVector[d]
+                cntr[p, d] += 1
+            if pos[p, d] < 0.0:
+                pos[p, d] += BoxVector[d]
+                cntr[p, d] -= 1
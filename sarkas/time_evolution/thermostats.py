@@ -1,5 +1,5 @@
 """
-Module containing various thermostat. Berendsen only for now.
+Module containing various thermostat. Berendsen, stochastic velocity rescaling (CSVR) and Nose-Hoover chains.
 """
 import numpy as np
 from numba import njit
@@ -30,11 +30,44 @@ class Thermostat:
         Timestep at which thermostat is turned on.
 
     type: str
-        Thermostat type
+        Thermostat type. Choices: ``'berendsen'``, ``'csvr'``, ``'nose_hoover'``.
 
     berendsen_tau: float
         Berendsen parameter.
 
+    csvr_tau: float
+        Relaxation time of the CSVR thermostat in units of timesteps. Default = one plasma period,
+        i.e. 2 pi / (w_p dt).
+
+    nose_hoover_tau: float
+        Period of the Nose-Hoover thermostats' oscillations in units of timesteps. Default = five plasma periods,
+        i.e. 10 pi / (w_p dt).
+
+    chain_length: int
+        Number of thermostats in each Nose-Hoover chain. Default = 3.
+
+    chain_velocities: numpy.ndarray
+        Velocities of the Nose-Hoover thermostats of each species in units of 1/timestep.
+        Shape = (``num_species``, ``chain_length``).
+
+    dimensions: int
+        Number of non-zero dimensions.
+
+    degrees_of_freedom: numpy.ndarray
+        Number of degrees of freedom of each species.
+
+    temperature_constants: numpy.ndarray
+        Conversion factors from kinetic energy to temperature of each species.
+
+    species_kinetic_temperatures: numpy.ndarray
+        Buffer of the instantaneous temperature of each species.
+
+    diagnostic_columns: list
+        Names of the quantities returned by :meth:`diagnostics`.
+
+    rnd_gen: numpy.random.Generator
+        Random number generator of the CSVR thermostat.
+
     """
 
     def __init__(self):
@@ -47,6 +80,16 @@ class Thermostat:
         self.species_num = None
         self.species_masses = None
         self.berendsen_tau = None
+        self.csvr_tau = None
+        self.nose_hoover_tau = None
+        self.chain_length = 3
+        self.chain_velocities = None
+        self.dimensions = None
+        self.degrees_of_freedom = None
+        self.temperature_constants = None
+        self.species_kinetic_temperatures = None
+        self.diagnostic_columns = None
+        self.rnd_gen = None
         self.eV_temp_flag = False
         self.K_temp_flag = False
 
@@ -85,8 +128,14 @@ class Thermostat:
         """Print Thermostat information in a user-friendly way."""
         print('Type: {}'.format(self.type))
         print('First thermostating timestep, i.e. relaxation_timestep = {}'.format(self.relaxation_timestep))
-        print("Berendsen parameter tau: {:.3f} [timesteps]".format(self.berendsen_tau))
-        print("Berendsen relaxation rate: {:.3f} [1/timesteps] ".format(self.relaxation_rate))
+        if self.type.lower() == "berendsen":
+            print("Berendsen parameter tau: {:.3f} [timesteps]".format(self.berendsen_tau))
+            print("Berendsen relaxation rate: {:.3f} [1/timesteps] ".format(self.relaxation_rate))
+        elif self.type.lower() == "csvr":
+            print("CSVR relaxation time tau: {:.3f} [timesteps]".format(self.csvr_tau))
+        else:
+            print("Nose-Hoover chain length: {}".format(self.chain_length))
+            print("Nose-Hoover parameter tau: {:.3f} [timesteps]".format(self.nose_hoover_tau))
         if not self.eV_temp_flag and not self.K_temp_flag:
             # If you forgot to give thermostating temperatures
             print("\n!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! WARNING !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!")
@@ -117,19 +166,76 @@ class Thermostat:
             self.temperatures = np.copy(params.species_temperatures)
             self.temperatures_eV = np.copy(self.temperatures) / params.eV2K
 
+        self.type = self.type.lower().replace('-', '_')
+        msg = "Only Berendsen, CSVR and Nose-Hoover thermostats are supported."
+        assert self.type in ["berendsen", "csvr", "nose_hoover"], msg
+
         if self.berendsen_tau:
             self.relaxation_rate = 1.0 / self.berendsen_tau
-        else:
+        elif self.relaxation_rate:
             self.berendsen_tau = 1.0 / self.relaxation_rate
 
         if not self.temperatures.all():
             self.temperatures = np.copy(params.species_temperatures)
 
         self.kB = params.kB
-        self.species_num = np.copy(params.species_num)
+        self.dimensions = params.dimensions
         self.species_masses = np.copy(params.species_masses)
+        self.species_kinetic_temperatures = np.zeros(params.num_species)
+        self.set_species_num(params.species_num)
+
+        # Plasma period in units of timesteps. The Berendsen tau, a few timesteps, is too short for the thermostats
+        # that sample the canonical ensemble.
+        plasma_period = 2.0 * np.pi / (params.total_plasma_frequency * params.dt)
+
+        if self.type == "csvr":
+            if self.csvr_tau is None:
+                self.csvr_tau = plasma_period
+            # Use a different stream from the one of the particles' initialization.
+            seed = params.rand_seed if hasattr(params, "rand_seed") else 123456789
+            self.rnd_gen = np.random.Generator(np.random.PCG64(seed).jumped())
+
+        elif self.type == "nose_hoover":
+            if self.nose_hoover_tau is None:
+                # Slower than the plasma oscillations so that the chain does not resonate with them
+                self.nose_hoover_tau = 5.0 * plasma_period
+            assert self.chain_length > 0, "Nose-Hoover thermostat: chain_length must be positive."
+            self.chain_velocities = np.zeros((params.num_species, self.chain_length))
+
+        self.diagnostic_columns = ["{} Thermostat Temperature".format(sp_name) for sp_name in params.species_names]
+        if self.type == "nose_hoover":
+            self.diagnostic_columns += ["{} Chain Velocity".format(sp_name) for sp_name in params.species_names]
+
+    def diagnostics(self):
+        """
+        Instantaneous temperature of each species computed at the last update and, for the Nose-Hoover thermostat,
+        velocity of the first thermostat of each chain. See ``diagnostic_columns``.
 
-        assert self.type.lower() == "berendsen", "Only Berendsen thermostat is supported."
+        Returns
+        -------
+        values : numpy.ndarray
+            Thermostat's diagnostics.
+
+        """
+        if self.type == "nose_hoover":
+            return np.concatenate((self.species_kinetic_temperatures, self.chain_velocities[:, 0]))
+
+        return np.copy(self.species_kinetic_temperatures)
+
+    def set_species_num(self, species_num):
+        """
+        Update the number of particles of each species and the quantities depending on it.
+
+        Parameters
+        ----------
+        species_num : numpy.ndarray
+            Number of particles of each species.
+
+        """
+        self.species_num = np.copy(species_num)
+        self.degrees_of_freedom = self.dimensions * self.species_num
+        # Species completely absorbed by the boundaries have zero temperature
+        self.temperature_constants = 2.0 / (self.kB * np.maximum(self.degrees_of_freedom, 1))
 
     def update(self, ptcls, it):
         """
@@ -144,9 +250,41 @@ class Thermostat:
             Current timestep.
 
         """
-        K, T = ptcls.kinetic_temperature()
-        berendsen(ptcls.vel, self.temperatures, T, self.species_num, self.relaxation_timestep,
-                  self.relaxation_rate, it)
+        kinetic_temperatures(ptcls.vel, ptcls.masses, self.species_num, self.temperature_constants,
+                             self.species_kinetic_temperatures)
+        self.rescale(ptcls.vel, self.species_kinetic_temperatures, it)
+
+    def rescale(self, vel, T, it):
+        """
+        Rescale particles' velocities given their instantaneous temperatures.
+
+        Parameters
+        ----------
+        vel : numpy.ndarray
+            Particles' velocities. Updated in place.
+
+        T : numpy.ndarray
+            Instantaneous temperature of each species.
+
+        it : int
+            Current timestep.
+
+        """
+        if self.type == "berendsen":
+            berendsen(vel, self.temperatures, T, self.species_num, self.relaxation_timestep, self.relaxation_rate,
+                      it)
+        elif self.type == "csvr":
+            if it < self.relaxation_timestep:
+                return
+            gauss = self.rnd_gen.standard_normal(len(self.species_num))
+            chi2 = self.rnd_gen.chisquare(np.maximum(self.degrees_of_freedom - 1, 1))
+            csvr(vel, self.temperatures, T, self.species_num, np.exp(-1.0 / self.csvr_tau), self.degrees_of_freedom,
+                 gauss, chi2)
+        else:
+            if it < self.relaxation_timestep:
+                return
+            nose_hoover_chain(vel, self.temperatures, T, self.species_num, self.nose_hoover_tau,
+                              self.degrees_of_freedom, self.chain_velocities)
 
 
 @njit
@@ -195,6 +333,42 @@ def calc_kin_temp(vel, nums, masses, kB):
     return K, T
 
 
+@njit
+def kinetic_temperatures(vel, masses, species_num, const, T):
+    """
+    Calculate the temperature of each species in a single pass over the particles' velocities.
+
+    Parameters
+    ----------
+    vel: numpy.ndarray
+        Particles' velocities.
+
+    masses: numpy.ndarray
+        Particles' masses.
+
+    species_num: numpy.ndarray
+        Number of particles of each species.
+
+    const: numpy.ndarray
+        Conversion factors from kinetic energy to temperature, :math:`2/(k_B N_{\rm dof})`.
+
+    T : numpy.ndarray
+        Temperature of each species. Updated in place.
+
+    """
+    species_start = 0
+    for i in range(len(species_num)):
+        species_end = species_start + species_num[i]
+        K = 0.0
+        for p in range(species_start, species_end):
+            v2 = 0.0
+            for d in range(vel.shape[1]):
+                v2 += vel[p, d] * vel[p, d]
+            K += 0.5 * masses[p] * v2
+        T[i] = const[i] * K
+        species_start = species_end
+
+
 @njit
 def berendsen(vel, T_desired, T, species_np, therm_timestep, tau, it):
     """
@@ -234,12 +408,165 @@ def berendsen(vel, T_desired, T, species_np, therm_timestep, tau, it):
     # else:
     #     fact = np.sqrt(1.0 + (T_desired / T - 1.0) * tau)  # eq.(11)
 
-    # branchless programming
-    fact = 1.0 * (it < therm_timestep) + np.sqrt(1.0 + (T_desired / T - 1.0) * tau) * (it >= therm_timestep)
     species_start = 0
     species_end = 0
 
     for i, num in enumerate(species_np):
         species_end += num
-        vel[species_start:species_end, :] *= fact[i]
+        # Species completely absorbed by the boundaries
+        if num == 0:
+            continue
+        # branchless programming
+        fact = 1.0 * (it < therm_timestep) + np.sqrt(1.0 + (T_desired[i] / T[i] - 1.0) * tau) * (it >= therm_timestep)
+        vel[species_start:species_end, :] *= fact
         species_start += num
+
+
+@njit
+def csvr(vel, T_desired, T, species_num, c, ndof, gauss, chi2):
+    """
+    Update particle velocity based on the canonical sampling through velocity rescaling thermostat [Bussi2007]_.
+    The kinetic energy of each species evolves by one timestep of the stochastic dynamics of eq. (A7) in the reference.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities to rescale.
+
+    T_desired : numpy.ndarray
+        Target temperature of each species.
+
+    T : numpy.ndarray
+        Instantaneous temperature of each species.
+
+    species_num : numpy.ndarray
+        Number of each species.
+
+    c : float
+        :math:`e^{-1/\tau}` with :math:`\tau` the relaxation time in units of timesteps.
+
+    ndof : numpy.ndarray
+        Number of degrees of freedom of each species.
+
+    gauss : numpy.ndarray
+        One normally distributed random number for each species.
+
+    chi2 : numpy.ndarray
+        Sum of ``ndof - 1`` squared normally distributed random numbers for each species.
+
+    References
+    ----------
+    .. [Bussi2007] `G. Bussi et al., J Chem Phys 126 014101 (2007) <https://doi.org/10.1063/1.2408420>`_
+
+    """
+    species_start = 0
+    for i in range(len(species_num)):
+        species_end = species_start + species_num[i]
+        # Empty species or particles at rest cannot be rescaled
+        if species_num[i] == 0 or T[i] == 0.0:
+            species_start = species_end
+            continue
+
+        ratio = T_desired[i] / (ndof[i] * T[i])
+        alpha2 = c + (1.0 - c) * ratio * (gauss[i] * gauss[i] + chi2[i]) \
+            + 2.0 * gauss[i] * np.sqrt(c * (1.0 - c) * ratio)
+        fact = np.sqrt(alpha2)
+        # Sign of alpha as in the reference implementation. Only relevant for very short relaxation times.
+        if gauss[i] + np.sqrt(c / ((1.0 - c) * ratio)) < 0.0:
+            fact = -fact
+
+        for p in range(species_start, species_end):
+            for d in range(vel.shape[1]):
+                vel[p, d] *= fact
+        T[i] *= alpha2
+        species_start = species_end
+
+
+@njit
+def nose_hoover_chain(vel, T_desired, T, species_num, tau, ndof, v_xi):
+    """
+    Update particle velocity based on Nose-Hoover chain thermostats [Martyna1992]_, one chain for each species.
+    The chain is propagated for one timestep using the Trotter factorization of [Martyna1996]_.
+
+    Parameters
+    ----------
+    vel : numpy.ndarray
+        Particles' velocities to rescale.
+
+    T_desired : numpy.ndarray
+        Target temperature of each species.
+
+    T : numpy.ndarray
+        Instantaneous temperature of each species.
+
+    species_num : numpy.ndarray
+        Number of each species.
+
+    tau : float
+        Period of the thermostats' oscillations in units of timesteps. It defines the thermostats' masses
+        :math:`Q_1 = N_{\rm dof} k_B T \tau^2`, :math:`Q_{j > 1} = k_B T \tau^2`.
+
+    ndof : numpy.ndarray
+        Number of degrees of freedom of each species.
+
+    v_xi : numpy.ndarray
+        Thermostats' velocities in units of 1/timestep. Shape = (``num_species``, ``chain_length``).
+        Updated in place.
+
+    Notes
+    -----
+    The thermostat is applied once per timestep after the velocity verlet step. Alternating full steps of the chain
+    and of the particles is equivalent to the symmetric factorization with half steps of the chain before and after
+    the particles' step.
+
+    References
+    ----------
+    .. [Martyna1992] `G. J. Martyna et al., J Chem Phys 97 2635 (1992) <https://doi.org/10.1063/1.463940>`_
+    .. [Martyna1996] `G. J. Martyna et al., Mol Phys 87 1117 (1996) <https://doi.org/10.1080/00268979600100761>`_
+
+    """
+    chain_length = v_xi.shape[1]
+    tau2 = tau * tau
+
+    species_start = 0
+    for i in range(len(species_num)):
+        species_end = species_start + species_num[i]
+        if species_num[i] == 0:
+            species_start = species_end
+            continue
+
+        ratio = T[i] / T_desired[i]
+        # Half step from the end to the beginning of the chain
+        for j in range(chain_length - 1, -1, -1):
+            if j < chain_length - 1:
+                v_xi[i, j] *= np.exp(-0.25 * v_xi[i, j + 1])
+            if j == 0:
+                v_xi[i, j] += 0.5 * (ratio - 1.0) / tau2
+            elif j == 1:
+                v_xi[i, j] += 0.5 * (ndof[i] * v_xi[i, 0] * v_xi[i, 0] - 1.0 / tau2)
+            else:
+                v_xi[i, j] += 0.5 * (v_xi[i, j - 1] * v_xi[i, j - 1] - 1.0 / tau2)
+            if j < chain_length - 1:
+                v_xi[i, j] *= np.exp(-0.25 * v_xi[i, j + 1])
+
+        fact = np.exp(-v_xi[i, 0])
+        for p in range(species_start, species_end):
+            for d in range(vel.shape[1]):
+                vel[p, d] *= fact
+        ratio *= fact * fact
+        T[i] *= fact * fact
+
+        # Half step from the beginning to the end of the chain
+        for j in range(chain_length):
+            if j < chain_length - 1:
+                v_xi[i, j] *= np.exp(-0.25 * v_xi[i, j + 1])
+            if j == 0:
+                v_xi[i, j] += 0.5 * (ratio - 1.0) / tau2
+            elif j == 1:
+                v_xi[i, j] += 0.5 * (ndof[i] * v_xi[i, 0] * v_xi[i, 0] - 1.0 / tau2)
+            else:
+                v_xi[i, j] += 0.5 * (v_xi[i, j - 1] * v_xi[i, j - 1] - 1.0 / tau2)
+            if j < chain_length - 1:
+                v_xi[i, j] *= np.exp(-0.25 * v_xi[i, j + 1])
+
+        species_start = species_end
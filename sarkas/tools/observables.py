@@ -8,10 +8,12 @@ if get_ipython().__class__.__name__ == 'ZMQInteractiveShell':
 else:
     from tqdm import tqdm
 
-from numba import njit
+from numba import njit, prange
 from matplotlib.gridspec import GridSpec
 
 import os
+from ast import literal_eval
+from functools import partial
 import numpy as np
 import pandas as pd
 import seaborn as sns
@@ -19,11 +21,20 @@ import matplotlib.pyplot as plt
 # import h5py
 # import logging
 
+import scipy.fft as scp_fft
 import scipy.signal as scp_signal
 import scipy.stats as scp_stats
 
+from sarkas.utilities.energy_log import read_energy
+from sarkas.utilities.io import DUMP_FIELDS
 from sarkas.utilities.timing import SarkasTimer
-from sarkas.utilities.io import num_sort
+from sarkas.utilities.trajectory import DumpReader, count_dumps, last_dump, load_checkpoint, load_dump, missing_dumps, \
+    read_dumps, stream_dir
+
+# Directory of the production phase where the per-dump quantities computed during the simulation are saved.
+INSITU_DIR = 'InSitu'
+# Particles' data available to the per-dump functions during the simulation, see InSituPipeline.accumulate.
+INSITU_FIELDS = ['pos', 'vel', 'acc']
 
 UNITS = [
     # MKS Units
@@ -155,6 +166,31 @@ class Observable:
         If True, `runs` needs be specified. It will collect data from all runs and stored them in a large ndarray to
         be averaged over.
 
+    accumulators : dict
+        Per-dump quantities computed by a :class:`FramePipeline`. See :meth:`register`.
+
+    insitu : bool
+        Flag for computing the per-dump quantities during the production phase, see :class:`InSituPipeline`.
+        Default = False.
+
+    insitu_file : str
+        Path to the npz file containing the per-dump quantities computed during the production phase.
+
+    insitu_pipeline : sarkas.tools.observables.InSituPipeline
+        Pipeline of the running production phase, set while the observable is set up for it. The production dumps,
+        still being written, are not read. Default = None.
+
+    acf_method : str
+        Method of calculation of the autocorrelation functions. ``'full'``, all the lags of each slice with
+        :func:`correlationfunction`, or ``'multiple_tau'``, logarithmically spaced lags of the whole phase with a
+        :class:`MultipleTauCorrelator`. Default = ``'full'``.
+
+    mt_points : int
+        Number of lags of each level of the multiple-tau correlator. Default = 16.
+
+    mt_averaging : int
+        Number of values averaged into one value of the next level of the multiple-tau correlator. Default = 2.
+
     """
 
     def __init__(self):
@@ -167,6 +203,14 @@ class Observable:
         self.screen_output = True
         self.timer = SarkasTimer()
         self.k_observable = False
+        self.dump_fields = None
+        self.stream_fields = None
+        self.accumulators = None
+        self.insitu = False
+        self.insitu_pipeline = None
+        self.acf_method = 'full'
+        self.mt_points = 16
+        self.mt_averaging = 2
 
     def __repr__(self):
         sortedDict = dict(sorted(self.__dict__.items(), key=lambda x: x[0].lower()))
@@ -300,12 +344,14 @@ class Observable:
         # Get the number of independent observables if multi-species
         self.no_obs = int(self.num_species * (self.num_species + 1) / 2)
 
-        # Get the total number of dumps by looking at the files in the directory
-        self.prod_no_dumps = len(os.listdir(self.prod_dump_dir))
-        self.eq_no_dumps = len(os.listdir(self.eq_dump_dir))
+        # Get the total number of dumps by looking at the files in the directory. During the production phase the
+        # in-situ pipeline sets them, since the dumps are still being written.
+        insitu_run = self.insitu_pipeline is not None and self.phase == 'production'
+        self.prod_no_dumps = self.insitu_pipeline.no_dumps if insitu_run else count_dumps(self.prod_dump_dir)
+        self.eq_no_dumps = count_dumps(self.eq_dump_dir)
         # Check for magnetized plasma options
         if self.magnetized and self.electrostatic_equilibration:
-            self.mag_no_dumps = len(os.listdir(self.mag_dump_dir))
+            self.mag_no_dumps = count_dumps(self.mag_dump_dir)
 
         # Assign dumps variables based on the choice of phase
         if self.phase == 'equilibration':
@@ -326,6 +372,24 @@ class Observable:
             self.no_steps = self.magnetization_steps
             self.dump_dir = self.mag_dump_dir
 
+        if self.dump_fields:
+            if insitu_run:
+                self.stream_fields = next(f for f in self.dump_fields if set(f) <= set(INSITU_FIELDS))
+            else:
+                self.stream_fields = self.select_stream(self.dump_fields)
+
+        # Use only the dumps before the first missing one
+        missing = missing_dumps(self.dump_dir, self.dump_step) if not insitu_run else []
+        if len(missing) > 0:
+            print("\nWARNING: the dumps of the steps {} are missing in {}.".format(missing, self.dump_dir))
+            self.no_dumps = int(missing[0] // self.dump_step)
+            print("Only the first {} dumps will be used.".format(self.no_dumps))
+
+        # Per-dump quantities computed during the simulation replace the dumps
+        self.insitu_file = os.path.join(self.production_dir, INSITU_DIR, self.__class__.__name__ + '.npz')
+        if self.insitu and self.phase == 'production':
+            self.load_insitu()
+
         # Time slicing for long runs
         if not hasattr(self, 'no_slices'):
             self.no_slices = 1
@@ -344,9 +408,83 @@ class Observable:
         #                     # format='%(levelname)s: %(asctime)s %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p',
         #                     level=logging.INFO)
 
+    def select_stream(self, dump_fields):
+        """
+        Read the dumps of the stream containing the fields needed by the observable. ``dump_dir``, ``dump_step`` and
+        ``no_dumps`` are updated if the fields are saved in a stream of the dump schema.
+
+        Parameters
+        ----------
+        dump_fields : list
+            Lists of fields from which the observable can be computed, in order of preference.
+
+        Returns
+        -------
+        fields : list
+            Fields to be read.
+
+        Raises
+        ------
+        ValueError
+            If no set of fields is saved in the main dumps or in a single stream of the phase.
+
+        """
+        schema = self.dump_schemas.get(self.phase, {}) if getattr(self, 'dump_schemas', None) else {}
+        main_fields = schema.get('fields', DUMP_FIELDS[self.phase])
+
+        for fields in dump_fields:
+            for name, stream in schema.get('streams', {}).items():
+                if set(fields) <= set(stream['fields']):
+                    self.dump_dir = stream_dir(self.dump_dir, name)
+                    self.dump_step = stream['dump_step']
+                    self.no_dumps = count_dumps(self.dump_dir)
+                    return fields
+
+            if set(fields) <= set(main_fields):
+                return fields
+
+        raise ValueError("{} needs the fields {} in the same dumps of the {} phase, but neither the dumps nor a stream "
+                         "of the dump schema save them.".format(self.__class__.__name__,
+                                                                ' or '.join(str(f) for f in dump_fields), self.phase))
+
+    def read_species_current(self, start, stop):
+        """
+        Read the sum of the velocities of the particles of each species from the dumps of the timesteps
+        ``range(start, stop, dump_step)``. The sum is done here if only the particles' velocities were saved.
+
+        Parameters
+        ----------
+        start : int
+            First timestep.
+
+        stop : int
+            Timestep after the last one.
+
+        Returns
+        -------
+        sp_current : numpy.ndarray
+            Current of each species. Shape = (``num_species``, ``dimensions``, ``dumps``).
+
+        time : numpy.ndarray
+            Time of each dump.
+
+        """
+        frames = self.accumulated('species_current', start, stop)
+        if frames is not None:
+            return frames['species_current'].transpose(1, 2, 0), frames['time']
+
+        if 'species_current' in self.stream_fields:
+            sp_current, time = read_dumps(self.dump_dir, 'species_current', start, stop, self.dump_step)
+            return np.asarray(sp_current).transpose(1, 2, 0), time
+
+        # Parse the particles' velocities from the dumps. Shape = (dimensions, dumps, particles).
+        # Raw binary trajectories are memory mapped and not copied.
+        vel, time = read_dumps(self.dump_dir, 'vel', start, stop, self.dump_step)
+        return calc_species_current(np.asarray(vel).transpose(2, 0, 1), self.species_num), time
+
     def parse(self):
         """
-        Grab the pandas dataframe from the saved csv file. If file does not exist call ``compute``.
+        Grab the pandas dataframe from the saved csv file or binary energy log. If file does not exist call ``compute``.
         """
         if self.k_observable:
             try:
@@ -446,58 +584,320 @@ class Observable:
             Flag for reading microscopic velocity Fourier components,``v(\mathbf k, t)``. Default = False.
 
         """
-        if nkt_flag:
-            try:
-                # Check that what was already calculated is correct
-                with pd.HDFStore(self.nkt_hdf_file, mode='r') as nkt_hfile:
-                    metadata = nkt_hfile.get_storer('nkt').attrs.metadata
-
-                if metadata['no_slices'] == self.no_slices:
-                    # Check for the correct number of k values
-                    if metadata["angle_averaging"] == self.angle_averaging:
-                        # Check for the correct max harmonics
-                        comp = self.max_k_harmonics == metadata["max_k_harmonics"]
-                        if not comp.all():
-                            self.calc_kt_data(nkt_flag=True)
-                    else:
-                        self.calc_kt_data(nkt_flag=True)
-                else:
-                    self.calc_kt_data(nkt_flag=True)
+        accumulated = self.accumulators if self.accumulators else {}
+        if nkt_flag and ('nkt' in accumulated or not self.kt_file_current(self.nkt_hdf_file, 'nkt')):
+            self.calc_kt_data(nkt_flag=True)
 
-                # elif metadata['max_k_harmonics']
-                #
-                # if self.angle_averaging == nkt_data["angle_averaging"]:
-                #
-                #     comp = self.max_k_harmonics == nkt_data["max_harmonics"]
-                #     if not comp.all():
-                #         self.calc_kt_data(nkt_flag=True)
-                # else:
-                #     self.calc_kt_data(nkt_flag=True)
+        if vkt_flag and ('vkt' in accumulated or not self.kt_file_current(self.vkt_hdf_file, 'vkt')):
+            self.calc_kt_data(vkt_flag=True)
 
-            except OSError:
-                self.calc_kt_data(nkt_flag=True)
+    def kt_file_current(self, hdf_file, key):
+        """
+        Check whether the time dependent Fourier space data saved in a file was calculated with the current slices and
+        :math:`\mathbf k` vectors.
 
-        if vkt_flag:
+        Parameters
+        ----------
+        hdf_file : str
+            Path of the file.
 
-            try:
-                # Check that what was already calculated is correct
-                with pd.HDFStore(self.vkt_hdf_file, mode='r') as vkt_hfile:
-                    metadata = vkt_hfile.get_storer('vkt').attrs.metadata
-
-                if metadata['no_slices'] == self.no_slices:
-                    # Check for the correct number of k values
-                    if metadata["angle_averaging"] == self.angle_averaging:
-                        # Check for the correct max harmonics
-                        comp = self.max_k_harmonics == metadata["max_k_harmonics"]
-                        if not comp.all():
-                            self.calc_kt_data(vkt_flag=True)
-                    else:
-                        self.calc_kt_data(vkt_flag=True)
-                else:
-                    self.calc_kt_data(vkt_flag=True)
+        key : str
+            ``'nkt'`` or ``'vkt'``.
+
+        Returns
+        -------
+        : bool
+            False if the file does not exist or it must be recalculated.
+
+        """
+        try:
+            with pd.HDFStore(hdf_file, mode='r') as hfile:
+                metadata = hfile.get_storer(key).attrs.metadata
+        except OSError:
+            return False
+
+        return metadata['no_slices'] == self.no_slices and metadata["angle_averaging"] == self.angle_averaging \
+            and (self.max_k_harmonics == metadata["max_k_harmonics"]).all()
+
+    def register(self, pipeline):
+        """
+        Register the per-dump quantities needed by :meth:`compute` in a :class:`FramePipeline`, so that the dumps are
+        read once for all the observables. Observables that do not read the dumps register nothing.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        pass
+
+    def add_accumulator(self, pipeline, name, fields, func, key=None):
+        """
+        Register a per-dump quantity for all the dumps of the phase.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        name : str
+            Name of the quantity in ``accumulators``.
+
+        fields : list
+            Fields read from the dumps.
+
+        func : callable
+            Function computing a dictionary of arrays from the particles' data of a dump.
+
+        key : tuple
+            Observables registering a quantity with the same key share it. Default = not shared.
+
+        """
+        if self.accumulators is None:
+            self.accumulators = {}
+        steps = np.arange(0, self.no_dumps * self.dump_step, self.dump_step)
+
+        # Already computed during the simulation
+        loaded = self.accumulators.get(name)
+        if loaded is not None and (key is None or loaded.key == key) and loaded.covers(steps):
+            return
+
+        self.accumulators[name] = pipeline.register(self.dump_dir, steps, fields, func, key)
+
+    def setup_insitu(self, pipeline, it_start=0):
+        """
+        Register the per-dump quantities needed by :meth:`compute` in the :class:`InSituPipeline` of the production
+        phase. Call it after :meth:`setup`.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.InSituPipeline
+            Pipeline of the production phase.
+
+        it_start : int
+            First production step. The quantities of the previous steps are read from ``insitu_file`` in a restarted
+            run. Default = 0.
+
+        """
+        previous = self.accumulators if it_start > 0 else None
+
+        self.dump_step = pipeline.dump_step
+        self.no_dumps = pipeline.no_dumps
+        self.accumulators = None
+        self.register(pipeline)
+        if not self.accumulators:
+            return
+
+        pipeline.observables.append(self)
+        if not previous:
+            return
+
+        for name, accumulator in self.accumulators.items():
+            old = previous.get(name)
+            if old is not None and type(old) is type(accumulator) and old.key == accumulator.key:
+                accumulator.resume(old, it_start)
+
+    def save_insitu(self):
+        """Save the per-dump quantities computed during the production phase in ``insitu_file``."""
+        arrays = {'dump_step': self.dump_step}
+        for name, accumulator in self.accumulators.items():
+            if not accumulator.filled.any():
+                continue
+            arrays[name + '.key'] = repr(accumulator.key)
+            arrays[name + '.type'] = type(accumulator).__name__
+            for key, value in accumulator.arrays().items():
+                arrays[name + '.' + key] = value
+
+        insitu_dir = os.path.dirname(self.insitu_file)
+        if not os.path.exists(insitu_dir):
+            os.mkdir(insitu_dir)
+        np.savez(self.insitu_file, **arrays)
+
+    def load_insitu(self):
+        """
+        Read the per-dump quantities computed during the production phase from ``insitu_file``, if it exists.
+        ``dump_step`` and ``no_dumps`` are updated to the computations' cadence.
+
+        """
+        if not os.path.exists(self.insitu_file):
+            return
+
+        with np.load(self.insitu_file) as data:
+            names = [key[:-len('.key')] for key in data.files if key.endswith('.key')]
+            if not names:
+                return
+
+            self.accumulators = {}
+            for name in names:
+                prefix = name + '.'
+                arrays = {key[len(prefix):]: data[key] for key in data.files if key.startswith(prefix)}
+                accumulator_class = ACCUMULATORS[str(arrays.pop('type', 'FrameAccumulator'))]
+                key = literal_eval(str(arrays.pop('key')))
+                self.accumulators[name] = accumulator_class.from_arrays(key, arrays)
+
+            self.dump_step = int(data['dump_step'])
+
+        # Use only the computations before the first missing one, as for the dumps
+        no_dumps = []
+        for accumulator in self.accumulators.values():
+            gaps = np.flatnonzero(accumulator.steps != self.dump_step * np.arange(len(accumulator.steps)))
+            no_dumps.append(gaps[0] if len(gaps) > 0 else len(accumulator.steps))
+        self.no_dumps = int(min(no_dumps))
+
+    def accumulated(self, name, start, stop, key=None):
+        """
+        Values of a per-dump quantity computed by a :class:`FramePipeline` for the dumps of the timesteps
+        ``range(start, stop, dump_step)``.
+
+        Parameters
+        ----------
+        name : str
+            Name of the quantity.
+
+        start : int
+            First timestep.
+
+        stop : int
+            Timestep after the last one.
+
+        key : tuple
+            Key with which the quantity must have been registered. Default = any.
+
+        Returns
+        -------
+        values : dict
+            Arrays of the quantity and ``time``. Shape = (``dumps``, ...). ``None`` if the quantity was not computed
+            for all the dumps, in which case the dumps are read as usual.
+
+        """
+        if not self.accumulators or name not in self.accumulators:
+            return None
+
+        accumulator = self.accumulators[name]
+        if key is not None and accumulator.key != key:
+            return None
+
+        return accumulator.rows(np.arange(start, stop, self.dump_step))
+
+    def acf_channels(self):
+        """
+        Quantities correlated when ``acf_method`` is ``'multiple_tau'``. Defined by the observables computing
+        autocorrelation functions.
+
+        Returns
+        -------
+        fields : list
+            Fields read from the dumps.
+
+        func : callable
+            Function computing the values of the channels from the particles' data of a dump.
+
+        first : numpy.ndarray
+            First channel of each product.
+
+        second : numpy.ndarray
+            Second channel of each product.
+
+        output : numpy.ndarray
+            Correlation function of each product.
+
+        centered : bool
+            Flag for the correlation functions of the fluctuations, see
+            :meth:`MultipleTauCorrelator.fluctuation_result`.
+
+        """
+        raise NotImplementedError("{} has no multiple-tau autocorrelation functions.".format(self.__class__.__name__))
+
+    def acf_columns(self, cf, correlator):
+        """
+        Columns of the dataframe computed from the correlation functions of the multiple-tau correlator.
+
+        Parameters
+        ----------
+        cf : numpy.ndarray
+            Correlation functions. Shape = (``outputs``, ``lags``).
+
+        correlator : sarkas.tools.observables.MultipleTauCorrelator
+            Correlator, for the quantities other than ``cf``.
+
+        Returns
+        -------
+        columns : dict
+            Arrays of the columns.
+
+        """
+        raise NotImplementedError("{} has no multiple-tau autocorrelation functions.".format(self.__class__.__name__))
+
+    def correlator_accumulator(self, steps):
+        """
+        Multiple-tau correlator of the quantities of :meth:`acf_channels`, long enough for the dumps of ``steps``.
 
-            except OSError:
-                self.calc_kt_data(vkt_flag=True)
+        Parameters
+        ----------
+        steps : numpy.ndarray
+            Timesteps of the dumps.
+
+        Returns
+        -------
+        accumulator : sarkas.tools.observables.CorrelatorAccumulator
+            Accumulator of the correlator.
+
+        """
+        fields, func, first, second, output, centered = self.acf_channels()
+        channels = int(max(first.max(), second.max())) + 1
+        levels = max(int(np.ceil(np.log(max(len(steps) / self.mt_points, 1.0)) / np.log(self.mt_averaging))) + 1, 1)
+        correlator = MultipleTauCorrelator(channels, self.mt_points, self.mt_averaging, levels, first, second, output,
+                                           centered)
+
+        return CorrelatorAccumulator(steps, fields, func, correlator)
+
+    def add_correlator(self, pipeline):
+        """
+        Register the multiple-tau correlation of the quantities of :meth:`acf_channels` for all the dumps of the phase.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing or of the production phase.
+
+        """
+        if self.accumulators is None:
+            self.accumulators = {}
+        steps = np.arange(0, self.no_dumps * self.dump_step, self.dump_step)
+
+        # Already computed during the simulation
+        loaded = self.accumulators.get('acf')
+        if isinstance(loaded, CorrelatorAccumulator) and loaded.covers(steps):
+            return
+
+        self.accumulators['acf'] = pipeline.add(self.dump_dir, self.correlator_accumulator(steps))
+
+    def compute_multiple_tau(self):
+        """
+        Compute the autocorrelation functions of the whole phase with a :class:`MultipleTauCorrelator`. The
+        correlator is fed by a :class:`FramePipeline` or during the simulation if the observable registered it, else
+        by reading the dumps here. The dataframe has only the ``Mean`` columns of the correlation functions, on
+        logarithmically spaced times.
+
+        """
+        steps = np.arange(0, self.no_dumps * self.dump_step, self.dump_step)
+        accumulator = self.accumulators.get('acf') if self.accumulators else None
+        if not isinstance(accumulator, CorrelatorAccumulator) or not accumulator.covers(steps):
+            accumulator = self.correlator_accumulator(steps)
+            dumps = DumpReader(self.dump_dir, steps, accumulator.fields)
+            for step, data in tqdm(dumps, disable=not self.verbose, desc='Correlating'):
+                accumulator.add(step, data)
+
+        lags, cf = accumulator.correlator.result()
+        self.dataframe = pd.DataFrame()
+        self.dataframe["Time"] = lags * self.dump_step * self.dt
+        for column, values in self.acf_columns(cf, accumulator.correlator).items():
+            self.dataframe[column] = values
+
+        # Create the columns for the HDF df
+        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
 
     def calc_kt_data(self, nkt_flag=False, vkt_flag=False):
         """Calculate Time dependent Fourier space quantities.
@@ -518,12 +918,17 @@ class Observable:
             tinit = self.timer.current()
             for isl in range(self.no_slices):
                 print("\nCalculating n(k,t) for slice {}/{}.".format(isl + 1, self.no_slices))
-                nkt = calc_nkt(self.dump_dir,
-                               (start_slice, end_slice, self.slice_steps),
-                               self.dump_step,
-                               self.species_num,
-                               self.k_list,
-                               self.verbose)
+                frames = self.accumulated('nkt', start_slice, end_slice, ('nkt', self.k_list.tobytes()))
+                if frames is not None:
+                    nkt = frames['nkt'].transpose(1, 0, 2)
+                else:
+                    nkt = calc_nkt(self.dump_dir,
+                                   (start_slice, end_slice, self.slice_steps),
+                                   self.dump_step,
+                                   self.species_num,
+                                   self.k_list,
+                                   self.box_lengths,
+                                   self.verbose)
                 start_slice += self.slice_steps * self.dump_step
                 end_slice += self.slice_steps * self.dump_step
                 # n(k,t).shape = [no_species, time, k vectors]
@@ -570,12 +975,17 @@ class Observable:
             for isl in range(self.no_slices):
                 print("\nCalculating longitudinal and transverse "
                       "velocity fluctuations v(k,t) for slice {}/{}.".format(isl + 1, self.no_slices))
-                vkt, vkt_i, vkt_j, vkt_k = calc_vkt(self.dump_dir,
-                                                    (start_slice, end_slice, self.slice_steps),
-                                                    self.dump_step,
-                                                    self.species_num,
-                                                    self.k_list,
-                                                    self.verbose)
+                frames = self.accumulated('vkt', start_slice, end_slice, ('vkt', self.k_list.tobytes()))
+                if frames is not None:
+                    vkt, vkt_i, vkt_j, vkt_k = frames['vkt'].transpose(1, 2, 0, 3)
+                else:
+                    vkt, vkt_i, vkt_j, vkt_k = calc_vkt(self.dump_dir,
+                                                        (start_slice, end_slice, self.slice_steps),
+                                                        self.dump_step,
+                                                        self.species_num,
+                                                        self.k_list,
+                                                        self.box_lengths,
+                                                        self.verbose)
                 start_slice += self.slice_steps * self.dump_step
                 end_slice += self.slice_steps * self.dump_step
 
@@ -749,835 +1159,779 @@ class Observable:
         print(print_message)
 
 
-class CurrentCorrelationFunction(Observable):
+class FrameAccumulator:
     """
-    Current Correlation Functions: :math:`L(k,\\omega)` and :math:`T(k,\\omega)`.
+    Per-dump quantity computed by a :class:`FramePipeline`.
+
+    Parameters
+    ----------
+    steps : numpy.ndarray
+        Timesteps of the dumps.
+
+    fields : list
+        Fields read from the dumps.
+
+    func : callable
+        Function computing a dictionary of arrays from the particles' data of a dump.
+
+    key : tuple
+        Key with which the quantity was registered.
 
     Attributes
     ----------
-    k_list : list
-        List of all possible :math:`k` vectors with their corresponding magnitudes and indexes.
+    index : dict
+        Row of each timestep.
 
-    k_counts : numpy.ndarray
-        Number of occurrences of each :math:`k` magnitude.
+    values : dict
+        Arrays of the quantity. Shape = (``dumps``, ...). Allocated at the first dump.
 
-    ka_values : numpy.ndarray
-        Magnitude of each allowed :math:`ka` vector.
+    time : numpy.ndarray
+        Time of each dump.
 
-    no_ka_values: int
-        Length of ``ka_values`` array.
+    filled : numpy.ndarray
+        Whether the quantity of each dump has been computed.
 
     """
 
-    def setup(self, params, phase: str = None, **kwargs):
+    def __init__(self, steps, fields, func, key=None):
+        self.fields = list(fields)
+        self.func = func
+        self.key = key
+        self.steps = np.zeros(0, dtype=np.int64)
+        self.extend(steps)
+
+    def extend(self, steps):
         """
-        Assign attributes from simulation's parameters.
+        Add timesteps. Only before the dumps are read.
 
         Parameters
         ----------
-        params : sarkas.core.Parameters
-            Simulation's parameters.
-
-        phase : str, optional
-            Phase to compute. Default = 'production'.
-
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        steps : numpy.ndarray
+            Timesteps of the dumps.
 
         """
+        self.steps = np.union1d(self.steps, np.asarray(steps, dtype=np.int64))
+        self.index = {step: row for row, step in enumerate(self.steps)}
+        self.values = None
+        self.time = np.zeros(len(self.steps))
+        self.filled = np.zeros(len(self.steps), dtype=bool)
 
-        self.k_observable = True
-
-        if phase:
-            self.phase = phase.lower()
+    def add(self, step, data):
+        """
+        Compute the quantity of a dump. Dumps of other timesteps are skipped.
 
-        super().setup_init(params, self.phase)
+        Parameters
+        ----------
+        step : int
+            Timestep of the dump.
 
-        self.__name__ = 'ccf'
-        self.__long_name__ = 'Current Correlation Function'
+        data : dict
+            Particles' data.
 
-        saving_dir = os.path.join(self.postprocessing_dir, 'CurrentCorrelationFunction')
-        if not os.path.exists(saving_dir):
-            os.mkdir(saving_dir)
+        """
+        if step in self.index:
+            self.store(step, self.func(data), data['time'])
 
-        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
+    def store(self, step, values, time):
+        """
+        Copy the quantity of a dump.
 
-        # These calculation are needed for the io.postprocess_info().
-        # This is a hack and we need to find a faster way to do it
-        dt_r = self.dt * self.dump_step
+        Parameters
+        ----------
+        step : int
+            Timestep of the dump.
 
-        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+        values : dict
+            Arrays of the quantity.
 
-        self.w_min = 2.0 * np.pi / (self.slice_steps * dt_r)
-        self.w_max = np.pi / dt_r  # Half because np.fft calculates negative and positive frequencies
+        time : float
+            Time of the dump.
 
-        self.parse_k_data()
+        """
+        row = self.index[step]
+        if self.values is None:
+            self.values = {key: np.zeros((len(self.steps), *np.shape(value)), dtype=np.result_type(value))
+                           for key, value in values.items()}
+        for key, value in values.items():
+            self.values[key][row] = value
+        self.time[row] = time
+        self.filled[row] = True
+
+    def covers(self, steps):
+        """
+        Whether the quantity has been computed for a list of timesteps.
 
-        # self.filename_csv_longitudinal = os.path.join(self.saving_dir,
-        #                                               "Longitudinal_CurrentCorrelationFunction_" + self.job_id + '.csv')
-        # self.filename_csv_transverse = os.path.join(self.saving_dir,
-        #                                             "Transverse_CurrentCorrelationFunction_" + self.job_id + '.csv')
+        Parameters
+        ----------
+        steps : numpy.ndarray
+            Timesteps.
 
-        self.filename_hdf = os.path.join(
-            self.saving_dir,
-            "CurrentCorrelationFunction_" + self.job_id + '.h5')
+        Returns
+        -------
+        : bool
+            True if all the timesteps have been computed.
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+        """
+        return self.values is not None and all(step in self.index and self.filled[self.index[step]] for step in steps)
 
-    def compute(self, **kwargs):
+    def rows(self, steps):
         """
-        Calculate the microscopic current fluctuations correlation functions.
+        Values of a list of timesteps.
 
         Parameters
         ----------
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        steps : numpy.ndarray
+            Timesteps.
+
+        Returns
+        -------
+        values : dict
+            Arrays of the quantity and ``time``. ``None`` if some timesteps were not computed.
 
         """
+        if not self.covers(steps):
+            return None
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
-        # Parse vkt otherwise calculate them
-        self.parse_k_data()  # repeat from setup in case parameters have been updated
-        self.parse_kt_data(nkt_flag=False, vkt_flag=True)
-        # Initialize dataframes and add frequencies to it.
-        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
+        rows = [self.index[step] for step in steps]
+        values = {key: value[rows] for key, value in self.values.items()}
+        values['time'] = self.time[rows]
 
-        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
-        self.frequencies = np.fft.fftshift(self.frequencies)
+        return values
 
-        # self.dataframe_longitudinal["Frequencies"] = np.fft.fftshift(self.frequencies)
-        # self.dataframe_transverse["Frequencies"] = np.fft.fftshift(self.frequencies)
+    def arrays(self):
+        """
+        Arrays saved in an in-situ file, see :meth:`Observable.save_insitu`.
 
-        # temp_dataframe_longitudinal = pd.DataFrame()
-        temp_dataframe = pd.DataFrame()
-        tinit = self.timer.current()
+        Returns
+        -------
+        arrays : dict
+            Timesteps, times and values of the computed dumps.
 
-        vkt_df = pd.read_hdf(self.vkt_hdf_file, mode='r', key='vkt')
-        # Containers
-        vkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
-        vkt_i = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
-        vkt_j = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
-        vkt_k = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+        """
+        rows = self.filled
+        arrays = {'steps': self.steps[rows], 'time': self.time[rows]}
+        for key, value in self.values.items():
+            arrays['values.' + key] = value[rows]
 
-        for isl in range(self.no_slices):
+        return arrays
 
-            # Put data in the container to pass
-            for sp, sp_name in enumerate(self.species_names):
-                vkt[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Longitudinal"][sp_name])
-                vkt_i[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse i"][sp_name])
-                vkt_j[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse j"][sp_name])
-                vkt_k[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse k"][sp_name])
+    @classmethod
+    def from_arrays(cls, key, arrays):
+        """
+        Accumulator read from an in-situ file.
 
-            # Calculate Lkw and Tkw
-            Lkw = calc_Skw(vkt, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
-            Tkw_i = calc_Skw(vkt_i, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
-            Tkw_j = calc_Skw(vkt_j, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
-            Tkw_k = calc_Skw(vkt_k, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
+        Parameters
+        ----------
+        key : tuple
+            Key with which the quantity was registered.
 
-            Tkw = (Tkw_i + Tkw_j + Tkw_k) / 3.0
+        arrays : dict
+            Arrays returned by :meth:`arrays`.
 
-            # Lkw_tot += Lkw / self.no_slices
-            # Tkw_tot += Tkw / self.no_slices
-            # Create the dataframe's column names
-            slc_column = 'slice {}'.format(isl + 1)
-            ka_columns = ["ka = {:.6f}".format(ka) for ik, ka in enumerate(self.ka_values)]
+        Returns
+        -------
+        accumulator : sarkas.tools.observables.FrameAccumulator
+            Accumulator with all the saved dumps computed.
 
-            # Save the full Skw into a Dataframe
-            sp_indx = 0
-            for i, sp1 in enumerate(self.species_names):
-                for j, sp2 in enumerate(self.species_names[i:]):
-                    columns = [
-                        "Longitudinal_{}-{}_".format(sp1, sp2) + slc_column +
-                        "_{}_k = [{}, {}, {}]".format(
-                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
-                        # Final string : Longitudinal_H-He_slice 1_ka = 0.123456_k = [0, 0, 1]
-                        for ik in range(len(self.k_harmonics))]
-                    temp_dataframe = pd.concat(
-                        [temp_dataframe, pd.DataFrame(Lkw[sp_indx, :, :].T, columns=columns)],
-                        axis=1)
+        """
+        accumulator = cls(arrays['steps'], [], None, key)
+        accumulator.values = {name[len('values.'):]: value for name, value in arrays.items()
+                              if name.startswith('values.')}
+        accumulator.time = arrays['time']
+        accumulator.filled[:] = True
 
-                    columns = [
-                        "Transverse_{}-{}_".format(sp1, sp2) + slc_column +
-                        "_{}_k = [{}, {}, {}]".format(
-                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
-                        # Final string : Transverse_H-He_slice 1_ka = 0.123456_k = [0, 0, 1]
-                        for ik in range(len(self.k_harmonics))]
-                    temp_dataframe = pd.concat(
-                        [temp_dataframe, pd.DataFrame(Tkw[sp_indx, :, :].T, columns=columns)],
-                        axis=1)
+        return accumulator
 
-                    sp_indx += 1
+    def resume(self, previous, it_start):
+        """
+        Copy the dumps computed in a previous run up to the restart step.
 
-        # Create the MultiIndex
-        tuples = [tuple(c.split("_")) for c in temp_dataframe.columns]
-        temp_dataframe.columns = pd.MultiIndex.from_tuples(tuples,
-                                                           names=['direction', 'species', 'slices', 'ka_value',
-                                                                  'k_harmonics'])
+        Parameters
+        ----------
+        previous : sarkas.tools.observables.FrameAccumulator
+            Accumulator of the previous run.
 
-        if os.path.exists(self.filename_hdf[:-3] + '_Full.h5'):
-            os.remove(self.filename_hdf[:-3] + '_Full.h5')
+        it_start : int
+            Restart step.
 
-        temp_dataframe.to_hdf(self.filename_hdf[:-3] + '_Full.h5', mode='w', key=self.__name__)
+        """
+        for step in previous.steps[previous.steps <= it_start]:
+            if step in self.index:
+                row = previous.index[step]
+                self.store(step, {key: value[row] for key, value in previous.values.items()}, previous.time[row])
 
-        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
-        self.dataframe = pd.DataFrame()
-        self.dataframe[' _ _ _ _Frequencies'] = self.frequencies
-        # Take the mean and std and store them into the dataframe to return
-        for sp1, sp1_name in enumerate(self.species_names):
-            for sp2, sp2_name in enumerate(self.species_names[sp1:], sp1):
-                comp_name = '{}-{}'.format(sp1_name, sp2_name)
-                ### LONGITUDINAL
-                # Rename the columns with values of ka
-                ka_columns = ['Longitudinal_' + comp_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka)
-                              for ik, ka in enumerate(self.ka_values)]
 
-                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
-                df_mean = temp_dataframe['Longitudinal'][comp_name].mean(level=1, axis='columns')
-                df_mean = df_mean.rename(col_mapper(df_mean.columns, ka_columns), axis=1)
-                # Std
-                ka_columns = ['Longitudinal_' + comp_name + "_Std_ka{} = {:.4f}".format(ik + 1,ka)
-                              for ik, ka in enumerate(self.ka_values)]
-                df_std = temp_dataframe['Longitudinal'][comp_name].std(level=1, axis='columns')
-                df_std = df_std.rename(col_mapper(df_std.columns, ka_columns), axis=1)
+class MultipleTauCorrelator:
+    """
+    Order-n multiple-tau correlator. The correlation functions are updated at each new value of the correlated
+    quantities, keeping only ``points`` past values at each of ``levels`` levels. The values of a level are the
+    averages of ``averaging`` consecutive values of the previous level. Hence the memory is proportional to the
+    logarithm of the length of the run and the lags are spaced logarithmically.
 
-                self.dataframe = pd.concat([self.dataframe, df_mean, df_std], axis=1)
+    At the lags smaller than ``points`` the result is the same as that of :func:`correlationfunction`. At longer lags
+    the values are averaged over blocks of ``averaging**level`` steps.
 
-                ### Transverse
-                # Rename the columns with values of ka
-                ka_columns = ['Transverse_' + comp_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka)
-                              for ik, ka in enumerate(self.ka_values)]
+    Parameters
+    ----------
+    channels : int
+        Number of correlated quantities.
 
-                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
-                tdf_mean = temp_dataframe['Transverse'][comp_name].mean(level=1, axis='columns')
-                tdf_mean = tdf_mean.rename(col_mapper(tdf_mean.columns, ka_columns), axis=1)
-                # Std
-                ka_columns = ['Transverse_' + comp_name + "_Std_ka{} = {:.4f}".format(ik + 1, ka)
-                              for ik, ka in enumerate(self.ka_values)]
-                tdf_std = temp_dataframe['Transverse'][comp_name].std(level=1, axis='columns')
-                tdf_std = tdf_std.rename(col_mapper(tdf_std.columns, ka_columns), axis=1)
+    points : int
+        Number of lags of each level. Multiple of ``averaging``. Default = 16.
 
-                self.dataframe = pd.concat([self.dataframe, tdf_mean, tdf_std], axis=1)
+    averaging : int
+        Number of values of a level averaged into one value of the next level. Default = 2.
 
-        # Create the MultiIndex columns:
-        # Longitudinal_H-He_Mean_Frequencies | ka = 0.123456
-        # Longitudinal_H-He_Std_ka = 0.123456
+    levels : int
+        Number of levels. The longest lag is ``(points - 1) * averaging**(levels - 1)``. Default = 16.
 
-        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
-        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
+    first : numpy.ndarray
+        First channel of each product. Default = all the channels.
 
-        tend = self.timer.current()
-        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
+    second : numpy.ndarray
+        Second channel of each product, taken ``lag`` steps before the first one. Default = ``first``, i.e. the
+        autocorrelation of each channel.
 
-        # HDF will get huge if we don't remove
-        if os.path.exists(self.filename_hdf):
-            os.remove(self.filename_hdf)
+    output : numpy.ndarray
+        Correlation function to which each product is added. Products with the same output are summed, e.g. over the
+        particles of a species. Default = one correlation function per product.
 
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+    centered : bool
+        Flag for keeping the sums of the values of each lag, needed by :meth:`fluctuation_result`. Default = False.
 
-    def pretty_print(self):
-        """Print current correlation function calculation parameters for help in choice of simulation parameters."""
-        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
-        print('k wavevector information saved in: \n', self.k_file)
-        print('v(k,t) data saved in: \n', self.vkt_hdf_file)
-        print('Data saved in: \n{}'.format(self.filename_hdf))
-        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.frequencies,'
-              ' \n\t self.dataframe')
-        print('\nFrequency Space Parameters:')
-        print('\tNo. of slices = {}'.format(self.no_slices))
-        print('\tNo. dumps per slice = {}'.format(self.slice_steps))
-        print('\tFrequency step dw = 2 pi (no_slices * prod_dump_step)/(production_steps * dt)')
-        print('\tdw = {:1.4f} w_p = {:1.4e} [Hz]'.format(
-            self.w_min / self.total_plasma_frequency, self.w_min))
-        print('\tMaximum Frequency w_max = 2 pi /(prod_dump_step * dt)')
-        print('\tw_max = {:1.4f} w_p = {:1.4e} [Hz]'.format(
-            self.w_max / self.total_plasma_frequency, self.w_max))
+    Attributes
+    ----------
+    shift : numpy.ndarray
+        Past values of each level. Shape = (``levels``, ``points``, ``channels``).
 
-        print('\n\nWavevector parameters:')
-        print('Smallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
-        print('k_min = {:.4f} / a_ws = {:.4e} '.format(self.ka_values[0], self.ka_values[0] / self.a_ws), end='')
-        print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    correlation : numpy.ndarray
+        Sum of the products of each lag. Shape = (``levels``, ``points``, ``outputs``).
 
-        print('\nAngle averaging choice: {}'.format(self.angle_averaging))
-        if self.angle_averaging == 'full':
-            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
-            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
-                                                              self.max_aa_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
-        elif self.angle_averaging == 'custom':
-            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
-            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
-            print('\tAA k_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
-                                                                 self.max_aa_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    counts : numpy.ndarray
+        Number of products of each lag. Shape = (``levels``, ``points``).
 
-            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
-            print('\tLargest wavector k_max = k_min * n_x')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
-                                                              self.max_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
-        elif self.angle_averaging == 'principal_axis':
-            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
-            print('\tLargest wavector k_max = k_min * n_x')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
-                                                              self.max_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    first_sum : numpy.ndarray
+        Sum of the later values of each channel of each lag. Shape = (``levels``, ``points``, ``channels``) if
+        ``centered`` else (``levels``, ``points``, 0).
 
-        print('\nTotal number of k values to calculate = {}'.format(len(self.k_list)))
-        print('No. of unique ka values to calculate = {}'.format(len(self.ka_values)))
+    second_sum : numpy.ndarray
+        Sum of the earlier values of each channel of each lag. Same shape as ``first_sum``.
 
+    total : numpy.ndarray
+        Sum of the values of each channel.
 
-class DynamicStructureFactor(Observable):
-    """Dynamic Structure factor."""
+    samples : int
+        Number of values of each channel.
 
-    def setup(self, params, phase: str = None, **kwargs):
+    state_arrays : list
+        Names of the arrays saved by :meth:`state` and restored by :meth:`from_state`.
+
+    """
+
+    state_arrays = ['shift', 'correlation', 'counts', 'first_sum', 'second_sum', 'accumulator', 'accumulated', 'insert',
+                    'filled', 'total']
+
+    def __init__(self, channels, points=16, averaging=2, levels=16, first=None, second=None, output=None,
+                 centered=False):
+        assert points % averaging == 0, "The number of points of each level must be a multiple of the averaging."
+        self.points = points
+        self.averaging = averaging
+        self.levels = levels
+        self.first = np.arange(channels) if first is None else np.asarray(first, dtype=np.int64)
+        self.second = np.copy(self.first) if second is None else np.asarray(second, dtype=np.int64)
+        self.output = np.arange(len(self.first)) if output is None else np.asarray(output, dtype=np.int64)
+
+        self.shift = np.zeros((levels, points, channels))
+        self.correlation = np.zeros((levels, points, self.output.max() + 1))
+        self.counts = np.zeros((levels, points), dtype=np.int64)
+        self.first_sum = np.zeros((levels, points, channels if centered else 0))
+        self.second_sum = np.zeros_like(self.first_sum)
+        self.accumulator = np.zeros((levels, channels))
+        self.accumulated = np.zeros(levels, dtype=np.int64)
+        self.insert = np.zeros(levels, dtype=np.int64)
+        self.filled = np.zeros(levels, dtype=np.int64)
+        self.total = np.zeros(channels)
+        self.samples = 0
+
+    def update(self, values):
         """
-        Assign attributes from simulation's parameters.
+        Add the values of the next step.
 
         Parameters
         ----------
-        params : sarkas.core.Parameters
-            Simulation's parameters.
+        values : numpy.ndarray
+            Value of each channel.
 
-        phase : str, optional
-            Phase to compute. Default = 'production'.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+        multiple_tau_update(values, self.shift, self.correlation, self.counts, self.first_sum, self.second_sum,
+                            self.accumulator, self.accumulated, self.insert, self.filled, self.averaging, self.first,
+                            self.second, self.output)
+        self.total += values
+        self.samples += 1
+
+    def extend(self, series):
+        """
+        Add the values of consecutive steps.
 
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        Parameters
+        ----------
+        series : numpy.ndarray
+            Values of each channel. Shape = (``channels``, ``steps``).
 
         """
+        series = np.ascontiguousarray(np.transpose(series), dtype=np.float64)
+        multiple_tau_series(series, self.shift, self.correlation, self.counts, self.first_sum, self.second_sum,
+                            self.accumulator, self.accumulated, self.insert, self.filled, self.averaging, self.first,
+                            self.second, self.output)
+        self.total += series.sum(axis=0)
+        self.samples += series.shape[0]
+
+    def lags(self):
+        """
+        Lags of the correlation functions.
 
-        self.k_observable = True
+        Returns
+        -------
+        lags : numpy.ndarray
+            Lags in steps of the correlated values.
 
-        if phase:
-            self.phase = phase.lower()
+        rows : tuple
+            Level and point of each lag.
 
-        super().setup_init(params, self.phase)
+        """
+        levels, points = np.nonzero(self.counts)
+        # The first lags of a level are computed more accurately by the previous level
+        keep = (levels == 0) | (points >= self.points // self.averaging)
+        levels, points = levels[keep], points[keep]
 
-        self.__name__ = 'dsf'
-        self.__long_name__ = 'Dynamic Structure Factor'
+        return points * self.averaging ** levels, (levels, points)
 
-        # Create the directory where to store the computed data
-        saving_dir = os.path.join(self.postprocessing_dir, 'DynamicStructureFactor')
-        if not os.path.exists(saving_dir):
-            os.mkdir(saving_dir)
+    def result(self):
+        """
+        Correlation functions normalized by the number of products of each lag, as in :func:`correlationfunction`.
 
-        # Create the phase directory
-        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
+        Returns
+        -------
+        lags : numpy.ndarray
+            Lags in steps of the correlated values.
 
-        # These calculation are needed for the io.postprocess_info().
-        # This is a hack and we need to find a faster way to do it
-        dt_r = self.dt * self.dump_step
+        cf : numpy.ndarray
+            Correlation functions. Shape = (``outputs``, ``lags``).
 
-        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+        """
+        lags, rows = self.lags()
+        cf = self.correlation[rows] / self.counts[rows][:, np.newaxis]
 
-        self.w_min = 2.0 * np.pi / (self.slice_steps * self.dt * self.dump_step)
-        self.w_max = np.pi / dt_r  # Half because np.fft calculates negative and positive frequencies
+        return lags, cf.transpose()
 
-        self.parse_k_data()
+    def fluctuation_result(self):
+        """
+        Correlation functions of the fluctuations of the channels about their means over the whole run, as
+        :func:`correlationfunction` of ``A - A.mean()`` and ``B - B.mean()``. Requires ``centered``.
 
-        self.filename_csv = os.path.join(self.saving_dir, "DynamicStructureFactor_" + self.job_id + '.csv')
-        self.filename_hdf = os.path.join(self.saving_dir, "DynamicStructureFactor_" + self.job_id + '.h5')
+        Returns
+        -------
+        lags : numpy.ndarray
+            Lags in steps of the correlated values.
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+        cf : numpy.ndarray
+            Correlation functions. Shape = (``outputs``, ``lags``).
 
-    def compute(self, **kwargs):
         """
-        Compute :math:`S_{ij} (k,\\omega)` and the array of :math:`\\omega` values.
-        Shape = (``no_ws``, ``no_Sij``)
+        assert self.first_sum.shape[2] > 0, "The correlator does not keep the sums of the values of each lag."
+        lags, rows = self.lags()
+        mean = self.mean()
+        counts = self.counts[rows][:, np.newaxis]
+        # sum (a - ma)(b - mb) = sum ab - mb sum a - ma sum b + n ma mb
+        products = mean[self.second] * self.first_sum[rows][:, self.first] \
+            + mean[self.first] * self.second_sum[rows][:, self.second] \
+            - counts * mean[self.first] * mean[self.second]
+        cf = np.copy(self.correlation[rows])
+        np.subtract.at(cf.T, self.output, products.T)
+
+        return lags, (cf / counts).transpose()
+
+    def mean(self):
+        """
+        Mean of each channel.
 
-        Parameters
-        ----------
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        Returns
+        -------
+        mean : numpy.ndarray
+            Mean value of each channel.
 
         """
+        return self.total / max(self.samples, 1)
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+    def state(self):
+        """
+        Arrays defining the correlator.
 
-        # Parse nkt otherwise calculate it
-        self.parse_k_data()  # repeat from setup in case parameters have been updated
-        self.parse_kt_data(nkt_flag=True)
+        Returns
+        -------
+        state : dict
+            Parameters and accumulated sums.
 
-        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
-        self.frequencies = np.fft.fftshift(self.frequencies)
+        """
+        state = {'points': self.points, 'averaging': self.averaging, 'levels': self.levels, 'first': self.first,
+                 'second': self.second, 'output': self.output, 'samples': self.samples}
+        for key in self.state_arrays:
+            state[key] = getattr(self, key)
 
-        # Save the raw Skw data into a temporary dataframe.
-        # The final Skw will be calculated using mean and std on this dataframe
-        temp_dataframe = pd.DataFrame()
-        tinit = self.timer.current()
-        nkt_df = pd.read_hdf(self.nkt_hdf_file, mode='r', key='nkt')
-        for isl in range(0, self.no_slices):
-            # Initialize container
-            nkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
-            for sp, sp_name in enumerate(self.species_names):
-                nkt[sp] = np.array(nkt_df["slice {}".format(isl + 1)][sp_name])
+        return state
 
-            # Calculate Skw
-            Skw_all = calc_Skw(nkt, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
+    @classmethod
+    def from_state(cls, state):
+        """
+        Correlator defined by the arrays returned by :meth:`state`.
 
-            # Create the dataframe's column names
-            slc_column = 'slice {}'.format(isl + 1)
-            ka_columns = ["ka = {:.8f}".format(ka) for ik, ka in enumerate(self.ka_values)]
-            # Save the full Skw into a Dataframe
-            sp_indx = 0
-            for i, sp1 in enumerate(self.species_names):
-                for j, sp2 in enumerate(self.species_names[i:]):
-                    columns = [
-                        "{}-{}_".format(sp1, sp2) + slc_column +
-                        "_{}_k = [{}, {}, {}]".format(
-                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
-                        for ik in range(len(self.k_harmonics))]
-                    temp_dataframe = pd.concat(
-                        [temp_dataframe, pd.DataFrame(Skw_all[sp_indx, :, :].T, columns=columns)],
-                        axis=1)
-                    sp_indx += 1
-
-        # Create the MultiIndex
-        tuples = [tuple(c.split("_")) for c in temp_dataframe.columns]
-        temp_dataframe.columns = pd.MultiIndex.from_tuples(tuples,
-                                                           names=['species', 'slices', 'k_index', 'k_harmonics'])
-
-        if os.path.exists(self.filename_hdf[:-3] + '_Full.h5'):
-            os.remove(self.filename_hdf[:-3] + '_Full.h5')
-        temp_dataframe.to_hdf(self.filename_hdf[:-3] + '_Full.h5', mode='w', key=self.__name__)
+        Parameters
+        ----------
+        state : dict
+            Parameters and accumulated sums.
 
-        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
-        self.dataframe = pd.DataFrame()
-        self.dataframe[" _ _Frequencies"] = self.frequencies
+        Returns
+        -------
+        correlator : sarkas.tools.observables.MultipleTauCorrelator
+            Correlator.
 
-        # Take the mean and std and store them into the dataframe to return
-        for sp1, sp1_name in enumerate(self.species_names):
-            for sp2, sp2_name in enumerate(self.species_names[sp1:], sp1):
-                skw_name = '{}-{}'.format(sp1_name, sp2_name)
-                # Rename the columns with values of ka
-                ka_columns = [skw_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka) for ik, ka in enumerate(self.ka_values)]
-                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
-                df_mean = temp_dataframe[skw_name].mean(level=1, axis='columns')
-                df_mean = df_mean.rename(col_mapper(df_mean.columns, ka_columns), axis=1)
-                # Std
-                ka_columns = [skw_name + "_Std_ka{} = {:.4f}".format(ik + 1, ka) for ik, ka in enumerate(self.ka_values)]
-                df_std = temp_dataframe[skw_name].std(level=1, axis='columns')
-                df_std = df_std.rename(col_mapper(df_std.columns, ka_columns), axis=1)
+        """
+        correlator = cls(state['shift'].shape[2], int(state['points']), int(state['averaging']),
+                         int(state['levels']), state['first'], state['second'], state['output'],
+                         state['first_sum'].shape[2] > 0)
+        for key in cls.state_arrays:
+            getattr(correlator, key)[...] = state[key]
+        correlator.samples = int(state['samples'])
 
-                self.dataframe = pd.concat([self.dataframe, df_mean, df_std], axis=1)
+        return correlator
 
-        # Create the MultiIndex columns
-        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
-        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
 
-        tend = self.timer.current()
-        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
+class CorrelatorAccumulator(FrameAccumulator):
+    """
+    Correlation functions of a per-dump quantity computed by a :class:`MultipleTauCorrelator`. The values of the
+    dumps are not stored, hence the dumps must be added in order.
 
-        # HDF will get huge if we don't remove
-        if os.path.exists(self.filename_hdf):
-            os.remove(self.filename_hdf)
+    Parameters
+    ----------
+    steps : numpy.ndarray
+        Timesteps of the dumps.
 
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+    fields : list
+        Fields read from the dumps.
 
-    def pretty_print(self):
-        """Print dynamic structure factor calculation parameters for help in choice of simulation parameters."""
+    func : callable
+        Function computing the values of the correlated channels from the particles' data of a dump.
 
-        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
-        print('k wavevector information saved in: \n', self.k_file)
-        print('n(k,t) data saved in: \n', self.nkt_hdf_file)
-        print('Data saved in: \n', self.filename_hdf)
-        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.frequencies, self.dataframe')
+    correlator : sarkas.tools.observables.MultipleTauCorrelator
+        Correlator.
 
-        print('\nFrequency Space Parameters:')
-        print('\tNo. of slices = {}'.format(self.no_slices))
-        print('\tNo. dumps per slice = {}'.format(self.slice_steps))
-        print('\tFrequency step dw = 2 pi (no_slices * prod_dump_step)/(production_steps * dt)')
-        print('\tdw = {:1.4f} w_p = {:1.4e} [Hz]'.format(
-            self.w_min / self.total_plasma_frequency, self.w_min))
-        print('\tMaximum Frequency w_max = 2 pi /(prod_dump_step * dt)')
-        print('\tw_max = {:1.4f} w_p = {:1.4e} [Hz]'.format(
-            self.w_max / self.total_plasma_frequency, self.w_max))
+    key : tuple
+        Key with which the quantity was registered.
 
-        print('\n\nWavevector parameters:')
-        print('Smallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
-        print('k_min = {:.4f} / a_ws = {:.4e} '.format(self.ka_values[0], self.ka_values[0] / self.a_ws), end='')
-        print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    """
 
-        print('\nAngle averaging choice: {}'.format(self.angle_averaging))
-        if self.angle_averaging == 'full':
-            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
-            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
-                                                              self.max_aa_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
-        elif self.angle_averaging == 'custom':
-            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
-            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
-            print('\tAA k_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
-                                                                 self.max_aa_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    def __init__(self, steps, fields, func, correlator, key=None):
+        super().__init__(steps, fields, func, key)
+        self.correlator = correlator
+        self.last_row = -1
 
-            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
-            print('\tLargest wavector k_max = k_min * n_x')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
-                                                              self.max_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
-        elif self.angle_averaging == 'principal_axis':
-            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
-            print('\tLargest wavector k_max = k_min * n_x')
-            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
-                                                              self.max_ka_value / self.a_ws), end='')
-            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+    def store(self, step, values, time):
+        """
+        Add the values of a dump to the correlator.
 
-        print('\nTotal number of k values to calculate = {}'.format(len(self.k_list)))
-        print('No. of unique ka values to calculate = {}'.format(len(self.ka_values)))
+        Parameters
+        ----------
+        step : int
+            Timestep of the dump.
 
+        values : numpy.ndarray
+            Values of the correlated channels.
 
-class ElectricCurrent(Observable):
-    """Electric Current Auto-correlation function."""
+        time : float
+            Time of the dump.
 
-    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
         """
-        Initialize the attributes from simulation's parameters.
+        row = self.index[step]
+        assert row > self.last_row, "The dumps must be correlated in order."
+        self.correlator.update(values)
+        self.time[row] = time
+        self.filled[row] = True
+        self.last_row = row
+
+    def covers(self, steps):
+        """
+        Whether all the dumps of a list of timesteps have been correlated.
 
         Parameters
         ----------
-        params : sarkas.core.Parameters
-            Simulation's parameters.
+        steps : numpy.ndarray
+            Timesteps.
 
-        phase : str, optional
-            Phase to compute. Default = 'production'.
+        Returns
+        -------
+        : bool
+            True if all the timesteps have been correlated.
 
-        no_slices : int
-            Number of independent runs inside a long simulation. Default = 1.
+        """
+        return all(step in self.index and self.filled[self.index[step]] for step in steps)
 
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+    def rows(self, steps):
+        """The values of the dumps are not stored."""
+        return None
 
+    def arrays(self):
         """
-        if phase:
-            self.phase = phase.lower()
+        Arrays saved in an in-situ file, see :meth:`Observable.save_insitu`.
 
-        if no_slices:
-            self.no_slices = no_slices
+        Returns
+        -------
+        arrays : dict
+            Timesteps and times of the correlated dumps and state of the correlator.
 
-        super().setup_init(params, self.phase)
+        """
+        rows = self.filled
+        arrays = {'steps': self.steps[rows], 'time': self.time[rows]}
+        for key, value in self.correlator.state().items():
+            arrays['correlator.' + key] = value
 
-        self.__name__ = 'ec'
-        self.__long_name__ = 'Electric Current'
+        return arrays
 
-        # Create the directory where to store the computed data
-        saving_dir = os.path.join(self.postprocessing_dir, 'ElectricCurrent')
-        if not os.path.exists(saving_dir):
-            os.mkdir(saving_dir)
+    @classmethod
+    def from_arrays(cls, key, arrays):
+        """
+        Accumulator read from an in-situ file.
 
-        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
+        Parameters
+        ----------
+        key : tuple
+            Key with which the quantity was registered.
 
-        self.filename_hdf = os.path.join(self.saving_dir, "ElectricCurrent_" + self.job_id + '.h5')
+        arrays : dict
+            Arrays returned by :meth:`arrays`.
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+        Returns
+        -------
+        accumulator : sarkas.tools.observables.CorrelatorAccumulator
+            Accumulator with all the saved dumps correlated.
 
-    def compute(self, **kwargs):
         """
-        Compute the electric current and the corresponding auto-correlation functions.
+        state = {name[len('correlator.'):]: value for name, value in arrays.items() if name.startswith('correlator.')}
+        accumulator = cls(arrays['steps'], [], None, MultipleTauCorrelator.from_state(state), key)
+        accumulator.time = arrays['time']
+        accumulator.filled[:] = True
+        accumulator.last_row = len(accumulator.steps) - 1
+
+        return accumulator
+
+    def resume(self, previous, it_start):
+        """
+        Continue the correlation of a previous run. Possible only if the previous run correlated the dumps up to the
+        restart step and no further, since the correlator cannot be rewound.
 
         Parameters
         ----------
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        previous : sarkas.tools.observables.CorrelatorAccumulator
+            Accumulator of the previous run.
+
+        it_start : int
+            Restart step.
 
         """
+        steps = previous.steps[previous.filled]
+        if len(steps) == 0 or steps[-1] != it_start:
+            print("\nWARNING: the correlation functions cannot be continued from step {}. "
+                  "They will be computed from the restart step.".format(it_start))
+            return
 
-        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
-        self.__dict__.update(kwargs.copy())
+        for step in steps:
+            if step in self.index:
+                row = self.index[step]
+                self.time[row] = previous.time[previous.index[step]]
+                self.filled[row] = True
+                self.last_row = row
+        self.correlator = previous.correlator
 
-        # Recalculate the slicing parameters if no_slices has been passed
-        self.slice_steps = int(self.no_dumps / self.no_slices)
 
-        start_slice = 0
-        end_slice = self.slice_steps * self.dump_step
-        time = np.zeros(self.slice_steps)
-        # Initialize timer
-        t0 = self.timer.current()
+# Classes of the accumulators saved in the in-situ files
+ACCUMULATORS = {'FrameAccumulator': FrameAccumulator, 'CorrelatorAccumulator': CorrelatorAccumulator}
 
-        ec_str = "Electric Current"
-        ec_acf_str = "Electric Current ACF"
 
-        for isl in range(self.no_slices):
-            print("\nCalculating electric current and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
-            # Parse the particles from the dump files
-            vel = np.zeros((self.dimensions, self.slice_steps, self.total_num_ptcls))
-            #
-            # print("\nParsing particles' velocities.")
-            for it, dump in enumerate(tqdm(range(start_slice, end_slice, self.dump_step),
-                                           desc='Read in data',
-                                           disable=not self.verbose)):
-                datap = load_from_restart(self.dump_dir, dump)
-                time[it] = datap["time"]
-                vel[0, it, :] = datap["vel"][:, 0]
-                vel[1, it, :] = datap["vel"][:, 1]
-                vel[2, it, :] = datap["vel"][:, 2]
-            #
-            if isl == 0:
-                self.dataframe["Time"] = time
+class FramePipeline:
+    """
+    Single pass over the dumps feeding the per-dump quantities registered by several observables. Each dump directory
+    is read once, with the union of the fields and timesteps needed. See :meth:`Observable.register`.
 
-            species_current, total_current = calc_elec_current(vel, self.species_charges, self.species_num)
+    Parameters
+    ----------
+    read_ahead : int
+        Number of dumps read in advance. See :class:`sarkas.utilities.trajectory.DumpReader`. Default = 4.
 
-            # # Store the data
-            for i, sp_name in enumerate(self.species_names):
-                col_str = "{} ".format(sp_name) + ec_str
-                self.dataframe[col_str + "_X_slice {}".format(isl)] = species_current[i, 0, :]
-                self.dataframe[col_str + "_Y_slice {}".format(isl)] = species_current[i, 1, :]
-                self.dataframe[col_str + "_Z_slice {}".format(isl)] = species_current[i, 2, :]
-                # Calculate ACF
-                sp_acf_xx = correlationfunction(species_current[i, 0, :], species_current[i, 0, :])
-                sp_acf_yy = correlationfunction(species_current[i, 1, :], species_current[i, 1, :])
-                sp_acf_zz = correlationfunction(species_current[i, 2, :], species_current[i, 2, :])
-                tot_acf = sp_acf_xx + sp_acf_yy + sp_acf_zz
-                col_str = "{} ".format(sp_name) + ec_acf_str
-                # Store ACF
-                self.dataframe[col_str + "_X_slice {}".format(isl)] = sp_acf_xx
-                self.dataframe[col_str + "_Y_slice {}".format(isl)] = sp_acf_yy
-                self.dataframe[col_str + "_Z_slice {}".format(isl)] = sp_acf_zz
-                self.dataframe[col_str + "_Total_slice {}".format(isl)] = tot_acf
+    threads : int
+        Number of reading threads. Default = 2.
 
-            # Total current and its ACF
-            self.dataframe[ec_str + "_X_slice {}".format(isl)] = total_current[ 0, :]
-            self.dataframe[ec_str + "_Y_slice {}".format(isl)] = total_current[ 1, :]
-            self.dataframe[ec_str + "_Z_slice {}".format(isl)] = total_current[ 2, :]
+    verbose : bool
+        Flag for showing the progress bar. Default = False.
 
-            sp_acf_xx = correlationfunction(total_current[0, :], total_current[0, :])
-            sp_acf_yy = correlationfunction(total_current[1, :], total_current[1, :])
-            sp_acf_zz = correlationfunction(total_current[2, :], total_current[2, :])
-            tot_acf = sp_acf_xx + sp_acf_yy + sp_acf_zz
+    Attributes
+    ----------
+    accumulators : dict
+        Registered quantities. Keys are (dump directory, key) tuples.
 
-            self.dataframe[ec_acf_str + "_X_slice {}".format(isl)] = sp_acf_xx
-            self.dataframe[ec_acf_str + "_Y_slice {}".format(isl)] = sp_acf_yy
-            self.dataframe[ec_acf_str + "_Z_slice {}".format(isl)] = sp_acf_zz
-            self.dataframe[ec_acf_str + "_Total_slice {}".format(isl)] = tot_acf
+    insitu : bool
+        Flag for quantities computed during the simulation, see :class:`InSituPipeline`. Default = False.
 
-            start_slice += self.slice_steps * self.dump_step
-            end_slice += self.slice_steps * self.dump_step
+    """
 
-        # Average and std over the slices
-        for i, sp_name in enumerate(self.species_names):
-            col_str = "{} ".format(sp_name) + ec_str
-            xcol_str = [col_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
-            ycol_str = [col_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
-            zcol_str = [col_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+    def __init__(self, read_ahead=4, threads=2, verbose=False):
+        self.read_ahead = read_ahead
+        self.threads = threads
+        self.verbose = verbose
+        self.accumulators = {}
+        self.insitu = False
 
-            self.dataframe[col_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
-            self.dataframe[col_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
-            self.dataframe[col_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
-            self.dataframe[col_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
-            self.dataframe[col_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
-            self.dataframe[col_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
-            # ACF averages
-            col_str = "{} ".format(sp_name) + ec_acf_str
-            xcol_str = [col_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
-            ycol_str = [col_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
-            zcol_str = [col_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
-            tot_col_str = [col_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+    def register(self, fldr, steps, fields, func, key=None):
+        """
+        Register a per-dump quantity. A quantity already registered with the same key is shared.
 
-            self.dataframe[col_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
-            self.dataframe[col_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
-            self.dataframe[col_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
-            self.dataframe[col_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
-            self.dataframe[col_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
-            self.dataframe[col_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
-            self.dataframe[col_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
-            self.dataframe[col_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
+        Parameters
+        ----------
+        fldr : str
+            Dump directory.
 
-        # Total
-        xcol_str = [ec_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
-        ycol_str = [ec_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
-        zcol_str = [ec_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+        steps : numpy.ndarray
+            Timesteps of the dumps.
 
-        self.dataframe[ec_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
-        self.dataframe[ec_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
-        self.dataframe[ec_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
-        self.dataframe[ec_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
-        self.dataframe[ec_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
-        self.dataframe[ec_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
-        # Total ACF
-        xcol_str = [ec_acf_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
-        ycol_str = [ec_acf_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
-        zcol_str = [ec_acf_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
-        tot_col_str = [ec_acf_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+        fields : list
+            Fields read from the dumps.
 
-        self.dataframe[ec_acf_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
-        self.dataframe[ec_acf_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
-        self.dataframe[ec_acf_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
-        self.dataframe[ec_acf_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
-        self.dataframe[ec_acf_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
-        self.dataframe[ec_acf_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
-        self.dataframe[ec_acf_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
-        self.dataframe[ec_acf_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
-
-        # Create the columns for the HDF df
-        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+        func : callable
+            Function computing a dictionary of arrays from the particles' data of a dump.
 
+        key : tuple
+            Key of the quantity. Default = not shared.
 
-class RadialDistributionFunction(Observable):
-    """
-    Radial Distribution Function.
+        Returns
+        -------
+        accumulator : sarkas.tools.observables.FrameAccumulator
+            Accumulator of the quantity, filled by :meth:`run`.
 
-    Attributes
-    ----------
-    no_bins : int
-        Number of bins.
+        """
+        if key is None:
+            key = ('unique', len(self.accumulators))
 
-    dr_rdf : float
-        Size of each bin.
+        accumulator = self.accumulators.get((fldr, key))
+        if accumulator is None:
+            accumulator = FrameAccumulator(steps, fields, func, key)
+            self.accumulators[(fldr, key)] = accumulator
+        else:
+            accumulator.extend(steps)
 
-    """
+        return accumulator
 
-    def setup(self, params, phase: str = None, **kwargs):
+    def add(self, fldr, accumulator):
         """
-        Assign attributes from simulation's parameters.
+        Register an accumulator built by an observable, e.g. a :class:`CorrelatorAccumulator`. It is not shared.
 
         Parameters
         ----------
-        params : sarkas.core.Parameters
-            Simulation's parameters.
-
-        phase : str, optional
-            Phase to compute. Default = 'production'.
+        fldr : str
+            Dump directory.
 
+        accumulator : sarkas.tools.observables.FrameAccumulator
+            Accumulator.
 
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        Returns
+        -------
+        accumulator : sarkas.tools.observables.FrameAccumulator
+            Same accumulator, filled by :meth:`run`.
 
         """
+        self.accumulators[(fldr, ('unique', len(self.accumulators)))] = accumulator
 
-        if phase:
-            self.phase = phase.lower()
-
-        super().setup_init(params, self.phase)
-        self.__name__ = 'rdf'
-        self.__long_name__ = 'Radial Distribution Function'
-
-        saving_dir = os.path.join(self.postprocessing_dir, 'RadialDistributionFunction')
-        if not os.path.exists(saving_dir):
-            os.mkdir(saving_dir)
-
-        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
-
-        self.filename_csv = os.path.join(self.saving_dir,
-                                         "RadialDistributionFunction_" + self.job_id + ".csv")
-
-        # These definitions are needed for the print out.
-        self.rc = self.cutoff_radius
-        self.no_bins = self.rdf_nbins
-        self.dr_rdf = self.rc / self.no_bins
-
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+        return accumulator
 
-    def compute(self, rdf_hist=None, **kwargs):
-        """
-        Parameters
-        ----------
-        rdf_hist : numpy.ndarray
-            Histogram of the radial distribution function.
+    def run(self):
+        """Read the dumps of each directory once and compute all the registered quantities."""
+        directories = {}
+        for (fldr, key), accumulator in self.accumulators.items():
+            directories.setdefault(fldr, []).append(accumulator)
 
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+        for fldr, accumulators in directories.items():
+            steps = np.unique(np.concatenate([acc.steps for acc in accumulators]))
+            fields = sorted(set(field for acc in accumulators for field in acc.fields))
+            print("\nReading {} dumps from {} for {} quantities.".format(len(steps), fldr, len(accumulators)))
+            dumps = DumpReader(fldr, steps, fields, read_ahead=self.read_ahead, threads=self.threads)
+            for step, data in tqdm(dumps, disable=not self.verbose, desc='Dumps Loop'):
+                for acc in accumulators:
+                    acc.add(step, data)
 
-        """
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
+class InSituPipeline(FramePipeline):
+    """
+    Per-dump quantities of the observables computed from the particles' data during the production phase, instead
+    of from the dumps. Each observable saves its quantities in a small file, see :meth:`Observable.save_insitu`,
+    read at post-processing in place of the dumps. Hence the production dumps can be saved rarely or only for restart.
 
-        # initialize temporary arrays
-        r_values = np.zeros(self.no_bins)
-        bin_vol = np.zeros(self.no_bins)
-        pair_density = np.zeros((self.num_species, self.num_species))
-        gr = np.zeros((self.no_bins, self.no_obs))
+    Parameters
+    ----------
+    dump_step : int
+        Interval of timesteps between two computations.
 
-        if not isinstance(rdf_hist, np.ndarray):
-            # Find the last dump by looking for the largest number in the checkpoints filenames
-            dumps_list = os.listdir(self.dump_dir)
-            dumps_list.sort(key=num_sort)
-            name, ext = os.path.splitext(dumps_list[-1])
-            _, number = name.split('_')
-            data = load_from_restart(self.dump_dir, int(number))
-            rdf_hist = data["rdf_hist"]
+    production_steps : int
+        Number of production steps.
 
-        # Make sure you are getting the right number of bins and redefine dr_rdf.
-        self.no_bins = rdf_hist.shape[0]
-        self.dr_rdf = self.rc / self.no_bins
+    dt : float
+        Timestep.
 
-        t0 = self.timer.current()
-        # No. of pairs per volume
-        for i, sp1 in enumerate(self.species_num):
-            pair_density[i, i] = sp1 * (sp1 - 1) / self.box_volume
-            if self.num_species > 1:
-                for j, sp2 in enumerate(self.species_num[i + 1:], i + 1):
-                    pair_density[i, j] = sp1 * sp2 / self.box_volume
+    Attributes
+    ----------
+    no_dumps : int
+        Number of computations, including the initial configuration.
 
-        # Calculate the volume of each bin
-        sphere_shell_const = 4.0 * np.pi / 3.0
-        bin_vol[0] = sphere_shell_const * self.dr_rdf ** 3
-        for ir in range(1, self.no_bins):
-            r1 = ir * self.dr_rdf
-            r2 = (ir + 1) * self.dr_rdf
-            bin_vol[ir] = sphere_shell_const * (r2 ** 3 - r1 ** 3)
-            r_values[ir] = (ir + 0.5) * self.dr_rdf
+    observables : list
+        Observables saving their quantities at the end of the production phase.
 
-        # Save the ra values for simplicity
-        self.ra_values = r_values / self.a_ws
+    """
 
-        self.dataframe["Distance"] = r_values
-        gr_ij = 0
-        for i, sp1 in enumerate(self.species_names):
-            for j, sp2 in enumerate(self.species_names[i:], i):
-                denom_const = (pair_density[i, j] * self.production_steps)
-                gr[:, gr_ij] = (rdf_hist[:, i, j] + rdf_hist[:, j, i]) / denom_const / bin_vol[:]
+    def __init__(self, dump_step, production_steps, dt):
+        super().__init__()
+        self.insitu = True
+        self.dump_step = dump_step
+        self.dt = dt
+        self.no_dumps = production_steps // dump_step + 1
+        self.observables = []
 
-                self.dataframe['{}-{} RDF'.format(sp1, sp2)] = gr[:, gr_ij]
+    def accumulate(self, it, ptcls):
+        """
+        Compute all the registered quantities from the current particles' data.
 
-                gr_ij += 1
+        Parameters
+        ----------
+        it : int
+            Timestep number.
 
-        tend = self.timer.current()
-        self.time_stamp('Radial Distribution Function Calculation', self.timer.time_division(tend - t0))
-        self.dataframe.to_csv(self.filename_csv, index=False, encoding='utf-8')
+        ptcls : sarkas.core.Particles
+            Particles' class.
 
-    def pretty_print(self):
-        """Print radial distribution function calculation parameters for help in choice of simulation parameters."""
+        """
+        # Arrays of the initial size also when absorbed particles have been removed, as in the dumps
+        p_id, names, pos, vel, acc, cntr = ptcls.checkpoint_data()
+        data = {'pos': pos, 'vel': vel, 'acc': acc, 'time': it * self.dt}
+        for accumulator in self.accumulators.values():
+            accumulator.add(it, data)
 
-        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
-        print('Data saved in: \n', self.filename_csv)
-        print('Data accessible at: self.ra_values, self.dataframe')
-        print('\nNo. bins = {}'.format(self.no_bins))
-        print('dr = {:1.4f} a_ws = {:1.4e} '.format(self.dr_rdf / self.a_ws, self.dr_rdf), end='')
-        print("[cm]" if self.units == "cgs" else "[m]")
-        print('Maximum Distance (i.e. potential.rc)= {:1.4f} a_ws = {:1.4e} '.format(
-            self.rc / self.a_ws, self.rc), end='')
-        print("[cm]" if self.units == "cgs" else "[m]")
+    def save(self):
+        """Save the quantities of each observable and release their memory."""
+        for observable in self.observables:
+            observable.save_insitu()
+            observable.accumulators = None
+            observable.insitu_pipeline = None
 
 
-class StaticStructureFactor(Observable):
+class CurrentCorrelationFunction(Observable):
     """
-    Static Structure Factors :math:`S_{ij}(k)`.
+    Current Correlation Functions: :math:`L(k,\\omega)` and :math:`T(k,\\omega)`.
 
     Attributes
     ----------
@@ -1613,16 +1967,18 @@ class StaticStructureFactor(Observable):
 
         """
 
+        self.k_observable = True
+
         if phase:
             self.phase = phase.lower()
 
-        self.k_observable = True
+        self.dump_fields = [['pos', 'vel']]
         super().setup_init(params, self.phase)
 
-        self.__name__ = 'ssf'
-        self.__long_name__ = 'Static Structure Function'
+        self.__name__ = 'ccf'
+        self.__long_name__ = 'Current Correlation Function'
 
-        saving_dir = os.path.join(self.postprocessing_dir, 'StaticStructureFunction')
+        saving_dir = os.path.join(self.postprocessing_dir, 'CurrentCorrelationFunction')
         if not os.path.exists(saving_dir):
             os.mkdir(saving_dir)
 
@@ -1632,19 +1988,46 @@ class StaticStructureFactor(Observable):
 
         # These calculation are needed for the io.postprocess_info().
         # This is a hack and we need to find a faster way to do it
-        self.slice_steps = int((self.production_steps + 1) / (self.dump_step * self.no_slices))
-        self.no_dumps = int(self.slice_steps / self.prod_dump_step)
+        dt_r = self.dt * self.dump_step
+
+        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+
+        self.w_min = 2.0 * np.pi / (self.slice_steps * dt_r)
+        self.w_max = np.pi / dt_r  # Half because np.fft calculates negative and positive frequencies
 
         self.parse_k_data()
 
-        self.filename_hdf = os.path.join(self.saving_dir, "StaticStructureFunction_" + self.job_id + ".h5")
+        # self.filename_csv_longitudinal = os.path.join(self.saving_dir,
+        #                                               "Longitudinal_CurrentCorrelationFunction_" + self.job_id + '.csv')
+        # self.filename_csv_transverse = os.path.join(self.saving_dir,
+        #                                             "Transverse_CurrentCorrelationFunction_" + self.job_id + '.csv')
+
+        self.filename_hdf = os.path.join(
+            self.saving_dir,
+            "CurrentCorrelationFunction_" + self.job_id + '.h5')
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
+    def register(self, pipeline):
+        """
+        Register the velocity fluctuations of each dump in a :class:`FramePipeline`.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        if pipeline.insitu or not self.kt_file_current(self.vkt_hdf_file, 'vkt'):
+            self.add_accumulator(pipeline, 'vkt', ['pos', 'vel'],
+                                 partial(vk_frame, k_list=self.k_list, species_np=self.species_num,
+                                         box_lengths=self.box_lengths),
+                                 ('vkt', self.k_list.tobytes()))
+
     def compute(self, **kwargs):
         """
-        Calculate all :math:`S_{ij}(k)`, save them into a Pandas dataframe, and write them to a csv.
+        Calculate the microscopic current fluctuations correlation functions.
 
         Parameters
         ----------
@@ -1656,66 +2039,164 @@ class StaticStructureFactor(Observable):
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
-
-        # Parse nkt otherwise calculate it
+        # Parse vkt otherwise calculate them
         self.parse_k_data()  # repeat from setup in case parameters have been updated
-        self.parse_kt_data(nkt_flag=True)
+        self.parse_kt_data(nkt_flag=False, vkt_flag=True)
+        # Initialize dataframes and add frequencies to it.
         # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
-        self.dataframe = pd.DataFrame()
 
-        no_dumps_calculated = self.slice_steps * self.no_slices
-        Sk_avg = np.zeros((self.no_obs, len(self.k_counts), no_dumps_calculated))
-        print("\nCalculating S(k) ...")
+        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+        self.frequencies = np.fft.fftshift(self.frequencies)
 
-        tinit = self.timer.current()
-        nkt_df = pd.read_hdf(self.nkt_hdf_file, mode='r', key='nkt')
-        for isl in tqdm(range(self.no_slices)):
-            # Initialize container
-            nkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
-            for sp, sp_name in enumerate(self.species_names):
-                nkt[sp] = np.array(nkt_df["slice {}".format(isl + 1)][sp_name])
+        # self.dataframe_longitudinal["Frequencies"] = np.fft.fftshift(self.frequencies)
+        # self.dataframe_transverse["Frequencies"] = np.fft.fftshift(self.frequencies)
 
-            init = isl * self.slice_steps
-            fin = (isl + 1) * self.slice_steps
-            Sk_avg[:, :, init:fin] = calc_Sk(nkt, self.k_list, self.k_counts, self.species_num, self.slice_steps)
+        # temp_dataframe_longitudinal = pd.DataFrame()
+        temp_dataframe = pd.DataFrame()
+        tinit = self.timer.current()
 
-        Sk = np.mean(Sk_avg, axis=-1)
-        Sk_err = np.std(Sk_avg, axis=-1)
-        k_column = "Inverse Wavelength"
-        self.dataframe[k_column] = self.k_values
-        sp_indx = 0
-        for i, sp1 in enumerate(self.species_names):
-            for j, sp2 in enumerate(self.species_names[i:]):
-                column = "{}-{}_Mean".format(sp1, sp2)
-                err_column = "{}-{}_Std".format(sp1, sp2)
+        vkt_df = pd.read_hdf(self.vkt_hdf_file, mode='r', key='vkt')
+        # Containers
+        vkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+        vkt_i = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+        vkt_j = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+        vkt_k = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
 
-                self.dataframe[column] = Sk[sp_indx, :]
-                self.dataframe[err_column] = Sk_err[sp_indx, :]
+        for isl in range(self.no_slices):
 
-                sp_indx += 1
+            # Put data in the container to pass
+            for sp, sp_name in enumerate(self.species_names):
+                vkt[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Longitudinal"][sp_name])
+                vkt_i[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse i"][sp_name])
+                vkt_j[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse j"][sp_name])
+                vkt_k[sp] = np.array(vkt_df["slice {}".format(isl + 1)]["Transverse k"][sp_name])
 
-        # Create the MultiIndex columns
-        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
-        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
+            # Calculate Lkw and Tkw
+            Lkw = calc_Skw(vkt, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
+            Tkw_i = calc_Skw(vkt_i, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
+            Tkw_j = calc_Skw(vkt_j, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
+            Tkw_k = calc_Skw(vkt_k, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
 
-        tend = self.timer.current()
-        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
+            Tkw = (Tkw_i + Tkw_j + Tkw_k) / 3.0
 
-        # HDF will get huge if we don't remove
-        if os.path.exists(self.filename_hdf):
-            os.remove(self.filename_hdf)
+            # Lkw_tot += Lkw / self.no_slices
+            # Tkw_tot += Tkw / self.no_slices
+            # Create the dataframe's column names
+            slc_column = 'slice {}'.format(isl + 1)
+            ka_columns = ["ka = {:.6f}".format(ka) for ik, ka in enumerate(self.ka_values)]
 
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+            # Save the full Skw into a Dataframe
+            sp_indx = 0
+            for i, sp1 in enumerate(self.species_names):
+                for j, sp2 in enumerate(self.species_names[i:]):
+                    columns = [
+                        "Longitudinal_{}-{}_".format(sp1, sp2) + slc_column +
+                        "_{}_k = [{}, {}, {}]".format(
+                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
+                        # Final string : Longitudinal_H-He_slice 1_ka = 0.123456_k = [0, 0, 1]
+                        for ik in range(len(self.k_harmonics))]
+                    temp_dataframe = pd.concat(
+                        [temp_dataframe, pd.DataFrame(Lkw[sp_indx, :, :].T, columns=columns)],
+                        axis=1)
 
-    def pretty_print(self):
-        """Print static structure factor calculation parameters for help in choice of simulation parameters."""
+                    columns = [
+                        "Transverse_{}-{}_".format(sp1, sp2) + slc_column +
+                        "_{}_k = [{}, {}, {}]".format(
+                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
+                        # Final string : Transverse_H-He_slice 1_ka = 0.123456_k = [0, 0, 1]
+                        for ik in range(len(self.k_harmonics))]
+                    temp_dataframe = pd.concat(
+                        [temp_dataframe, pd.DataFrame(Tkw[sp_indx, :, :].T, columns=columns)],
+                        axis=1)
+
+                    sp_indx += 1
+
+        # Create the MultiIndex
+        tuples = [tuple(c.split("_")) for c in temp_dataframe.columns]
+        temp_dataframe.columns = pd.MultiIndex.from_tuples(tuples,
+                                                           names=['direction', 'species', 'slices', 'ka_value',
+                                                                  'k_harmonics'])
+
+        if os.path.exists(self.filename_hdf[:-3] + '_Full.h5'):
+            os.remove(self.filename_hdf[:-3] + '_Full.h5')
+
+        temp_dataframe.to_hdf(self.filename_hdf[:-3] + '_Full.h5', mode='w', key=self.__name__)
+
+        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
+        self.dataframe = pd.DataFrame()
+        self.dataframe[' _ _ _ _Frequencies'] = self.frequencies
+        # Take the mean and std and store them into the dataframe to return
+        for sp1, sp1_name in enumerate(self.species_names):
+            for sp2, sp2_name in enumerate(self.species_names[sp1:], sp1):
+                comp_name = '{}-{}'.format(sp1_name, sp2_name)
+                ### LONGITUDINAL
+                # Rename the columns with values of ka
+                ka_columns = ['Longitudinal_' + comp_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka)
+                              for ik, ka in enumerate(self.ka_values)]
+
+                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
+                df_mean = temp_dataframe['Longitudinal'][comp_name].mean(level=1, axis='columns')
+                df_mean = df_mean.rename(col_mapper(df_mean.columns, ka_columns), axis=1)
+                # Std
+                ka_columns = ['Longitudinal_' + comp_name + "_Std_ka{} = {:.4f}".format(ik + 1,ka)
+                              for ik, ka in enumerate(self.ka_values)]
+                df_std = temp_dataframe['Longitudinal'][comp_name].std(level=1, axis='columns')
+                df_std = df_std.rename(col_mapper(df_std.columns, ka_columns), axis=1)
+
+                self.dataframe = pd.concat([self.dataframe, df_mean, df_std], axis=1)
+
+                ### Transverse
+                # Rename the columns with values of ka
+                ka_columns = ['Transverse_' + comp_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka)
+                              for ik, ka in enumerate(self.ka_values)]
+
+                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
+                tdf_mean = temp_dataframe['Transverse'][comp_name].mean(level=1, axis='columns')
+                tdf_mean = tdf_mean.rename(col_mapper(tdf_mean.columns, ka_columns), axis=1)
+                # Std
+                ka_columns = ['Transverse_' + comp_name + "_Std_ka{} = {:.4f}".format(ik + 1, ka)
+                              for ik, ka in enumerate(self.ka_values)]
+                tdf_std = temp_dataframe['Transverse'][comp_name].std(level=1, axis='columns')
+                tdf_std = tdf_std.rename(col_mapper(tdf_std.columns, ka_columns), axis=1)
+
+                self.dataframe = pd.concat([self.dataframe, tdf_mean, tdf_std], axis=1)
+
+        # Create the MultiIndex columns:
+        # Longitudinal_H-He_Mean_Frequencies | ka = 0.123456
+        # Longitudinal_H-He_Std_ka = 0.123456
+
+        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
+        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
+
+        tend = self.timer.current()
+        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
+
+        # HDF will get huge if we don't remove
+        if os.path.exists(self.filename_hdf):
+            os.remove(self.filename_hdf)
+
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
 
+    def pretty_print(self):
+        """Print current correlation function calculation parameters for help in choice of simulation parameters."""
         print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
         print('k wavevector information saved in: \n', self.k_file)
-        print('n(k,t) Data saved in: \n', self.nkt_hdf_file)
-        print('Data saved in: \n', self.filename_hdf)
-        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.dataframe')
-        print('\nSmallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
+        print('v(k,t) data saved in: \n', self.vkt_hdf_file)
+        print('Data saved in: \n{}'.format(self.filename_hdf))
+        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.frequencies,'
+              ' \n\t self.dataframe')
+        print('\nFrequency Space Parameters:')
+        print('\tNo. of slices = {}'.format(self.no_slices))
+        print('\tNo. dumps per slice = {}'.format(self.slice_steps))
+        print('\tFrequency step dw = 2 pi (no_slices * prod_dump_step)/(production_steps * dt)')
+        print('\tdw = {:1.4f} w_p = {:1.4e} [Hz]'.format(
+            self.w_min / self.total_plasma_frequency, self.w_min))
+        print('\tMaximum Frequency w_max = 2 pi /(prod_dump_step * dt)')
+        print('\tw_max = {:1.4f} w_p = {:1.4e} [Hz]'.format(
+            self.w_max / self.total_plasma_frequency, self.w_max))
+
+        print('\n\nWavevector parameters:')
+        print('Smallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
         print('k_min = {:.4f} / a_ws = {:.4e} '.format(self.ka_values[0], self.ka_values[0] / self.a_ws), end='')
         print("[1/cm]" if self.units == "cgs" else "[1/m]")
 
@@ -1749,10 +2230,8 @@ class StaticStructureFactor(Observable):
         print('No. of unique ka values to calculate = {}'.format(len(self.ka_values)))
 
 
-class Thermodynamics(Observable):
-    """
-    Thermodynamic functions.
-    """
+class DynamicStructureFactor(Observable):
+    """Dynamic Structure factor."""
 
     def setup(self, params, phase: str = None, **kwargs):
         """
@@ -1772,400 +2251,463 @@ class Thermodynamics(Observable):
 
         """
 
+        self.k_observable = True
+
         if phase:
             self.phase = phase.lower()
 
+        self.dump_fields = [['pos']]
         super().setup_init(params, self.phase)
-        self.__name__ = 'therm'
-        self.__long_name__ = 'Thermodynamics'
 
-        self.dataframe = pd.DataFrame()
+        self.__name__ = 'dsf'
+        self.__long_name__ = 'Dynamic Structure Factor'
 
-        if params.load_method == "restart":
-            self.restart_sim = True
-        else:
-            self.restart_sim = False
+        # Create the directory where to store the computed data
+        saving_dir = os.path.join(self.postprocessing_dir, 'DynamicStructureFactor')
+        if not os.path.exists(saving_dir):
+            os.mkdir(saving_dir)
 
-        if self.phase.lower() == 'production':
-            self.saving_dir = self.production_dir
-        elif self.phase.lower() == 'equilibration':
-            self.saving_dir = self.equilibration_dir
-        elif self.phase.lower() == 'magnetization':
-            self.saving_dir = self.magnetization_dir
+        # Create the phase directory
+        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
+
+        # These calculation are needed for the io.postprocess_info().
+        # This is a hack and we need to find a faster way to do it
+        dt_r = self.dt * self.dump_step
+
+        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+
+        self.w_min = 2.0 * np.pi / (self.slice_steps * self.dt * self.dump_step)
+        self.w_max = np.pi / dt_r  # Half because np.fft calculates negative and positive frequencies
+
+        self.parse_k_data()
+
+        self.filename_csv = os.path.join(self.saving_dir, "DynamicStructureFactor_" + self.job_id + '.csv')
+        self.filename_hdf = os.path.join(self.saving_dir, "DynamicStructureFactor_" + self.job_id + '.h5')
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
-    def compute_pressure_from_rdf(self, r, gr, potential, potential_matrix, **kwargs):
+    def register(self, pipeline):
         """
-        Calculate the Pressure using the radial distribution function
+        Register the density fluctuations of each dump. Shared with :class:`StaticStructureFactor` in a :class:`FramePipeline`.
 
         Parameters
         ----------
-        r : numpy.ndarray
-            Particles' distances.
-
-        gr : numpy.ndarray
-            Pair distribution function.
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
 
-        potential: str
-            Potential used in the simulation.
+        """
+        if pipeline.insitu or not self.kt_file_current(self.nkt_hdf_file, 'nkt'):
+            self.add_accumulator(pipeline, 'nkt', ['pos'],
+                                 partial(nk_frame, k_list=self.k_list, species_np=self.species_num,
+                                         box_lengths=self.box_lengths),
+                                 ('nkt', self.k_list.tobytes()))
 
-        potential_matrix: numpy.ndarray
-            Potential parameters.
+    def compute(self, **kwargs):
+        """
+        Compute :math:`S_{ij} (k,\\omega)` and the array of :math:`\\omega` values.
+        Shape = (``no_ws``, ``no_Sij``)
 
+        Parameters
+        ----------
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
 
-        Returns
-        -------
-        pressure : float
-            Pressure divided by :math:`k_BT`.
-
         """
+
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
-        r2 = r * r
-        r3 = r2 * r
+        # Parse nkt otherwise calculate it
+        self.parse_k_data()  # repeat from setup in case parameters have been updated
+        self.parse_kt_data(nkt_flag=True)
 
-        if potential.lower() == "coulomb":
-            dv_dr = - 1.0 / r2
-            # Check for finiteness of first element when r[0] = 0.0
-            if not np.isfinite(dv_dr[0]):
-                dv_dr[0] = dv_dr[1]
-            gr -= 1
-        elif potential.lower() == "yukawa":
-            pass
-        elif potential.lower() == "qsp":
-            pass
-        else:
-            raise ValueError('Unknown potential')
+        self.frequencies = 2.0 * np.pi * np.fft.fftfreq(self.slice_steps, self.dt * self.dump_step)
+        self.frequencies = np.fft.fftshift(self.frequencies)
 
-        # No. of independent g(r)
-        T = np.mean(self.dataframe["Temperature"])
-        pressure = self.kB * T - 2.0 / 3.0 * np.pi * self.species_num_dens[0] \
-                   * potential_matrix[0, 0, 0] * np.trapz(dv_dr * r3 * gr, x=r)
-        pressure *= self.species_num_dens[0]
+        # Save the raw Skw data into a temporary dataframe.
+        # The final Skw will be calculated using mean and std on this dataframe
+        temp_dataframe = pd.DataFrame()
+        tinit = self.timer.current()
+        nkt_df = pd.read_hdf(self.nkt_hdf_file, mode='r', key='nkt')
+        for isl in range(0, self.no_slices):
+            # Initialize container
+            nkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+            for sp, sp_name in enumerate(self.species_names):
+                nkt[sp] = np.array(nkt_df["slice {}".format(isl + 1)][sp_name])
 
-        return pressure
+            # Calculate Skw
+            Skw_all = calc_Skw(nkt, self.k_list, self.species_num, self.slice_steps, self.dt, self.dump_step)
 
-    def parse(self, phase=None):
-        """
-        Grab the pandas dataframe from the saved csv file.
-        """
-        if phase:
-            self.phase = phase.lower()
+            # Create the dataframe's column names
+            slc_column = 'slice {}'.format(isl + 1)
+            ka_columns = ["ka = {:.8f}".format(ka) for ik, ka in enumerate(self.ka_values)]
+            # Save the full Skw into a Dataframe
+            sp_indx = 0
+            for i, sp1 in enumerate(self.species_names):
+                for j, sp2 in enumerate(self.species_names[i:]):
+                    columns = [
+                        "{}-{}_".format(sp1, sp2) + slc_column +
+                        "_{}_k = [{}, {}, {}]".format(
+                            ka_columns[int(self.k_harmonics[ik, -1])], *self.k_harmonics[ik, :-2].astype(int))
+                        for ik in range(len(self.k_harmonics))]
+                    temp_dataframe = pd.concat(
+                        [temp_dataframe, pd.DataFrame(Skw_all[sp_indx, :, :].T, columns=columns)],
+                        axis=1)
+                    sp_indx += 1
 
-        if self.phase == 'equilibration':
-            self.dataframe = pd.read_csv(self.eq_energy_filename, index_col=False)
-            self.fldr = self.equilibration_dir
-        elif self.phase == 'production':
-            self.dataframe = pd.read_csv(self.prod_energy_filename, index_col=False)
-            self.fldr = self.production_dir
-        elif self.phase == 'magnetization':
-            self.dataframe = pd.read_csv(self.mag_energy_filename, index_col=False)
-            self.fldr = self.magnetization_dir
+        # Create the MultiIndex
+        tuples = [tuple(c.split("_")) for c in temp_dataframe.columns]
+        temp_dataframe.columns = pd.MultiIndex.from_tuples(tuples,
+                                                           names=['species', 'slices', 'k_index', 'k_harmonics'])
 
-    def statistics(self, quantity="Total Energy", max_no_divisions=100, show=False):
-        """
-        ToDo:
-        Parameters
-        ----------
-        quantity
-        max_no_divisions
-        show
+        if os.path.exists(self.filename_hdf[:-3] + '_Full.h5'):
+            os.remove(self.filename_hdf[:-3] + '_Full.h5')
+        temp_dataframe.to_hdf(self.filename_hdf[:-3] + '_Full.h5', mode='w', key=self.__name__)
 
-        Returns
-        -------
+        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
+        self.dataframe = pd.DataFrame()
+        self.dataframe[" _ _Frequencies"] = self.frequencies
 
-        """
-        self.parse()
-        run_avg = self.dataframe[quantity].mean()
-        run_std = self.dataframe[quantity].std()
+        # Take the mean and std and store them into the dataframe to return
+        for sp1, sp1_name in enumerate(self.species_names):
+            for sp2, sp2_name in enumerate(self.species_names[sp1:], sp1):
+                skw_name = '{}-{}'.format(sp1_name, sp2_name)
+                # Rename the columns with values of ka
+                ka_columns = [skw_name + "_Mean_ka{} = {:.4f}".format(ik + 1, ka) for ik, ka in enumerate(self.ka_values)]
+                # Mean: level = 1 corresponds to averaging all the k harmonics with the same magnitude
+                df_mean = temp_dataframe[skw_name].mean(level=1, axis='columns')
+                df_mean = df_mean.rename(col_mapper(df_mean.columns, ka_columns), axis=1)
+                # Std
+                ka_columns = [skw_name + "_Std_ka{} = {:.4f}".format(ik + 1, ka) for ik, ka in enumerate(self.ka_values)]
+                df_std = temp_dataframe[skw_name].std(level=1, axis='columns')
+                df_std = df_std.rename(col_mapper(df_std.columns, ka_columns), axis=1)
 
-        observable = np.array(self.dataframe[quantity])
-        # Loop over the blocks
-        tau_blk, sigma2_blk, statistical_efficiency = calc_statistical_efficiency(observable,
-                                                                                  run_avg, run_std,
-                                                                                  max_no_divisions, self.no_dumps)
-        # Plot the statistical efficiency
-        fig, ax = plt.subplots(1, 1, figsize=(10, 7))
-        ax.plot(1 / tau_blk[2:], statistical_efficiency[2:], '--o', label=quantity)
-        ax.grid(True, alpha=0.3)
-        ax.legend(loc='best')
-        ax.set_xscale('log')
-        ax.set_ylabel(r'$s(\tau_{\rm{blk}})$')
-        ax.set_xlabel(r'$1/\tau_{\rm{blk}}$')
-        fig.tight_layout()
-        fig.savefig(os.path.join(self.postproc_dir, quantity + 'StatisticalEfficiency_' + self.job_id + '.png'))
+                self.dataframe = pd.concat([self.dataframe, df_mean, df_std], axis=1)
 
-        if show:
-            fig.show()
+        # Create the MultiIndex columns
+        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
+        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
 
-    def temp_energy_plot(self, process,
-                         phase: str = None,
-                         show: bool = False,
-                         publication: bool = False,
-                         figname: str = None):
+        tend = self.timer.current()
+        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
+
+        # HDF will get huge if we don't remove
+        if os.path.exists(self.filename_hdf):
+            os.remove(self.filename_hdf)
+
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+
+    def pretty_print(self):
+        """Print dynamic structure factor calculation parameters for help in choice of simulation parameters."""
+
+        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('k wavevector information saved in: \n', self.k_file)
+        print('n(k,t) data saved in: \n', self.nkt_hdf_file)
+        print('Data saved in: \n', self.filename_hdf)
+        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.frequencies, self.dataframe')
+
+        print('\nFrequency Space Parameters:')
+        print('\tNo. of slices = {}'.format(self.no_slices))
+        print('\tNo. dumps per slice = {}'.format(self.slice_steps))
+        print('\tFrequency step dw = 2 pi (no_slices * prod_dump_step)/(production_steps * dt)')
+        print('\tdw = {:1.4f} w_p = {:1.4e} [Hz]'.format(
+            self.w_min / self.total_plasma_frequency, self.w_min))
+        print('\tMaximum Frequency w_max = 2 pi /(prod_dump_step * dt)')
+        print('\tw_max = {:1.4f} w_p = {:1.4e} [Hz]'.format(
+            self.w_max / self.total_plasma_frequency, self.w_max))
+
+        print('\n\nWavevector parameters:')
+        print('Smallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
+        print('k_min = {:.4f} / a_ws = {:.4e} '.format(self.ka_values[0], self.ka_values[0] / self.a_ws), end='')
+        print("[1/cm]" if self.units == "cgs" else "[1/m]")
+
+        print('\nAngle averaging choice: {}'.format(self.angle_averaging))
+        if self.angle_averaging == 'full':
+            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
+            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
+                                                              self.max_aa_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+        elif self.angle_averaging == 'custom':
+            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
+            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
+            print('\tAA k_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
+                                                                 self.max_aa_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+
+            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
+            print('\tLargest wavector k_max = k_min * n_x')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
+                                                              self.max_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+        elif self.angle_averaging == 'principal_axis':
+            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
+            print('\tLargest wavector k_max = k_min * n_x')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
+                                                              self.max_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+
+        print('\nTotal number of k values to calculate = {}'.format(len(self.k_list)))
+        print('No. of unique ka values to calculate = {}'.format(len(self.ka_values)))
+
+
+class ElectricCurrent(Observable):
+    """Electric Current Auto-correlation function."""
+
+    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
         """
-        Plot Temperature and Energy as a function of time with their cumulative sum and average.
+        Initialize the attributes from simulation's parameters.
 
         Parameters
         ----------
-        process : sarkas.processes.PostProcess
-            Sarkas Process.
-
-        phase: str, optional
-            Phase to plot. "equilibration" or "production".
+        params : sarkas.core.Parameters
+            Simulation's parameters.
 
-        show: bool, optional
-            Flag for displaying the figure.
+        phase : str, optional
+            Phase to compute. Default = 'production'.
 
-        publication: bool, optional
-            Flag for publication style plotting.
+        no_slices : int
+            Number of independent runs inside a long simulation. Default = 1.
 
-        figname: str, optional
-            Name with which to save the plot.
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
 
         """
-
         if phase:
-            phase = phase.lower()
-            self.phase = phase
-            if self.phase == 'equilibration':
-                self.no_dumps = self.eq_no_dumps
-                self.dump_dir = self.eq_dump_dir
-                self.dump_step = self.eq_dump_step
-                self.saving_dir = self.equilibration_dir
-                self.no_steps = self.equilibration_steps
-                self.parse(self.phase)
-                self.dataframe = self.dataframe.iloc[1:, :]
+            self.phase = phase.lower()
 
-            elif self.phase == 'production':
-                self.no_dumps = self.prod_no_dumps
-                self.dump_dir = self.prod_dump_dir
-                self.dump_step = self.prod_dump_step
-                self.saving_dir = self.production_dir
-                self.no_steps = self.production_steps
-                self.parse(self.phase)
+        if no_slices:
+            self.no_slices = no_slices
 
-            elif self.phase == 'magnetization':
-                self.no_dumps = self.mag_no_dumps
-                self.dump_dir = self.mag_dump_dir
-                self.dump_step = self.mag_dump_step
-                self.saving_dir = self.magnetization_dir
-                self.no_steps = self.magnetization_steps
-                self.parse(self.phase)
+        self.dump_fields = [['species_current'], ['vel']]
+        super().setup_init(params, self.phase)
 
-        else:
-            self.parse()
+        self.__name__ = 'ec'
+        self.__long_name__ = 'Electric Current'
 
-        completed_steps = self.dump_step * (self.no_dumps - 1)
-        fig = plt.figure(figsize=(20, 8))
-        fsz = 16
-        if publication:
+        # Create the directory where to store the computed data
+        saving_dir = os.path.join(self.postprocessing_dir, 'ElectricCurrent')
+        if not os.path.exists(saving_dir):
+            os.mkdir(saving_dir)
 
-            plt.style.use('PUBstyle')
-            gs = GridSpec(3, 7)
+        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
 
-            # Temperature plots
-            T_delta_plot = fig.add_subplot(gs[0, 0:2])
-            T_main_plot = fig.add_subplot(gs[1:3, 0:2])
-            T_hist_plot = fig.add_subplot(gs[1:3, 2])
-            # Energy plots
-            E_delta_plot = fig.add_subplot(gs[0, 4:6])
-            E_main_plot = fig.add_subplot(gs[1:3, 4:6])
-            E_hist_plot = fig.add_subplot(gs[1:3, 6])
+        self.filename_hdf = os.path.join(self.saving_dir, "ElectricCurrent_" + self.job_id + '.h5')
 
-        else:
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
 
-            gs = GridSpec(4, 8)
+    def register(self, pipeline):
+        """
+        Register the current of each species in each dump. Shared with :class:`DiffusionFlux` in a :class:`FramePipeline`.
 
-            Info_plot = fig.add_subplot(gs[0:4, 0:2])
-            # Temperature plots
-            T_delta_plot = fig.add_subplot(gs[0, 2:4])
-            T_main_plot = fig.add_subplot(gs[1:4, 2:4])
-            T_hist_plot = fig.add_subplot(gs[1:4, 4])
-            # Energy plots
-            E_delta_plot = fig.add_subplot(gs[0, 5:7])
-            E_main_plot = fig.add_subplot(gs[1:4, 5:7])
-            E_hist_plot = fig.add_subplot(gs[1:4, 7])
-        # Grab the current rcParams so that I can restore it later
-        current_rcParams = plt.rcParams.copy()
-        # Update rcParams with the necessary values
-        plt.rc('font', size=fsz)  # controls default text sizes
-        plt.rc('axes', titlesize=fsz)  # fontsize of the axes title
-        plt.rc('axes', labelsize=fsz)  # fontsize of the x and y labels
-        plt.rc('xtick', labelsize=fsz - 2)  # fontsize of the tick labels
-        plt.rc('ytick', labelsize=fsz - 2)  # fontsize of the tick labels
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
 
-        # Grab the color line list from the plt cycler. I will used this in the hist plots
-        color_from_cycler = plt.rcParams['axes.prop_cycle'].by_key()["color"]
+        """
+        if self.acf_method == 'multiple_tau':
+            self.add_correlator(pipeline)
+            return
 
-        # ------------------------------------------- Temperature -------------------------------------------#
-        # Calculate Temperature plot's labels and multipliers
-        time_mul, temp_mul, time_prefix, temp_prefix, time_lbl, temp_lbl = plot_labels(self.dataframe["Time"],
-                                                                                       self.dataframe["Temperature"],
-                                                                                       "Time",
-                                                                                       "Temperature", self.units)
-        # Rescale quantities
-        time = time_mul * self.dataframe["Time"]
-        Temperature = temp_mul * self.dataframe["Temperature"]
-        T_desired = temp_mul * self.T_desired
+        self.add_accumulator(pipeline, 'species_current', self.stream_fields,
+                             partial(species_current_frame, species_np=self.species_num), ('species_current',))
 
-        # Temperature moving average
-        T_cumavg = Temperature.expanding().mean()
+    def acf_channels(self):
+        """
+        Current of each species and total current for the multiple-tau correlator. See :meth:`Observable.acf_channels`.
 
-        # Temperature deviation and its moving average
-        Delta_T = (Temperature - T_desired) * 100 / T_desired
-        Delta_T_cum_avg = Delta_T.expanding().mean()
+        """
+        channels = np.arange((self.num_species + 1) * 3)
+        func = partial(current_acf_frame, species_np=self.species_num, species_charges=self.species_charges)
 
-        # Temperature Main plot
-        T_main_plot.plot(time, Temperature, alpha=0.7)
-        T_main_plot.plot(time, T_cumavg, label='Moving Average')
-        T_main_plot.axhline(T_desired, ls='--', c='r', alpha=0.7, label='Desired T')
-        T_main_plot.legend(loc='best')
-        T_main_plot.set(ylabel="Temperature" + temp_lbl, xlabel="Time" + time_lbl)
+        return self.stream_fields, func, channels, channels, channels, False
 
-        # Temperature Deviation plot
-        T_delta_plot.plot(time, Delta_T, alpha=0.5)
-        T_delta_plot.plot(time, Delta_T_cum_avg, alpha=0.8)
-        T_delta_plot.set(xticks=[], ylabel=r'Deviation [%]')
+    def acf_columns(self, cf, correlator):
+        """
+        Electric current ACF columns from the multiple-tau correlator. See :meth:`Observable.acf_columns`.
 
-        # This was a failed attempt to calculate the theoretical Temperature distribution.
-        # Gaussian
-        T_dist = scp_stats.norm(loc=T_desired, scale=Temperature.std())
-        # Histogram plot
-        sns.histplot(y=Temperature,
-                     bins='auto',
-                     stat='density',
-                     alpha=0.75,
-                     legend='False',
-                     ax=T_hist_plot)
-        T_hist_plot.set(ylabel=None, xlabel=None, xticks=[], yticks=[])
-        T_hist_plot.plot(T_dist.pdf(Temperature), Temperature, color=color_from_cycler[1])
+        """
+        cf = cf.reshape(self.num_species + 1, 3, -1)
+        col_strs = ["{} Electric Current ACF".format(sp_name) for sp_name in self.species_names]
+        col_strs.append("Electric Current ACF")
 
-        # ------------------------------------------- Total Energy -------------------------------------------#
-        # Calculate Energy plot's labels and multipliers
-        time_mul, energy_mul, _, _, time_lbl, energy_lbl = plot_labels(self.dataframe["Time"],
-                                                                       self.dataframe["Total Energy"],
-                                                                       "Time",
-                                                                       "Energy",
-                                                                       self.units)
+        columns = {}
+        for i, col_str in enumerate(col_strs):
+            for d, ax in enumerate(['X', 'Y', 'Z']):
+                columns[col_str + "_{}_Mean".format(ax)] = cf[i, d]
+            columns[col_str + "_Total_Mean"] = cf[i].sum(axis=0)
 
-        Energy = energy_mul * self.dataframe["Total Energy"]
-        # Total Energy moving average
-        E_cumavg = Energy.expanding().mean()
-        # Total Energy Deviation and its moving average
-        Delta_E = (Energy - Energy.iloc[0]) * 100 / Energy.iloc[0]
-        Delta_E_cum_avg = Delta_E.expanding().mean()
+        return columns
 
-        # Energy main plot
-        E_main_plot.plot(time, Energy, alpha=0.7)
-        E_main_plot.plot(time, E_cumavg, label='Moving Average')
-        E_main_plot.axhline(Energy.mean(), ls='--', c='r', alpha=0.7, label='Avg')
-        E_main_plot.legend(loc='best')
-        E_main_plot.set(ylabel="Total Energy" + energy_lbl, xlabel="Time" + time_lbl)
+    def compute(self, **kwargs):
+        """
+        Compute the electric current and the corresponding auto-correlation functions.
 
-        # Deviation Plot
-        E_delta_plot.plot(time, Delta_E, alpha=0.5)
-        E_delta_plot.plot(time, Delta_E_cum_avg, alpha=0.8)
-        E_delta_plot.set(xticks=[], ylabel=r'Deviation [%]')
+        Parameters
+        ----------
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
 
-        # (Failed) Attempt to calculate the theoretical Energy distribution
-        # In an NVT ensemble Energy fluctuation are given by sigma(E) = sqrt( k_B T^2 C_v)
-        # where C_v is the isothermal heat capacity
-        # Since this requires a lot of prior calculation I skip it and just make a Gaussian
-        E_dist = scp_stats.norm(loc=Energy.mean(), scale=Energy.std())
-        # Histogram plot
-        sns.histplot(y=Energy,
-                     bins='auto',
-                     stat='density',
-                     alpha=0.75,
-                     legend='False',
-                     ax=E_hist_plot)
-        # Grab the second color since the first is used for histplot
-        E_hist_plot.plot(E_dist.pdf(Energy), Energy, color=color_from_cycler[1])
+        """
 
-        E_hist_plot.set(ylabel=None, xlabel=None, xticks=[], yticks=[])
+        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
+        self.__dict__.update(kwargs.copy())
 
-        if not publication:
-            dt_mul, _, _, _, dt_lbl, _ = plot_labels(process.integrator.dt,
-                                                     self.dataframe["Total Energy"],
-                                                     "Time",
-                                                     "Energy",
-                                                     self.units)
-            # Information section
-            Info_plot.axis([0, 10, 0, 10])
-            Info_plot.grid(False)
+        if self.acf_method == 'multiple_tau':
+            self.compute_multiple_tau()
+            return
 
-            Info_plot.text(0., 10, "Job ID: {}".format(self.job_id))
-            Info_plot.text(0., 9.5, "Phase: {}".format(self.phase.capitalize()))
-            Info_plot.text(0., 9.0, "No. of species = {}".format(len(self.species_num)))
-            y_coord = 8.5
-            for isp, sp in enumerate(process.species):
-                Info_plot.text(0., y_coord, "Species {} : {}".format(isp + 1, sp.name))
-                Info_plot.text(0.0, y_coord - 0.5, "  No. of particles = {} ".format(sp.num))
-                Info_plot.text(0.0, y_coord - 1.,
-                               "  Temperature = {:.2f} {}".format(temp_mul * sp.temperature, temp_lbl))
-                y_coord -= 1.5
+        # Recalculate the slicing parameters if no_slices has been passed
+        self.slice_steps = int(self.no_dumps / self.no_slices)
 
-            y_coord -= 0.25
-            Info_plot.text(0., y_coord, "Total $N$ = {}".format(process.parameters.total_num_ptcls))
-            Info_plot.text(0., y_coord - 0.5, "Thermostat: {}".format(process.thermostat.type))
-            Info_plot.text(0., y_coord - 1., "Berendsen rate = {:.2f}".format(process.thermostat.relaxation_rate))
-            Info_plot.text(0., y_coord - 1.5, "Potential: {}".format(process.potential.type))
-            Info_plot.text(0., y_coord - 2., "Tot Force Error = {:.2e}".format(process.parameters.force_error))
-            delta_t = dt_mul * process.integrator.dt
-            Info_plot.text(0., y_coord - 2.5, "$\Delta t$ = {:.2f} {}".format(delta_t, dt_lbl))
-            Info_plot.text(0., y_coord - 3., "Step interval = {}".format(self.dump_step))
-            Info_plot.text(0., y_coord - 3.5,
-                           "Step interval time = {:.2f} {}".format(self.dump_step * delta_t, dt_lbl))
-            Info_plot.text(0., y_coord - 4., "Completed steps = {}".format(completed_steps))
-            Info_plot.text(0., y_coord - 4.5,
-                           "Completed time = {:.2f} {}".format(completed_steps * delta_t / dt_mul * time_mul, time_lbl))
-            Info_plot.text(0., y_coord - 5., "Total timesteps = {}".format(self.no_steps))
-            Info_plot.text(0., y_coord - 5.5,
-                           "Total time = {:.2f} {}".format(self.no_steps * delta_t / dt_mul * time_mul, time_lbl))
-            Info_plot.text(0., y_coord - 6.,
-                           "{:1.2f} % Completed".format(100 * completed_steps / self.no_steps))
-            Info_plot.axis('off')
+        start_slice = 0
+        end_slice = self.slice_steps * self.dump_step
+        # Initialize timer
+        t0 = self.timer.current()
 
-        if not publication:
-            fig.tight_layout()
+        ec_str = "Electric Current"
+        ec_acf_str = "Electric Current ACF"
 
-        # Saving
-        if figname:
-            fig.savefig(os.path.join(self.saving_dir, figname + '_' + self.job_id + '.png'))
-        else:
-            fig.savefig(os.path.join(self.saving_dir, 'Plot_EnsembleCheck_' + self.job_id + '.png'))
+        for isl in range(self.no_slices):
+            print("\nCalculating electric current and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
+            sp_current, time = self.read_species_current(start_slice, end_slice)
+            if isl == 0:
+                self.dataframe["Time"] = time
 
-        if show:
-            fig.show()
+            species_current, total_current = calc_elec_current(sp_current, self.species_charges)
 
-        # Restore the previous rcParams
-        plt.rcParams = current_rcParams
+            # # Store the data
+            for i, sp_name in enumerate(self.species_names):
+                col_str = "{} ".format(sp_name) + ec_str
+                self.dataframe[col_str + "_X_slice {}".format(isl)] = species_current[i, 0, :]
+                self.dataframe[col_str + "_Y_slice {}".format(isl)] = species_current[i, 1, :]
+                self.dataframe[col_str + "_Z_slice {}".format(isl)] = species_current[i, 2, :]
+                # Calculate ACF
+                sp_acf_xx = correlationfunction(species_current[i, 0, :], species_current[i, 0, :])
+                sp_acf_yy = correlationfunction(species_current[i, 1, :], species_current[i, 1, :])
+                sp_acf_zz = correlationfunction(species_current[i, 2, :], species_current[i, 2, :])
+                tot_acf = sp_acf_xx + sp_acf_yy + sp_acf_zz
+                col_str = "{} ".format(sp_name) + ec_acf_str
+                # Store ACF
+                self.dataframe[col_str + "_X_slice {}".format(isl)] = sp_acf_xx
+                self.dataframe[col_str + "_Y_slice {}".format(isl)] = sp_acf_yy
+                self.dataframe[col_str + "_Z_slice {}".format(isl)] = sp_acf_zz
+                self.dataframe[col_str + "_Total_slice {}".format(isl)] = tot_acf
+
+            # Total current and its ACF
+            self.dataframe[ec_str + "_X_slice {}".format(isl)] = total_current[ 0, :]
+            self.dataframe[ec_str + "_Y_slice {}".format(isl)] = total_current[ 1, :]
+            self.dataframe[ec_str + "_Z_slice {}".format(isl)] = total_current[ 2, :]
 
+            sp_acf_xx = correlationfunction(total_current[0, :], total_current[0, :])
+            sp_acf_yy = correlationfunction(total_current[1, :], total_current[1, :])
+            sp_acf_zz = correlationfunction(total_current[2, :], total_current[2, :])
+            tot_acf = sp_acf_xx + sp_acf_yy + sp_acf_zz
 
-class VelocityAutoCorrelationFunction(Observable):
-    """Velocity Auto-correlation function."""
+            self.dataframe[ec_acf_str + "_X_slice {}".format(isl)] = sp_acf_xx
+            self.dataframe[ec_acf_str + "_Y_slice {}".format(isl)] = sp_acf_yy
+            self.dataframe[ec_acf_str + "_Z_slice {}".format(isl)] = sp_acf_zz
+            self.dataframe[ec_acf_str + "_Total_slice {}".format(isl)] = tot_acf
 
-    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
+            start_slice += self.slice_steps * self.dump_step
+            end_slice += self.slice_steps * self.dump_step
+
+        # Average and std over the slices
+        for i, sp_name in enumerate(self.species_names):
+            col_str = "{} ".format(sp_name) + ec_str
+            xcol_str = [col_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
+            ycol_str = [col_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
+            zcol_str = [col_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+
+            self.dataframe[col_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
+            self.dataframe[col_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
+            self.dataframe[col_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
+            self.dataframe[col_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
+            self.dataframe[col_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
+            self.dataframe[col_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
+            # ACF averages
+            col_str = "{} ".format(sp_name) + ec_acf_str
+            xcol_str = [col_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
+            ycol_str = [col_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
+            zcol_str = [col_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+            tot_col_str = [col_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+
+            self.dataframe[col_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
+            self.dataframe[col_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
+            self.dataframe[col_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
+            self.dataframe[col_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
+            self.dataframe[col_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
+            self.dataframe[col_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
+            self.dataframe[col_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
+            self.dataframe[col_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
+
+        # Total
+        xcol_str = [ec_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
+        ycol_str = [ec_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
+        zcol_str = [ec_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+
+        self.dataframe[ec_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
+        self.dataframe[ec_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
+        self.dataframe[ec_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
+        self.dataframe[ec_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
+        self.dataframe[ec_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
+        self.dataframe[ec_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
+        # Total ACF
+        xcol_str = [ec_acf_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
+        ycol_str = [ec_acf_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
+        zcol_str = [ec_acf_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+        tot_col_str = [ec_acf_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+
+        self.dataframe[ec_acf_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
+        self.dataframe[ec_acf_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
+        self.dataframe[ec_acf_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
+        self.dataframe[ec_acf_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
+        self.dataframe[ec_acf_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
+        self.dataframe[ec_acf_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
+        self.dataframe[ec_acf_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
+        self.dataframe[ec_acf_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
+
+        # Create the columns for the HDF df
+        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+
+
+class RadialDistributionFunction(Observable):
+    """
+    Radial Distribution Function.
+
+    Attributes
+    ----------
+    no_bins : int
+        Number of bins.
+
+    dr_rdf : float
+        Size of each bin.
+
+    """
+
+    def setup(self, params, phase: str = None, **kwargs):
         """
         Assign attributes from simulation's parameters.
 
         Parameters
         ----------
-        no_slices : int
-            Number of independent runs inside a long simulation. Default = 1.
+        params : sarkas.core.Parameters
+            Simulation's parameters.
 
         phase : str, optional
             Phase to compute. Default = 'production'.
 
-        params : sarkas.core.Parameters
-            Simulation's parameters.
 
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
@@ -2176,15 +2718,11 @@ class VelocityAutoCorrelationFunction(Observable):
         if phase:
             self.phase = phase.lower()
 
-        if no_slices:
-            self.no_slices = no_slices
-
         super().setup_init(params, self.phase)
-        self.__name__ = 'vacf'
-        self.__long_name__ = 'Velocity AutoCorrelation Function'
+        self.__name__ = 'rdf'
+        self.__long_name__ = 'Radial Distribution Function'
 
-        # Create the directory where to store the computed data
-        saving_dir = os.path.join(self.postprocessing_dir, 'VelocityAutoCorrelationFunction')
+        saving_dir = os.path.join(self.postprocessing_dir, 'RadialDistributionFunction')
         if not os.path.exists(saving_dir):
             os.mkdir(saving_dir)
 
@@ -2192,18 +2730,24 @@ class VelocityAutoCorrelationFunction(Observable):
         if not os.path.exists(self.saving_dir):
             os.mkdir(self.saving_dir)
 
-        self.filename_hdf = os.path.join(self.saving_dir, "VelocityACF_" + self.job_id + '.h5')
+        self.filename_csv = os.path.join(self.saving_dir,
+                                         "RadialDistributionFunction_" + self.job_id + ".csv")
+
+        # These definitions are needed for the print out.
+        self.rc = self.cutoff_radius
+        self.no_bins = self.rdf_nbins
+        self.dr_rdf = self.rc / self.no_bins
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
-        #
 
-    def compute(self, **kwargs):
+    def compute(self, rdf_hist=None, **kwargs):
         """
-        Compute the velocity auto-correlation functions.
-
         Parameters
         ----------
+        rdf_hist : numpy.ndarray
+            Histogram of the radial distribution function.
+
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
@@ -2212,88 +2756,92 @@ class VelocityAutoCorrelationFunction(Observable):
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
-        self.dataframe = pd.DataFrame()
-        # Recalculate the slicing parameters if no_slices has been passed
-        self.slice_steps = int(self.no_dumps / self.no_slices)
 
-        start_slice = 0
-        end_slice = self.slice_steps * self.dump_step
-        time = np.zeros(self.slice_steps)
+        # initialize temporary arrays
+        r_values = np.zeros(self.no_bins)
+        bin_vol = np.zeros(self.no_bins)
+        pair_density = np.zeros((self.num_species, self.num_species))
+        gr = np.zeros((self.no_bins, self.no_obs))
 
-        vacf_str = 'VACF'
-        t0 = self.timer.current()
-        for isl in range(self.no_slices):
-            print("\nCalculating vacf for slice {}/{}.".format(isl + 1, self.no_slices))
-            # Parse the particles from the dump files
-            vel = np.zeros((self.dimensions, self.total_num_ptcls, self.slice_steps))
-            #
-            for it, dump in enumerate(tqdm(range(start_slice, end_slice, self.dump_step),
-                                           desc='Read in data',
-                                           disable=not self.verbose)):
-                datap = load_from_restart(self.dump_dir, dump)
-                time[it] = datap["time"]
-                vel[0, :, it] = datap["vel"][:, 0]
-                vel[1, :, it] = datap["vel"][:, 1]
-                vel[2, :, it] = datap["vel"][:, 2]
-            #
-            if isl == 0:
-                self.dataframe["Time"] = time
+        if not isinstance(rdf_hist, np.ndarray):
+            # The last dump of the production phase is a restart checkpoint, hence it contains the histogram
+            data = load_checkpoint(self.dump_dir, last_dump(self.dump_dir))
+            rdf_hist = data["rdf_hist"]
 
-            # Return an array of shape( num_species, dim + 1, slice_steps)
-            vacf = calc_vacf(vel, self.species_num)
+        # Make sure you are getting the right number of bins and redefine dr_rdf.
+        self.no_bins = rdf_hist.shape[0]
+        self.dr_rdf = self.rc / self.no_bins
 
-            for i, sp1 in enumerate(self.species_names):
-                sp_vacf_str = "{} ".format(sp1) + vacf_str
-                self.dataframe[sp_vacf_str + "_X_slice {}".format(isl)] = vacf[i, 0, :]
-                self.dataframe[sp_vacf_str + "_Y_slice {}".format(isl)] = vacf[i, 1, :]
-                self.dataframe[sp_vacf_str + "_Z_slice {}".format(isl)] = vacf[i, 2, :]
-                self.dataframe[sp_vacf_str + "_Total_slice {}".format(isl)] = vacf[i, 3, :]
+        t0 = self.timer.current()
+        # No. of pairs per volume
+        for i, sp1 in enumerate(self.species_num):
+            pair_density[i, i] = sp1 * (sp1 - 1) / self.box_volume
+            if self.num_species > 1:
+                for j, sp2 in enumerate(self.species_num[i + 1:], i + 1):
+                    pair_density[i, j] = sp1 * sp2 / self.box_volume
 
-            start_slice += self.slice_steps * self.dump_step
-            end_slice += self.slice_steps * self.dump_step
+        # Calculate the volume of each bin
+        sphere_shell_const = 4.0 * np.pi / 3.0
+        bin_vol[0] = sphere_shell_const * self.dr_rdf ** 3
+        for ir in range(1, self.no_bins):
+            r1 = ir * self.dr_rdf
+            r2 = (ir + 1) * self.dr_rdf
+            bin_vol[ir] = sphere_shell_const * (r2 ** 3 - r1 ** 3)
+            r_values[ir] = (ir + 0.5) * self.dr_rdf
 
-        # Average the stuff
+        # Save the ra values for simplicity
+        self.ra_values = r_values / self.a_ws
+
+        self.dataframe["Distance"] = r_values
+        gr_ij = 0
         for i, sp1 in enumerate(self.species_names):
-            sp_vacf_str = "{} ".format(sp1) + vacf_str
-            xcol_str = [sp_vacf_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
-            ycol_str = [sp_vacf_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
-            zcol_str = [sp_vacf_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
-            tot_col_str = [sp_vacf_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+            for j, sp2 in enumerate(self.species_names[i:], i):
+                denom_const = (pair_density[i, j] * self.production_steps)
+                gr[:, gr_ij] = (rdf_hist[:, i, j] + rdf_hist[:, j, i]) / denom_const / bin_vol[:]
 
-            self.dataframe[sp_vacf_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
-            self.dataframe[sp_vacf_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
-            self.dataframe[sp_vacf_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
-            self.dataframe[sp_vacf_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
-            self.dataframe[sp_vacf_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
-            self.dataframe[sp_vacf_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
-            self.dataframe[sp_vacf_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
-            self.dataframe[sp_vacf_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
+                self.dataframe['{}-{} RDF'.format(sp1, sp2)] = gr[:, gr_ij]
 
-        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+                gr_ij += 1
 
         tend = self.timer.current()
-        self.time_stamp("VACF Calculation", self.timer.time_division(tend - t0))
+        self.time_stamp('Radial Distribution Function Calculation', self.timer.time_division(tend - t0))
+        self.dataframe.to_csv(self.filename_csv, index=False, encoding='utf-8')
 
     def pretty_print(self):
-        """Print observable parameters for help in choice of simulation parameters."""
+        """Print radial distribution function calculation parameters for help in choice of simulation parameters."""
 
         print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
         print('Data saved in: \n', self.filename_csv)
-        print('Data accessible at: self.dataframe')
+        print('Data accessible at: self.ra_values, self.dataframe')
+        print('\nNo. bins = {}'.format(self.no_bins))
+        print('dr = {:1.4f} a_ws = {:1.4e} '.format(self.dr_rdf / self.a_ws, self.dr_rdf), end='')
+        print("[cm]" if self.units == "cgs" else "[m]")
+        print('Maximum Distance (i.e. potential.rc)= {:1.4f} a_ws = {:1.4e} '.format(
+            self.rc / self.a_ws, self.rc), end='')
+        print("[cm]" if self.units == "cgs" else "[m]")
 
-        print('\nNo. of slices = {}'.format(self.no_slices))
-        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
 
-        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
-            self.dt * self.slice_steps,
-            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+class StaticStructureFactor(Observable):
+    """
+    Static Structure Factors :math:`S_{ij}(k)`.
+
+    Attributes
+    ----------
+    k_list : list
+        List of all possible :math:`k` vectors with their corresponding magnitudes and indexes.
 
+    k_counts : numpy.ndarray
+        Number of occurrences of each :math:`k` magnitude.
 
-class DiffusionFlux(Observable):
-    """Diffusion Fluxes and their Auto-correlation functions."""
+    ka_values : numpy.ndarray
+        Magnitude of each allowed :math:`ka` vector.
 
-    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
+    no_ka_values: int
+        Length of ``ka_values`` array.
+
+    """
+
+    def setup(self, params, phase: str = None, **kwargs):
         """
         Assign attributes from simulation's parameters.
 
@@ -2305,9 +2853,6 @@ class DiffusionFlux(Observable):
         phase : str, optional
             Phase to compute. Default = 'production'.
 
-        no_slices : int
-            Number of independent runs inside a long simulation. Default = 1.
-
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
@@ -2317,19 +2862,14 @@ class DiffusionFlux(Observable):
         if phase:
             self.phase = phase.lower()
 
-        if no_slices:
-            self.no_slices = no_slices
-
+        self.k_observable = True
+        self.dump_fields = [['pos']]
         super().setup_init(params, self.phase)
 
-        self.__name__ = 'diff_flux'
-        self.__long_name__ = 'Diffusion Flux'
-
-        # if not hasattr(self, 'species_mass_densities'):
-        #     self.species_mass_densities = self.species_num_dens * self.species_masses
+        self.__name__ = 'ssf'
+        self.__long_name__ = 'Static Structure Function'
 
-        # Create the directory where to store the computed data
-        saving_dir = os.path.join(self.postprocessing_dir, 'DiffusionFlux')
+        saving_dir = os.path.join(self.postprocessing_dir, 'StaticStructureFunction')
         if not os.path.exists(saving_dir):
             os.mkdir(saving_dir)
 
@@ -2337,17 +2877,37 @@ class DiffusionFlux(Observable):
         if not os.path.exists(self.saving_dir):
             os.mkdir(self.saving_dir)
 
-        self.filename_hdf = os.path.join(self.saving_dir, "DiffusionFlux_" + self.job_id + '.h5')
+        # These calculation are needed for the io.postprocess_info().
+        # This is a hack and we need to find a faster way to do it
+        self.slice_steps = int((self.production_steps + 1) / (self.dump_step * self.no_slices))
+        self.no_dumps = int(self.slice_steps / self.prod_dump_step)
 
-        self.no_fluxes = self.num_species - 1
-        self.no_fluxes_acf = int(self.no_fluxes * self.no_fluxes)
+        self.parse_k_data()
+
+        self.filename_hdf = os.path.join(self.saving_dir, "StaticStructureFunction_" + self.job_id + ".h5")
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
+    def register(self, pipeline):
+        """
+        Register the density fluctuations of each dump. Shared with :class:`DynamicStructureFactor` in a :class:`FramePipeline`.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        if pipeline.insitu or not self.kt_file_current(self.nkt_hdf_file, 'nkt'):
+            self.add_accumulator(pipeline, 'nkt', ['pos'],
+                                 partial(nk_frame, k_list=self.k_list, species_np=self.species_num,
+                                         box_lengths=self.box_lengths),
+                                 ('nkt', self.k_list.tobytes()))
+
     def compute(self, **kwargs):
         """
-        Compute the velocity auto-correlation functions.
+        Calculate all :math:`S_{ij}(k)`, save them into a Pandas dataframe, and write them to a csv.
 
         Parameters
         ----------
@@ -2356,116 +2916,108 @@ class DiffusionFlux(Observable):
             attributes and/or add new ones.
 
         """
-        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
-        self.__dict__.update(kwargs.copy())
-
-        # Recalculate the slicing parameters if no_slices has been passed
-        self.slice_steps = int(self.no_dumps / self.no_slices)
 
-        start_slice = 0
-        end_slice = self.slice_steps * self.dump_step
-        time = np.zeros(self.slice_steps)
-        # Initialize timer
-        t0 = self.timer.current()
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
 
-        df_str = "Diffusion Flux"
-        df_acf_str = "Diffusion Flux ACF"
+        # Parse nkt otherwise calculate it
+        self.parse_k_data()  # repeat from setup in case parameters have been updated
+        self.parse_kt_data(nkt_flag=True)
+        # This re-initialization of the dataframe is needed to avoid len mismatch conflicts when re-calculating
+        self.dataframe = pd.DataFrame()
 
-        for isl in range(self.no_slices):
-            print("\nCalculating diffusion flux and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
-            # Parse the particles from the dump files
-            vel = np.zeros((self.dimensions, self.slice_steps, self.total_num_ptcls))
-            #
-            # print("\nParsing particles' velocities.")
-            for it, dump in enumerate(tqdm(range(start_slice, end_slice, self.dump_step),
-                                           desc='Read in data',
-                                           disable=not self.verbose)):
-                datap = load_from_restart(self.dump_dir, dump)
-                time[it] = datap["time"]
-                vel[0, it, :] = datap["vel"][:, 0]
-                vel[1, it, :] = datap["vel"][:, 1]
-                vel[2, it, :] = datap["vel"][:, 2]
-            #
-            if isl == 0:
-                self.dataframe["Time"] = time
+        no_dumps_calculated = self.slice_steps * self.no_slices
+        Sk_avg = np.zeros((self.no_obs, len(self.k_counts), no_dumps_calculated))
+        print("\nCalculating S(k) ...")
 
-            # This returns two arrays
-            # diff_fluxes = array of shape (no_fluxes, no_dim, no_dumps_per_slice)
-            # df_acf = array of shape (no_fluxes_acf, no_dim + 1, no_dumps_per_slice)
-            diff_fluxes, df_acf = calc_diff_flux_acf(vel,
-                                                     self.species_num,
-                                                     self.species_concentrations,
-                                                     self.species_masses)
+        tinit = self.timer.current()
+        nkt_df = pd.read_hdf(self.nkt_hdf_file, mode='r', key='nkt')
+        for isl in tqdm(range(self.no_slices)):
+            # Initialize container
+            nkt = np.zeros((self.num_species, self.slice_steps, len(self.k_list)), dtype=np.complex128)
+            for sp, sp_name in enumerate(self.species_names):
+                nkt[sp] = np.array(nkt_df["slice {}".format(isl + 1)][sp_name])
 
-            # # Store the data
-            for i, flux in enumerate(diff_fluxes):
-                self.dataframe[df_str + " {}_X_slice {}".format(i, isl)] = flux[0, :]
-                self.dataframe[df_str + " {}_Y_slice {}".format(i, isl)] = flux[1, :]
-                self.dataframe[df_str + " {}_Z_slice {}".format(i, isl)] = flux[2, :]
+            init = isl * self.slice_steps
+            fin = (isl + 1) * self.slice_steps
+            Sk_avg[:, :, init:fin] = calc_Sk(nkt, self.k_list, self.k_counts, self.species_num, self.slice_steps)
 
-            for i, flux_acf in enumerate(df_acf):
-                self.dataframe[df_acf_str + " {}_X_slice {}".format(i, isl)] = flux_acf[0, :]
-                self.dataframe[df_acf_str + " {}_Y_slice {}".format(i, isl)] = flux_acf[1, :]
-                self.dataframe[df_acf_str + " {}_Z_slice {}".format(i, isl)] = flux_acf[2, :]
-                self.dataframe[df_acf_str + " {}_Total_slice {}".format(i, isl)] = flux_acf[3, :]
+        Sk = np.mean(Sk_avg, axis=-1)
+        Sk_err = np.std(Sk_avg, axis=-1)
+        k_column = "Inverse Wavelength"
+        self.dataframe[k_column] = self.k_values
+        sp_indx = 0
+        for i, sp1 in enumerate(self.species_names):
+            for j, sp2 in enumerate(self.species_names[i:]):
+                column = "{}-{}_Mean".format(sp1, sp2)
+                err_column = "{}-{}_Std".format(sp1, sp2)
 
-            start_slice += self.slice_steps * self.dump_step
-            end_slice += self.slice_steps * self.dump_step
+                self.dataframe[column] = Sk[sp_indx, :]
+                self.dataframe[err_column] = Sk_err[sp_indx, :]
 
-        # Average and std over the slices
-        for i in range(self.no_fluxes):
-            xcol_str = [df_str + " {}_X_slice {}".format(i, isl) for isl in range(self.no_slices)]
-            ycol_str = [df_str + " {}_Y_slice {}".format(i, isl) for isl in range(self.no_slices)]
-            zcol_str = [df_str + " {}_Z_slice {}".format(i, isl) for isl in range(self.no_slices)]
+                sp_indx += 1
 
-            self.dataframe[df_str + " {}_X_Mean".format(i)] = self.dataframe[xcol_str].mean(axis=1)
-            self.dataframe[df_str + " {}_X_Std".format(i)] = self.dataframe[xcol_str].std(axis=1)
-            self.dataframe[df_str + " {}_Y_Mean".format(i)] = self.dataframe[ycol_str].mean(axis=1)
-            self.dataframe[df_str + " {}_Y_Std".format(i)] = self.dataframe[ycol_str].std(axis=1)
-            self.dataframe[df_str + " {}_Z_Mean".format(i)] = self.dataframe[zcol_str].mean(axis=1)
-            self.dataframe[df_str + " {}_Z_Std".format(i)] = self.dataframe[zcol_str].std(axis=1)
+        # Create the MultiIndex columns
+        tuples = [tuple(c.split("_")) for c in self.dataframe.columns]
+        self.dataframe.columns = pd.MultiIndex.from_tuples(tuples)
 
-        # Average and std over the slices
-        for i in range(self.no_fluxes_acf):
-            xcol_str = [df_acf_str + " {}_X_slice {}".format(i, isl) for isl in range(self.no_slices)]
-            ycol_str = [df_acf_str + " {}_Y_slice {}".format(i, isl) for isl in range(self.no_slices)]
-            zcol_str = [df_acf_str + " {}_Z_slice {}".format(i, isl) for isl in range(self.no_slices)]
-            tot_col_str = [df_acf_str + " {}_Total_slice {}".format(i, isl) for isl in range(self.no_slices)]
+        tend = self.timer.current()
+        self.time_stamp(self.__long_name__ + " Calculation", self.timer.time_division(tend - tinit))
 
-            self.dataframe[df_acf_str + " {}_X_Mean".format(i)] = self.dataframe[xcol_str].mean(axis=1)
-            self.dataframe[df_acf_str + " {}_X_Std".format(i)] = self.dataframe[xcol_str].std(axis=1)
-            self.dataframe[df_acf_str + " {}_Y_Mean".format(i)] = self.dataframe[ycol_str].mean(axis=1)
-            self.dataframe[df_acf_str + " {}_Y_Std".format(i)] = self.dataframe[ycol_str].std(axis=1)
-            self.dataframe[df_acf_str + " {}_Z_Mean".format(i)] = self.dataframe[zcol_str].mean(axis=1)
-            self.dataframe[df_acf_str + " {}_Z_Std".format(i)] = self.dataframe[zcol_str].std(axis=1)
-            self.dataframe[df_acf_str + " {}_Total_Mean".format(i)] = self.dataframe[tot_col_str].mean(axis=1)
-            self.dataframe[df_acf_str + " {}_Total_Std".format(i)] = self.dataframe[tot_col_str].std(axis=1)
+        # HDF will get huge if we don't remove
+        if os.path.exists(self.filename_hdf):
+            os.remove(self.filename_hdf)
 
-        # Create the columns for the HDF df
-        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
         self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
 
-        tend = self.timer.current()
-        self.time_stamp("Diffusion Flux and its ACF Calculation", self.timer.time_division(tend - t0))
-
     def pretty_print(self):
-        """Print observable parameters for help in choice of simulation parameters."""
+        """Print static structure factor calculation parameters for help in choice of simulation parameters."""
 
         print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('k wavevector information saved in: \n', self.k_file)
+        print('n(k,t) Data saved in: \n', self.nkt_hdf_file)
         print('Data saved in: \n', self.filename_hdf)
-        print('Data accessible at: self.dataframe')
+        print('Data accessible at: self.k_list, self.k_counts, self.ka_values, self.dataframe')
+        print('\nSmallest wavevector k_min = 2 pi / L = 3.9 / N^(1/3)')
+        print('k_min = {:.4f} / a_ws = {:.4e} '.format(self.ka_values[0], self.ka_values[0] / self.a_ws), end='')
+        print("[1/cm]" if self.units == "cgs" else "[1/m]")
 
-        print('\nNo. of slices = {}'.format(self.no_slices))
-        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
-        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
-            self.dt * self.slice_steps,
-            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+        print('\nAngle averaging choice: {}'.format(self.angle_averaging))
+        if self.angle_averaging == 'full':
+            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
+            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
+                                                              self.max_aa_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+        elif self.angle_averaging == 'custom':
+            print('\tMaximum angle averaged k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_aa_harmonics))
+            print('\tLargest angle averaged k_max = k_min * sqrt( n_x^2 + n_y^2 + n_z^2)')
+            print('\tAA k_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_aa_ka_value,
+                                                                 self.max_aa_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+
+            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
+            print('\tLargest wavector k_max = k_min * n_x')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
+                                                              self.max_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
+        elif self.angle_averaging == 'principal_axis':
+            print('\tMaximum k harmonics = n_x, n_y, n_z = {}, {}, {}'.format(*self.max_k_harmonics))
+            print('\tLargest wavector k_max = k_min * n_x')
+            print('\tk_max = {:.4f} / a_ws = {:1.4e} '.format(self.max_ka_value,
+                                                              self.max_ka_value / self.a_ws), end='')
+            print("[1/cm]" if self.units == "cgs" else "[1/m]")
 
+        print('\nTotal number of k values to calculate = {}'.format(len(self.k_list)))
+        print('No. of unique ka values to calculate = {}'.format(len(self.ka_values)))
 
-class PressureTensor(Observable):
-    """Diffusion Fluxes and their Auto-correlation functions."""
 
-    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
+class Thermodynamics(Observable):
+    """
+    Thermodynamic functions.
+    """
+
+    def setup(self, params, phase: str = None, **kwargs):
         """
         Assign attributes from simulation's parameters.
 
@@ -2477,9 +3029,6 @@ class PressureTensor(Observable):
         phase : str, optional
             Phase to compute. Default = 'production'.
 
-        no_slices : int
-            Number of independent runs inside a long simulation. Default = 1.
-
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
@@ -2489,1052 +3038,2333 @@ class PressureTensor(Observable):
         if phase:
             self.phase = phase.lower()
 
-        if no_slices:
-            self.no_slices = no_slices
-
         super().setup_init(params, self.phase)
+        self.__name__ = 'therm'
+        self.__long_name__ = 'Thermodynamics'
 
-        self.__name__ = 'pressure_tensor'
-        self.__long_name__ = 'Pressure Tensor'
-
-        # if not hasattr(self, 'species_mass_densities'):
-        #     self.species_mass_densities = self.species_num_dens * self.species_masses
-
-        # Create the directory where to store the computed data
-        saving_dir = os.path.join(self.postprocessing_dir, 'PressureTensor')
-        if not os.path.exists(saving_dir):
-            os.mkdir(saving_dir)
-
-        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
+        self.dataframe = pd.DataFrame()
 
-        self.filename_hdf = os.path.join(self.saving_dir, "PressureTensor_" + self.job_id + '.h5')
+        if params.load_method == "restart":
+            self.restart_sim = True
+        else:
+            self.restart_sim = False
 
-        self.no_fluxes = self.num_species - 1
-        self.no_fluxes_acf = int(self.no_fluxes * self.no_fluxes)
+        if self.phase.lower() == 'production':
+            self.saving_dir = self.production_dir
+        elif self.phase.lower() == 'equilibration':
+            self.saving_dir = self.equilibration_dir
+        elif self.phase.lower() == 'magnetization':
+            self.saving_dir = self.magnetization_dir
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
-    def compute(self, **kwargs):
+    def compute_pressure_from_rdf(self, r, gr, potential, potential_matrix, **kwargs):
         """
-        Compute the velocity auto-correlation functions.
+        Calculate the Pressure using the radial distribution function
 
         Parameters
         ----------
+        r : numpy.ndarray
+            Particles' distances.
+
+        gr : numpy.ndarray
+            Pair distribution function.
+
+        potential: str
+            Potential used in the simulation.
+
+        potential_matrix: numpy.ndarray
+            Potential parameters.
+
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
 
+        Returns
+        -------
+        pressure : float
+            Pressure divided by :math:`k_BT`.
+
         """
-        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
+        # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
 
-        # Recalculate the slicing parameters if no_slices has been passed
-        self.slice_steps = int(self.no_dumps / self.no_slices)
-
-        start_slice = 0
-        end_slice = self.slice_steps * self.dump_step
-        time = np.zeros(self.slice_steps)
-        # Initialize timer
-        t0 = self.timer.current()
-
-        pt_str = "Pressure Tensor"
-        pt_acf_str = "Pressure Tensor ACF"
+        r2 = r * r
+        r3 = r2 * r
 
-        for isl in range(self.no_slices):
-            print("\nCalculating pressure tensor and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
-            # Parse the particles from the dump files
-            pressure = np.zeros(self.slice_steps)
-            pressure_tensor_temp = np.zeros((self.dimensions, self.dimensions, self.slice_steps))
+        if potential.lower() == "coulomb":
+            dv_dr = - 1.0 / r2
+            # Check for finiteness of first element when r[0] = 0.0
+            if not np.isfinite(dv_dr[0]):
+                dv_dr[0] = dv_dr[1]
+            gr -= 1
+        elif potential.lower() == "yukawa":
+            pass
+        elif potential.lower() == "qsp":
+            pass
+        else:
+            raise ValueError('Unknown potential')
 
-            for it, dump in enumerate(tqdm(range(start_slice, end_slice, self.dump_step),
-                                           desc='Calculating Pressure',
-                                           disable=not self.verbose)):
-                datap = load_from_restart(self.dump_dir, dump)
-                time[it] = datap["time"]
+        # No. of independent g(r)
+        T = np.mean(self.dataframe["Temperature"])
+        pressure = self.kB * T - 2.0 / 3.0 * np.pi * self.species_num_dens[0] \
+                   * potential_matrix[0, 0, 0] * np.trapz(dv_dr * r3 * gr, x=r)
+        pressure *= self.species_num_dens[0]
 
-                pressure[it], pressure_tensor_temp[:, :, it] = calc_pressure_tensor(
-                    datap["pos"],
-                    datap["vel"],
-                    datap["acc"],
-                    self.species_masses,
-                    self.species_num,
-                    self.box_volume)
-            #
+        return pressure
 
-            if isl == 0:
-                self.dataframe["Time"] = time
+    def parse(self, phase=None):
+        """
+        Grab the pandas dataframe from the saved csv file or binary energy log.
+        """
+        if phase:
+            self.phase = phase.lower()
 
-            self.dataframe["Pressure_slice {}".format(isl)] = pressure
-            self.dataframe["Pressure ACF_slice {}".format(isl)] = correlationfunction(pressure, pressure)
-            # This is needed for the bulk viscosity
-            delta_pressure = pressure - pressure.mean()
-            self.dataframe["Delta Pressure_slice {}".format(isl)] = delta_pressure
-            self.dataframe["Delta Pressure ACF_slice {}".format(isl)] = correlationfunction(delta_pressure, delta_pressure)
+        if self.phase == 'equilibration':
+            self.dataframe = read_energy(self.eq_energy_filename)
+            self.fldr = self.equilibration_dir
+        elif self.phase == 'production':
+            self.dataframe = read_energy(self.prod_energy_filename)
+            self.fldr = self.production_dir
+        elif self.phase == 'magnetization':
+            self.dataframe = read_energy(self.mag_energy_filename)
+            self.fldr = self.magnetization_dir
 
-            if self.dimensions == 3:
-                dim_lbl = ['x', 'y', 'z']
-            elif self.dimensions == 2:
-                dim_lbl = ['x', 'y']
+    def statistics(self, quantity="Total Energy", max_no_divisions=100, show=False):
+        """
+        ToDo:
+        Parameters
+        ----------
+        quantity
+        max_no_divisions
+        show
 
-            # Calculate the acf of the pressure tensor
-            for i, ax1 in enumerate(dim_lbl):
-                for j, ax2 in enumerate(dim_lbl):
-                    self.dataframe[pt_str + " {}{}_slice {}".format(ax1, ax2, isl)] = pressure_tensor_temp[i, j, :]
+        Returns
+        -------
 
-                    pressure_tensor_acf_temp = correlationfunction(pressure_tensor_temp[i, j, :],
-                                                                   pressure_tensor_temp[i, j, :])
-                    self.dataframe[pt_acf_str + " {}{}_slice {}".format(ax1, ax2, isl)] = pressure_tensor_acf_temp
+        """
+        self.parse()
+        run_avg = self.dataframe[quantity].mean()
+        run_std = self.dataframe[quantity].std()
 
-            start_slice += self.slice_steps * self.dump_step
-            end_slice += self.slice_steps * self.dump_step
+        observable = np.array(self.dataframe[quantity])
+        # Loop over the blocks
+        tau_blk, sigma2_blk, statistical_efficiency = calc_statistical_efficiency(observable,
+                                                                                  run_avg, run_std,
+                                                                                  max_no_divisions, self.no_dumps)
+        # Plot the statistical efficiency
+        fig, ax = plt.subplots(1, 1, figsize=(10, 7))
+        ax.plot(1 / tau_blk[2:], statistical_efficiency[2:], '--o', label=quantity)
+        ax.grid(True, alpha=0.3)
+        ax.legend(loc='best')
+        ax.set_xscale('log')
+        ax.set_ylabel(r'$s(\tau_{\rm{blk}})$')
+        ax.set_xlabel(r'$1/\tau_{\rm{blk}}$')
+        fig.tight_layout()
+        fig.savefig(os.path.join(self.postproc_dir, quantity + 'StatisticalEfficiency_' + self.job_id + '.png'))
 
-        col_str = ["Pressure_slice {}".format(isl) for isl in range(self.no_slices)]
-        self.dataframe["Pressure_Mean"] = self.dataframe[col_str].mean(axis=1)
-        self.dataframe["Pressure_Std"] = self.dataframe[col_str].std(axis=1)
-        col_str = ["Pressure ACF_slice {}".format(isl) for isl in range(self.no_slices)]
-        self.dataframe["Pressure ACF_Mean"] = self.dataframe[col_str].mean(axis=1)
-        self.dataframe["Pressure ACF_Std"] = self.dataframe[col_str].std(axis=1)
+        if show:
+            fig.show()
 
-        col_str = ["Delta Pressure_slice {}".format(isl) for isl in range(self.no_slices)]
-        self.dataframe["Delta Pressure_Mean"] = self.dataframe[col_str].mean(axis=1)
-        self.dataframe["Delta Pressure_Std"] = self.dataframe[col_str].std(axis=1)
-        col_str = ["Delta Pressure ACF_slice {}".format(isl) for isl in range(self.no_slices)]
-        self.dataframe["Delta Pressure ACF_Mean"] = self.dataframe[col_str].mean(axis=1)
-        self.dataframe["Delta Pressure ACF_Std"] = self.dataframe[col_str].std(axis=1)
+    def temp_energy_plot(self, process,
+                         phase: str = None,
+                         show: bool = False,
+                         publication: bool = False,
+                         figname: str = None):
+        """
+        Plot Temperature and Energy as a function of time with their cumulative sum and average.
 
-        # Average and std over the slices
-        for i, ax1 in enumerate(dim_lbl):
-            for j, ax2 in enumerate(dim_lbl):
-                ij_col_str = [pt_str + " {}{}_slice {}".format(ax1, ax2, isl) for isl in range(self.no_slices)]
+        Parameters
+        ----------
+        process : sarkas.processes.PostProcess
+            Sarkas Process.
 
-                self.dataframe[pt_str + " {}{}_Mean".format(ax1, ax2)] = self.dataframe[ij_col_str].mean(axis=1)
-                self.dataframe[pt_str + " {}{}_Std".format(ax1, ax2)] = self.dataframe[ij_col_str].std(axis=1)
+        phase: str, optional
+            Phase to plot. "equilibration" or "production".
 
-                ij_col_acf_str = [pt_acf_str + " {}{}_slice {}".format(ax1, ax2, isl) for isl in range(self.no_slices)]
+        show: bool, optional
+            Flag for displaying the figure.
 
-                self.dataframe[pt_acf_str + " {}{}_Mean".format(ax1, ax2)] = self.dataframe[ij_col_acf_str].mean(axis=1)
-                self.dataframe[pt_acf_str + " {}{}_Std".format(ax1, ax2)] = self.dataframe[ij_col_acf_str].std(axis=1)
+        publication: bool, optional
+            Flag for publication style plotting.
 
-        # Create the columns for the HDF df
-        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
-        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+        figname: str, optional
+            Name with which to save the plot.
 
-        tend = self.timer.current()
-        self.time_stamp("Pressure Tensor and its ACF Calculation", self.timer.time_division(tend - t0))
+        """
 
-    def pretty_print(self):
-        """Print observable parameters for help in choice of simulation parameters."""
+        if phase:
+            phase = phase.lower()
+            self.phase = phase
+            if self.phase == 'equilibration':
+                self.no_dumps = self.eq_no_dumps
+                self.dump_dir = self.eq_dump_dir
+                self.dump_step = self.eq_dump_step
+                self.saving_dir = self.equilibration_dir
+                self.no_steps = self.equilibration_steps
+                self.parse(self.phase)
+                self.dataframe = self.dataframe.iloc[1:, :]
 
-        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
-        print('Data saved in: \n', self.filename_hdf)
-        print('Data accessible at: self.dataframe')
+            elif self.phase == 'production':
+                self.no_dumps = self.prod_no_dumps
+                self.dump_dir = self.prod_dump_dir
+                self.dump_step = self.prod_dump_step
+                self.saving_dir = self.production_dir
+                self.no_steps = self.production_steps
+                self.parse(self.phase)
 
-        print('\nNo. of slices = {}'.format(self.no_slices))
-        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
-        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
-            self.dt * self.slice_steps,
-            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+            elif self.phase == 'magnetization':
+                self.no_dumps = self.mag_no_dumps
+                self.dump_dir = self.mag_dump_dir
+                self.dump_step = self.mag_dump_step
+                self.saving_dir = self.magnetization_dir
+                self.no_steps = self.magnetization_steps
+                self.parse(self.phase)
 
+        else:
+            self.parse()
 
-class VelocityDistribution(Observable):
-    """
-    Moments of the velocity distributions defined as
+        completed_steps = self.dump_step * (self.no_dumps - 1)
+        fig = plt.figure(figsize=(20, 8))
+        fsz = 16
+        if publication:
 
-    .. math::
-        \\langle v^{\\alpha} \\rangle = \\int_{-\\infty}^{\\infty} d v \, f(v) v^{2 \\alpha}.
+            plt.style.use('PUBstyle')
+            gs = GridSpec(3, 7)
 
-    Attributes
-    ----------
-    no_bins: int
-        Number of bins used to calculate the velocity distribution.
+            # Temperature plots
+            T_delta_plot = fig.add_subplot(gs[0, 0:2])
+            T_main_plot = fig.add_subplot(gs[1:3, 0:2])
+            T_hist_plot = fig.add_subplot(gs[1:3, 2])
+            # Energy plots
+            E_delta_plot = fig.add_subplot(gs[0, 4:6])
+            E_main_plot = fig.add_subplot(gs[1:3, 4:6])
+            E_hist_plot = fig.add_subplot(gs[1:3, 6])
 
-    plots_dir: str
-        Directory in which to store Hermite coefficients plots.
+        else:
 
-    species_plots_dirs : list, str
-        Directory for each species where to save Hermite coefficients plots.
+            gs = GridSpec(4, 8)
 
-    max_no_moment: int
-        Maximum number of moments = :math:`\alpha`. Default = 3.
+            Info_plot = fig.add_subplot(gs[0:4, 0:2])
+            # Temperature plots
+            T_delta_plot = fig.add_subplot(gs[0, 2:4])
+            T_main_plot = fig.add_subplot(gs[1:4, 2:4])
+            T_hist_plot = fig.add_subplot(gs[1:4, 4])
+            # Energy plots
+            E_delta_plot = fig.add_subplot(gs[0, 5:7])
+            E_main_plot = fig.add_subplot(gs[1:4, 5:7])
+            E_hist_plot = fig.add_subplot(gs[1:4, 7])
+        # Grab the current rcParams so that I can restore it later
+        current_rcParams = plt.rcParams.copy()
+        # Update rcParams with the necessary values
+        plt.rc('font', size=fsz)  # controls default text sizes
+        plt.rc('axes', titlesize=fsz)  # fontsize of the axes title
+        plt.rc('axes', labelsize=fsz)  # fontsize of the x and y labels
+        plt.rc('xtick', labelsize=fsz - 2)  # fontsize of the tick labels
+        plt.rc('ytick', labelsize=fsz - 2)  # fontsize of the tick labels
 
-    """
+        # Grab the color line list from the plt cycler. I will used this in the hist plots
+        color_from_cycler = plt.rcParams['axes.prop_cycle'].by_key()["color"]
 
-    def setup(self,
-              params,
-              phase: str = None,
-              hist_kwargs: dict = None,
-              max_no_moment: int = 6,
-              curve_fit_kwargs: dict = None,
-              **kwargs):
+        # ------------------------------------------- Temperature -------------------------------------------#
+        # Calculate Temperature plot's labels and multipliers
+        time_mul, temp_mul, time_prefix, temp_prefix, time_lbl, temp_lbl = plot_labels(self.dataframe["Time"],
+                                                                                       self.dataframe["Temperature"],
+                                                                                       "Time",
+                                                                                       "Temperature", self.units)
+        # Rescale quantities
+        time = time_mul * self.dataframe["Time"]
+        Temperature = temp_mul * self.dataframe["Temperature"]
+        T_desired = temp_mul * self.T_desired
+
+        # Temperature moving average
+        T_cumavg = Temperature.expanding().mean()
+
+        # Temperature deviation and its moving average
+        Delta_T = (Temperature - T_desired) * 100 / T_desired
+        Delta_T_cum_avg = Delta_T.expanding().mean()
+
+        # Temperature Main plot
+        T_main_plot.plot(time, Temperature, alpha=0.7)
+        T_main_plot.plot(time, T_cumavg, label='Moving Average')
+        T_main_plot.axhline(T_desired, ls='--', c='r', alpha=0.7, label='Desired T')
+        T_main_plot.legend(loc='best')
+        T_main_plot.set(ylabel="Temperature" + temp_lbl, xlabel="Time" + time_lbl)
+
+        # Temperature Deviation plot
+        T_delta_plot.plot(time, Delta_T, alpha=0.5)
+        T_delta_plot.plot(time, Delta_T_cum_avg, alpha=0.8)
+        T_delta_plot.set(xticks=[], ylabel=r'Deviation [%]')
+
+        # This was a failed attempt to calculate the theoretical Temperature distribution.
+        # Gaussian
+        T_dist = scp_stats.norm(loc=T_desired, scale=Temperature.std())
+        # Histogram plot
+        sns.histplot(y=Temperature,
+                     bins='auto',
+                     stat='density',
+                     alpha=0.75,
+                     legend='False',
+                     ax=T_hist_plot)
+        T_hist_plot.set(ylabel=None, xlabel=None, xticks=[], yticks=[])
+        T_hist_plot.plot(T_dist.pdf(Temperature), Temperature, color=color_from_cycler[1])
+
+        # ------------------------------------------- Total Energy -------------------------------------------#
+        # Calculate Energy plot's labels and multipliers
+        time_mul, energy_mul, _, _, time_lbl, energy_lbl = plot_labels(self.dataframe["Time"],
+                                                                       self.dataframe["Total Energy"],
+                                                                       "Time",
+                                                                       "Energy",
+                                                                       self.units)
+
+        Energy = energy_mul * self.dataframe["Total Energy"]
+        # Total Energy moving average
+        E_cumavg = Energy.expanding().mean()
+        # Total Energy Deviation and its moving average
+        Delta_E = (Energy - Energy.iloc[0]) * 100 / Energy.iloc[0]
+        Delta_E_cum_avg = Delta_E.expanding().mean()
+
+        # Energy main plot
+        E_main_plot.plot(time, Energy, alpha=0.7)
+        E_main_plot.plot(time, E_cumavg, label='Moving Average')
+        E_main_plot.axhline(Energy.mean(), ls='--', c='r', alpha=0.7, label='Avg')
+        E_main_plot.legend(loc='best')
+        E_main_plot.set(ylabel="Total Energy" + energy_lbl, xlabel="Time" + time_lbl)
+
+        # Deviation Plot
+        E_delta_plot.plot(time, Delta_E, alpha=0.5)
+        E_delta_plot.plot(time, Delta_E_cum_avg, alpha=0.8)
+        E_delta_plot.set(xticks=[], ylabel=r'Deviation [%]')
+
+        # (Failed) Attempt to calculate the theoretical Energy distribution
+        # In an NVT ensemble Energy fluctuation are given by sigma(E) = sqrt( k_B T^2 C_v)
+        # where C_v is the isothermal heat capacity
+        # Since this requires a lot of prior calculation I skip it and just make a Gaussian
+        E_dist = scp_stats.norm(loc=Energy.mean(), scale=Energy.std())
+        # Histogram plot
+        sns.histplot(y=Energy,
+                     bins='auto',
+                     stat='density',
+                     alpha=0.75,
+                     legend='False',
+                     ax=E_hist_plot)
+        # Grab the second color since the first is used for histplot
+        E_hist_plot.plot(E_dist.pdf(Energy), Energy, color=color_from_cycler[1])
+
+        E_hist_plot.set(ylabel=None, xlabel=None, xticks=[], yticks=[])
+
+        if not publication:
+            dt_mul, _, _, _, dt_lbl, _ = plot_labels(process.integrator.dt,
+                                                     self.dataframe["Total Energy"],
+                                                     "Time",
+                                                     "Energy",
+                                                     self.units)
+            # Information section
+            Info_plot.axis([0, 10, 0, 10])
+            Info_plot.grid(False)
+
+            Info_plot.text(0., 10, "Job ID: {}".format(self.job_id))
+            Info_plot.text(0., 9.5, "Phase: {}".format(self.phase.capitalize()))
+            Info_plot.text(0., 9.0, "No. of species = {}".format(len(self.species_num)))
+            y_coord = 8.5
+            for isp, sp in enumerate(process.species):
+                Info_plot.text(0., y_coord, "Species {} : {}".format(isp + 1, sp.name))
+                Info_plot.text(0.0, y_coord - 0.5, "  No. of particles = {} ".format(sp.num))
+                Info_plot.text(0.0, y_coord - 1.,
+                               "  Temperature = {:.2f} {}".format(temp_mul * sp.temperature, temp_lbl))
+                y_coord -= 1.5
+
+            y_coord -= 0.25
+            Info_plot.text(0., y_coord, "Total $N$ = {}".format(process.parameters.total_num_ptcls))
+            Info_plot.text(0., y_coord - 0.5, "Thermostat: {}".format(process.thermostat.type))
+            Info_plot.text(0., y_coord - 1., "Berendsen rate = {:.2f}".format(process.thermostat.relaxation_rate))
+            Info_plot.text(0., y_coord - 1.5, "Potential: {}".format(process.potential.type))
+            Info_plot.text(0., y_coord - 2., "Tot Force Error = {:.2e}".format(process.parameters.force_error))
+            delta_t = dt_mul * process.integrator.dt
+            Info_plot.text(0., y_coord - 2.5, "$\Delta t$ = {:.2f} {}".format(delta_t, dt_lbl))
+            Info_plot.text(0., y_coord - 3., "Step interval = {}".format(self.dump_step))
+            Info_plot.text(0., y_coord - 3.5,
+                           "Step interval time = {:.2f} {}".format(self.dump_step * delta_t, dt_lbl))
+            Info_plot.text(0., y_coord - 4., "Completed steps = {}".format(completed_steps))
+            Info_plot.text(0., y_coord - 4.5,
+                           "Completed time = {:.2f} {}".format(completed_steps * delta_t / dt_mul * time_mul, time_lbl))
+            Info_plot.text(0., y_coord - 5., "Total timesteps = {}".format(self.no_steps))
+            Info_plot.text(0., y_coord - 5.5,
+                           "Total time = {:.2f} {}".format(self.no_steps * delta_t / dt_mul * time_mul, time_lbl))
+            Info_plot.text(0., y_coord - 6.,
+                           "{:1.2f} % Completed".format(100 * completed_steps / self.no_steps))
+            Info_plot.axis('off')
+
+        if not publication:
+            fig.tight_layout()
 
+        # Saving
+        if figname:
+            fig.savefig(os.path.join(self.saving_dir, figname + '_' + self.job_id + '.png'))
+        else:
+            fig.savefig(os.path.join(self.saving_dir, 'Plot_EnsembleCheck_' + self.job_id + '.png'))
+
+        if show:
+            fig.show()
+
+        # Restore the previous rcParams
+        plt.rcParams = current_rcParams
+
+
+class VelocityAutoCorrelationFunction(Observable):
+    """Velocity Auto-correlation function."""
+
+    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
         """
         Assign attributes from simulation's parameters.
 
         Parameters
         ----------
-        params : sarkas.core.Parameters
-            Simulation's parameters.
+        no_slices : int
+            Number of independent runs inside a long simulation. Default = 1.
 
         phase : str, optional
             Phase to compute. Default = 'production'.
 
-        max_no_moment : int
-            Maximum number of moments to calculate. Default = 6.
-
-        hist_kwargs : dict, optional
-            Dictionary of keyword arguments to pass to ``np.histogram`` for the calculation of the distributions.
-
-        curve_fit_kwargs: dict, optional
-            Dictionary of keyword arguments to pass to ``scipy.curve_fit`` for fitting of Hermite coefficients.
+        params : sarkas.core.Parameters
+            Simulation's parameters.
 
         **kwargs :
             These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
             attributes and/or add new ones.
 
+        Raises
+        ------
+        ValueError
+            If ``insitu`` is set without ``acf_method: multiple_tau``.
+
         """
 
-        if curve_fit_kwargs:
-            self.curve_fit_kwargs = curve_fit_kwargs
-
         if phase:
             self.phase = phase.lower()
 
+        if no_slices:
+            self.no_slices = no_slices
+
+        # In situ the default method would have to store the velocities of every computation, as many as the dumps
+        if self.insitu and self.acf_method != 'multiple_tau':
+            raise ValueError("VelocityAutoCorrelationFunction can be computed in situ only with "
+                             "acf_method: multiple_tau.")
+
+        self.dump_fields = [['vel']]
         super().setup_init(params, self.phase)
-        self.__name__ = 'vd'
-        self.__long_name__ = 'Velocity Distribution'
+        self.__name__ = 'vacf'
+        self.__long_name__ = 'Velocity AutoCorrelation Function'
+
+        # Create the directory where to store the computed data
+        saving_dir = os.path.join(self.postprocessing_dir, 'VelocityAutoCorrelationFunction')
+        if not os.path.exists(saving_dir):
+            os.mkdir(saving_dir)
+
+        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
+
+        self.filename_hdf = os.path.join(self.saving_dir, "VelocityACF_" + self.job_id + '.h5')
 
         # Update the attribute with the passed arguments
         self.__dict__.update(kwargs.copy())
-        # Check on hist_kwargs
-        if hist_kwargs:
-            # Is it a dictionary ?
-            assert isinstance(hist_kwargs, dict), 'hist_kwargs not a dictionary. Please pass a dictionary.'
-            self.hist_kwargs = hist_kwargs
-        # Default number of moments to calculate
-        self.max_no_moment = max_no_moment
+        #
+
+    def register(self, pipeline):
+        """
+        Register the multiple-tau correlator of the velocities in a :class:`FramePipeline`. The default method
+        registers nothing: it reads the velocities of one slice at a time in :meth:`compute`, so that only one slice
+        is in memory and the raw binary trajectories are memory mapped instead of copied.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        if self.acf_method == 'multiple_tau':
+            self.add_correlator(pipeline)
+
+    def acf_channels(self):
+        """
+        Velocity of each particle for the multiple-tau correlator, correlated into the VACF of its species.
+        See :meth:`Observable.acf_channels`.
+
+        """
+        channels = np.arange(self.total_num_ptcls * 3)
+        species = np.repeat(np.arange(self.num_species), self.species_num)
+        output = np.repeat(species, 3) * 3 + np.tile(np.arange(3), self.total_num_ptcls)
+
+        return ['vel'], velocity_acf_frame, channels, channels, output, False
+
+    def acf_columns(self, cf, correlator):
+        """
+        VACF columns from the multiple-tau correlator. See :meth:`Observable.acf_columns`.
+
+        """
+        vacf = cf.reshape(self.num_species, 3, -1) / np.asarray(self.species_num)[:, np.newaxis, np.newaxis]
+
+        columns = {}
+        for i, sp1 in enumerate(self.species_names):
+            sp_vacf_str = "{} VACF".format(sp1)
+            for d, ax in enumerate(['X', 'Y', 'Z']):
+                columns[sp_vacf_str + "_{}_Mean".format(ax)] = vacf[i, d]
+            columns[sp_vacf_str + "_Total_Mean"] = vacf[i].sum(axis=0)
+
+        return columns
+
+    def compute(self, **kwargs):
+        """
+        Compute the velocity auto-correlation functions.
+
+        Parameters
+        ----------
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
+
+        if self.acf_method == 'multiple_tau':
+            self.compute_multiple_tau()
+            return
+        self.dataframe = pd.DataFrame()
+        # Recalculate the slicing parameters if no_slices has been passed
+        self.slice_steps = int(self.no_dumps / self.no_slices)
+
+        start_slice = 0
+        end_slice = self.slice_steps * self.dump_step
+
+        vacf_str = 'VACF'
+        t0 = self.timer.current()
+        for isl in range(self.no_slices):
+            print("\nCalculating vacf for slice {}/{}.".format(isl + 1, self.no_slices))
+            # Parse the particles' velocities from the dumps. Shape = (dimensions, particles, dumps).
+            # Raw binary trajectories are memory mapped and not copied.
+            vel, time = read_dumps(self.dump_dir, 'vel', start_slice, end_slice, self.dump_step)
+            vel = np.asarray(vel).transpose(2, 1, 0)
+            #
+            if isl == 0:
+                self.dataframe["Time"] = time
+
+            # Return an array of shape( num_species, dim + 1, slice_steps)
+            vacf = calc_vacf(vel, self.species_num)
+
+            for i, sp1 in enumerate(self.species_names):
+                sp_vacf_str = "{} ".format(sp1) + vacf_str
+                self.dataframe[sp_vacf_str + "_X_slice {}".format(isl)] = vacf[i, 0, :]
+                self.dataframe[sp_vacf_str + "_Y_slice {}".format(isl)] = vacf[i, 1, :]
+                self.dataframe[sp_vacf_str + "_Z_slice {}".format(isl)] = vacf[i, 2, :]
+                self.dataframe[sp_vacf_str + "_Total_slice {}".format(isl)] = vacf[i, 3, :]
+
+            start_slice += self.slice_steps * self.dump_step
+            end_slice += self.slice_steps * self.dump_step
+
+        # Average the stuff
+        for i, sp1 in enumerate(self.species_names):
+            sp_vacf_str = "{} ".format(sp1) + vacf_str
+            xcol_str = [sp_vacf_str + "_X_slice {}".format(isl) for isl in range(self.no_slices)]
+            ycol_str = [sp_vacf_str + "_Y_slice {}".format(isl) for isl in range(self.no_slices)]
+            zcol_str = [sp_vacf_str + "_Z_slice {}".format(isl) for isl in range(self.no_slices)]
+            tot_col_str = [sp_vacf_str + "_Total_slice {}".format(isl) for isl in range(self.no_slices)]
+
+            self.dataframe[sp_vacf_str + "_X_Mean"] = self.dataframe[xcol_str].mean(axis=1)
+            self.dataframe[sp_vacf_str + "_X_Std"] = self.dataframe[xcol_str].std(axis=1)
+            self.dataframe[sp_vacf_str + "_Y_Mean"] = self.dataframe[ycol_str].mean(axis=1)
+            self.dataframe[sp_vacf_str + "_Y_Std"] = self.dataframe[ycol_str].std(axis=1)
+            self.dataframe[sp_vacf_str + "_Z_Mean"] = self.dataframe[zcol_str].mean(axis=1)
+            self.dataframe[sp_vacf_str + "_Z_Std"] = self.dataframe[zcol_str].std(axis=1)
+            self.dataframe[sp_vacf_str + "_Total_Mean"] = self.dataframe[tot_col_str].mean(axis=1)
+            self.dataframe[sp_vacf_str + "_Total_Std"] = self.dataframe[tot_col_str].std(axis=1)
+
+        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+
+        tend = self.timer.current()
+        self.time_stamp("VACF Calculation", self.timer.time_division(tend - t0))
+
+    def pretty_print(self):
+        """Print observable parameters for help in choice of simulation parameters."""
+
+        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('Data saved in: \n', self.filename_csv)
+        print('Data accessible at: self.dataframe')
+
+        print('\nNo. of slices = {}'.format(self.no_slices))
+        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
+
+        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
+            self.dt * self.slice_steps,
+            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+
+
+class DiffusionFlux(Observable):
+    """Diffusion Fluxes and their Auto-correlation functions."""
+
+    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
+        """
+        Assign attributes from simulation's parameters.
+
+        Parameters
+        ----------
+        params : sarkas.core.Parameters
+            Simulation's parameters.
+
+        phase : str, optional
+            Phase to compute. Default = 'production'.
+
+        no_slices : int
+            Number of independent runs inside a long simulation. Default = 1.
+
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+
+        if phase:
+            self.phase = phase.lower()
+
+        if no_slices:
+            self.no_slices = no_slices
+
+        self.dump_fields = [['species_current'], ['vel']]
+        super().setup_init(params, self.phase)
+
+        self.__name__ = 'diff_flux'
+        self.__long_name__ = 'Diffusion Flux'
+
+        # if not hasattr(self, 'species_mass_densities'):
+        #     self.species_mass_densities = self.species_num_dens * self.species_masses
 
         # Create the directory where to store the computed data
-        # First the name of the observable
-        saving_dir = os.path.join(self.postprocessing_dir, 'VelocityDistribution')
+        saving_dir = os.path.join(self.postprocessing_dir, 'DiffusionFlux')
         if not os.path.exists(saving_dir):
             os.mkdir(saving_dir)
-        # then the phase
+
         self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
 
-        self.adjusted_dump_dir = []
+        self.filename_hdf = os.path.join(self.saving_dir, "DiffusionFlux_" + self.job_id + '.h5')
 
-        if self.multi_run_average:
-            for r in range(self.runs):
-                # Direct to the correct dumps directory
-                dump_dir = os.path.join('run{}'.format(r), os.path.join('Simulation',
-                                                                        os.path.join(self.phase.capitalize(), 'dumps')))
-                dump_dir = os.path.join(self.simulations_dir, dump_dir)
-                self.adjusted_dump_dir.append(dump_dir)
-            # Re-path the saving directory
-            saving_dir = os.path.join(self.simulations_dir, 'PostProcessing')
-            if not os.path.exists(saving_dir):
-                os.mkdir(saving_dir)
-            saving_dir = os.path.join(saving_dir, self.phase.capitalize())
-            if not os.path.exists(saving_dir):
-                os.mkdir(saving_dir)
-            self.saving_dir = os.path.join(saving_dir, 'VelocityDistribution')
-        else:
-            self.adjusted_dump_dir = [self.dump_dir]
+        self.no_fluxes = self.num_species - 1
+        self.no_fluxes_acf = int(self.no_fluxes * self.no_fluxes)
+
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
+
+    def register(self, pipeline):
+        """
+        Register the current of each species in each dump. Shared with :class:`ElectricCurrent` in a :class:`FramePipeline`.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        if self.acf_method == 'multiple_tau':
+            self.add_correlator(pipeline)
+            return
+
+        self.add_accumulator(pipeline, 'species_current', self.stream_fields,
+                             partial(species_current_frame, species_np=self.species_num), ('species_current',))
+
+    def acf_channels(self):
+        """
+        Relative diffusion fluxes for the multiple-tau correlator. See :meth:`Observable.acf_channels`.
+
+        """
+        no_fluxes = self.num_species - 1
+        i, j, d = np.meshgrid(np.arange(no_fluxes), np.arange(no_fluxes), np.arange(3), indexing='ij')
+        first = (i * 3 + d).ravel()
+        second = (j * 3 + d).ravel()
+        output = np.arange(no_fluxes * no_fluxes * 3)
+        func = partial(diffusion_flux_acf_frame, species_np=self.species_num,
+                       species_conc=self.species_concentrations, species_mass=self.species_masses)
+
+        return self.stream_fields, func, first, second, output, False
+
+    def acf_columns(self, cf, correlator):
+        """
+        Diffusion flux ACF columns from the multiple-tau correlator. See :meth:`Observable.acf_columns`.
+
+        """
+        cf = cf.reshape((self.num_species - 1) ** 2, 3, -1)
+
+        columns = {}
+        for i, flux_acf in enumerate(cf):
+            for d, ax in enumerate(['X', 'Y', 'Z']):
+                columns["Diffusion Flux ACF {}_{}_Mean".format(i, ax)] = flux_acf[d]
+            columns["Diffusion Flux ACF {}_Total_Mean".format(i)] = flux_acf.sum(axis=0)
+
+        return columns
+
+    def compute(self, **kwargs):
+        """
+        Compute the velocity auto-correlation functions.
+
+        Parameters
+        ----------
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
+        self.__dict__.update(kwargs.copy())
+
+        if self.acf_method == 'multiple_tau':
+            self.compute_multiple_tau()
+            return
+
+        # Recalculate the slicing parameters if no_slices has been passed
+        self.slice_steps = int(self.no_dumps / self.no_slices)
+
+        start_slice = 0
+        end_slice = self.slice_steps * self.dump_step
+        # Initialize timer
+        t0 = self.timer.current()
+
+        df_str = "Diffusion Flux"
+        df_acf_str = "Diffusion Flux ACF"
+
+        for isl in range(self.no_slices):
+            print("\nCalculating diffusion flux and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
+            sp_current, time = self.read_species_current(start_slice, end_slice)
+            if isl == 0:
+                self.dataframe["Time"] = time
+
+            # This returns two arrays
+            # diff_fluxes = array of shape (no_fluxes, no_dim, no_dumps_per_slice)
+            # df_acf = array of shape (no_fluxes_acf, no_dim + 1, no_dumps_per_slice)
+            diff_fluxes, df_acf = calc_diff_flux_acf(sp_current,
+                                                     self.species_concentrations,
+                                                     self.species_masses)
+
+            # # Store the data
+            for i, flux in enumerate(diff_fluxes):
+                self.dataframe[df_str + " {}_X_slice {}".format(i, isl)] = flux[0, :]
+                self.dataframe[df_str + " {}_Y_slice {}".format(i, isl)] = flux[1, :]
+                self.dataframe[df_str + " {}_Z_slice {}".format(i, isl)] = flux[2, :]
+
+            for i, flux_acf in enumerate(df_acf):
+                self.dataframe[df_acf_str + " {}_X_slice {}".format(i, isl)] = flux_acf[0, :]
+                self.dataframe[df_acf_str + " {}_Y_slice {}".format(i, isl)] = flux_acf[1, :]
+                self.dataframe[df_acf_str + " {}_Z_slice {}".format(i, isl)] = flux_acf[2, :]
+                self.dataframe[df_acf_str + " {}_Total_slice {}".format(i, isl)] = flux_acf[3, :]
+
+            start_slice += self.slice_steps * self.dump_step
+            end_slice += self.slice_steps * self.dump_step
+
+        # Average and std over the slices
+        for i in range(self.no_fluxes):
+            xcol_str = [df_str + " {}_X_slice {}".format(i, isl) for isl in range(self.no_slices)]
+            ycol_str = [df_str + " {}_Y_slice {}".format(i, isl) for isl in range(self.no_slices)]
+            zcol_str = [df_str + " {}_Z_slice {}".format(i, isl) for isl in range(self.no_slices)]
+
+            self.dataframe[df_str + " {}_X_Mean".format(i)] = self.dataframe[xcol_str].mean(axis=1)
+            self.dataframe[df_str + " {}_X_Std".format(i)] = self.dataframe[xcol_str].std(axis=1)
+            self.dataframe[df_str + " {}_Y_Mean".format(i)] = self.dataframe[ycol_str].mean(axis=1)
+            self.dataframe[df_str + " {}_Y_Std".format(i)] = self.dataframe[ycol_str].std(axis=1)
+            self.dataframe[df_str + " {}_Z_Mean".format(i)] = self.dataframe[zcol_str].mean(axis=1)
+            self.dataframe[df_str + " {}_Z_Std".format(i)] = self.dataframe[zcol_str].std(axis=1)
+
+        # Average and std over the slices
+        for i in range(self.no_fluxes_acf):
+            xcol_str = [df_acf_str + " {}_X_slice {}".format(i, isl) for isl in range(self.no_slices)]
+            ycol_str = [df_acf_str + " {}_Y_slice {}".format(i, isl) for isl in range(self.no_slices)]
+            zcol_str = [df_acf_str + " {}_Z_slice {}".format(i, isl) for isl in range(self.no_slices)]
+            tot_col_str = [df_acf_str + " {}_Total_slice {}".format(i, isl) for isl in range(self.no_slices)]
+
+            self.dataframe[df_acf_str + " {}_X_Mean".format(i)] = self.dataframe[xcol_str].mean(axis=1)
+            self.dataframe[df_acf_str + " {}_X_Std".format(i)] = self.dataframe[xcol_str].std(axis=1)
+            self.dataframe[df_acf_str + " {}_Y_Mean".format(i)] = self.dataframe[ycol_str].mean(axis=1)
+            self.dataframe[df_acf_str + " {}_Y_Std".format(i)] = self.dataframe[ycol_str].std(axis=1)
+            self.dataframe[df_acf_str + " {}_Z_Mean".format(i)] = self.dataframe[zcol_str].mean(axis=1)
+            self.dataframe[df_acf_str + " {}_Z_Std".format(i)] = self.dataframe[zcol_str].std(axis=1)
+            self.dataframe[df_acf_str + " {}_Total_Mean".format(i)] = self.dataframe[tot_col_str].mean(axis=1)
+            self.dataframe[df_acf_str + " {}_Total_Std".format(i)] = self.dataframe[tot_col_str].std(axis=1)
+
+        # Create the columns for the HDF df
+        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+
+        tend = self.timer.current()
+        self.time_stamp("Diffusion Flux and its ACF Calculation", self.timer.time_division(tend - t0))
+
+    def pretty_print(self):
+        """Print observable parameters for help in choice of simulation parameters."""
+
+        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('Data saved in: \n', self.filename_hdf)
+        print('Data accessible at: self.dataframe')
+
+        print('\nNo. of slices = {}'.format(self.no_slices))
+        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
+        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
+            self.dt * self.slice_steps,
+            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+
+
+class PressureTensor(Observable):
+    """Diffusion Fluxes and their Auto-correlation functions."""
+
+    def setup(self, params, phase: str = None, no_slices: int = None, **kwargs):
+        """
+        Assign attributes from simulation's parameters.
+
+        Parameters
+        ----------
+        params : sarkas.core.Parameters
+            Simulation's parameters.
+
+        phase : str, optional
+            Phase to compute. Default = 'production'.
+
+        no_slices : int
+            Number of independent runs inside a long simulation. Default = 1.
+
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+
+        if phase:
+            self.phase = phase.lower()
+
+        if no_slices:
+            self.no_slices = no_slices
+
+        super().setup_init(params, self.phase)
+
+        self.__name__ = 'pressure_tensor'
+        self.__long_name__ = 'Pressure Tensor'
+
+        # if not hasattr(self, 'species_mass_densities'):
+        #     self.species_mass_densities = self.species_num_dens * self.species_masses
+
+        # Create the directory where to store the computed data
+        saving_dir = os.path.join(self.postprocessing_dir, 'PressureTensor')
+        if not os.path.exists(saving_dir):
+            os.mkdir(saving_dir)
+
+        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
+
+        self.filename_hdf = os.path.join(self.saving_dir, "PressureTensor_" + self.job_id + '.h5')
+
+        self.no_fluxes = self.num_species - 1
+        self.no_fluxes_acf = int(self.no_fluxes * self.no_fluxes)
+
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
+
+    def register(self, pipeline):
+        """
+        Register the pressure tensor of each dump in a :class:`FramePipeline`.
+
+        Parameters
+        ----------
+        pipeline : sarkas.tools.observables.FramePipeline
+            Pipeline of the post-processing.
+
+        """
+        if self.acf_method == 'multiple_tau':
+            self.add_correlator(pipeline)
+            return
+
+        self.add_accumulator(pipeline, 'pressure', ['pos', 'vel', 'acc'],
+                             partial(pressure_frame, species_mass=self.species_masses, species_np=self.species_num,
+                                     box_volume=self.box_volume))
+
+    def acf_channels(self):
+        """
+        Pressure and pressure tensor for the multiple-tau correlator. See :meth:`Observable.acf_channels`.
+
+        """
+        channels = np.arange(10)
+        func = partial(pressure_acf_frame, species_mass=self.species_masses, species_np=self.species_num,
+                       box_volume=self.box_volume)
+
+        return ['pos', 'vel', 'acc'], func, channels, channels, channels, True
+
+    def acf_columns(self, cf, correlator):
+        """
+        Pressure ACF columns from the multiple-tau correlator. See :meth:`Observable.acf_columns`.
+
+        """
+        dim_lbl = ['x', 'y', 'z'][:self.dimensions]
+        _, delta_cf = correlator.fluctuation_result()
+
+        columns = {"Pressure ACF_Mean": cf[0], "Delta Pressure ACF_Mean": delta_cf[0]}
+        for i, ax1 in enumerate(dim_lbl):
+            for j, ax2 in enumerate(dim_lbl):
+                columns["Pressure Tensor ACF {}{}_Mean".format(ax1, ax2)] = cf[1 + 3 * i + j]
+
+        return columns
+
+    def compute(self, **kwargs):
+        """
+        Compute the velocity auto-correlation functions.
+
+        Parameters
+        ----------
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+        # Update the attribute with the passed arguments. e.g time_averaging and timesteps_to_skip
+        self.__dict__.update(kwargs.copy())
+
+        if self.acf_method == 'multiple_tau':
+            self.compute_multiple_tau()
+            return
+
+        # Recalculate the slicing parameters if no_slices has been passed
+        self.slice_steps = int(self.no_dumps / self.no_slices)
+
+        start_slice = 0
+        end_slice = self.slice_steps * self.dump_step
+        time = np.zeros(self.slice_steps)
+        # Initialize timer
+        t0 = self.timer.current()
+
+        pt_str = "Pressure Tensor"
+        pt_acf_str = "Pressure Tensor ACF"
+
+        for isl in range(self.no_slices):
+            print("\nCalculating pressure tensor and its acf for slice {}/{}.".format(isl + 1, self.no_slices))
+            # Parse the particles from the dump files
+            pressure = np.zeros(self.slice_steps)
+            pressure_tensor_temp = np.zeros((self.dimensions, self.dimensions, self.slice_steps))
+
+            frames = self.accumulated('pressure', start_slice, end_slice)
+            if frames is not None:
+                time = frames['time']
+                pressure = frames['pressure']
+                pressure_tensor_temp = frames['pressure_tensor'].transpose(1, 2, 0)
+            else:
+                dumps = DumpReader(self.dump_dir, range(start_slice, end_slice, self.dump_step),
+                                   fields=["pos", "vel", "acc"])
+                for it, (dump, datap) in enumerate(tqdm(dumps, desc='Calculating Pressure',
+                                                        disable=not self.verbose)):
+                    time[it] = datap["time"]
+
+                    pressure[it], pressure_tensor_temp[:, :, it] = calc_pressure_tensor(
+                        datap["pos"],
+                        datap["vel"],
+                        datap["acc"],
+                        self.species_masses,
+                        self.species_num,
+                        self.box_volume)
+
+            if isl == 0:
+                self.dataframe["Time"] = time
+
+            self.dataframe["Pressure_slice {}".format(isl)] = pressure
+            self.dataframe["Pressure ACF_slice {}".format(isl)] = correlationfunction(pressure, pressure)
+            # This is needed for the bulk viscosity
+            delta_pressure = pressure - pressure.mean()
+            self.dataframe["Delta Pressure_slice {}".format(isl)] = delta_pressure
+            self.dataframe["Delta Pressure ACF_slice {}".format(isl)] = correlationfunction(delta_pressure, delta_pressure)
+
+            if self.dimensions == 3:
+                dim_lbl = ['x', 'y', 'z']
+            elif self.dimensions == 2:
+                dim_lbl = ['x', 'y']
+
+            # Calculate the acf of the pressure tensor
+            for i, ax1 in enumerate(dim_lbl):
+                for j, ax2 in enumerate(dim_lbl):
+                    self.dataframe[pt_str + " {}{}_slice {}".format(ax1, ax2, isl)] = pressure_tensor_temp[i, j, :]
+
+                    pressure_tensor_acf_temp = correlationfunction(pressure_tensor_temp[i, j, :],
+                                                                   pressure_tensor_temp[i, j, :])
+                    self.dataframe[pt_acf_str + " {}{}_slice {}".format(ax1, ax2, isl)] = pressure_tensor_acf_temp
+
+            start_slice += self.slice_steps * self.dump_step
+            end_slice += self.slice_steps * self.dump_step
+
+        col_str = ["Pressure_slice {}".format(isl) for isl in range(self.no_slices)]
+        self.dataframe["Pressure_Mean"] = self.dataframe[col_str].mean(axis=1)
+        self.dataframe["Pressure_Std"] = self.dataframe[col_str].std(axis=1)
+        col_str = ["Pressure ACF_slice {}".format(isl) for isl in range(self.no_slices)]
+        self.dataframe["Pressure ACF_Mean"] = self.dataframe[col_str].mean(axis=1)
+        self.dataframe["Pressure ACF_Std"] = self.dataframe[col_str].std(axis=1)
+
+        col_str = ["Delta Pressure_slice {}".format(isl) for isl in range(self.no_slices)]
+        self.dataframe["Delta Pressure_Mean"] = self.dataframe[col_str].mean(axis=1)
+        self.dataframe["Delta Pressure_Std"] = self.dataframe[col_str].std(axis=1)
+        col_str = ["Delta Pressure ACF_slice {}".format(isl) for isl in range(self.no_slices)]
+        self.dataframe["Delta Pressure ACF_Mean"] = self.dataframe[col_str].mean(axis=1)
+        self.dataframe["Delta Pressure ACF_Std"] = self.dataframe[col_str].std(axis=1)
+
+        # Average and std over the slices
+        for i, ax1 in enumerate(dim_lbl):
+            for j, ax2 in enumerate(dim_lbl):
+                ij_col_str = [pt_str + " {}{}_slice {}".format(ax1, ax2, isl) for isl in range(self.no_slices)]
+
+                self.dataframe[pt_str + " {}{}_Mean".format(ax1, ax2)] = self.dataframe[ij_col_str].mean(axis=1)
+                self.dataframe[pt_str + " {}{}_Std".format(ax1, ax2)] = self.dataframe[ij_col_str].std(axis=1)
+
+                ij_col_acf_str = [pt_acf_str + " {}{}_slice {}".format(ax1, ax2, isl) for isl in range(self.no_slices)]
+
+                self.dataframe[pt_acf_str + " {}{}_Mean".format(ax1, ax2)] = self.dataframe[ij_col_acf_str].mean(axis=1)
+                self.dataframe[pt_acf_str + " {}{}_Std".format(ax1, ax2)] = self.dataframe[ij_col_acf_str].std(axis=1)
+
+        # Create the columns for the HDF df
+        self.dataframe.columns = pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in self.dataframe.columns])
+        self.dataframe.to_hdf(self.filename_hdf, mode='w', key=self.__name__)
+
+        tend = self.timer.current()
+        self.time_stamp("Pressure Tensor and its ACF Calculation", self.timer.time_division(tend - t0))
+
+    def pretty_print(self):
+        """Print observable parameters for help in choice of simulation parameters."""
+
+        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('Data saved in: \n', self.filename_hdf)
+        print('Data accessible at: self.dataframe')
+
+        print('\nNo. of slices = {}'.format(self.no_slices))
+        print('No. dumps per slice = {}'.format( int(self.slice_steps/self.dump_step)) )
+        print('Time interval of autocorrelation function = {:.4e} [s] ~ {} w_p T'.format(
+            self.dt * self.slice_steps,
+            int(self.dt * self.slice_steps * self.total_plasma_frequency)))
+
+
+class VelocityDistribution(Observable):
+    """
+    Moments of the velocity distributions defined as
+
+    .. math::
+        \\langle v^{\\alpha} \\rangle = \\int_{-\\infty}^{\\infty} d v \, f(v) v^{2 \\alpha}.
+
+    Attributes
+    ----------
+    no_bins: int
+        Number of bins used to calculate the velocity distribution.
+
+    plots_dir: str
+        Directory in which to store Hermite coefficients plots.
+
+    species_plots_dirs : list, str
+        Directory for each species where to save Hermite coefficients plots.
+
+    max_no_moment: int
+        Maximum number of moments = :math:`\alpha`. Default = 3.
+
+    """
+
+    def setup(self,
+              params,
+              phase: str = None,
+              hist_kwargs: dict = None,
+              max_no_moment: int = 6,
+              curve_fit_kwargs: dict = None,
+              **kwargs):
+
+        """
+        Assign attributes from simulation's parameters.
+
+        Parameters
+        ----------
+        params : sarkas.core.Parameters
+            Simulation's parameters.
+
+        phase : str, optional
+            Phase to compute. Default = 'production'.
+
+        max_no_moment : int
+            Maximum number of moments to calculate. Default = 6.
+
+        hist_kwargs : dict, optional
+            Dictionary of keyword arguments to pass to ``np.histogram`` for the calculation of the distributions.
+
+        curve_fit_kwargs: dict, optional
+            Dictionary of keyword arguments to pass to ``scipy.curve_fit`` for fitting of Hermite coefficients.
+
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+
+        if curve_fit_kwargs:
+            self.curve_fit_kwargs = curve_fit_kwargs
+
+        if phase:
+            self.phase = phase.lower()
+
+        super().setup_init(params, self.phase)
+        self.__name__ = 'vd'
+        self.__long_name__ = 'Velocity Distribution'
+
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
+        # Check on hist_kwargs
+        if hist_kwargs:
+            # Is it a dictionary ?
+            assert isinstance(hist_kwargs, dict), 'hist_kwargs not a dictionary. Please pass a dictionary.'
+            self.hist_kwargs = hist_kwargs
+        # Default number of moments to calculate
+        self.max_no_moment = max_no_moment
+
+        # Create the directory where to store the computed data
+        # First the name of the observable
+        saving_dir = os.path.join(self.postprocessing_dir, 'VelocityDistribution')
+        if not os.path.exists(saving_dir):
+            os.mkdir(saving_dir)
+        # then the phase
+        self.saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+
+        self.adjusted_dump_dir = []
+
+        if self.multi_run_average:
+            for r in range(self.runs):
+                # Direct to the correct dumps directory
+                dump_dir = os.path.join('run{}'.format(r), os.path.join('Simulation',
+                                                                        os.path.join(self.phase.capitalize(), 'dumps')))
+                dump_dir = os.path.join(self.simulations_dir, dump_dir)
+                self.adjusted_dump_dir.append(dump_dir)
+            # Re-path the saving directory
+            saving_dir = os.path.join(self.simulations_dir, 'PostProcessing')
+            if not os.path.exists(saving_dir):
+                os.mkdir(saving_dir)
+            saving_dir = os.path.join(saving_dir, self.phase.capitalize())
+            if not os.path.exists(saving_dir):
+                os.mkdir(saving_dir)
+            self.saving_dir = os.path.join(saving_dir, 'VelocityDistribution')
+        else:
+            self.adjusted_dump_dir = [self.dump_dir]
+
+        if not os.path.exists(self.saving_dir):
+            os.mkdir(self.saving_dir)
+
+        # Directories in which to store plots
+        self.plots_dir = os.path.join(self.saving_dir, 'Plots')
+        if not os.path.exists(self.plots_dir):
+            os.mkdir(self.plots_dir)
+
+        # Paths where to store the dataframes
+        if self.multi_run_average:
+            self.filename_csv = os.path.join(self.saving_dir, "VelocityDistribution.csv")
+            self.filename_hdf = os.path.join(self.saving_dir, "VelocityDistribution.h5")
+        else:
+            self.filename_csv = os.path.join(self.saving_dir, "VelocityDistribution_" + self.job_id + '.csv')
+            self.filename_hdf = os.path.join(self.saving_dir, "VelocityDistribution_" + self.job_id + '.h5')
+
+        if hasattr(self, 'max_no_moment'):
+            self.moments_dataframe = None
+            self.mom_df_filename_csv = os.path.join(self.saving_dir, "Moments_" + self.job_id + '.csv')
+
+        if hasattr(self, 'max_hermite_order'):
+            self.hermite_dataframe = None
+            self.herm_df_filename_csv = os.path.join(self.saving_dir, "HermiteCoefficients_" + self.job_id + '.csv')
+            # some checks
+            if not hasattr(self, 'hermite_rms_tol'):
+                self.hermite_rms_tol = 0.05
+
+        self.species_plots_dirs = None
+
+        # Need this for pretty print
+        # Calculate the dimension of the velocity container
+        # 2nd Dimension of the raw velocity array
+        self.dim = 1 if self.dimensional_average else self.dimensions
+        # range(inv_dim) for the loop over dimension
+        self.inv_dim = self.dimensions if self.dimensional_average else 1
+
+        # Array containing the start index of each species. The last value is equivalent to vel_raw.shape[-1]
+        self.species_index_start = np.array([0, *np.cumsum(self.species_num)], dtype=int) * self.inv_dim * self.runs
+
+        # Check if arguments have been passed
+        if hist_kwargs:
+            # Did you pass a single dictionary for multispecies?
+            for key, value in hist_kwargs.items():
+                # The elements of hist_kwargs should be lists
+                if not isinstance(hist_kwargs[key], list):
+                    hist_kwargs[key] = [value for i in range(self.num_species)]
+
+            # Override whatever was passed via YAML or setup
+            self.hist_kwargs.update(hist_kwargs.copy())
+
+        self.prepare_histogram_args()
+
+    def grab_sim_data(self):
+        """Read in velocity data"""
+
+        # Velocity array for storing simulation data
+        vel_raw = np.zeros((self.no_dumps, self.dim, self.runs * self.inv_dim * self.total_num_ptcls))
+        time = np.zeros(self.no_dumps)
+
+        print("\nCollecting data from snapshots ...")
+        if self.dimensional_average:
+            # Loop over the runs
+            for r, dump_dir_r in enumerate(tqdm(self.adjusted_dump_dir, disable=(not self.verbose), desc='Runs Loop')):
+                # Loop over the timesteps. The dumps are read in the background.
+                dumps = DumpReader(dump_dir_r, range(0, self.no_dumps * self.dump_step, self.dump_step),
+                                   fields=["vel", "names"])
+                for it, (dump, datap) in enumerate(tqdm(dumps, disable=(not self.verbose), desc='Timestep Loop')):
+                    # Loop over the particles' species
+                    for sp_indx, (sp_name, sp_num) in enumerate(zip(self.species_names, self.species_num)):
+                        # Calculate the correct start and end index for storage
+                        start_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * r
+                        end_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * (r + 1)
+                        # Use a mask to grab only the selected species and flatten along the first axis
+                        # data = ( v1_x, v1_y, v1_z,
+                        #          v2_x, v2_y, v2_z,
+                        #          v3_x, v3_y, v3_z,
+                        #          ...)
+                        # The flatten array would like this
+                        # flattened = ( v1_x, v2_x, v3_x, ..., v1_y, v2_y, v3_y, ..., v1_z, v2_z, v3_z, ...)
+                        vel_raw[it, 0, start_indx: end_indx] = datap["vel"][datap["names"] == sp_name].flatten('F')
+
+                    time[it] = datap["time"]
+        else:  # Dimensional Average = False
+            # Loop over the runs
+            for r, dump_dir_r in enumerate(tqdm(self.adjusted_dump_dir, disable=(not self.verbose), desc='Runs Loop')):
+                # Loop over the timesteps. The dumps are read in the background.
+                dumps = DumpReader(dump_dir_r, range(0, self.no_dumps * self.dump_step, self.dump_step),
+                                   fields=["vel", "names"])
+                for it, (dump, datap) in enumerate(tqdm(dumps, disable=(not self.verbose), desc='Timestep Loop')):
+                    # Loop over the particles' species
+                    for sp_indx, (sp_name, sp_num) in enumerate(zip(self.species_names, self.species_num)):
+                        # Calculate the correct start and end index for storage
+                        start_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * r
+                        end_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * (r + 1)
+                        # Use a mask to grab only the selected species and transpose the array to put dimensions first
+                        vel_raw[it, :, start_indx: end_indx] = datap["vel"][datap["names"] == sp_name].transpose()
+
+                time[it] = datap["time"]
+
+        return time, vel_raw
+
+    def compute(self, hist_kwargs: dict = None, **kwargs):
+        """
+        Calculate the moments of the velocity distributions and save them to a pandas dataframes and csv.
+
+        Parameters
+        ----------
+        hist_kwargs : dict, optional
+            Dictionary with arguments to pass to ``numpy.histogram``.
+
+        **kwargs :
+            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
+            attributes and/or add new ones.
+
+        """
+
+        # Update the attribute with the passed arguments
+        self.__dict__.update(kwargs.copy())
+
+        # Check if arguments have been passed
+        if hist_kwargs:
+            # Did you pass a single dictionary for multispecies?
+            for key, value in hist_kwargs.items():
+                # The elements of hist_kwargs should be lists
+                if not isinstance(hist_kwargs[key], list):
+                    hist_kwargs[key] = [value for i in range(self.num_species)]
+
+            # Override whatever was passed via YAML or setup
+            self.hist_kwargs.update(hist_kwargs.copy())
+
+        # Make the histogram arguments
+        self.prepare_histogram_args()
+
+        # Print info to screen
+        self.pretty_print()
+
+        # Ok let's do it.
+        self.dataframe = pd.DataFrame()
+
+        # Calculate the dimension of the velocity container
+
+        # 2nd Dimension of the raw velocity array
+        self.dim = 1 if self.dimensional_average else self.dimensions
+        # range(inv_dim) for the loop over dimension
+        self.inv_dim = self.dimensions if self.dimensional_average else 1
+        # Array containing the start index of each species. The last value is equivalent to vel_raw.shape[-1]
+        self.species_index_start = np.array([0, *np.cumsum(self.species_num)], dtype=int) * self.inv_dim * self.runs
+
+        # Grab simulation data
+        time, vel_raw = self.grab_sim_data()
+
+        # Make the velocity distribution
+        self.create_distribution(vel_raw, time)
+
+        # Calculate velocity moments
+        if hasattr(self, "max_no_moment"):
+            self.compute_moments(False, vel_raw, time)
+        #
+        if hasattr(self, "max_hermite_order"):
+            self.compute_hermite_expansion(False)
+
+    def prepare_histogram_args(self):
+
+        # Initialize histograms arguments
+        if not hasattr(self, 'hist_kwargs'):
+            self.hist_kwargs = {'density': [],
+                                'bins': [],
+                                'range': []
+                                }
+        # Default values
+        bin_width = 0.05
+        # Range of the histogram = (-wid * vth, wid * vth)
+        wid = 5
+        # The number of bins is calculated from default values of bin_width and wid
+        no_bins = int(2.0 * wid / bin_width)
+        # Calculate thermal speed from energy/temperature data.
+        try:
+            energy_fle = self.prod_energy_filename if self.phase == 'production' else self.eq_energy_filename
+            energy_df = read_energy(energy_fle)
+            if self.num_species > 1:
+                vth = np.zeros(self.num_species)
+                for sp, (sp_mass, sp_name) in enumerate(zip(self.species_masses, self.species_names)):
+                    vth[sp] = np.sqrt(energy_df["{} Temperature".format(sp_name)].mean() * self.kB / sp_mass)
+            else:
+                vth = np.sqrt(energy_df["Temperature"].mean() * self.kB / self.species_masses)
+
+        except FileNotFoundError:
+            vth = np.sqrt(self.kB * self.T_desired / self.species_masses)
+
+        self.vth = np.copy(vth)
+
+        # Create the default dictionary of histogram args
+        default_hist_kwargs = {'density': [],
+                               'bins': [],
+                               'range': []}
+        if self.num_species > 1:
+            for sp in range(self.num_species):
+                default_hist_kwargs['density'].append(True)
+                default_hist_kwargs['bins'].append(no_bins)
+                default_hist_kwargs['range'].append((-wid * vth[sp], wid * vth[sp]))
+        else:
+            default_hist_kwargs['density'].append(True)
+            default_hist_kwargs['bins'].append(no_bins)
+            default_hist_kwargs['range'].append((-wid * vth[0], wid * vth[0]))
+
+        # Now do some checks.
+        # Check for numpy.histogram args in kwargs
+        must_have_keys = ['bins', 'range', 'density']
+
+        for k, key in enumerate(must_have_keys):
+            try:
+                # Is it empty?
+                if len(self.hist_kwargs[key]) == 0:
+                    self.hist_kwargs[key] = default_hist_kwargs[key]
+            except KeyError:
+                self.hist_kwargs[key] = default_hist_kwargs[key]
+
+        # Ok at this point I have a dictionary whose elements are list.
+        # I want the inverse a list whose elements are dicts
+        self.list_hist_kwargs = []
+        for indx in range(self.num_species):
+            another_dict = {}
+            # Loop over the keys and grab the species value
+            for key, values in self.hist_kwargs.items():
+                another_dict[key] = values[indx]
+
+            self.list_hist_kwargs.append(another_dict)
+
+    def create_distribution(self, vel_raw: np.ndarray = None, time: np.ndarray = None):
+        """
+        Calculate the velocity distribution of each species and save the corresponding dataframes.
+
+        Parameters
+        ----------
+        vel_raw: np.ndarray, optional
+            Container of particles velocity at each time step.
+
+        time: np.ndarray, optional
+            Time array.
+
+        """
+
+        print("\nCreating velocity distributions ...")
+        tinit = self.timer.current()
+        no_dumps = vel_raw.shape[0]
+        no_dim = vel_raw.shape[1]
+        # I want a Hierarchical dataframe
+        # Example:
+        #   Ca	                        Yb	    Ca	                        Yb	    Ca	                        Yb
+        #   X	                        X	    Y	                        Y	    Z	                        Z
+        #   1.54e-03 -2.54e+22 3.54e+00	1 2     1.54e-03 -2.54e+22 3.54e+00	1 2	    1.54e-03 -2.54e+22 3.54e+00 1 2
+        # This has 3 rows of columns. The first identifies the species, The second the axis,
+        # and the third the value of the bin_edge
+        # This can be easily obtained from pandas dataframe MultiIndex. But first I will create a dataframe
+        # from a huge matrix. The columns of this dataframe will be
+        # Ca_X_1.54e-03 Ca_X_-2.54e+22 Ca_X_3.54e+00 Yb_X_1	Yb_X_2 Ca_Y_1.54e-03 Ca_Y_-2.54e+22 Ca_Y_3.54e+00 Yb_Y_1 ...
+        # using pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in df.columns]) I can create a hierarchical df.
+        # This is because I can access the data as
+        # df['Ca']['X']
+        # >>>       1.54e-03	-2.54e+22	3.54e+00
+        # >>> Time
+        # >>>   0   -1.694058	1.217008	-0.260678
+        # with the index = to my time array.
+        # see https://pandas.pydata.org/pandas-docs/stable/user_guide/advanced.html#reconstructing-the-level-labels
+
+        # Columns
+
+        full_df_columns = []
+        # At the first time step I will create the columns list.
+        dist_matrix = np.zeros((len(time), self.dim * (np.sum(self.hist_kwargs["bins"]) + self.num_species)))
+        # The +1 at the end is because I decided to add a column containing the timestep
+        # For convenience save the bin edges somewhere else. The columns of the dataframe are string. This will give
+        # problems when plotting.
+        # Use a dictionary since the arrays could be different lengths
+        self.species_bin_edges = {}
+        for k in self.species_names:
+            # Initialize the sub-dictionary
+            self.species_bin_edges[k] = {}
+
+        for it in range(no_dumps):
+            for d, ds in zip(range(no_dim), ["X", "Y", "Z"]):
+                indx_0 = 0
+                for indx, (sp_name, sp_start) in enumerate(zip(self.species_names, self.species_index_start)):
+                    # Calculate the correct start and end index for storage
+                    sp_end = self.species_index_start[indx + 1]
+
+                    bin_count, bin_edges = np.histogram(vel_raw[it, d, sp_start:sp_end], **self.list_hist_kwargs[indx])
+
+                    # Executive decision: Center the bins
+                    bin_loc = 0.5 * (bin_edges[:-1] + bin_edges[1:])
+                    # Create the second_column_row the dataframe
+                    if it == 0:
+                        # Create the column array
+                        full_df_columns.append(["{}_{}_Time".format(sp_name, ds)])
+                        full_df_columns.append(
+                            ["{}_{}_{:6e}".format(sp_name, ds, be) for be in bin_loc])
+                        self.species_bin_edges[sp_name][ds] = bin_edges
+                        # Ok. Now I have created the bins columns' names
+                    # Time to insert in the huge matrix.
+                    indx_1 = indx_0 + 1 + len(bin_count)
+                    dist_matrix[it, indx_0] = time[it]
+                    dist_matrix[it, indx_0 + 1:indx_1] = bin_count
+                    indx_0 = indx_1
+        # Alright. The matrix is filled now onto the dataframe
+        # First let's flatten the columns array. This is because I have something like this
+        # Example: Binary Mixture with 3 H bins per axis and 2 He bins per axis
+        # columns =[['H_X', 'H_X', 'H_X'], ['He_X', 'He_X'], ['H_Y', 'H_Y', 'H_Y'], ['He_Y', 'He_Y'] ... Z-axis]
+        # Flatten with list(np.concatenate(columns).flat)
+        # Now has become
+        # first_column_row=['H_X', 'H_X', 'H_X', 'He_X', 'He_X', 'H_Y', 'H_Y', 'H_Y', 'He_Y', 'He_Y' ... Z-axis]
+        # I think this is easier to understand than using nested list comprehension
+        # see https://stackabuse.com/python-how-to-flatten-list-of-lists/
+        full_df_columns = list(np.concatenate(full_df_columns).flat)
+        self.dataframe = pd.DataFrame(dist_matrix, columns=full_df_columns)
+        # Save it
+        self.dataframe.to_csv(self.filename_csv, encoding='utf-8', index=False)
+
+        # Hierarchical DataFrame
+        self.hierarchical_dataframe = self.dataframe.copy()
+        self.hierarchical_dataframe.columns = pd.MultiIndex.from_tuples(
+            [tuple(c.split("_")) for c in self.hierarchical_dataframe.columns])
+        self.hierarchical_dataframe.to_hdf(self.filename_hdf, key=self.__name__, encoding='utf-8')
+
+        tend = self.timer.current()
+        self.time_stamp("Velocity distribution calculation", self.timer.time_division(tend - tinit))
+
+    def compute_moments(self, parse_data: bool = False, vel_raw: np.ndarray = None, time: np.ndarray = None):
+        """Calculate and save moments of the distribution.
+
+        Parameters
+        ----------
+        parse_data: bool
+            Flag for reading data. Default = False. If False, must pass ``vel_raw`` and ``time.
+            If True it will parse data from simulations dumps.
+
+        vel_raw: np.ndarray, optional
+            Container of particles velocity at each time step.
+
+        time: np.ndarray, optional
+            Time array.
+
+        """
+        self.moments_dataframe = pd.DataFrame()
+        self.moments_hdf_dataframe = pd.DataFrame()
+
+        if parse_data:
+            time, vel_raw = self.grab_sim_data()
+
+        self.moments_dataframe["Time"] = time
+
+        print("\nCalculating velocity moments ...")
+        tinit = self.timer.current()
+        moments, ratios = calc_moments(vel_raw, self.max_no_moment, self.species_index_start)
+        tend = self.timer.current()
+        self.time_stamp("Velocity moments calculation", self.timer.time_division(tend - tinit))
+
+        # Save the dataframe
+        if self.dimensional_average:
+            for i, sp in enumerate(self.species_names):
+                self.moments_hdf_dataframe["{}_X_Time".format(sp)] = time
+                for m in range(self.max_no_moment):
+                    self.moments_dataframe["{} {} moment".format(sp, m + 1)] = moments[i, :, :, m][:, 0]
+                    self.moments_hdf_dataframe["{}_X_{} moment".format(sp, m + 1)] = moments[i, :, :, m][:, 0]
+                for m in range(self.max_no_moment):
+                    self.moments_dataframe["{} {} moment ratio".format(sp, m + 1)] = ratios[i, :, :, m][:, 0]
+                    self.moments_hdf_dataframe["{}_X_{}-2 ratio".format(sp, m + 1)] = ratios[i, :, :, m][:, 0]
+        else:
+            for i, sp in enumerate(self.species_names):
+                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
+                    self.moments_hdf_dataframe["{}_{}_Time".format(sp, ds)] = time
+                    for m in range(self.max_no_moment):
+                        self.moments_dataframe["{} {} moment axis {}".format(sp, m + 1, ds)] = moments[i, :, d, m][:, 0]
+                        self.moments_hdf_dataframe["{}_{}_{} moment".format(sp, ds, m + 1)] = moments[i, :, :, m][:, 0]
+
+                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
+                    self.moments_hdf_dataframe["{}_{}_Time".format(sp, ds)] = time
+                    for m in range(self.max_no_moment):
+                        self.moments_dataframe[
+                            "{} {} moment ratio axis {}".format(sp, m + 1, ds)] = ratios[i, :, d, m][:, 0]
+                        self.moments_hdf_dataframe[
+                            "{}_{}_{}-2 ratio ".format(sp, ds, m + 1)] = ratios[i, :, d, m][:, 0]
+
+        self.moments_dataframe.to_csv(self.filename_csv, index=False, encoding='utf-8')
+        # Hierarchical DF Save
+        # Make the columns
+        self.moments_hdf_dataframe.columns = pd.MultiIndex.from_tuples(
+            [tuple(c.split("_")) for c in self.moments_hdf_dataframe.columns])
+        # Save the df in the hierarchical df with a new key/group
+        self.moments_hdf_dataframe.to_hdf(
+            self.filename_hdf,
+            mode='a',
+            key='velocity_moments',
+            encoding='utf-8'
+        )
+
+    def compute_hermite_expansion(self, calc_moments: bool = False):
+        """
+        Calculate and save Hermite coefficients of the Grad expansion.
+
+        Parameters
+        ----------
+        calc_moments: bool
+            Flag for calculating velocity moments. These are needed for the hermite calculation.
+            Default = False.
+
+        """
+        from scipy.optimize import curve_fit
+
+        self.hermite_dataframe = pd.DataFrame()
+        self.hermite_hdf_dataframe = pd.DataFrame()
+
+        if calc_moments:
+            self.compute_moments(parse_data=True)
+
+        if not hasattr(self, 'hermite_rms_tol'):
+            self.hermite_rms_tol = 0.05
+
+        self.hermite_dataframe["Time"] = np.copy(self.moments_dataframe["Time"])
+        self.hermite_sigmas = np.zeros((self.num_species, self.dim, len(self.hermite_dataframe["Time"])))
+        self.hermite_epochs = np.zeros((self.num_species, self.dim, len(self.hermite_dataframe["Time"])))
+        hermite_coeff = np.zeros(
+            (self.num_species, self.dim, self.max_hermite_order + 1, len(self.hermite_dataframe["Time"])))
+
+        print("\nCalculating Hermite coefficients ...")
+        tinit = self.timer.current()
+
+        for sp, sp_name in enumerate(tqdm(self.species_names, desc='Species')):
+            for it, t in enumerate(tqdm(self.hermite_dataframe["Time"], desc='Time')):
+                # Grab the thermal speed from the moments
+                vrms = self.moments_dataframe["{} 2 moment".format(sp_name)].iloc[it]
+                # Loop over dimensions. No tensor availability yet
+                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
+
+                    # Grab the distribution from the hierarchical df
+                    dist = self.hierarchical_dataframe[sp_name][ds].iloc[it, 1:]
+
+                    # Grab and center the bins
+                    v_bins = 0.5 * (self.species_bin_edges[sp_name][ds][1:] + self.species_bin_edges[sp_name][ds][:-1])
+                    cntrl = True
+                    j = 0
+
+                    # This is a routine to calculate the hermite coefficient in the case of non-equilibrium simulations.
+                    # In non-equilibrium we cannot define a temperature. This is because the temperature is defined from
+                    # the rms width of a Gaussian distribution. In non-equilibrium we don't have a Gaussian, thus the
+                    # first thing to do is to find the underlying Gaussian in our distribution. This is what this
+                    # iterative procedure is for.
+
+                    while cntrl:
+                        # Normalize
+                        norm = np.trapz(dist, x=v_bins / vrms)
+
+                        # Calculate the hermite coeff
+                        h_coeff = calculate_herm_coeff(v_bins / vrms, dist / norm, self.max_hermite_order)
+
+                        # Fit the rms only to the Grad expansion. This finds the underlying Gaussian
+                        res, _ = curve_fit(
+                            # the lambda func is because i need to fit only rms not the h_coeff
+                            lambda x, rms: grad_expansion(x, rms, h_coeff),
+                            v_bins / vrms,
+                            dist / norm,
+                            self.curve_fit_kwargs)
+
+                        vrms *= res[0]
+
+                        if abs(1.0 - res[0]) < self.hermite_rms_tol:
+                            cntrl = False
+                            self.hermite_sigmas[sp, d, it] = vrms
+                            self.hermite_epochs[sp, d, it] = j
+                            hermite_coeff[sp, d, :, it] = h_coeff
+                        j += 1
+
+        tend = self.timer.current()
+
+        for sp, sp_name in enumerate(self.species_names):
+            for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
+                for h in range(self.max_hermite_order):
+                    self.hermite_dataframe["{} {} {} Hermite coeff".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
+                    if h == 0:
+                        self.hermite_hdf_dataframe[
+                            "{}_{}_Time".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
+                        self.hermite_hdf_dataframe[
+                            "{}_{}_RMS".format(sp_name, ds, h)] = self.hermite_sigmas[sp, d, :]
+                        self.hermite_hdf_dataframe[
+                            "{}_{}_epoch".format(sp_name, ds, h)] = self.hermite_epochs[sp, d, :]
+                    else:
+                        self.hermite_hdf_dataframe["{}_{}_{} coeff".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
+
+        # Save the CSV
+        self.hermite_dataframe.to_csv(self.herm_df_filename_csv, index=False, encoding='utf-8')
+        # Make the columns
+        self.hermite_hdf_dataframe.columns = pd.MultiIndex.from_tuples(
+            [tuple(c.split("_")) for c in self.hermite_hdf_dataframe.columns])
+        # Save the df in the hierarchical df with a new key/group
+        self.hermite_hdf_dataframe.to_hdf(
+            self.filename_hdf,
+            mode='a',
+            key='hermite_coefficients',
+            encoding='utf-8'
+        )
+
+        self.time_stamp("Hermite expansion calculation", self.timer.time_division(tend - tinit))
+
+    def pretty_print(self):
+        """Print information in a user-friendly way."""
+
+        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
+        print('CSV dataframe saved in:\n\t ', self.filename_csv)
+        print('HDF5 dataframe saved in:\n\t ', self.filename_hdf)
+        print('Data accessible at: self.dataframe, self.hierarchical_dataframe, self.species_bin_edges')
+        print('\nMulti run average: ', self.multi_run_average)
+        print('No. of runs: ', self.runs)
+        print("Size of the parsed velocity array: {} x {} x {}".format(self.no_dumps,
+                                                                       self.dim,
+                                                                       self.runs * self.inv_dim * self.total_num_ptcls))
+        print('\nHistograms Information:')
+        for sp, (sp_name, dics) in enumerate(zip(self.species_names, self.list_hist_kwargs)):
+            if sp == 0:
+                print("Species: {}".format(sp_name))
+            else:
+                print("\nSpecies: {}".format(sp_name))
+            print("No. of samples = {}".format(self.species_num[sp] * self.inv_dim * self.runs))
+            print("Thermal speed: v_th = {:.6e} ".format(self.vth[sp]), end='')
+            print("[cm/s]" if self.units == "cgs" else "[m/s]")
+            for key, values in dics.items():
+                if key == 'range':
+                    print("{} : ( {:.2f}, {:.2f} ) v_th,"
+                          "\n\t( {:.4e}, {:.4e} ) ".format(key, *values / self.vth[sp], *values), end='')
+                    print("[cm/s]" if self.units == "cgs" else "[m/s]")
+                else:
+                    print("{}: {}".format(key, values))
+            bin_width = abs(dics["range"][1] - dics["range"][0]) / (self.vth[sp] * dics["bins"])
+            print("Bin Width = {:.4f}".format(bin_width))
+
+        if hasattr(self, "max_no_moment"):
+            print('\nMoments Information:')
+            print('CSV dataframe saved in:\n\t ', self.mom_df_filename_csv)
+            print('Data accessible at: self.moments_dataframe, self.moments_hdf_dataframe')
+            print('Highest moment to calculate: {}'.format(self.max_no_moment))
+
+        if hasattr(self, "max_hermite_order"):
+            print('\nGrad Expansion Information:')
+            print('CSV dataframe saved in:\n\t ', self.herm_df_filename_csv)
+            print('Data accessible at: self.hermite_dataframe, self.hermite_hdf_dataframe')
+            print('Highest order to calculate: {}'.format(self.max_hermite_order))
+            print('RMS Tolerance: {:.3f}'.format(self.hermite_rms_tol))
+
+
+@njit
+def calc_Sk(nkt, k_list, k_counts, species_np, no_dumps):
+    """
+    Calculate :math:`S_{ij}(k)` at each saved timestep.
 
-        if not os.path.exists(self.saving_dir):
-            os.mkdir(self.saving_dir)
+    Parameters
+    ----------
+    nkt : numpy.ndarray, complex
+        Density fluctuations of all species. Shape = ( ``no_species``, ``no_dumps``, ``no_ka_values``)
 
-        # Directories in which to store plots
-        self.plots_dir = os.path.join(self.saving_dir, 'Plots')
-        if not os.path.exists(self.plots_dir):
-            os.mkdir(self.plots_dir)
+    k_list :
+        List of :math:`k` indices in each direction with corresponding magnitude and index of ``k_counts``.
+        Shape=(``no_ka_values``, 5)
 
-        # Paths where to store the dataframes
-        if self.multi_run_average:
-            self.filename_csv = os.path.join(self.saving_dir, "VelocityDistribution.csv")
-            self.filename_hdf = os.path.join(self.saving_dir, "VelocityDistribution.h5")
-        else:
-            self.filename_csv = os.path.join(self.saving_dir, "VelocityDistribution_" + self.job_id + '.csv')
-            self.filename_hdf = os.path.join(self.saving_dir, "VelocityDistribution_" + self.job_id + '.h5')
+    k_counts : numpy.ndarray
+        Number of times each :math:`k` magnitude appears.
 
-        if hasattr(self, 'max_no_moment'):
-            self.moments_dataframe = None
-            self.mom_df_filename_csv = os.path.join(self.saving_dir, "Moments_" + self.job_id + '.csv')
+    species_np : numpy.ndarray
+        Array with number of particles of each species.
 
-        if hasattr(self, 'max_hermite_order'):
-            self.hermite_dataframe = None
-            self.herm_df_filename_csv = os.path.join(self.saving_dir, "HermiteCoefficients_" + self.job_id + '.csv')
-            # some checks
-            if not hasattr(self, 'hermite_rms_tol'):
-                self.hermite_rms_tol = 0.05
+    no_dumps : int
+        Number of dumps.
 
-        self.species_plots_dirs = None
+    Returns
+    -------
 
-        # Need this for pretty print
-        # Calculate the dimension of the velocity container
-        # 2nd Dimension of the raw velocity array
-        self.dim = 1 if self.dimensional_average else self.dimensions
-        # range(inv_dim) for the loop over dimension
-        self.inv_dim = self.dimensions if self.dimensional_average else 1
+    Sk_all : numpy.ndarray
+        Array containing :math:`S_{ij}(k)`. Shape=(``no_Sk``, ``no_ka_values``, ``no_dumps``)
 
-        # Array containing the start index of each species. The last value is equivalent to vel_raw.shape[-1]
-        self.species_index_start = np.array([0, *np.cumsum(self.species_num)], dtype=int) * self.inv_dim * self.runs
+    """
 
-        # Check if arguments have been passed
-        if hist_kwargs:
-            # Did you pass a single dictionary for multispecies?
-            for key, value in hist_kwargs.items():
-                # The elements of hist_kwargs should be lists
-                if not isinstance(hist_kwargs[key], list):
-                    hist_kwargs[key] = [value for i in range(self.num_species)]
+    no_sk = int(len(species_np) * (len(species_np) + 1) / 2)
+    Sk_raw = np.zeros((no_sk, len(k_counts), no_dumps))
+    pair_indx = 0
+    for ip, si in enumerate(species_np):
+        for jp in range(ip, len(species_np)):
+            sj = species_np[jp]
+            dens_const = 1.0 / np.sqrt(si * sj)
+            for it in range(no_dumps):
+                for ik, ka in enumerate(k_list):
+                    indx = int(ka[-1])
+                    nk_i = nkt[ip, it, ik]
+                    nk_j = nkt[jp, it, ik]
+                    Sk_raw[pair_indx, indx, it] += np.real(np.conj(nk_i) * nk_j) * dens_const / k_counts[indx]
+            pair_indx += 1
 
-            # Override whatever was passed via YAML or setup
-            self.hist_kwargs.update(hist_kwargs.copy())
+    return Sk_raw
 
-        self.prepare_histogram_args()
 
-    def grab_sim_data(self):
-        """Read in velocity data"""
+def calc_Skw(nkt, ka_list, species_np, no_dumps, dt, dump_step):
+    """
+    Calculate the Fourier transform of the correlation function of ``nkt``.
 
-        # Velocity array for storing simulation data
-        vel_raw = np.zeros((self.no_dumps, self.dim, self.runs * self.inv_dim * self.total_num_ptcls))
-        time = np.zeros(self.no_dumps)
+    Parameters
+    ----------
+    dt : float
+        Time interval.
 
-        print("\nCollecting data from snapshots ...")
-        if self.dimensional_average:
-            # Loop over the runs
-            for r, dump_dir_r in enumerate(tqdm(self.adjusted_dump_dir, disable=(not self.verbose), desc='Runs Loop')):
-                # Loop over the timesteps
-                for it in tqdm(range(self.no_dumps), disable=(not self.verbose), desc='Timestep Loop'):
-                    # Read data from file
-                    dump = int(it * self.dump_step)
-                    datap = load_from_restart(dump_dir_r, dump)
-                    # Loop over the particles' species
-                    for sp_indx, (sp_name, sp_num) in enumerate(zip(self.species_names, self.species_num)):
-                        # Calculate the correct start and end index for storage
-                        start_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * r
-                        end_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * (r + 1)
-                        # Use a mask to grab only the selected species and flatten along the first axis
-                        # data = ( v1_x, v1_y, v1_z,
-                        #          v2_x, v2_y, v2_z,
-                        #          v3_x, v3_y, v3_z,
-                        #          ...)
-                        # The flatten array would like this
-                        # flattened = ( v1_x, v2_x, v3_x, ..., v1_y, v2_y, v3_y, ..., v1_z, v2_z, v3_z, ...)
-                        vel_raw[it, 0, start_indx: end_indx] = datap["vel"][datap["names"] == sp_name].flatten('F')
+    dump_step : int
+        Snapshot interval.
 
-                    time[it] = datap["time"]
-        else:  # Dimensional Average = False
-            # Loop over the runs
-            for r, dump_dir_r in enumerate(tqdm(self.adjusted_dump_dir, disable=(not self.verbose), desc='Runs Loop')):
-                # Loop over the timesteps
-                for it in tqdm(range(self.no_dumps), disable=(not self.verbose), desc='Timestep Loop'):
-                    # Read data from file
-                    dump = int(it * self.dump_step)
-                    datap = load_from_restart(dump_dir_r, dump)
-                    # Loop over the particles' species
-                    for sp_indx, (sp_name, sp_num) in enumerate(zip(self.species_names, self.species_num)):
-                        # Calculate the correct start and end index for storage
-                        start_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * r
-                        end_indx = self.species_index_start[sp_indx] + self.inv_dim * sp_num * (r + 1)
-                        # Use a mask to grab only the selected species and transpose the array to put dimensions first
-                        vel_raw[it, :, start_indx: end_indx] = datap["vel"][datap["names"] == sp_name].transpose()
+    nkt :  complex, numpy.ndarray
+        Particles' density or velocity fluctuations.
+        Shape = ( ``no_species``, ``no_dumps``, ``no_k_list``)
 
-                time[it] = datap["time"]
+    ka_list : list
+        List of :math:`k` indices in each direction with corresponding magnitude and index of ``ka_counts``.
+        Shape=(``no_ka_values``, 5)
 
-        return time, vel_raw
+    ka_counts : numpy.ndarray
+        Number of times each :math:`k` magnitude appears.
 
-    def compute(self, hist_kwargs: dict = None, **kwargs):
-        """
-        Calculate the moments of the velocity distributions and save them to a pandas dataframes and csv.
+    species_np : numpy.ndarray
+        Array with one element giving number of particles.
 
-        Parameters
-        ----------
-        hist_kwargs : dict, optional
-            Dictionary with arguments to pass to ``numpy.histogram``.
+    no_dumps : int
+        Number of dumps.
 
-        **kwargs :
-            These are will overwrite any ``sarkas.core.Parameters`` or default ``sarkas.tools.observables.Observable``
-            attributes and/or add new ones.
+    Returns
+    -------
+    Skw : numpy.ndarray
+        DSF/CCF of each species and pair of species.
+        Shape = (``no_skw``, ``no_ka_values``, ``no_dumps``)
+    """
+    # Fourier transform normalization: norm = dt / Total time
+    norm = dt / np.sqrt(no_dumps * dt * dump_step)
+    # number of independent observables
+    no_skw = int(len(species_np) * (len(species_np) + 1) / 2)
+    # DSF
+    # Skw = np.zeros((no_skw, len(ka_counts), no_dumps))
+    Skw_all = np.zeros((no_skw, len(ka_list), no_dumps))
+    pair_indx = 0
+    for ip, si in enumerate(species_np):
+        for jp in range(ip, len(species_np)):
+            sj = species_np[jp]
+            dens_const = 1.0 / np.sqrt(si * sj)
+            for ik, ka in enumerate(ka_list):
+                # indx = int(ka[-1])
+                nkw_i = np.fft.fft(nkt[ip, :, ik]) * norm
+                nkw_j = np.fft.fft(nkt[jp, :, ik]) * norm
+                Skw_all[pair_indx, ik, :] = np.fft.fftshift(np.real(np.conj(nkw_i) * nkw_j) * dens_const)
+                # Skw[pair_indx, indx, :] += Skw_all[pair_indx, ik, :] / ka_counts[indx]
+            pair_indx += 1
 
-        """
+    return Skw_all
 
-        # Update the attribute with the passed arguments
-        self.__dict__.update(kwargs.copy())
 
-        # Check if arguments have been passed
-        if hist_kwargs:
-            # Did you pass a single dictionary for multispecies?
-            for key, value in hist_kwargs.items():
-                # The elements of hist_kwargs should be lists
-                if not isinstance(hist_kwargs[key], list):
-                    hist_kwargs[key] = [value for i in range(self.num_species)]
+@njit
+def calc_species_current(vel, sp_num):
+    """
+    Calculate the sum of the velocities of the particles of each species.
 
-            # Override whatever was passed via YAML or setup
-            self.hist_kwargs.update(hist_kwargs.copy())
+    Parameters
+    ----------
+    vel: numpy.ndarray
+        Particles' velocities. Shape = (``no_dim``, ``no_dumps``, ``total_num_ptcls``)
 
-        # Make the histogram arguments
-        self.prepare_histogram_args()
+    sp_num: numpy.ndarray
+        Number of particles of each species.
 
-        # Print info to screen
-        self.pretty_print()
+    Returns
+    -------
+    sp_current : numpy.ndarray
+        Current of each species. Shape = (``no_species``, ``no_dim``, ``no_dumps``)
 
-        # Ok let's do it.
-        self.dataframe = pd.DataFrame()
+    """
+    sp_current = np.zeros((sp_num.shape[0], vel.shape[0], vel.shape[1]))
 
-        # Calculate the dimension of the velocity container
+    sp_start = 0
+    sp_end = 0
+    for s, n_sp in enumerate(sp_num):
+        # Find the index of the last particle of species s
+        sp_end += n_sp
+        sp_current[s, :, :] = np.sum(vel[:, :, sp_start:sp_end], axis=-1)
+        sp_start += n_sp
 
-        # 2nd Dimension of the raw velocity array
-        self.dim = 1 if self.dimensional_average else self.dimensions
-        # range(inv_dim) for the loop over dimension
-        self.inv_dim = self.dimensions if self.dimensional_average else 1
-        # Array containing the start index of each species. The last value is equivalent to vel_raw.shape[-1]
-        self.species_index_start = np.array([0, *np.cumsum(self.species_num)], dtype=int) * self.inv_dim * self.runs
+    return sp_current
 
-        # Grab simulation data
-        time, vel_raw = self.grab_sim_data()
 
-        # Make the velocity distribution
-        self.create_distribution(vel_raw, time)
+def calc_elec_current(sp_current, sp_charge):
+    """
+    Calculate the total electric current and electric current of each species.
 
-        # Calculate velocity moments
-        if hasattr(self, "max_no_moment"):
-            self.compute_moments(False, vel_raw, time)
-        #
-        if hasattr(self, "max_hermite_order"):
-            self.compute_hermite_expansion(False)
+    Parameters
+    ----------
+    sp_current: numpy.ndarray
+        Sum of the velocities of the particles of each species. Shape = (``no_species``, ``no_dim``, ``no_dumps``)
 
-    def prepare_histogram_args(self):
+    sp_charge: numpy.ndarray
+        Charge of each species.
 
-        # Initialize histograms arguments
-        if not hasattr(self, 'hist_kwargs'):
-            self.hist_kwargs = {'density': [],
-                                'bins': [],
-                                'range': []
-                                }
-        # Default values
-        bin_width = 0.05
-        # Range of the histogram = (-wid * vth, wid * vth)
-        wid = 5
-        # The number of bins is calculated from default values of bin_width and wid
-        no_bins = int(2.0 * wid / bin_width)
-        # Calculate thermal speed from energy/temperature data.
-        try:
-            energy_fle = self.prod_energy_filename if self.phase == 'production' else self.eq_energy_filename
-            energy_df = pd.read_csv(energy_fle, index_col=False, encoding='utf-8')
-            if self.num_species > 1:
-                vth = np.zeros(self.num_species)
-                for sp, (sp_mass, sp_name) in enumerate(zip(self.species_masses, self.species_names)):
-                    vth[sp] = np.sqrt(energy_df["{} Temperature".format(sp_name)].mean() * self.kB / sp_mass)
-            else:
-                vth = np.sqrt(energy_df["Temperature"].mean() * self.kB / self.species_masses)
+    Returns
+    -------
+    Js : numpy.ndarray
+        Electric current of each species. Shape = (``no_species``, ``no_dim``, ``no_dumps``)
+
+    Jtot : numpy.ndarray
+        Total electric current. Shape = (``no_dim``, ``no_dumps``)
+    """
+
+    Js = sp_charge[:, np.newaxis, np.newaxis] * sp_current
+    Jtot = np.sum(Js, axis=0)
+
+    return Js, Jtot
 
-        except FileNotFoundError:
-            vth = np.sqrt(self.kB * self.T_desired / self.species_masses)
 
-        self.vth = np.copy(vth)
+def calc_moments(dist, max_moment, species_index_start):
+    """
+    Calculate the moments of the (velocity) distribution.
 
-        # Create the default dictionary of histogram args
-        default_hist_kwargs = {'density': [],
-                               'bins': [],
-                               'range': []}
-        if self.num_species > 1:
-            for sp in range(self.num_species):
-                default_hist_kwargs['density'].append(True)
-                default_hist_kwargs['bins'].append(no_bins)
-                default_hist_kwargs['range'].append((-wid * vth[sp], wid * vth[sp]))
-        else:
-            default_hist_kwargs['density'].append(True)
-            default_hist_kwargs['bins'].append(no_bins)
-            default_hist_kwargs['range'].append((-wid * vth[0], wid * vth[0]))
+    Parameters
+    ----------
+    dist: numpy.ndarray
+        Distribution of each time step. Shape = (``no_dumps``, ``dim``, ``runs * inv_dim * total_num_ptlcs``)
 
-        # Now do some checks.
-        # Check for numpy.histogram args in kwargs
-        must_have_keys = ['bins', 'range', 'density']
+    max_moment: int
+        Maximum moment to calculate
 
-        for k, key in enumerate(must_have_keys):
-            try:
-                # Is it empty?
-                if len(self.hist_kwargs[key]) == 0:
-                    self.hist_kwargs[key] = default_hist_kwargs[key]
-            except KeyError:
-                self.hist_kwargs[key] = default_hist_kwargs[key]
+    species_index_start: numpy.ndarray
+        Array containing the start index of each species. The last value is equivalent to dist.shape[-1]
 
-        # Ok at this point I have a dictionary whose elements are list.
-        # I want the inverse a list whose elements are dicts
-        self.list_hist_kwargs = []
-        for indx in range(self.num_species):
-            another_dict = {}
-            # Loop over the keys and grab the species value
-            for key, values in self.hist_kwargs.items():
-                another_dict[key] = values[indx]
+    Returns
+    -------
+    moments: numpy.ndarray
+        Moments of the distribution.
+        Shape=( ``no_species``, ``no_dumps``, ``dim``, ``max_moment`` )
 
-            self.list_hist_kwargs.append(another_dict)
+    ratios: numpy.ndarray
+        Ratios of each moments with respect to the expected Maxwellian value.
+        Shape=( ``no_species``, ``no_dumps``,  ``no_dim``, ``max_moment - 1``)
 
-    def create_distribution(self, vel_raw: np.ndarray = None, time: np.ndarray = None):
-        """
-        Calculate the velocity distribution of each species and save the corresponding dataframes.
+    Notes
+    -----
+    See these `equations <https://en.wikipedia.org/wiki/Normal_distribution#Moments:~:text=distribution.-,Moments>`_
+    """
 
-        Parameters
-        ----------
-        vel_raw: np.ndarray, optional
-            Container of particles velocity at each time step.
+    # from scipy.stats import moment as scp_moment
+    from scipy.special import gamma as scp_gamma
 
-        time: np.ndarray, optional
-            Time array.
+    no_species = len(species_index_start)
+    no_dumps = dist.shape[0]
+    dim = dist.shape[1]
+    moments = np.zeros((no_species, no_dumps, dim, max_moment))
+    ratios = np.zeros((no_species, no_dumps, dim, max_moment))
 
-        """
+    for indx, sp_start in enumerate(species_index_start[:-1]):
+        # Calculate the correct start and end index for storage
+        sp_end = species_index_start[indx + 1]
 
-        print("\nCreating velocity distributions ...")
-        tinit = self.timer.current()
-        no_dumps = vel_raw.shape[0]
-        no_dim = vel_raw.shape[1]
-        # I want a Hierarchical dataframe
-        # Example:
-        #   Ca	                        Yb	    Ca	                        Yb	    Ca	                        Yb
-        #   X	                        X	    Y	                        Y	    Z	                        Z
-        #   1.54e-03 -2.54e+22 3.54e+00	1 2     1.54e-03 -2.54e+22 3.54e+00	1 2	    1.54e-03 -2.54e+22 3.54e+00 1 2
-        # This has 3 rows of columns. The first identifies the species, The second the axis,
-        # and the third the value of the bin_edge
-        # This can be easily obtained from pandas dataframe MultiIndex. But first I will create a dataframe
-        # from a huge matrix. The columns of this dataframe will be
-        # Ca_X_1.54e-03 Ca_X_-2.54e+22 Ca_X_3.54e+00 Yb_X_1	Yb_X_2 Ca_Y_1.54e-03 Ca_Y_-2.54e+22 Ca_Y_3.54e+00 Yb_Y_1 ...
-        # using pd.MultiIndex.from_tuples([tuple(c.split("_")) for c in df.columns]) I can create a hierarchical df.
-        # This is because I can access the data as
-        # df['Ca']['X']
-        # >>>       1.54e-03	-2.54e+22	3.54e+00
-        # >>> Time
-        # >>>   0   -1.694058	1.217008	-0.260678
-        # with the index = to my time array.
-        # see https://pandas.pydata.org/pandas-docs/stable/user_guide/advanced.html#reconstructing-the-level-labels
+        for mom in range(max_moment):
+            moments[indx, :, :, mom] = scp_stats.moment(dist[:, :, sp_start:sp_end], moment=mom + 1, axis=2)
 
-        # Columns
+    # sqrt( <v^2> ) = standard deviation = moments[:, :, :, 1] ** (1/2)
+    for mom in range(max_moment):
+        pwr = mom + 1
+        const = 2.0 ** (pwr / 2) * scp_gamma((pwr + 1) / 2) / np.sqrt(np.pi)
+        ratios[:, :, :, mom] = moments[:, :, :, mom] / (const * moments[:, :, :, 1] ** (pwr / 2.))
 
-        full_df_columns = []
-        # At the first time step I will create the columns list.
-        dist_matrix = np.zeros((len(time), self.dim * (np.sum(self.hist_kwargs["bins"]) + self.num_species)))
-        # The +1 at the end is because I decided to add a column containing the timestep
-        # For convenience save the bin edges somewhere else. The columns of the dataframe are string. This will give
-        # problems when plotting.
-        # Use a dictionary since the arrays could be different lengths
-        self.species_bin_edges = {}
-        for k in self.species_names:
-            # Initialize the sub-dictionary
-            self.species_bin_edges[k] = {}
+    return moments, ratios
 
-        for it in range(no_dumps):
-            for d, ds in zip(range(no_dim), ["X", "Y", "Z"]):
-                indx_0 = 0
-                for indx, (sp_name, sp_start) in enumerate(zip(self.species_names, self.species_index_start)):
-                    # Calculate the correct start and end index for storage
-                    sp_end = self.species_index_start[indx + 1]
 
-                    bin_count, bin_edges = np.histogram(vel_raw[it, d, sp_start:sp_end], **self.list_hist_kwargs[indx])
+def calc_nk(pos_data, k_list, box_lengths):
+    """
+    Calculate the instantaneous microscopic density :math:`n(k)` defined as
 
-                    # Executive decision: Center the bins
-                    bin_loc = 0.5 * (bin_edges[:-1] + bin_edges[1:])
-                    # Create the second_column_row the dataframe
-                    if it == 0:
-                        # Create the column array
-                        full_df_columns.append(["{}_{}_Time".format(sp_name, ds)])
-                        full_df_columns.append(
-                            ["{}_{}_{:6e}".format(sp_name, ds, be) for be in bin_loc])
-                        self.species_bin_edges[sp_name][ds] = bin_edges
-                        # Ok. Now I have created the bins columns' names
-                    # Time to insert in the huge matrix.
-                    indx_1 = indx_0 + 1 + len(bin_count)
-                    dist_matrix[it, indx_0] = time[it]
-                    dist_matrix[it, indx_0 + 1:indx_1] = bin_count
-                    indx_0 = indx_1
-        # Alright. The matrix is filled now onto the dataframe
-        # First let's flatten the columns array. This is because I have something like this
-        # Example: Binary Mixture with 3 H bins per axis and 2 He bins per axis
-        # columns =[['H_X', 'H_X', 'H_X'], ['He_X', 'He_X'], ['H_Y', 'H_Y', 'H_Y'], ['He_Y', 'He_Y'] ... Z-axis]
-        # Flatten with list(np.concatenate(columns).flat)
-        # Now has become
-        # first_column_row=['H_X', 'H_X', 'H_X', 'He_X', 'He_X', 'H_Y', 'H_Y', 'H_Y', 'He_Y', 'He_Y' ... Z-axis]
-        # I think this is easier to understand than using nested list comprehension
-        # see https://stackabuse.com/python-how-to-flatten-list-of-lists/
-        full_df_columns = list(np.concatenate(full_df_columns).flat)
-        self.dataframe = pd.DataFrame(dist_matrix, columns=full_df_columns)
-        # Save it
-        self.dataframe.to_csv(self.filename_csv, encoding='utf-8', index=False)
+    .. math::
+        n_{A} ( k ) = \sum_i^{N_A} \exp [ -i \mathbf k \cdot \mathbf r_{i} ]
 
-        # Hierarchical DataFrame
-        self.hierarchical_dataframe = self.dataframe.copy()
-        self.hierarchical_dataframe.columns = pd.MultiIndex.from_tuples(
-            [tuple(c.split("_")) for c in self.hierarchical_dataframe.columns])
-        self.hierarchical_dataframe.to_hdf(self.filename_hdf, key=self.__name__, encoding='utf-8')
+    Parameters
+    ----------
+    pos_data : numpy.ndarray
+        Particles' position. Shape = ( ``tot_no_ptcls``, 3)
 
-        tend = self.timer.current()
-        self.time_stamp("Velocity distribution calculation", self.timer.time_division(tend - tinit))
+    k_list : list
+        List of :math:`k` indices in each direction with corresponding magnitude and index of ``ka_counts``.
+        Shape=(``no_ka_values``, 5)
 
-    def compute_moments(self, parse_data: bool = False, vel_raw: np.ndarray = None, time: np.ndarray = None):
-        """Calculate and save moments of the distribution.
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-        Parameters
-        ----------
-        parse_data: bool
-            Flag for reading data. Default = False. If False, must pass ``vel_raw`` and ``time.
-            If True it will parse data from simulations dumps.
+    Returns
+    -------
+    nk : numpy.ndarray
+        Array containing :math:`n(k)`.
+    """
+    pos = np.asarray(pos_data)[np.newaxis]
+    return species_nk(pos, k_list, box_lengths, np.array([pos.shape[1]]))[0, 0]
 
-        vel_raw: np.ndarray, optional
-            Container of particles velocity at each time step.
 
-        time: np.ndarray, optional
-            Time array.
+def species_nk(pos, k_list, box_lengths, species_np, chunk=256):
+    """
+    Calculate the microscopic density :math:`n(k)` of each species in each of a block of dumps.
 
-        """
-        self.moments_dataframe = pd.DataFrame()
-        self.moments_hdf_dataframe = pd.DataFrame()
+    The phase factors are built from the powers of :math:`\exp[-2 \pi i x / L]` of each particle, see
+    :func:`harmonic_phases`. The dumps and blocks of ``chunk`` particles are computed in parallel.
 
-        if parse_data:
-            time, vel_raw = self.grab_sim_data()
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
 
-        self.moments_dataframe["Time"] = time
+    k_list : list
+        List of :math:`k` vectors.
 
-        print("\nCalculating velocity moments ...")
-        tinit = self.timer.current()
-        moments, ratios = calc_moments(vel_raw, self.max_no_moment, self.species_index_start)
-        tend = self.timer.current()
-        self.time_stamp("Velocity moments calculation", self.timer.time_division(tend - tinit))
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-        # Save the dataframe
-        if self.dimensional_average:
-            for i, sp in enumerate(self.species_names):
-                self.moments_hdf_dataframe["{}_X_Time".format(sp)] = time
-                for m in range(self.max_no_moment):
-                    self.moments_dataframe["{} {} moment".format(sp, m + 1)] = moments[i, :, :, m][:, 0]
-                    self.moments_hdf_dataframe["{}_X_{} moment".format(sp, m + 1)] = moments[i, :, :, m][:, 0]
-                for m in range(self.max_no_moment):
-                    self.moments_dataframe["{} {} moment ratio".format(sp, m + 1)] = ratios[i, :, :, m][:, 0]
-                    self.moments_hdf_dataframe["{}_X_{}-2 ratio".format(sp, m + 1)] = ratios[i, :, :, m][:, 0]
-        else:
-            for i, sp in enumerate(self.species_names):
-                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
-                    self.moments_hdf_dataframe["{}_{}_Time".format(sp, ds)] = time
-                    for m in range(self.max_no_moment):
-                        self.moments_dataframe["{} {} moment axis {}".format(sp, m + 1, ds)] = moments[i, :, d, m][:, 0]
-                        self.moments_hdf_dataframe["{}_{}_{} moment".format(sp, ds, m + 1)] = moments[i, :, :, m][:, 0]
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
-                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
-                    self.moments_hdf_dataframe["{}_{}_Time".format(sp, ds)] = time
-                    for m in range(self.max_no_moment):
-                        self.moments_dataframe[
-                            "{} {} moment ratio axis {}".format(sp, m + 1, ds)] = ratios[i, :, d, m][:, 0]
-                        self.moments_hdf_dataframe[
-                            "{}_{}_{}-2 ratio ".format(sp, ds, m + 1)] = ratios[i, :, d, m][:, 0]
+    chunk : int
+        Largest number of particles of a block. Default = 256.
 
-        self.moments_dataframe.to_csv(self.filename_csv, index=False, encoding='utf-8')
-        # Hierarchical DF Save
-        # Make the columns
-        self.moments_hdf_dataframe.columns = pd.MultiIndex.from_tuples(
-            [tuple(c.split("_")) for c in self.moments_hdf_dataframe.columns])
-        # Save the df in the hierarchical df with a new key/group
-        self.moments_hdf_dataframe.to_hdf(
-            self.filename_hdf,
-            mode='a',
-            key='velocity_moments',
-            encoding='utf-8'
-        )
+    Returns
+    -------
+    nk : numpy.ndarray
+        :math:`n(k)` of each species. Shape = ( ``no_species``, ``no_dumps``, ``no_ka_values``)
 
-    def compute_hermite_expansion(self, calc_moments: bool = False):
-        """
-        Calculate and save Hermite coefficients of the Grad expansion.
+    """
+    harmonics = k_harmonic_indices(k_list, box_lengths)
+    chunk_start, chunk_end, chunk_species = particle_chunks(species_np, chunk)
+    nk_chunks = calc_nk_chunks(np.asarray(pos, dtype=np.float64), np.asarray(box_lengths, dtype=np.float64),
+                               harmonics, chunk_start, chunk_end)
+
+    nk = np.zeros((len(species_np), nk_chunks.shape[0], nk_chunks.shape[2]), dtype=np.complex128)
+    np.add.at(nk, chunk_species, nk_chunks.transpose(1, 0, 2))
+
+    return nk
 
-        Parameters
-        ----------
-        calc_moments: bool
-            Flag for calculating velocity moments. These are needed for the hermite calculation.
-            Default = False.
 
-        """
-        from scipy.optimize import curve_fit
+def k_harmonic_indices(k_list, box_lengths):
+    """
+    Integer harmonics :math:`(n_x, n_y, n_z)` of the :math:`k` vectors, :math:`k_x = n_x / L_x`.
 
-        self.hermite_dataframe = pd.DataFrame()
-        self.hermite_hdf_dataframe = pd.DataFrame()
+    Parameters
+    ----------
+    k_list : list
+        List of :math:`k` vectors.
 
-        if calc_moments:
-            self.compute_moments(parse_data=True)
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-        if not hasattr(self, 'hermite_rms_tol'):
-            self.hermite_rms_tol = 0.05
+    Returns
+    -------
+    harmonics : numpy.ndarray
+        Harmonics of each :math:`k` vector. Shape = (``no_ka_values``, 3)
 
-        self.hermite_dataframe["Time"] = np.copy(self.moments_dataframe["Time"])
-        self.hermite_sigmas = np.zeros((self.num_species, self.dim, len(self.hermite_dataframe["Time"])))
-        self.hermite_epochs = np.zeros((self.num_species, self.dim, len(self.hermite_dataframe["Time"])))
-        hermite_coeff = np.zeros(
-            (self.num_species, self.dim, self.max_hermite_order + 1, len(self.hermite_dataframe["Time"])))
+    """
+    return np.rint(np.asarray(k_list)[:, :3] * box_lengths).astype(np.int64)
 
-        print("\nCalculating Hermite coefficients ...")
-        tinit = self.timer.current()
 
-        for sp, sp_name in enumerate(tqdm(self.species_names, desc='Species')):
-            for it, t in enumerate(tqdm(self.hermite_dataframe["Time"], desc='Time')):
-                # Grab the thermal speed from the moments
-                vrms = self.moments_dataframe["{} 2 moment".format(sp_name)].iloc[it]
-                # Loop over dimensions. No tensor availability yet
-                for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
+def particle_chunks(species_np, chunk):
+    """
+    Split the particles in blocks of at most ``chunk`` particles of the same species.
 
-                    # Grab the distribution from the hierarchical df
-                    dist = self.hierarchical_dataframe[sp_name][ds].iloc[it, 1:]
+    Parameters
+    ----------
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
-                    # Grab and center the bins
-                    v_bins = 0.5 * (self.species_bin_edges[sp_name][ds][1:] + self.species_bin_edges[sp_name][ds][:-1])
-                    cntrl = True
-                    j = 0
+    chunk : int
+        Largest number of particles of a block.
 
-                    # This is a routine to calculate the hermite coefficient in the case of non-equilibrium simulations.
-                    # In non-equilibrium we cannot define a temperature. This is because the temperature is defined from
-                    # the rms width of a Gaussian distribution. In non-equilibrium we don't have a Gaussian, thus the
-                    # first thing to do is to find the underlying Gaussian in our distribution. This is what this
-                    # iterative procedure is for.
+    Returns
+    -------
+    chunk_start : numpy.ndarray
+        First particle of each block.
 
-                    while cntrl:
-                        # Normalize
-                        norm = np.trapz(dist, x=v_bins / vrms)
+    chunk_end : numpy.ndarray
+        Last particle + 1 of each block.
 
-                        # Calculate the hermite coeff
-                        h_coeff = calculate_herm_coeff(v_bins / vrms, dist / norm, self.max_hermite_order)
+    chunk_species : numpy.ndarray
+        Species of each block.
 
-                        # Fit the rms only to the Grad expansion. This finds the underlying Gaussian
-                        res, _ = curve_fit(
-                            # the lambda func is because i need to fit only rms not the h_coeff
-                            lambda x, rms: grad_expansion(x, rms, h_coeff),
-                            v_bins / vrms,
-                            dist / norm,
-                            self.curve_fit_kwargs)
+    """
+    chunk_start, chunk_end, chunk_species = [], [], []
+    sp_start = 0
+    for sp, n_sp in enumerate(species_np):
+        for start in range(sp_start, sp_start + n_sp, chunk):
+            chunk_start.append(start)
+            chunk_end.append(min(start + chunk, sp_start + n_sp))
+            chunk_species.append(sp)
+        sp_start += n_sp
 
-                        vrms *= res[0]
+    return (np.array(chunk_start, dtype=np.int64), np.array(chunk_end, dtype=np.int64),
+            np.array(chunk_species, dtype=np.int64))
 
-                        if abs(1.0 - res[0]) < self.hermite_rms_tol:
-                            cntrl = False
-                            self.hermite_sigmas[sp, d, it] = vrms
-                            self.hermite_epochs[sp, d, it] = j
-                            hermite_coeff[sp, d, :, it] = h_coeff
-                        j += 1
 
-        tend = self.timer.current()
+@njit
+def harmonic_phases(pos, box_lengths, max_harmonics):
+    """
+    Phase factors :math:`\exp[-2 \pi i n x / L]` of each particle for :math:`n = 0, ...` ``max_harmonics`` in each
+    direction, computed by repeated multiplication of :math:`\exp[-2 \pi i x / L]`.
 
-        for sp, sp_name in enumerate(self.species_names):
-            for d, ds in zip(range(self.dim), ["X", "Y", "Z"]):
-                for h in range(self.max_hermite_order):
-                    self.hermite_dataframe["{} {} {} Hermite coeff".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
-                    if h == 0:
-                        self.hermite_hdf_dataframe[
-                            "{}_{}_Time".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
-                        self.hermite_hdf_dataframe[
-                            "{}_{}_RMS".format(sp_name, ds, h)] = self.hermite_sigmas[sp, d, :]
-                        self.hermite_hdf_dataframe[
-                            "{}_{}_epoch".format(sp_name, ds, h)] = self.hermite_epochs[sp, d, :]
-                    else:
-                        self.hermite_hdf_dataframe["{}_{}_{} coeff".format(sp_name, ds, h)] = hermite_coeff[sp, d, h, :]
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Shape = ( ``no_ptcls``, 3)
 
-        # Save the CSV
-        self.hermite_dataframe.to_csv(self.herm_df_filename_csv, index=False, encoding='utf-8')
-        # Make the columns
-        self.hermite_hdf_dataframe.columns = pd.MultiIndex.from_tuples(
-            [tuple(c.split("_")) for c in self.hermite_hdf_dataframe.columns])
-        # Save the df in the hierarchical df with a new key/group
-        self.hermite_hdf_dataframe.to_hdf(
-            self.filename_hdf,
-            mode='a',
-            key='hermite_coefficients',
-            encoding='utf-8'
-        )
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-        self.time_stamp("Hermite expansion calculation", self.timer.time_division(tend - tinit))
+    max_harmonics : numpy.ndarray
+        Largest harmonic in each direction.
 
-    def pretty_print(self):
-        """Print information in a user-friendly way."""
+    Returns
+    -------
+    phases : numpy.ndarray
+        Phase factors. Shape = ( 3, ``max_harmonics.max() + 1``, ``no_ptcls``)
 
-        print('\n\n{:=^70} \n'.format(' ' + self.__long_name__ + ' '))
-        print('CSV dataframe saved in:\n\t ', self.filename_csv)
-        print('HDF5 dataframe saved in:\n\t ', self.filename_hdf)
-        print('Data accessible at: self.dataframe, self.hierarchical_dataframe, self.species_bin_edges')
-        print('\nMulti run average: ', self.multi_run_average)
-        print('No. of runs: ', self.runs)
-        print("Size of the parsed velocity array: {} x {} x {}".format(self.no_dumps,
-                                                                       self.dim,
-                                                                       self.runs * self.inv_dim * self.total_num_ptcls))
-        print('\nHistograms Information:')
-        for sp, (sp_name, dics) in enumerate(zip(self.species_names, self.list_hist_kwargs)):
-            if sp == 0:
-                print("Species: {}".format(sp_name))
-            else:
-                print("\nSpecies: {}".format(sp_name))
-            print("No. of samples = {}".format(self.species_num[sp] * self.inv_dim * self.runs))
-            print("Thermal speed: v_th = {:.6e} ".format(self.vth[sp]), end='')
-            print("[cm/s]" if self.units == "cgs" else "[m/s]")
-            for key, values in dics.items():
-                if key == 'range':
-                    print("{} : ( {:.2f}, {:.2f} ) v_th,"
-                          "\n\t( {:.4e}, {:.4e} ) ".format(key, *values / self.vth[sp], *values), end='')
-                    print("[cm/s]" if self.units == "cgs" else "[m/s]")
-                else:
-                    print("{}: {}".format(key, values))
-            bin_width = abs(dics["range"][1] - dics["range"][0]) / (self.vth[sp] * dics["bins"])
-            print("Bin Width = {:.4f}".format(bin_width))
+    """
+    no_ptcls = pos.shape[0]
+    phases = np.ones((3, max_harmonics.max() + 1, no_ptcls), dtype=np.complex128)
+    for d in range(3):
+        for p in range(no_ptcls):
+            base = np.exp(-2.0j * np.pi * pos[p, d] / box_lengths[d])
+            for n in range(1, max_harmonics[d] + 1):
+                phases[d, n, p] = phases[d, n - 1, p] * base
 
-        if hasattr(self, "max_no_moment"):
-            print('\nMoments Information:')
-            print('CSV dataframe saved in:\n\t ', self.mom_df_filename_csv)
-            print('Data accessible at: self.moments_dataframe, self.moments_hdf_dataframe')
-            print('Highest moment to calculate: {}'.format(self.max_no_moment))
+    return phases
 
-        if hasattr(self, "max_hermite_order"):
-            print('\nGrad Expansion Information:')
-            print('CSV dataframe saved in:\n\t ', self.herm_df_filename_csv)
-            print('Data accessible at: self.hermite_dataframe, self.hermite_hdf_dataframe')
-            print('Highest order to calculate: {}'.format(self.max_hermite_order))
-            print('RMS Tolerance: {:.3f}'.format(self.hermite_rms_tol))
+
+@njit
+def harmonic_phase(phases, d, n, p):
+    """Phase factor of the harmonic ``n`` in the direction ``d`` of the particle ``p``. Negative ``n`` are the complex
+    conjugates of the positive ones."""
+    if n >= 0:
+        return phases[d, n, p]
+    return np.conj(phases[d, -n, p])
 
 
 @njit
-def calc_Sk(nkt, k_list, k_counts, species_np, no_dumps):
+def max_abs_harmonics(harmonics):
+    """Largest absolute harmonic in each direction."""
+    max_harmonics = np.zeros(3, dtype=np.int64)
+    for ik in range(harmonics.shape[0]):
+        for d in range(3):
+            max_harmonics[d] = max(max_harmonics[d], abs(harmonics[ik, d]))
+
+    return max_harmonics
+
+
+@njit(parallel=True)
+def calc_nk_chunks(pos, box_lengths, harmonics, chunk_start, chunk_end):
     """
-    Calculate :math:`S_{ij}(k)` at each saved timestep.
+    Calculate :math:`n(k)` of each block of particles in each dump. The dumps and blocks are computed in parallel.
 
     Parameters
     ----------
-    nkt : numpy.ndarray, complex
-        Density fluctuations of all species. Shape = ( ``no_species``, ``no_dumps``, ``no_ka_values``)
+    pos : numpy.ndarray
+        Particles' positions. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
 
-    k_list :
-        List of :math:`k` indices in each direction with corresponding magnitude and index of ``k_counts``.
-        Shape=(``no_ka_values``, 5)
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-    k_counts : numpy.ndarray
-        Number of times each :math:`k` magnitude appears.
+    harmonics : numpy.ndarray
+        Harmonics of each :math:`k` vector. Shape = (``no_ka_values``, 3)
 
-    species_np : numpy.ndarray
-        Array with number of particles of each species.
+    chunk_start : numpy.ndarray
+        First particle of each block.
 
-    no_dumps : int
-        Number of dumps.
+    chunk_end : numpy.ndarray
+        Last particle + 1 of each block.
 
     Returns
     -------
-
-    Sk_all : numpy.ndarray
-        Array containing :math:`S_{ij}(k)`. Shape=(``no_Sk``, ``no_ka_values``, ``no_dumps``)
+    nk : numpy.ndarray
+        :math:`n(k)` of each block. Shape = ( ``no_dumps``, ``no_chunks``, ``no_ka_values``)
 
     """
+    no_dumps = pos.shape[0]
+    no_chunks = chunk_start.shape[0]
+    no_k = harmonics.shape[0]
+    max_harmonics = max_abs_harmonics(harmonics)
+    nk = np.zeros((no_dumps, no_chunks, no_k), dtype=np.complex128)
+    for item in prange(no_dumps * no_chunks):
+        it = item // no_chunks
+        ic = item % no_chunks
+        phases = harmonic_phases(pos[it, chunk_start[ic]:chunk_end[ic]], box_lengths, max_harmonics)
+        for ik in range(no_k):
+            nx, ny, nz = harmonics[ik, 0], harmonics[ik, 1], harmonics[ik, 2]
+            total = 0.0j
+            for p in range(phases.shape[2]):
+                total += harmonic_phase(phases, 0, nx, p) * harmonic_phase(phases, 1, ny, p) \
+                    * harmonic_phase(phases, 2, nz, p)
+            nk[it, ic, ik] = total
 
-    no_sk = int(len(species_np) * (len(species_np) + 1) / 2)
-    Sk_raw = np.zeros((no_sk, len(k_counts), no_dumps))
-    pair_indx = 0
-    for ip, si in enumerate(species_np):
-        for jp in range(ip, len(species_np)):
-            sj = species_np[jp]
-            dens_const = 1.0 / np.sqrt(si * sj)
-            for it in range(no_dumps):
-                for ik, ka in enumerate(k_list):
-                    indx = int(ka[-1])
-                    nk_i = nkt[ip, it, ik]
-                    nk_j = nkt[jp, it, ik]
-                    Sk_raw[pair_indx, indx, it] += np.real(np.conj(nk_i) * nk_j) * dens_const / k_counts[indx]
-            pair_indx += 1
-
-    return Sk_raw
+    return nk
 
 
-def calc_Skw(nkt, ka_list, species_np, no_dumps, dt, dump_step):
+def nk_frame(data, k_list, species_np, box_lengths):
     """
-    Calculate the Fourier transform of the correlation function of ``nkt``.
+    Density fluctuations of each species in a dump. Per-dump function of :class:`FramePipeline`.
 
     Parameters
     ----------
-    dt : float
-        Time interval.
-
-    dump_step : int
-        Snapshot interval.
-
-    nkt :  complex, numpy.ndarray
-        Particles' density or velocity fluctuations.
-        Shape = ( ``no_species``, ``no_dumps``, ``no_k_list``)
-
-    ka_list : list
-        List of :math:`k` indices in each direction with corresponding magnitude and index of ``ka_counts``.
-        Shape=(``no_ka_values``, 5)
+    data : dict
+        Particles' data.
 
-    ka_counts : numpy.ndarray
-        Number of times each :math:`k` magnitude appears.
+    k_list : list
+        List of :math: `k` vectors.
 
     species_np : numpy.ndarray
-        Array with one element giving number of particles.
+        Number of particles of each species.
 
-    no_dumps : int
-        Number of dumps.
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
     Returns
     -------
-    Skw : numpy.ndarray
-        DSF/CCF of each species and pair of species.
-        Shape = (``no_skw``, ``no_ka_values``, ``no_dumps``)
+    values : dict
+        ``nkt``. Shape = (``no_species``, ``no_ka_values``).
+
     """
-    # Fourier transform normalization: norm = dt / Total time
-    norm = dt / np.sqrt(no_dumps * dt * dump_step)
-    # number of independent observables
-    no_skw = int(len(species_np) * (len(species_np) + 1) / 2)
-    # DSF
-    # Skw = np.zeros((no_skw, len(ka_counts), no_dumps))
-    Skw_all = np.zeros((no_skw, len(ka_list), no_dumps))
-    pair_indx = 0
-    for ip, si in enumerate(species_np):
-        for jp in range(ip, len(species_np)):
-            sj = species_np[jp]
-            dens_const = 1.0 / np.sqrt(si * sj)
-            for ik, ka in enumerate(ka_list):
-                # indx = int(ka[-1])
-                nkw_i = np.fft.fft(nkt[ip, :, ik]) * norm
-                nkw_j = np.fft.fft(nkt[jp, :, ik]) * norm
-                Skw_all[pair_indx, ik, :] = np.fft.fftshift(np.real(np.conj(nkw_i) * nkw_j) * dens_const)
-                # Skw[pair_indx, indx, :] += Skw_all[pair_indx, ik, :] / ka_counts[indx]
-            pair_indx += 1
+    return {'nkt': species_nk(data["pos"][np.newaxis], k_list, box_lengths, species_np)[:, 0]}
+
+
+def vk_frame(data, k_list, species_np, box_lengths):
+    """
+    Longitudinal and transverse velocity fluctuations of each species in a dump. Per-dump function of
+    :class:`FramePipeline`.
+
+    Parameters
+    ----------
+    data : dict
+        Particles' data.
+
+    k_list : list
+        List of :math: `k` vectors.
+
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
-    return Skw_all
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
+    Returns
+    -------
+    values : dict
+        ``vkt``: longitudinal and three transverse components. Shape = (4, ``no_species``, ``no_ka_values``).
 
-@njit
-def calc_elec_current(vel, sp_charge, sp_num):
     """
-    Calculate the total electric current and electric current of each species.
+    vk = species_vk(data["pos"][np.newaxis], data["vel"][np.newaxis], k_list, box_lengths, species_np)
+    return {'vkt': vk[:, :, 0]}
+
+
+def species_current_frame(data, species_np):
+    """
+    Current of each species in a dump. Per-dump function of :class:`FramePipeline`.
 
     Parameters
     ----------
-    vel: numpy.ndarray
-        Particles' velocities.
-
-    sp_charge: numpy.ndarray
-        Charge of each species.
+    data : dict
+        Particles' data. Either ``species_current`` or ``vel``.
 
-    sp_num: numpy.ndarray
+    species_np : numpy.ndarray
         Number of particles of each species.
 
     Returns
     -------
-    Js : numpy.ndarray
-        Electric current of each species. Shape = (``no_species``, ``no_dim``, ``no_dumps``)
+    values : dict
+        ``species_current``. Shape = (``no_species``, ``no_dim``).
 
-    Jtot : numpy.ndarray
-        Total electric current. Shape = (``no_dim``, ``no_dumps``)
     """
+    if 'species_current' in data:
+        return {'species_current': data['species_current']}
 
-    no_dumps = vel.shape[1]
-    no_dim = vel.shape[0]
+    vel = np.ascontiguousarray(data['vel'].transpose()[:, np.newaxis, :])
+    return {'species_current': calc_species_current(vel, species_np)[:, :, 0]}
 
-    Js = np.zeros((sp_num.shape[0], no_dim, no_dumps))
-    Jtot = np.zeros((no_dim, no_dumps))
 
-    sp_start = 0
-    sp_end = 0
-    for s, (q_sp, n_sp) in enumerate(zip(sp_charge, sp_num)):
-        # Find the index of the last particle of species s
-        sp_end += n_sp
-        # Calculate the current of each species
-        Js[s, :, :] = q_sp * np.sum(vel[:, :, sp_start:sp_end], axis=-1)
-        # Add to the total current
-        Jtot[:, :] += Js[s, :, :]
+def pressure_frame(data, species_mass, species_np, box_volume):
+    """
+    Pressure and pressure tensor of a dump. Per-dump function of :class:`FramePipeline`.
 
-        sp_start += n_sp
+    Parameters
+    ----------
+    data : dict
+        Particles' data.
 
-    return Js, Jtot
+    species_mass : numpy.ndarray
+        Mass of each species.
+
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
+    box_volume : float
+        Volume of simulation's box.
+
+    Returns
+    -------
+    values : dict
+        ``pressure`` and ``pressure_tensor``.
 
-def calc_moments(dist, max_moment, species_index_start):
     """
-    Calculate the moments of the (velocity) distribution.
+    # calc_pressure_tensor rescales the velocities and accelerations in place. The data is shared by all the quantities.
+    pressure, pressure_tensor = calc_pressure_tensor(data["pos"], np.copy(data["vel"]), np.copy(data["acc"]),
+                                                     species_mass, species_np, box_volume)
+    return {'pressure': pressure, 'pressure_tensor': pressure_tensor}
+
+
+def current_acf_frame(data, species_np, species_charges):
+    """
+    Electric current of each species and total electric current of a dump. Channels of the multiple-tau correlator of
+    :class:`ElectricCurrent`.
 
     Parameters
     ----------
-    dist: numpy.ndarray
-        Distribution of each time step. Shape = (``no_dumps``, ``dim``, ``runs * inv_dim * total_num_ptlcs``)
+    data : dict
+        Particles' data. Either ``species_current`` or ``vel``.
 
-    max_moment: int
-        Maximum moment to calculate
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
-    species_index_start: numpy.ndarray
-        Array containing the start index of each species. The last value is equivalent to dist.shape[-1]
+    species_charges : numpy.ndarray
+        Charge of each species.
 
     Returns
     -------
-    moments: numpy.ndarray
-        Moments of the distribution.
-        Shape=( ``no_species``, ``no_dumps``, ``dim``, ``max_moment`` )
+    channels : numpy.ndarray
+        Currents. Shape = ((``no_species`` + 1) * ``no_dim``).
 
-    ratios: numpy.ndarray
-        Ratios of each moments with respect to the expected Maxwellian value.
-        Shape=( ``no_species``, ``no_dumps``,  ``no_dim``, ``max_moment - 1``)
-
-    Notes
-    -----
-    See these `equations <https://en.wikipedia.org/wiki/Normal_distribution#Moments:~:text=distribution.-,Moments>`_
     """
+    species_current = species_current_frame(data, species_np)['species_current'] * species_charges[:, np.newaxis]
+    return np.concatenate((species_current.ravel(), species_current.sum(axis=0)))
 
-    # from scipy.stats import moment as scp_moment
-    from scipy.special import gamma as scp_gamma
 
-    no_species = len(species_index_start)
-    no_dumps = dist.shape[0]
-    dim = dist.shape[1]
-    moments = np.zeros((no_species, no_dumps, dim, max_moment))
-    ratios = np.zeros((no_species, no_dumps, dim, max_moment))
+def diffusion_flux_acf_frame(data, species_np, species_conc, species_mass):
+    """
+    Relative diffusion fluxes of a dump, as in :func:`calc_diff_flux_acf`. Channels of the multiple-tau correlator of
+    :class:`DiffusionFlux`.
 
-    for indx, sp_start in enumerate(species_index_start[:-1]):
-        # Calculate the correct start and end index for storage
-        sp_end = species_index_start[indx + 1]
+    Parameters
+    ----------
+    data : dict
+        Particles' data. Either ``species_current`` or ``vel``.
 
-        for mom in range(max_moment):
-            moments[indx, :, :, mom] = scp_stats.moment(dist[:, :, sp_start:sp_end], moment=mom + 1, axis=2)
+    species_np : numpy.ndarray
+        Number of particles of each species.
 
-    # sqrt( <v^2> ) = standard deviation = moments[:, :, :, 1] ** (1/2)
-    for mom in range(max_moment):
-        pwr = mom + 1
-        const = 2.0 ** (pwr / 2) * scp_gamma((pwr + 1) / 2) / np.sqrt(np.pi)
-        ratios[:, :, :, mom] = moments[:, :, :, mom] / (const * moments[:, :, :, 1] ** (pwr / 2.))
+    species_conc : numpy.ndarray
+        Concentration of each species.
 
-    return moments, ratios
+    species_mass : numpy.ndarray
+        Particle's mass of each species.
 
+    Returns
+    -------
+    channels : numpy.ndarray
+        Relative diffusion fluxes. Shape = ((``no_species`` - 1) * ``no_dim``).
 
-@njit
-def calc_nk(pos_data, k_list):
     """
-    Calculate the instantaneous microscopic density :math:`n(k)` defined as
+    tot_vel = species_current_frame(data, species_np)['species_current']
+    jr_flux = np.zeros((len(species_mass) - 1, tot_vel.shape[1]))
+    for i, m_alpha in enumerate(species_mass[:-1]):
+        for j, m_beta in enumerate(species_mass):
+            delta_ab = 1 * (m_beta == m_alpha)
+            jr_flux[i] += (delta_ab - species_conc[i]) * tot_vel[j]
 
-    .. math::
-        n_{A} ( k ) = \sum_i^{N_A} \exp [ -i \mathbf k \cdot \mathbf r_{i} ]
+    return jr_flux.ravel()
+
+
+def pressure_acf_frame(data, species_mass, species_np, box_volume):
+    """
+    Pressure and pressure tensor of a dump. Channels of the multiple-tau correlator of :class:`PressureTensor`.
 
     Parameters
     ----------
-    pos_data : numpy.ndarray
-        Particles' position scaled by the box lengths.
-        Shape = ( ``no_dumps``, ``no_dim``, ``tot_no_ptcls``)
+    data : dict
+        Particles' data. ``pos``, ``vel`` and ``acc``.
 
-    k_list : list
-        List of :math:`k` indices in each direction with corresponding magnitude and index of ``ka_counts``.
-        Shape=(``no_ka_values``, 5)
+    species_mass : numpy.ndarray
+        Mass of each species.
+
+    species_np : numpy.ndarray
+        Number of particles of each species.
+
+    box_volume : float
+        Volume of the simulation box.
 
     Returns
     -------
-    nk : numpy.ndarray
-        Array containing :math:`n(k)`.
+    channels : numpy.ndarray
+        Pressure followed by the components of the pressure tensor. Shape = (1 + ``no_dim`` * ``no_dim``).
+
     """
+    values = pressure_frame(data, species_mass, species_np, box_volume)
+    return np.concatenate(([values['pressure']], values['pressure_tensor'].ravel()))
 
-    nk = np.zeros(len(k_list), dtype=np.complex128)
 
-    for ik, k_vec in enumerate(k_list):
-        kr_i = 2.0 * np.pi * (k_vec[0] * pos_data[:, 0] + k_vec[1] * pos_data[:, 1] + k_vec[2] * pos_data[:, 2])
-        nk[ik] = np.sum(np.exp(-1j * kr_i))
+def velocity_acf_frame(data):
+    """
+    Particles' velocities of a dump. Channels of the multiple-tau correlator of
+    :class:`VelocityAutoCorrelationFunction`.
 
-    return nk
+    Parameters
+    ----------
+    data : dict
+        Particles' data. ``vel``.
 
+    Returns
+    -------
+    channels : numpy.ndarray
+        Velocities. Shape = (``no_ptcls`` * ``no_dim``).
+
+    """
+    return np.ravel(data['vel'])
 
-def calc_nkt(fldr, slices, dump_step, species_np, k_list, verbose):
+
+def calc_nkt(fldr, slices, dump_step, species_np, k_list, box_lengths, verbose, block=32):
     """
     Calculate density fluctuations :math:`n(k,t)` of all species.
 
@@ -3560,6 +5390,15 @@ def calc_nkt(fldr, slices, dump_step, species_np, k_list, verbose):
     k_list : list
         List of :math: `k` vectors.
 
+    box_lengths : numpy.ndarray
+        Length of each box's side.
+
+    verbose : bool
+        Flag for the progress bar.
+
+    block : int
+        Number of dumps computed together in parallel. Default = 32.
+
     Return
     ------
     nkt : numpy.ndarray, complex
@@ -3568,15 +5407,18 @@ def calc_nkt(fldr, slices, dump_step, species_np, k_list, verbose):
 
     # Read particles' position for times in the slice
     nkt = np.zeros((len(species_np), slices[2], len(k_list)), dtype=np.complex128)
-    for it, dump in enumerate(tqdm(range(slices[0], slices[1], dump_step), disable=not verbose)):
-        data = load_from_restart(fldr, dump)
-        pos = data["pos"]
-        sp_start = 0
-        sp_end = 0
-        for i, sp in enumerate(species_np):
-            sp_end += sp
-            nkt[i, it, :] = calc_nk(pos[sp_start:sp_end, :], k_list)
-            sp_start += sp
+    pos = np.zeros((block, np.sum(species_np), 3))
+    dumps = DumpReader(fldr, range(slices[0], slices[1], dump_step), fields=["pos"])
+    filled = 0
+    for it, (dump, data) in enumerate(tqdm(dumps, disable=not verbose)):
+        pos[filled] = data["pos"]
+        filled += 1
+        if filled == block:
+            nkt[:, it + 1 - filled:it + 1, :] = species_nk(pos, k_list, box_lengths, species_np)
+            filled = 0
+
+    if filled > 0:
+        nkt[:, it + 1 - filled:it + 1, :] = species_nk(pos[:filled], k_list, box_lengths, species_np)
 
     return nkt
 
@@ -3664,17 +5506,14 @@ def calc_statistical_efficiency(observable, run_avg, run_std, max_no_divisions,
 
 
 # @jit Numba doesn't like scipy.signal
-def calc_diff_flux_acf(vel, sp_num, sp_conc, sp_mass):
+def calc_diff_flux_acf(tot_vel, sp_conc, sp_mass):
     """
     Calculate the diffusion fluxes and their autocorrelations functions in each direction.
 
     Parameters
     ----------
-    vel : numpy.ndarray
-        Particles' velocities. Shape = (``dimensions``, ``no_dumps``, ``total_num_ptcls``)
-
-    sp_num: numpy.ndarray
-        Number of particles of each species.
+    tot_vel : numpy.ndarray
+        Sum of the velocities of the particles of each species. Shape = (``no_species``, ``dimensions``, ``no_dumps``)
 
     sp_conc: numpy.ndarray
         Concentration of each species.
@@ -3694,26 +5533,11 @@ def calc_diff_flux_acf(vel, sp_num, sp_conc, sp_mass):
 
     """
 
-    no_dim = vel.shape[0]
-    no_dumps = vel.shape[1]
-    no_species = len(sp_num)
+    no_species, no_dim, no_dumps = tot_vel.shape
     # number of independent fluxes = no_species - 1,
     # number of acf of ind fluxes = no_species - 1 ^2
     no_jc_acf = int((no_species - 1) * (no_species - 1))
 
-    # Current of each species in each direction and at each timestep
-    tot_vel = np.zeros((no_species, no_dim, no_dumps))
-
-    sp_start = 0
-    sp_end = 0
-    # Calculate the total center of mass velocity (tot_com_vel)
-    # and the center of mass velocity of each species (com_vel)
-    for i, ns in enumerate(sp_num):
-        sp_end += ns
-        tot_vel[i, :, :] = np.sum(vel[:, :, sp_start: sp_end], axis=-1)
-        # tot_com_vel += mass_densities[i] * com_vel[i, :, :] / tot_mass_dens
-        sp_start += ns
-
     # Diffusion Fluxes
     J_flux = np.zeros((no_species - 1, no_dim, no_dumps))
 
@@ -3750,10 +5574,14 @@ def calc_diff_flux_acf(vel, sp_num, sp_conc, sp_mass):
 
 
 # @jit Numba doesn't like Scipy
-def calc_vacf(vel, sp_num):
+def calc_vacf(vel, sp_num, max_memory=2 ** 28, workers=-1):
     """
     Calculate the velocity autocorrelation function of each species and in each direction.
 
+    The autocorrelation functions are computed by FFT of blocks of particles of the same species. The power spectra of
+    the particles of a species are summed before the inverse transform, hence there is one inverse transform per species
+    and direction. The result is the same as the sum of :func:`correlationfunction` over the particles.
+
     Parameters
     ----------
     vel : numpy.ndarray
@@ -3763,6 +5591,12 @@ def calc_vacf(vel, sp_num):
     sp_num: numpy.ndarray
         Number of particles of each species.
 
+    max_memory : int
+        Approximate memory in bytes of the Fourier transforms of a block of particles. Default = 256 MB.
+
+    workers : int
+        Number of threads of the Fourier transforms, see ``scipy.fft.rfft``. Default = -1, i.e. all the CPUs.
+
     Returns
     -------
     vacf: numpy.ndarray
@@ -3772,51 +5606,55 @@ def calc_vacf(vel, sp_num):
     no_dim = vel.shape[0]
     no_dumps = vel.shape[2]
 
-    vacf = np.zeros((len(sp_num), no_dim + 1, no_dumps))
-
-    # Calculate the vacf of each species in each dimension
-    for i in range(no_dim):
-        sp_start = 0
-        sp_end = 0
-        for sp, n_sp in enumerate(sp_num):
-            sp_end += n_sp
-            # Temporary species vacf
-            sp_vacf = np.zeros(no_dumps)
-            # Calculate the vacf for each particle of species sp
-            for ptcl in range(sp_start, sp_end):
-                # Calculate the correlation function and add it to the array
-                ptcl_vacf = correlationfunction(vel[i, ptcl, :], vel[i, ptcl, :])
+    # Zero padding to at least 2 * Nt - 1 avoids the wrap around of the circular correlation
+    n_fft = scp_fft.next_fast_len(2 * no_dumps - 1, real=True)
+    # Bytes per particle: the padded velocities and their transform
+    ptcl_bytes = no_dim * (n_fft * 8 + (n_fft // 2 + 1) * 16)
+    block = max(int(max_memory // ptcl_bytes), 1)
+    # Normalization by the number of time origins of each lag
+    norm = np.arange(no_dumps, 0, -1)
 
-                # Add this particle vacf to the species vacf and normalize by the time origins
-                sp_vacf += ptcl_vacf
+    vacf = np.zeros((len(sp_num), no_dim + 1, no_dumps))
 
-            # Save the species vacf for dimension i
-            vacf[sp, i, :] = sp_vacf / n_sp
-            # Save the total vacf
-            vacf[sp, -1, :] += sp_vacf / n_sp
-            # Move to the next species first particle position
-            sp_start += n_sp
+    sp_start = 0
+    for sp, n_sp in enumerate(sp_num):
+        sp_end = sp_start + n_sp
+        # Sum of the power spectra of the particles of species sp
+        spectrum = np.zeros((no_dim, n_fft // 2 + 1))
+        for ptcl in range(sp_start, sp_end, block):
+            vel_ft = scp_fft.rfft(vel[:, ptcl:min(ptcl + block, sp_end), :], n=n_fft, axis=-1, workers=workers)
+            spectrum += (vel_ft.real ** 2 + vel_ft.imag ** 2).sum(axis=1)
+
+        sp_vacf = scp_fft.irfft(spectrum, n=n_fft, axis=-1, workers=workers)[:, :no_dumps] / norm
+
+        # Save the species vacf for each dimension and the total vacf
+        vacf[sp, :no_dim, :] = sp_vacf / n_sp
+        vacf[sp, -1, :] = sp_vacf.sum(axis=0) / n_sp
+        # Move to the next species first particle position
+        sp_start = sp_end
 
     return vacf
 
 
-@njit
-def calc_vk(pos_data, vel_data, k_list):
+def calc_vk(pos_data, vel_data, k_list, box_lengths):
     """
     Calculate the instantaneous longitudinal and transverse velocity fluctuations.
 
     Parameters
     ----------
     pos_data : numpy.ndarray
-        Particles' position. Shape = ( ``no_dumps``, 3, ``tot_no_ptcls``)
+        Particles' position. Shape = ( ``tot_no_ptcls``, 3)
 
     vel_data : numpy.ndarray
-        Particles' velocities. Shape = ( ``no_dumps``, 3, ``tot_no_ptcls``)
+        Particles' velocities. Shape = ( ``tot_no_ptcls``, 3)
 
     k_list : list
         List of :math:`k` indices in each direction with corresponding magnitude and index of ``ka_counts``.
         Shape=(``no_ka_values``, 5)
 
+    box_lengths : numpy.ndarray
+        Length of each box's side.
+
     Returns
     -------
     vkt : numpy.ndarray
@@ -3832,35 +5670,125 @@ def calc_vk(pos_data, vel_data, k_list):
         Array containing transverse velocity fluctuations in the :math:`z` direction.
 
     """
+    pos = np.asarray(pos_data)[np.newaxis]
+    vk = species_vk(pos, np.asarray(vel_data)[np.newaxis], k_list, box_lengths, np.array([pos.shape[1]]))
+
+    return vk[0, 0, 0], vk[1, 0, 0], vk[2, 0, 0], vk[3, 0, 0]
+
+
+def species_vk(pos, vel, k_list, box_lengths, species_np, chunk=256):
+    """
+    Calculate the longitudinal and transverse velocity fluctuations of each species in each of a block of dumps.
+    See :func:`species_nk`.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
+
+    vel : numpy.ndarray
+        Particles' velocities. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
+
+    k_list : list
+        List of :math:`k` vectors.
+
+    box_lengths : numpy.ndarray
+        Length of each box's side.
+
+    species_np : numpy.ndarray
+        Number of particles of each species.
+
+    chunk : int
+        Largest number of particles of a block. Default = 256.
+
+    Returns
+    -------
+    vk : numpy.ndarray
+        Longitudinal and three transverse components of each species.
+        Shape = ( 4, ``no_species``, ``no_dumps``, ``no_ka_values``)
+
+    """
+    harmonics = k_harmonic_indices(k_list, box_lengths)
+    chunk_start, chunk_end, chunk_species = particle_chunks(species_np, chunk)
+    vk_chunks = calc_vk_chunks(np.asarray(pos, dtype=np.float64), np.asarray(vel, dtype=np.float64),
+                               np.asarray(box_lengths, dtype=np.float64), harmonics,
+                               np.ascontiguousarray(np.asarray(k_list)[:, :3], dtype=np.float64),
+                               chunk_start, chunk_end)
+
+    vk = np.zeros((4, len(species_np), vk_chunks.shape[1], vk_chunks.shape[3]), dtype=np.complex128)
+    np.add.at(vk, (slice(None), chunk_species), vk_chunks.transpose(0, 2, 1, 3))
+
+    return vk
+
+
+@njit(parallel=True)
+def calc_vk_chunks(pos, vel, box_lengths, harmonics, k_vecs, chunk_start, chunk_end):
+    """
+    Calculate the longitudinal and transverse velocity fluctuations of each block of particles in each dump.
+    The dumps and blocks are computed in parallel.
+
+    Parameters
+    ----------
+    pos : numpy.ndarray
+        Particles' positions. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
 
-    # Longitudinal
-    vk = np.zeros(len(k_list), dtype=np.complex128)
+    vel : numpy.ndarray
+        Particles' velocities. Shape = ( ``no_dumps``, ``tot_no_ptcls``, 3)
 
-    # Transverse
-    vk_i = np.zeros(len(k_list), dtype=np.complex128)
-    vk_j = np.zeros(len(k_list), dtype=np.complex128)
-    vk_k = np.zeros(len(k_list), dtype=np.complex128)
+    box_lengths : numpy.ndarray
+        Length of each box's side.
 
-    for ik, k_vec in enumerate(k_list):
-        # Calculate the dot product and cross product between k, r, and v
-        kr_i = 2.0 * np.pi * (k_vec[0] * pos_data[:, 0] + k_vec[1] * pos_data[:, 1] + k_vec[2] * pos_data[:, 2])
-        k_dot_v = 2.0 * np.pi * (k_vec[0] * vel_data[:, 0] + k_vec[1] * vel_data[:, 1] + k_vec[2] * vel_data[:, 2])
+    harmonics : numpy.ndarray
+        Harmonics of each :math:`k` vector. Shape = (``no_ka_values``, 3)
 
-        k_cross_v_i = 2.0 * np.pi * (k_vec[1] * vel_data[:, 2] - k_vec[2] * vel_data[:, 1])
-        k_cross_v_j = -2.0 * np.pi * (k_vec[0] * vel_data[:, 2] - k_vec[2] * vel_data[:, 0])
-        k_cross_v_k = 2.0 * np.pi * (k_vec[0] * vel_data[:, 1] - k_vec[1] * vel_data[:, 0])
+    k_vecs : numpy.ndarray
+        :math:`k` vectors divided by :math:`2\pi`. Shape = (``no_ka_values``, 3)
 
-        # Microscopic longitudinal current
-        vk[ik] = np.sum(k_dot_v * np.exp(-1j * kr_i))
-        # Microscopic transverse current
-        vk_i[ik] = np.sum(k_cross_v_i * np.exp(-1j * kr_i))
-        vk_j[ik] = np.sum(k_cross_v_j * np.exp(-1j * kr_i))
-        vk_k[ik] = np.sum(k_cross_v_k * np.exp(-1j * kr_i))
+    chunk_start : numpy.ndarray
+        First particle of each block.
 
-    return vk, vk_i, vk_j, vk_k
+    chunk_end : numpy.ndarray
+        Last particle + 1 of each block.
 
+    Returns
+    -------
+    vk : numpy.ndarray
+        Longitudinal and three transverse components of each block.
+        Shape = ( 4, ``no_dumps``, ``no_chunks``, ``no_ka_values``)
 
-def calc_vkt(fldr, slices, dump_step, species_np, k_list, verbose):
+    """
+    no_dumps = pos.shape[0]
+    no_chunks = chunk_start.shape[0]
+    no_k = harmonics.shape[0]
+    max_harmonics = max_abs_harmonics(harmonics)
+    vk = np.zeros((4, no_dumps, no_chunks, no_k), dtype=np.complex128)
+    for item in prange(no_dumps * no_chunks):
+        it = item // no_chunks
+        ic = item % no_chunks
+        start = chunk_start[ic]
+        phases = harmonic_phases(pos[it, start:chunk_end[ic]], box_lengths, max_harmonics)
+        for ik in range(no_k):
+            nx, ny, nz = harmonics[ik, 0], harmonics[ik, 1], harmonics[ik, 2]
+            kx, ky, kz = 2.0 * np.pi * k_vecs[ik, 0], 2.0 * np.pi * k_vecs[ik, 1], 2.0 * np.pi * k_vecs[ik, 2]
+            vk_par, vk_i, vk_j, vk_k = 0.0j, 0.0j, 0.0j, 0.0j
+            for p in range(phases.shape[2]):
+                phase = harmonic_phase(phases, 0, nx, p) * harmonic_phase(phases, 1, ny, p) \
+                    * harmonic_phase(phases, 2, nz, p)
+                vx, vy, vz = vel[it, start + p, 0], vel[it, start + p, 1], vel[it, start + p, 2]
+                # Microscopic longitudinal and transverse currents
+                vk_par += (kx * vx + ky * vy + kz * vz) * phase
+                vk_i += (ky * vz - kz * vy) * phase
+                vk_j += -(kx * vz - kz * vx) * phase
+                vk_k += (kx * vy - ky * vx) * phase
+            vk[0, it, ic, ik] = vk_par
+            vk[1, it, ic, ik] = vk_i
+            vk[2, it, ic, ik] = vk_j
+            vk[3, it, ic, ik] = vk_k
+
+    return vk
+
+
+def calc_vkt(fldr, slices, dump_step, species_np, k_list, box_lengths, verbose, block=32):
     """
     Calculate the longitudinal and transverse velocities fluctuations of all species.
     Longitudinal
@@ -3892,6 +5820,15 @@ def calc_vkt(fldr, slices, dump_step, species_np, k_list, verbose):
     k_list : list
         List of :math: `k` vectors.
 
+    box_lengths : numpy.ndarray
+        Length of each box's side.
+
+    verbose : bool
+        Flag for the progress bar.
+
+    block : int
+        Number of dumps computed together in parallel. Default = 32.
+
     Returns
     -------
     vkt : numpy.ndarray, complex
@@ -3914,23 +5851,24 @@ def calc_vkt(fldr, slices, dump_step, species_np, k_list, verbose):
 
     # Read particles' position for all times
     no_dumps = slices[2]
-    vkt_par = np.zeros((len(species_np), no_dumps, len(k_list)), dtype=np.complex128)
-    vkt_perp_i = np.zeros((len(species_np), no_dumps, len(k_list)), dtype=np.complex128)
-    vkt_perp_j = np.zeros((len(species_np), no_dumps, len(k_list)), dtype=np.complex128)
-    vkt_perp_k = np.zeros((len(species_np), no_dumps, len(k_list)), dtype=np.complex128)
-    for it, dump in enumerate(tqdm(range(slices[0], slices[1], dump_step), disable=not verbose)):
-        data = load_from_restart(fldr, dump)
-        pos = data["pos"]
-        vel = data["vel"]
-        sp_start = 0
-        sp_end = 0
-        for i, sp in enumerate(species_np):
-            sp_end += sp
-            vkt_par[i, it, :], vkt_perp_i[i, it, :], vkt_perp_j[i, it, :], vkt_perp_k[i, it, :] = calc_vk(
-                pos[sp_start:sp_end, :], vel[sp_start:sp_end], k_list)
-            sp_start += sp
-
-    return vkt_par, vkt_perp_i, vkt_perp_j, vkt_perp_k
+    vkt = np.zeros((4, len(species_np), no_dumps, len(k_list)), dtype=np.complex128)
+    pos = np.zeros((block, np.sum(species_np), 3))
+    vel = np.zeros((block, np.sum(species_np), 3))
+    dumps = DumpReader(fldr, range(slices[0], slices[1], dump_step), fields=["pos", "vel"])
+    filled = 0
+    for it, (dump, data) in enumerate(tqdm(dumps, disable=not verbose)):
+        pos[filled] = data["pos"]
+        vel[filled] = data["vel"]
+        filled += 1
+        if filled == block:
+            vkt[:, :, it + 1 - filled:it + 1, :] = species_vk(pos, vel, k_list, box_lengths, species_np)
+            filled = 0
+
+    if filled > 0:
+        vkt[:, :, it + 1 - filled:it + 1, :] = species_vk(pos[:filled], vel[:filled], k_list, box_lengths,
+                                                          species_np)
+
+    return vkt[0], vkt[1], vkt[2], vkt[3]
 
 
 def grad_expansion(x, rms, h_coeff):
@@ -4148,9 +6086,7 @@ def load_from_restart(fldr, it):
         Particles' data.
     """
 
-    file_name = os.path.join(fldr, "checkpoint_" + str(it) + ".npz")
-    data = np.load(file_name, allow_pickle=True)
-    return data
+    return load_dump(fldr, it)
 
 
 def plot_labels(xdata, ydata, xlbl, ylbl, units):
@@ -4308,13 +6244,147 @@ def correlationfunction(At, Bt):
     # Calculate the full correlation function.
     full_corr = scp_signal.correlate(At, Bt, mode='full')
     # Normalization of the full correlation function, Similar to norm_counter
-    norm_corr = np.array([no_steps - ii for ii in range(no_steps)])
+    norm_corr = np.arange(no_steps, 0, -1)
     # Find the mid point of the array
     mid = full_corr.size // 2
     # I want only the second half of the array, i.e. the positive lags only
     return full_corr[mid:] / norm_corr
 
 
+def multiple_tau_correlation(At, Bt, points=16, averaging=2):
+    """
+    Calculate the correlation function of :math:`\mathbf{A}(t)` and :math:`\mathbf{B}(t)` on logarithmically spaced
+    lags with a :class:`MultipleTauCorrelator`. Same normalization as :func:`correlationfunction`.
+
+    Parameters
+    ----------
+    At : numpy.ndarray
+        Observable to correlate. Shape=(``no_steps``).
+
+    Bt : numpy.ndarray
+        Observable to correlate. Shape=(``no_steps``).
+
+    points : int
+        Number of lags of each level of the correlator. Default = 16.
+
+    averaging : int
+        Number of values averaged into one value of the next level. Default = 2.
+
+    Returns
+    -------
+    lags : numpy.ndarray
+        Lags in number of steps.
+
+    CF : numpy.ndarray
+        Correlation function :math:`C_{AB}(\tau)`
+
+    """
+    no_steps = At.size
+    levels = max(int(np.ceil(np.log(max(no_steps / points, 1.0)) / np.log(averaging))) + 1, 1)
+    correlator = MultipleTauCorrelator(2, points, averaging, levels, first=[0], second=[1])
+    correlator.extend(np.array([At, Bt]))
+    lags, cf = correlator.result()
+
+    return lags, cf[0]
+
+
+@njit
+def multiple_tau_update(value, shift, correlation, counts, first_sum, second_sum, accumulator, accumulated, insert,
+                        filled, averaging, first, second, output):
+    """
+    Add a value of each channel to a multiple-tau correlator. See :class:`MultipleTauCorrelator`.
+
+    Parameters
+    ----------
+    value : numpy.ndarray
+        Value of each channel.
+
+    shift : numpy.ndarray
+        Past values of each level. Circular buffers. Shape = (``levels``, ``points``, ``channels``).
+
+    correlation : numpy.ndarray
+        Sum of the products of each lag. Shape = (``levels``, ``points``, ``outputs``).
+
+    counts : numpy.ndarray
+        Number of products of each lag. Shape = (``levels``, ``points``).
+
+    first_sum : numpy.ndarray
+        Sum of the later values of each channel of each lag. Empty last axis if not needed.
+
+    second_sum : numpy.ndarray
+        Sum of the earlier values of each channel of each lag. Empty last axis if not needed.
+
+    accumulator : numpy.ndarray
+        Sum of the values of each level not yet averaged into the next level. Shape = (``levels``, ``channels``).
+
+    accumulated : numpy.ndarray
+        Number of values in ``accumulator``.
+
+    insert : numpy.ndarray
+        Position of the next value in the circular buffer of each level.
+
+    filled : numpy.ndarray
+        Number of values in the circular buffer of each level.
+
+    averaging : int
+        Number of values averaged into one value of the next level.
+
+    first : numpy.ndarray
+        First channel of each product.
+
+    second : numpy.ndarray
+        Second channel of each product.
+
+    output : numpy.ndarray
+        Correlation function of each product.
+
+    """
+    levels, points, channels = shift.shape
+    for level in range(levels):
+        i = insert[level]
+        shift[level, i] = value
+        if filled[level] < points:
+            filled[level] += 1
+
+        # The first lags of a level are computed by the previous level
+        lag_start = 0 if level == 0 else points // averaging
+        for lag in range(lag_start, filled[level]):
+            j = (i - lag) % points
+            for k in range(first.shape[0]):
+                correlation[level, lag, output[k]] += value[first[k]] * shift[level, j, second[k]]
+            for c in range(first_sum.shape[2]):
+                first_sum[level, lag, c] += value[c]
+                second_sum[level, lag, c] += shift[level, j, c]
+            counts[level, lag] += 1
+        insert[level] = (i + 1) % points
+
+        # Pass the average of the last values to the next level
+        accumulator[level] += value
+        accumulated[level] += 1
+        if accumulated[level] < averaging:
+            return
+        value = accumulator[level] / averaging
+        accumulator[level] = 0.0
+        accumulated[level] = 0
+
+
+@njit
+def multiple_tau_series(series, shift, correlation, counts, first_sum, second_sum, accumulator, accumulated, insert,
+                        filled, averaging, first, second, output):
+    """
+    Add consecutive values of each channel to a multiple-tau correlator. See :func:`multiple_tau_update`.
+
+    Parameters
+    ----------
+    series : numpy.ndarray
+        Values of each channel. Shape = (``steps``, ``channels``).
+
+    """
+    for it in range(series.shape[0]):
+        multiple_tau_update(series[it], shift, correlation, counts, first_sum, second_sum, accumulator, accumulated,
+                            insert, filled, averaging, first, second, output)
+
+
 def col_mapper(keys, vals):
     return dict(zip(keys, vals))
 
@@ -0,0 +1,249 @@
+"""
+Module handling the binary energy log of a simulation phase: an HDF5 file with one appendable table of energies,
+one row per dump, and one of integrator and thermostat diagnostics, one row per timestep.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+
+def log_filename(energy_filename):
+    """
+    Path of the binary energy log of a phase.
+
+    Parameters
+    ----------
+    energy_filename : str
+        Path of the energy csv file, e.g. ``ProductionEnergy_<job_id>.csv``.
+
+    Returns
+    -------
+    filename : str
+        Same path with the ``.h5`` extension.
+
+    """
+    return os.path.splitext(energy_filename)[0] + '.h5'
+
+
+def read_energy(energy_filename, table='energy'):
+    """
+    Read the energy data of a phase from the binary log, if it exists, or from the csv file.
+
+    Parameters
+    ----------
+    energy_filename : str
+        Path of the energy csv file.
+
+    table : str
+        ``'energy'`` or ``'diagnostics'``. The diagnostics are available only in the binary log. Default = ``'energy'``.
+
+    Returns
+    -------
+    dataframe : pandas.DataFrame
+        Energy data.
+
+    """
+    filename = log_filename(energy_filename)
+    if os.path.exists(filename):
+        with EnergyLog(filename, mode='r') as log:
+            return log.read(table)
+
+    return pd.read_csv(energy_filename, index_col=False)
+
+
+def remove_energy(energy_filename):
+    """
+    Delete the energy csv file and the binary log of a phase.
+
+    Parameters
+    ----------
+    energy_filename : str
+        Path of the energy csv file.
+
+    """
+    for filename in [energy_filename, log_filename(energy_filename)]:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+class EnergyLog:
+    """
+    HDF5 file of tables of floats. Each table is an appendable array of shape (``rows``, ``columns``) written in blocks
+    of rows. The column names are stored in the attribute ``columns`` of the array. The first column is the time.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the HDF5 file.
+
+    mode : str
+        ``'r'`` for reading, ``'a'`` for appending. Default = ``'a'``.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the HDF5 file.
+
+    file : tables.File
+        HDF5 file.
+
+    rewound : set
+        Tables already checked for rows to overwrite, see :meth:`append`.
+
+    """
+
+    def __init__(self, filename, mode='a'):
+        # PyTables is needed only by the hdf5 energy format
+        import tables
+
+        self.filename = filename
+        self.file = tables.open_file(filename, mode=mode)
+        self.rewound = set()
+
+    def __repr__(self):
+        return 'EnergyLog({})'.format(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Close the HDF5 file."""
+        if self.file.isopen:
+            self.file.close()
+
+    def append(self, table, columns, rows):
+        """
+        Append a block of rows to a table. At the first block of a restarted run the rows from the restart time onward
+        are removed.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table.
+
+        columns : list
+            Column names. Used only when creating the table.
+
+        rows : numpy.ndarray
+            Block of rows. Shape = (``rows``, ``columns``).
+
+        """
+        import tables
+
+        root = self.file.root
+        if table not in root:
+            array = self.file.create_earray(root, table, tables.Float64Atom(), shape=(0, len(columns)),
+                                            chunkshape=(max(rows.shape[0], 1), len(columns)))
+            array.attrs.columns = list(columns)
+        array = self.file.get_node(root, table)
+
+        if table not in self.rewound:
+            self.rewound.add(table)
+            if array.nrows > 0 and rows.shape[0] > 0:
+                times = array[:, 0]
+                keep = np.searchsorted(times, rows[0, 0])
+                if keep < array.nrows:
+                    array.truncate(keep)
+
+        array.append(rows)
+        self.file.flush()
+
+    def read(self, table='energy'):
+        """
+        Read a table.
+
+        Parameters
+        ----------
+        table : str
+            Name of the table. Default = ``'energy'``.
+
+        Returns
+        -------
+        dataframe : pandas.DataFrame
+            Table's data.
+
+        """
+        array = self.file.get_node(self.file.root, table)
+        return pd.DataFrame(array.read(), columns=list(array.attrs.columns))
+
+    def to_csv(self, csv_filename, table='energy'):
+        """
+        Export a table to a csv file.
+
+        Parameters
+        ----------
+        csv_filename : str
+            Path of the csv file.
+
+        table : str
+            Name of the table. Default = ``'energy'``.
+
+        """
+        self.read(table).to_csv(csv_filename, index=False)
+
+
+class LogBuffer:
+    """
+    Preallocated block of rows of a table of the :class:`EnergyLog`.
+
+    Parameters
+    ----------
+    columns : list
+        Column names.
+
+    size : int
+        Number of rows of the block.
+
+    Attributes
+    ----------
+    columns : list
+        Column names.
+
+    rows : numpy.ndarray
+        Block of rows. Shape = (``size``, ``columns``).
+
+    count : int
+        Number of rows filled.
+
+    """
+
+    def __init__(self, columns, size):
+        self.columns = list(columns)
+        self.rows = np.zeros((size, len(columns)))
+        self.count = 0
+
+    def append(self, values):
+        """
+        Copy a row into the block.
+
+        Parameters
+        ----------
+        values : list, numpy.ndarray
+            Row's values.
+
+        Returns
+        -------
+        full : bool
+            Whether the block is full.
+
+        """
+        self.rows[self.count] = values
+        self.count += 1
+        return self.count == self.rows.shape[0]
+
+    def block(self):
+        """
+        Copy of the filled rows. The block is emptied.
+
+        Returns
+        -------
+        rows : numpy.ndarray
+            Filled rows.
+
+        """
+        rows = self.rows[:self.count].copy()
+        self.count = 0
+        return rows
@@ -4,8 +4,16 @@ import re
 import yaml
 import csv
 import pickle
+import atexit
+import multiprocessing
+import queue
+import threading
 import numpy as np
 from pyfiglet import print_figlet, Figlet
+from sarkas.utilities.trajectory import CHECKPOINT_FILE, RAW_TRAJECTORY_HEADER, RESTART_FILE, STATIC_FILE, \
+    TRAJECTORY_FILE, Manifest, RawTrajectory, Trajectory, close_readers, close_trajectory, dump_steps, load_dump, \
+    stream_dir
+from sarkas.utilities.energy_log import EnergyLog, LogBuffer, log_filename
 from IPython import get_ipython
 
 if get_ipython().__class__.__name__ == 'ZMQInteractiveShell':
@@ -15,6 +23,12 @@ else:
     # If you are using IPython or Python kernel
     from tqdm import tqdm
 
+# Extended XYZ names of the fields saved by InputOutput.dump_xyz. OVITO maps pos and velo to its own properties.
+XYZ_PROPERTIES = {'pos': 'pos', 'vel': 'velo', 'acc': 'acc'}
+
+# Arguments of the frames formatted by xyz_frame in this process. See init_xyz_worker.
+_xyz_writer = {}
+
 FONTS = ['speed',
          'starwars',
          'graffiti',
@@ -36,6 +50,14 @@ LIGHT_COLORS = ['255;255;255',
                 '203;90;40'
                 ]
 
+# Fields of a dump of each phase. All of them are needed for a restart.
+DUMP_FIELDS = {'equilibration': ['pos', 'vel', 'acc'],
+               'magnetization': ['pos', 'vel', 'acc'],
+               'production': ['pos', 'vel', 'acc', 'cntr', 'rdf_hist']}
+# Quantities computed from the particles' data at dump time. ``species_current`` is the sum of the velocities of the
+# particles of each species. Shape = (``num_species``, ``dimensions``).
+REDUCED_FIELDS = ['species_current']
+
 # Dark Colors.
 DARK_COLORS = ['24;69;49',
                '0;129;131',
@@ -72,6 +94,17 @@ class InputOutput:
         self.verbose = False
         self.xyz_dir = None
         self.xyz_filename = None
+        self.async_dump = False
+        self.dump_queue_size = 4
+        self.dump_writer = None
+        self.dump_format = 'npz'
+        self.trajectories = None
+        self.dump_schemas = None
+        self.energy_format = 'csv'
+        self.energy_buffer_size = 1024
+        self.energy_columns = None
+        self.energy_logs = None
+        self.log_buffers = None
 
     def __repr__(self):
         sortedDict = dict(sorted(self.__dict__.items(), key=lambda x: x[0].lower()))
@@ -582,11 +615,11 @@ class InputOutput:
 
         observable : str
             Observable whose info to print. Default = None.
-            Choices = ['header','rdf', 'ccf', 'dsf', 'ssf', 'vm']
+            Choices = ['header','rdf', 'ccf', 'dsf', 'ssf', 'vm', 'pressure_tensor']
 
         """
 
-        choices = ['header', 'rdf', 'ccf', 'dsf', 'ssf', 'vd']
+        choices = ['header', 'rdf', 'ccf', 'dsf', 'ssf', 'vd', 'pressure_tensor']
         assert observable is not None, 'Observable not defined.'
 
         assert observable in choices, "Observable not defined. " \
@@ -595,7 +628,8 @@ class InputOutput:
                                       "'ccf' = Current Correlation Function, \n" \
                                       "'dsf' = Dynamic Structure Function, \n" \
                                       "'ssf' = Static Structure Factor, \n" \
-                                      "'vd' = Velocity Distribution"
+                                      "'vd' = Velocity Distribution, \n" \
+                                      "'pressure_tensor' = Pressure Tensor"
 
         if write_to_file:
             screen = sys.stdout
@@ -624,6 +658,8 @@ class InputOutput:
                 simulation.dsf.pretty_print()
             elif observable == 'ccf':
                 simulation.ccf.pretty_print()
+            elif observable == 'pressure_tensor':
+                simulation.pressure_tensor.pretty_print()
             elif observable == 'vd':
                 simulation.vm.setup(simulation.parameters)
                 print('\nVelocity Moments:')
@@ -959,51 +995,132 @@ class InputOutput:
         self.total_num_ptcls = params.total_num_ptcls
         self.total_plasma_frequency = params.total_plasma_frequency
         self.species_names = np.copy(params.species_names)
+        self.box_lengths = np.copy(params.box_lengths)
         self.coupling = params.coupling_constant * params.T_desired
 
-        # Check whether energy files exist already
-        if not os.path.exists(self.prod_energy_filename):
-            # Create the Energy file
-            dkeys = ["Time", "Total Energy", "Total Kinetic Energy", "Potential Energy", "Temperature"]
-            if len(species) > 1:
-                for i, sp in enumerate(species):
-                    dkeys.append("{} Kinetic Energy".format(sp.name))
-                    dkeys.append("{} Potential Energy".format(sp.name))
-                    dkeys.append("{} Temperature".format(sp.name))
-            data = dict.fromkeys(dkeys)
-
-            with open(self.prod_energy_filename, 'w+') as f:
-                w = csv.writer(f)
-                w.writerow(data.keys())
-
-        if not os.path.exists(self.eq_energy_filename) and not params.load_method[-7:] == 'restart':
-            # Create the Energy file
-            dkeys = ["Time", "Total Energy", "Total Kinetic Energy", "Potential Energy", "Temperature"]
-            if len(species) > 1:
-                for i, sp_name in enumerate(params.species_names):
-                    dkeys.append("{} Kinetic Energy".format(sp_name))
-                    dkeys.append("{} Potential Energy".format(sp_name))
-                    dkeys.append("{} Temperature".format(sp_name))
-            data = dict.fromkeys(dkeys)
-
-            with open(self.eq_energy_filename, 'w+') as f:
-                w = csv.writer(f)
-                w.writerow(data.keys())
+        self.energy_columns = ["Time", "Total Energy", "Total Kinetic Energy", "Potential Energy", "Temperature"]
+        if len(species) > 1:
+            for sp_name in params.species_names:
+                self.energy_columns.append("{} Kinetic Energy".format(sp_name))
+                self.energy_columns.append("{} Potential Energy".format(sp_name))
+                self.energy_columns.append("{} Temperature".format(sp_name))
+
+        assert self.energy_format in ['csv', 'hdf5'], "Wrong energy_format {}. Choose csv or hdf5.".format(
+            self.energy_format)
+
+        # The binary log is created at the first row
+        if self.energy_format == 'csv':
+            energy_files = [self.prod_energy_filename]
+            if not params.load_method[-7:] == 'restart':
+                energy_files.append(self.eq_energy_filename)
+                if self.electrostatic_equilibration:
+                    energy_files.append(self.mag_energy_filename)
+
+            # Create the energy files if they do not exist already
+            for energy_file in energy_files:
+                if not os.path.exists(energy_file):
+                    with open(energy_file, 'w+') as f:
+                        w = csv.writer(f)
+                        w.writerow(self.energy_columns)
+
+        self.setup_dump_schemas(params)
+
+    def setup_dump_schemas(self, params):
+        """
+        Complete the dump schema of each phase with the default values.
+
+        Parameters
+        ----------
+        params: sarkas.core.Parameters
+            General simulation parameters.
+
+        Notes
+        -----
+        The schema of a phase is a dictionary with the keys
+
+        ``fields`` : list of the fields saved in each dump. Default = all, see ``DUMP_FIELDS``.
+
+        ``precision`` : ``'double'`` or ``'single'``. Floats saved as float32 if ``'single'``. Default = ``'double'``.
 
+        ``compress`` : lossless compression of the dumps. Not available for ``dump_format: raw``. Default = False.
+
+        ``restart_step`` : interval of timesteps between full precision dumps of all the fields. The last dump of the
+        phase is always one of them. Default = number of steps of the phase.
+
+        ``streams`` : production only. Dictionary of additional dumps, each saved in ``dumps_<name>`` with its own
+        ``fields`` and ``dump_step`` and optionally ``precision`` and ``compress``. Default = no streams.
+
+        """
+        user_schemas = self.dump_schemas if self.dump_schemas else {}
+        for phase in user_schemas:
+            assert phase in DUMP_FIELDS, "Wrong phase {} in dump_schemas. Choose from {}.".format(
+                phase, list(DUMP_FIELDS.keys()))
+
+        steps = {'equilibration': (params.equilibration_steps, params.eq_dump_step),
+                 'production': (params.production_steps, params.prod_dump_step)}
         if self.electrostatic_equilibration:
-            if not os.path.exists(self.mag_energy_filename) and not params.load_method[-7:] == 'restart':
-                # Create the Energy file
-                dkeys = ["Time", "Total Energy", "Total Kinetic Energy", "Potential Energy", "Temperature"]
-                if len(species) > 1:
-                    for i, sp_name in enumerate(params.species_names):
-                        dkeys.append("{} Kinetic Energy".format(sp_name))
-                        dkeys.append("{} Potential Energy".format(sp_name))
-                        dkeys.append("{} Temperature".format(sp_name))
-                data = dict.fromkeys(dkeys)
-
-                with open(self.mag_energy_filename, 'w+') as f:
-                    w = csv.writer(f)
-                    w.writerow(data.keys())
+            steps['magnetization'] = (params.magnetization_steps, params.mag_dump_step)
+
+        dump_dirs = {'equilibration': self.eq_dump_dir, 'production': self.prod_dump_dir,
+                     'magnetization': self.mag_dump_dir}
+
+        self.dump_schemas = {}
+        for phase, (phase_steps, dump_step) in steps.items():
+            schema = {'fields': list(DUMP_FIELDS[phase]),
+                      'precision': 'double',
+                      'compress': False,
+                      'restart_step': max(phase_steps, 1),
+                      'streams': {}}
+            schema.update(user_schemas.get(phase, {}))
+            self.check_schema(schema, phase)
+
+            # Last dump of the phase. It is always a restart checkpoint.
+            schema['dump_step'] = dump_step
+            schema['last_dump'] = phase_steps - phase_steps % max(dump_step, 1)
+            # Whether the dumps contain all the data for a restart
+            schema['complete'] = schema['precision'] == 'double' and set(schema['fields']) == set(DUMP_FIELDS[phase])
+
+            assert not schema['streams'] or phase == 'production', "Dump streams are available only in production."
+            streams = {}
+            for name, user_stream in schema['streams'].items():
+                assert 'dump_step' in user_stream, "Define the dump_step of the stream {}.".format(name)
+                stream = {'fields': [],
+                          'precision': schema['precision'],
+                          'compress': schema['compress']}
+                stream.update(user_stream)
+                self.check_schema(stream, phase)
+                stream['dump_dir'] = stream_dir(dump_dirs[phase], name)
+                if not os.path.exists(stream['dump_dir']):
+                    os.mkdir(stream['dump_dir'])
+                streams[name] = stream
+            schema['streams'] = streams
+
+            # The integrator hands the particles' data to dump at the finest cadence
+            schema['io_step'] = int(np.gcd.reduce([dump_step] + [stream['dump_step'] for stream in streams.values()]))
+
+            self.dump_schemas[phase] = schema
+
+    def check_schema(self, schema, phase):
+        """
+        Check the fields, precision and compression of a dump schema or stream.
+
+        Parameters
+        ----------
+        schema : dict
+            Dump schema or stream.
+
+        phase : str
+            Simulation phase.
+
+        """
+        allowed_fields = DUMP_FIELDS[phase] + REDUCED_FIELDS
+        for field in schema['fields']:
+            assert field in allowed_fields, "Field {} cannot be dumped in the {} phase. Choose from {}.".format(
+                field, phase, allowed_fields)
+        assert schema['precision'] in ['single', 'double'], "Wrong precision {}. Choose single or double.".format(
+            schema['precision'])
+        assert not (schema['compress'] and self.dump_format == 'raw'), \
+            "Raw trajectories are memory mapped and cannot be compressed."
 
     def save_pickle(self, simulation):
         """
@@ -1094,48 +1211,368 @@ class InputOutput:
 
         it : int
             Timestep number.
+
+        Notes
+        -----
+        If ``async_dump`` is True a copy of the particles' data is handed to a :class:`DumpWriter` thread which
+        saves the dump and the energy row while the simulation continues. Call :meth:`flush_dumps` before reading
+        the files.
+
+        """
+        if not self.async_dump:
+            self.write_dump(phase, ptcls, it)
+            return
+
+        self.start_writer()
+        self.dump_writer.put(self.write_dump, phase, ptcls.snapshot(), it)
+
+    def start_writer(self):
+        """
+        Start the :class:`DumpWriter` thread, if not running yet. The buffers and the files of the energy logs are
+        created first since both the writer and the main thread use them.
+        """
+        if self.dump_writer is not None:
+            return
+
+        self.open_logs()
+        self.dump_writer = DumpWriter(self.dump_queue_size)
+
+    def open_logs(self):
+        """Create the dictionaries of the buffers and of the files of the energy logs."""
+        # Created here and not in __init__ since the attributes of this class are copied into the parameters
+        if self.log_buffers is None:
+            self.log_buffers = {}
+        if self.energy_logs is None:
+            self.energy_logs = {}
+
+    def flush_dumps(self):
+        """
+        Wait until all the dumps handed to the background writer have been saved, write the rows left in the
+        buffers of the energy logs and close the trajectory and energy log files.
+        """
+        if self.dump_writer is not None:
+            self.dump_writer.flush()
+
+        if self.log_buffers is not None:
+            for (phase, table), buffer in self.log_buffers.items():
+                if buffer.count > 0:
+                    self.write_log(phase, table, buffer.columns, buffer.block())
+
+        if self.energy_logs is not None:
+            for log in self.energy_logs.values():
+                log.close()
+            # Emptied and not reset, the writer thread may still be running
+            self.energy_logs.clear()
+
+        if self.trajectories is not None:
+            for dump_dir, trajectory in self.trajectories.items():
+                trajectory.close()
+                # Readers opened while the trajectory was written do not see the frames appended since
+                close_trajectory(dump_dir)
+            self.trajectories = None
+
+    def write_stream(self, stream, it, tme, fields):
+        """
+        Save a dump of a stream.
+
+        Parameters
+        ----------
+        stream : dict
+            Stream of the dump schema, see :meth:`setup_dump_schemas`.
+
+        it : int
+            Timestep number.
+
+        tme : float
+            Time.
+
+        fields : dict
+            Fields of the stream.
+
+        """
+        if self.dump_format in ['hdf5', 'raw']:
+            self.trajectory(stream['dump_dir'], stream['compress']).append(it, tme, **fields)
+        else:
+            savez = np.savez_compressed if stream['compress'] else np.savez
+            savez(os.path.join(stream['dump_dir'], CHECKPOINT_FILE.format(it)), time=tme, **fields)
+
+        self.index_dump(stream['dump_dir'], it, tme, fields)
+
+    def index_dump(self, dump_dir, it, tme, fields):
+        """
+        Append the row of a dump already saved to the manifest of its dump directory.
+
+        Parameters
+        ----------
+        dump_dir : str
+            Dump directory.
+
+        it : int
+            Timestep number.
+
+        tme : float
+            Time.
+
+        fields : list
+            Names of the saved fields.
+
+        """
+        if self.dump_format in ['hdf5', 'raw']:
+            filename = TRAJECTORY_FILE if self.dump_format == 'hdf5' else RAW_TRAJECTORY_HEADER
+            frame = self.trajectories[dump_dir].index(it)
+        else:
+            filename = CHECKPOINT_FILE.format(it)
+            frame = 0
+
+        Manifest.append(dump_dir, it, tme, filename, frame, list(fields))
+
+    @staticmethod
+    def schema_fields(fields, schema):
+        """
+        Select the fields of a dump schema and convert them to its precision.
+
+        Parameters
+        ----------
+        fields : dict
+            Particles' data.
+
+        schema : dict
+            Dump schema of the phase, see :meth:`setup_dump_schemas`.
+
+        Returns
+        -------
+        fields : dict
+            Fields to be saved.
+
         """
+        if schema['precision'] == 'single':
+            return {key: np.asarray(fields[key], dtype=np.float32) for key in schema['fields']}
+
+        return {key: fields[key] for key in schema['fields']}
+
+    def energy_filename(self, phase):
+        """
+        Energy csv file of a phase.
+
+        Parameters
+        ----------
+        phase : str
+            Simulation phase.
+
+        Returns
+        -------
+        filename : str
+            Path of the csv file. The binary log has the same path with the ``.h5`` extension.
+
+        """
+        if phase == 'equilibration':
+            return self.eq_energy_filename
+        elif phase == 'magnetization':
+            return self.mag_energy_filename
+
+        return self.prod_energy_filename
+
+    def log_row(self, phase, table, columns, values):
+        """
+        Copy a row into the buffer of a table of the energy log of a phase. Full buffers are written to the file.
+
+        Parameters
+        ----------
+        phase : str
+            Simulation phase.
+
+        table : str
+            ``'energy'`` or ``'diagnostics'``.
+
+        columns : list
+            Column names. Used only at the first row.
+
+        values : list, numpy.ndarray
+            Row's values. The first value is the time.
+
+        """
+        self.open_logs()
+
+        buffer = self.log_buffers.get((phase, table))
+        if buffer is None:
+            buffer = LogBuffer(columns, self.energy_buffer_size)
+            self.log_buffers[(phase, table)] = buffer
+
+        if buffer.append(values):
+            if table == 'energy' or not self.async_dump:
+                self.write_log(phase, table, columns, buffer.block())
+            else:
+                # Only one thread writes HDF5 files
+                self.start_writer()
+                self.dump_writer.put(self.write_log, phase, table, columns, buffer.block())
+
+    def log_step(self, phase, values, columns):
+        """
+        Log the integrator and thermostat diagnostics of a timestep. Only with ``energy_format: hdf5``.
+
+        Parameters
+        ----------
+        phase : str
+            Simulation phase.
+
+        values : list, numpy.ndarray
+            Diagnostics. The first value is the time.
+
+        columns : list
+            Names of the diagnostics.
+
+        """
+        if self.energy_format == 'hdf5':
+            self.log_row(phase, 'diagnostics', columns, values)
+
+    def write_log(self, phase, table, columns, rows):
+        """
+        Append a block of rows to a table of the energy log of a phase. The log is opened at the first call.
+
+        Parameters
+        ----------
+        phase : str
+            Simulation phase.
+
+        table : str
+            Name of the table.
+
+        columns : list
+            Column names.
+
+        rows : numpy.ndarray
+            Block of rows.
+
+        """
+        self.open_logs()
+
+        if phase not in self.energy_logs:
+            self.energy_logs[phase] = EnergyLog(log_filename(self.energy_filename(phase)), mode='a')
+
+        self.energy_logs[phase].append(table, columns, rows)
+
+    def export_energy_csv(self, phase='production'):
+        """
+        Save the energy table of the binary log of a phase to its energy csv file.
+
+        Parameters
+        ----------
+        phase : str
+            Simulation phase. Default = ``'production'``.
+
+        """
+        self.flush_dumps()
+        with EnergyLog(log_filename(self.energy_filename(phase)), mode='r') as log:
+            log.to_csv(self.energy_filename(phase))
+
+    def trajectory(self, dump_dir, compress=False):
+        """
+        Trajectory of a dump directory opened for appending. It is opened at the first call.
+
+        Parameters
+        ----------
+        dump_dir : str
+            Dump directory.
+
+        compress : bool
+            Compress the HDF5 trajectory. Default = False.
+
+        Returns
+        -------
+        trajectory : sarkas.utilities.trajectory.Trajectory, sarkas.utilities.trajectory.RawTrajectory
+            HDF5 or raw binary trajectory depending on ``dump_format``.
+
+        """
+        # Created here and not in __init__ since the attributes of this class are copied into the parameters
+        if self.trajectories is None:
+            self.trajectories = {}
+
+        if dump_dir not in self.trajectories:
+            # A file cannot be open for reading and writing at the same time
+            close_trajectory(dump_dir)
+            if self.dump_format == 'raw':
+                self.trajectories[dump_dir] = RawTrajectory(dump_dir, mode='a')
+            else:
+                self.trajectories[dump_dir] = Trajectory(os.path.join(dump_dir, TRAJECTORY_FILE), mode='a',
+                                                         compress=compress)
+
+        return self.trajectories[dump_dir]
+
+    def write_dump(self, phase, ptcls, it):
+        """
+        Save the particles' data and append a row to the energy file. The streams of the dump schema whose
+        ``dump_step`` divides ``it`` are saved too.
+
+        Parameters
+        ----------
+        phase: str
+            Simulation phase.
+
+        ptcls: sarkas.core.Particles
+            Particles data.
+
+        it : int
+            Timestep number.
+
+        """
+        # Arrays of the initial size also when absorbed particles have been removed
+        p_id, names, pos, vel, acc, cntr = ptcls.checkpoint_data()
+
+        tme = it * self.dt
+        fields = {'pos': pos, 'vel': vel, 'acc': acc}
+
         if phase == 'production':
             ptcls_file = self.prod_ptcls_filename + str(it)
-            tme = it * self.dt
-            np.savez(ptcls_file,
-                     id=ptcls.id,
-                     names=ptcls.names,
-                     pos=ptcls.pos,
-                     vel=ptcls.vel,
-                     acc=ptcls.acc,
-                     cntr=ptcls.pbc_cntr,
-                     rdf_hist=ptcls.rdf_hist,
-                     time=tme)
-
+            dump_dir = self.prod_dump_dir
+            fields['cntr'] = cntr
+            fields['rdf_hist'] = ptcls.rdf_hist
             energy_file = self.prod_energy_filename
 
         elif phase == 'equilibration':
             ptcls_file = self.eq_ptcls_filename + str(it)
-            tme = it * self.dt
-            np.savez(ptcls_file,
-                     id=ptcls.id,
-                     names=ptcls.names,
-                     pos=ptcls.pos,
-                     vel=ptcls.vel,
-                     acc=ptcls.acc,
-                     time=tme)
-
+            dump_dir = self.eq_dump_dir
             energy_file = self.eq_energy_filename
 
         elif phase == 'magnetization':
             ptcls_file = self.mag_ptcls_filename + str(it)
-            tme = it * self.dt
-            np.savez(ptcls_file,
-                     id=ptcls.id,
-                     names=ptcls.names,
-                     pos=ptcls.pos,
-                     vel=ptcls.vel,
-                     acc=ptcls.acc,
-                     time=tme)
-
+            dump_dir = self.mag_dump_dir
             energy_file = self.mag_energy_filename
 
+        schema = self.dump_schemas[phase]
+        streams = [stream for stream in schema['streams'].values() if it % stream['dump_step'] == 0]
+        main_dump = it % schema['dump_step'] == 0
+
+        if any('species_current' in stream['fields'] for stream in streams) or \
+                (main_dump and 'species_current' in schema['fields']):
+            fields['species_current'] = np.array([vel[p_id == sp].sum(axis=0)
+                                                  for sp in range(len(self.species_names))])
+
+        for stream in streams:
+            self.write_stream(stream, it, tme, self.schema_fields(fields, stream))
+
+        if not main_dump:
+            return
+
+        savez = np.savez_compressed if schema['compress'] else np.savez
+        checkpoint = it % schema['restart_step'] == 0 or it == schema['last_dump']
+
+        if self.dump_format in ['hdf5', 'raw']:
+            self.trajectory(dump_dir, schema['compress']).append(it, tme, id=p_id, names=names,
+                                                                **self.schema_fields(fields, schema))
+            if checkpoint and not schema['complete']:
+                savez(os.path.join(dump_dir, RESTART_FILE.format(it)), time=tme, **fields)
+            saved_fields = schema['fields']
+        else:
+            static_file = os.path.join(dump_dir, STATIC_FILE)
+            if not os.path.exists(static_file):
+                np.savez(static_file, id=p_id, names=names)
+            if not checkpoint:
+                fields = self.schema_fields(fields, schema)
+            savez(ptcls_file, time=tme, **fields)
+            saved_fields = list(fields)
+
+        self.index_dump(dump_dir, it, tme, saved_fields)
+
         kinetic_energies, temperatures = ptcls.kinetic_temperature()
         potential_energies = ptcls.potential_energies()
         # Save Energy data
@@ -1151,67 +1588,101 @@ class InputOutput:
                 data["{} Potential Energy".format(self.species_names[sp])] = potential_energies[sp]
                 data["{} Temperature".format(self.species_names[sp])] = temperatures[sp]
 
+        if self.energy_format == 'hdf5':
+            # This runs in the dump writer's thread if async_dump is True
+            self.log_row(phase, 'energy', self.energy_columns, list(data.values()))
+            return
+
         with open(energy_file, 'a') as f:
             w = csv.writer(f)
             w.writerow(data.values())
 
-    def dump_xyz(self, phase='production'):
+    def dump_xyz(self, phase='production', dump_skip=1, species=None, fields=None, processes=1, frames_per_task=4):
         """
-        Save the XYZ file by reading Sarkas dumps.
+        Save the dumps of a phase in an extended XYZ file that OVITO reads without any column mapping.
 
         Parameters
         ----------
         phase : str
-            Phase from which to read dumps. 'equilibration' or 'production'.
+            Phase from which to read dumps. 'equilibration', 'magnetization' or 'production'.
 
         dump_skip : int
             Interval of dumps to skip. Default = 1
 
-        """
+        species : list
+            Names of the species to save. Default = all.
+
+        fields : list
+            Fields to save. Choose from ``'pos'``, ``'vel'``, ``'acc'``. Default = those saved in the dumps.
+
+        processes : int
+            Number of worker processes formatting the frames. Default = 1, no workers.
 
+        frames_per_task : int
+            Number of frames handed to a worker at a time. Default = 4.
+
+        Notes
+        -----
+        Lengths, velocities, accelerations and time are rescaled by ``a_ws`` and ``total_plasma_frequency``, since OVITO
+        has a small number limit. Each frame is formatted as a single string and written as soon as it is ready, in the
+        order of the timesteps.
+
+        """
         if phase == 'equilibration':
             self.xyz_filename = os.path.join(self.equilibration_dir, "pva_" + self.job_id + '.xyz')
             dump_dir = self.eq_dump_dir
-
+        elif phase == 'magnetization':
+            self.xyz_filename = os.path.join(self.magnetization_dir, "pva_" + self.job_id + '.xyz')
+            dump_dir = self.mag_dump_dir
         else:
             self.xyz_filename = os.path.join(self.production_dir, "pva_" + self.job_id + '.xyz')
             dump_dir = self.prod_dump_dir
 
-        f_xyz = open(self.xyz_filename, "w+")
-
-        if not hasattr(self, 'a_ws'):
+        if not hasattr(self, 'a_ws') or not hasattr(self, 'box_lengths'):
             params = self.read_pickle_single('parameters')
             self.a_ws = params.a_ws
             self.total_num_ptcls = params.total_num_ptcls
             self.total_plasma_frequency = params.total_plasma_frequency
+            self.box_lengths = np.copy(params.box_lengths)
 
-        # Rescale constants. This is needed since OVITO has a small number limit.
-        pscale = 1.0 / self.a_ws
-        vscale = 1.0 / (self.a_ws * self.total_plasma_frequency)
-        ascale = 1.0 / (self.a_ws * self.total_plasma_frequency ** 2)
-
-        # Read the list of dumps and sort them in the correct (natural) order
-        dumps = os.listdir(dump_dir)
-        dumps.sort(key=num_sort)
-        for dump in tqdm(dumps, disable=not self.verbose):
-            data = self.read_npz(dump_dir, dump)
-            data["pos_x"] *= pscale
-            data["pos_y"] *= pscale
-            data["pos_z"] *= pscale
+        steps = dump_steps(dump_dir)[::dump_skip]
+        assert len(steps) > 0, "No dumps in {}.".format(dump_dir)
 
-            data["vel_x"] *= vscale
-            data["vel_y"] *= vscale
-            data["vel_z"] *= vscale
+        # The fields saved in all the dumps
+        first, last = load_dump(dump_dir, steps[0]), load_dump(dump_dir, steps[-1])
+        if fields is None:
+            fields = [key for key in XYZ_PROPERTIES if key in first and key in last]
+        for key in fields:
+            assert key in XYZ_PROPERTIES, "Wrong field {}. Choose from {}.".format(key, list(XYZ_PROPERTIES.keys()))
 
-            data["acc_x"] *= ascale
-            data["acc_y"] *= ascale
-            data["acc_z"] *= ascale
+        names = first["names"]
+        mask = np.isin(names, species) if species is not None else np.ones(len(names), dtype=bool)
+        assert mask.any(), "No particles of the species {}.".format(species)
 
-            f_xyz.writelines("{0:d}\n".format(self.total_num_ptcls))
-            f_xyz.writelines("name x y z vx vy vz ax ay az\n")
-            np.savetxt(f_xyz, data, fmt="%s %.6e %.6e %.6e %.6e %.6e %.6e %.6e %.6e %.6e")
-
-        f_xyz.close()
+        # Rescale constants. This is needed since OVITO has a small number limit.
+        scales = {'pos': 1.0 / self.a_ws,
+                  'vel': 1.0 / (self.a_ws * self.total_plasma_frequency),
+                  'acc': 1.0 / (self.a_ws * self.total_plasma_frequency ** 2),
+                  'time': self.total_plasma_frequency}
+
+        properties = ':'.join(['species:S:1'] + [XYZ_PROPERTIES[key] + ':R:3' for key in fields])
+        lattice = ' '.join('{:.6e}'.format(x) for x in np.diag(self.box_lengths / self.a_ws).ravel())
+        header = '{:d}\nProperties={} Lattice="{}" Time=%.6e\n'.format(mask.sum(), properties, lattice)
+        # One line per particle with its name and the formats of its floats
+        line = ' %.6e %.6e %.6e' * len(fields) + '\n'
+        template = header + ''.join(str(name) + line for name in names[mask])
+
+        initargs = (dump_dir, fields, mask, scales, template)
+        with open(self.xyz_filename, "w+") as f_xyz:
+            if processes > 1:
+                with multiprocessing.Pool(processes, initializer=init_xyz_worker, initargs=initargs) as pool:
+                    for frame in tqdm(pool.imap(xyz_frame, steps, chunksize=frames_per_task), total=len(steps),
+                                      disable=not self.verbose):
+                        f_xyz.write(frame)
+            else:
+                init_xyz_worker(*initargs)
+                for step in tqdm(steps, disable=not self.verbose):
+                    f_xyz.write(xyz_frame(step))
 
     @staticmethod
     def read_npz(fldr, it):
@@ -1223,7 +1694,7 @@ class InputOutput:
         fldr : str
             Folder containing dumps.
 
-        it : str
+        it : int
             Timestep to load.
 
         Returns
@@ -1232,9 +1703,7 @@ class InputOutput:
             Structured data array.
 
         """
-
-        file_name = os.path.join(fldr, it)
-        data = np.load(file_name, allow_pickle=True)
+        data = load_dump(fldr, it)
         # Dev Notes: the old way of saving the xyz file by
         # np.savetxt(f_xyz, np.c_[data["names"],data["pos"] ....]
         # , fmt="%10s %.6e %.6e %.6e %.6e %.6e %.6e %.6e %.6e %.6e")
@@ -1254,19 +1723,150 @@ class InputOutput:
                                        ('acc_z', np.float64)]
                                 )
         struct_array["names"] = data["names"]
-        struct_array["pos_x"] = data["pos"][:, 0]
-        struct_array["pos_y"] = data["pos"][:, 1]
-        struct_array["pos_z"] = data["pos"][:, 2]
+        # Fields not in the dump schema are left to zero
+        for key in ["pos", "vel", "acc"]:
+            if key in data:
+                struct_array[key + "_x"] = data[key][:, 0]
+                struct_array[key + "_y"] = data[key][:, 1]
+                struct_array[key + "_z"] = data[key][:, 2]
 
-        struct_array["vel_x"] = data["vel"][:, 0]
-        struct_array["vel_y"] = data["vel"][:, 1]
-        struct_array["vel_z"] = data["vel"][:, 2]
+        return struct_array
 
-        struct_array["acc_x"] = data["acc"][:, 0]
-        struct_array["acc_y"] = data["acc"][:, 1]
-        struct_array["acc_z"] = data["acc"][:, 2]
 
-        return struct_array
+class DumpWriter:
+    """
+    Thread saving the simulation's dumps in the background.
+
+    Jobs are kept in a bounded queue. When the queue is full, e.g. because the disk is slower than the simulation,
+    :meth:`put` blocks until the thread has finished the oldest job. The queue is flushed at interpreter exit.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximum number of jobs waiting in the queue.
+
+    Attributes
+    ----------
+    queue : queue.Queue
+        Jobs to run. Each job is a tuple (function, arguments).
+
+    thread : threading.Thread
+        Thread running the jobs.
+
+    error : Exception
+        First exception raised by a job. It is re-raised in the main thread by the next :meth:`put` or
+        :meth:`flush`.
+
+    """
+
+    def __init__(self, max_size=4):
+        self.queue = queue.Queue(maxsize=max_size)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name='DumpWriter', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def run(self):
+        """Run the jobs in the queue until the stop signal, ``None``, is received."""
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+
+            func, args = job
+            # Skip the remaining jobs after a failure. The error is raised in the main thread.
+            if self.error is None:
+                try:
+                    func(*args)
+                except Exception as err:
+                    self.error = err
+            self.queue.task_done()
+
+    def put(self, func, *args):
+        """
+        Add a job to the queue. Block if the queue is full.
+
+        Parameters
+        ----------
+        func : callable
+            Function to run.
+
+        args :
+            Arguments of ``func``.
+
+        """
+        self.check()
+        self.queue.put((func, args))
+
+    def flush(self):
+        """Wait until all the jobs in the queue are done."""
+        self.queue.join()
+        self.check()
+
+    def check(self):
+        """Raise the error of a failed job."""
+        if self.error is not None:
+            err = self.error
+            self.error = None
+            raise RuntimeError('The background dump writer failed.') from err
+
+    def close(self):
+        """Run the remaining jobs and stop the thread."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        atexit.unregister(self.close)
+        self.check()
+
+
+def init_xyz_worker(dump_dir, fields, mask, scales, template):
+    """
+    Store the arguments shared by all the frames of an XYZ file. See :meth:`InputOutput.dump_xyz`.
+
+    Parameters
+    ----------
+    dump_dir : str
+        Dump directory.
+
+    fields : list
+        Fields to save.
+
+    mask : numpy.ndarray
+        Particles to save.
+
+    scales : dict
+        Conversion factor of each field and of the time.
+
+    template : str
+        Format string of a frame.
+
+    """
+    # Trajectory readers inherited from the parent process are not shared
+    close_readers()
+    _xyz_writer.update(dump_dir=dump_dir, fields=fields, mask=mask, scales=scales, template=template)
+
+
+def xyz_frame(step):
+    """
+    Format a dump as a frame of an XYZ file.
+
+    Parameters
+    ----------
+    step : int
+        Timestep of the dump.
+
+    Returns
+    -------
+    frame : str
+        Frame.
+
+    """
+    data = load_dump(_xyz_writer['dump_dir'], step)
+    mask, scales = _xyz_writer['mask'], _xyz_writer['scales']
+    values = np.hstack([data[key][mask] * scales[key] for key in _xyz_writer['fields']])
+
+    return _xyz_writer['template'] % (float(data['time']) * scales['time'], *values.ravel().tolist())
 
 
 def alpha_to_int(text):
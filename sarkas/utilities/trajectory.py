@@ -0,0 +1,1205 @@
+"""
+Module handling the trajectory files storing the particles' data of all the dumps of a phase: a single HDF5 file or
+a set of raw binary files that can be memory mapped. The dumps of each directory are indexed by a manifest.
+"""
+import atexit
+import collections
+import csv
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Name of the trajectory file inside a dump directory
+TRAJECTORY_FILE = 'trajectory.h5'
+# Header of the raw binary trajectory inside a dump directory
+RAW_TRAJECTORY_HEADER = 'trajectory.json'
+# Dumps saved as npz files, one per timestep
+CHECKPOINT_FILE = 'checkpoint_{}.npz'
+# Full precision restart checkpoint saved next to a trajectory whose frames do not contain all the data for a restart
+RESTART_FILE = 'restart_{}.npz'
+# Particles' data that does not change during the simulation, saved once per dump directory of npz files
+STATIC_FILE = 'static.npz'
+# Append-only index of the dumps of a dump directory
+MANIFEST_FILE = 'manifest.csv'
+
+# Readers opened by open_trajectory, one per dump directory. They are kept open so that loading a frame does not
+# touch the filesystem.
+_readers = {}
+# Manifests read by open_manifest, one per dump directory. They are updated with the rows appended since last read.
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+class Trajectory:
+    """
+    Single-file store of the dumps of a simulation phase.
+
+    Each time dependent field, e.g. ``pos``, is a chunked, appendable array of shape (``frames``, ``N``, 3) with
+    one chunk per frame. Fields that do not change during the simulation, ``id`` and ``names``, are saved only once.
+
+    Parameters
+    ----------
+    filename : str
+        Path of the HDF5 file.
+
+    mode : str
+        ``'r'`` for reading, ``'a'`` for appending frames. Default = ``'r'``.
+
+    compress : bool
+        Compress the arrays created by :meth:`append` with zlib. Default = False.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the HDF5 file.
+
+    mode : str
+        Mode in which the file was opened.
+
+    file : tables.File
+        HDF5 file.
+
+    filters : tables.Filters
+        Compression filters of the new arrays. ``None`` if not compressed.
+
+    steps : numpy.ndarray
+        Timestep of each frame.
+
+    frames : dict
+        Frame index of each timestep.
+
+    """
+
+    static_fields = ['id', 'names']
+
+    def __init__(self, filename, mode='r', compress=False):
+        # PyTables is needed only by the hdf5 dump format
+        import tables
+
+        self.filename = filename
+        self.mode = mode
+        self.file = tables.open_file(filename, mode=mode)
+        # Lossless. The shuffle filter groups the bytes of the floats which then compress better.
+        self.filters = tables.Filters(complevel=5, complib='zlib', shuffle=True) if compress else None
+
+        if 'step' in self.file.root:
+            self.steps = self.file.root.step[:]
+        else:
+            self.steps = np.zeros(0, dtype=np.int64)
+
+        # Discard the incomplete frame of a run stopped while writing
+        if mode != 'r':
+            self.truncate(len(self.steps))
+
+        self.frames = {step: i for i, step in enumerate(self.steps)}
+
+    def __repr__(self):
+        return 'Trajectory({}, frames = {})'.format(self.filename, len(self))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def isopen(self):
+        """Whether the file is open."""
+        return bool(self.file.isopen)
+
+    def close(self):
+        """Close the HDF5 file."""
+        if self.file.isopen:
+            self.file.close()
+
+    def fields(self):
+        """
+        Names of the time dependent fields.
+
+        Returns
+        -------
+        fields : list
+            Names of the arrays with one row per frame, e.g. ``['acc', 'pos', 'step', 'time', 'vel']``.
+
+        """
+        return [node.name for node in self.file.list_nodes(self.file.root, classname='EArray')]
+
+    def append(self, step, time, **fields):
+        """
+        Append a frame. Appending a step that is not after the last one, as in a restart, removes the frames from
+        that step onward.
+
+        Parameters
+        ----------
+        step : int
+            Timestep of the frame.
+
+        time : float
+            Time of the frame.
+
+        **fields :
+            Particles' data, e.g. ``pos=ptcls.pos``.
+
+        """
+        import tables
+
+        if len(self.steps) > 0 and step <= self.steps[-1]:
+            self.truncate(np.searchsorted(self.steps, step))
+
+        root = self.file.root
+        for key, value in fields.items():
+            value = np.asarray(value)
+            if key in self.static_fields:
+                if key not in root:
+                    # Strings are stored as bytes
+                    if value.dtype.kind == 'U':
+                        value = np.char.encode(value)
+                    self.file.create_array(root, key, value)
+                continue
+
+            if key not in root:
+                self.file.create_earray(root, key, tables.Atom.from_dtype(value.dtype), shape=(0,) + value.shape,
+                                        chunkshape=(1,) + value.shape, filters=self.filters)
+            self.file.get_node(root, key).append(value[np.newaxis])
+
+        if 'time' not in root:
+            self.file.create_earray(root, 'time', tables.Float64Atom(), shape=(0,))
+            self.file.create_earray(root, 'step', tables.Int64Atom(), shape=(0,))
+        root.time.append([time])
+        # The step is the last array written. Its length is the number of complete frames.
+        root.step.append([step])
+        self.file.flush()
+
+        self.frames[step] = len(self.steps)
+        self.steps = np.append(self.steps, step)
+
+    def truncate(self, no_frames):
+        """
+        Keep only the first ``no_frames`` frames.
+
+        Parameters
+        ----------
+        no_frames : int
+            Number of frames to keep.
+
+        """
+        for node in self.file.list_nodes(self.file.root, classname='EArray'):
+            if node.nrows > no_frames:
+                node.truncate(no_frames)
+
+        for step in self.steps[no_frames:]:
+            self.frames.pop(step, None)
+        self.steps = self.steps[:no_frames]
+
+    def index(self, step):
+        """
+        Frame index of a timestep.
+
+        Parameters
+        ----------
+        step : int
+            Timestep.
+
+        Returns
+        -------
+        index : int
+            Frame index.
+
+        """
+        try:
+            return self.frames[step]
+        except KeyError:
+            raise KeyError('Step {} is not in the trajectory {}.'.format(step, self.filename))
+
+    def read(self, field, start=None, stop=None, stride=None):
+        """
+        Read a field for a range of frames.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field, e.g. ``'vel'``.
+
+        start : int
+            First frame index. Default = first frame.
+
+        stop : int
+            Frame index after the last one. Default = number of frames.
+
+        stride : int
+            Frame stride. Default = 1.
+
+        Returns
+        -------
+        data : numpy.ndarray
+            Data of the frames. Shape = (``frames``, ...).
+
+        """
+        return self.file.get_node(self.file.root, field)[start:stop:stride]
+
+    def read_static(self, field):
+        """
+        Read a field that does not change during the simulation.
+
+        Parameters
+        ----------
+        field : str
+            ``'id'`` or ``'names'``.
+
+        Returns
+        -------
+        data : numpy.ndarray
+            Field's data.
+
+        """
+        data = self.file.get_node(self.file.root, field).read()
+        if data.dtype.kind == 'S':
+            data = np.char.decode(data)
+        return data
+
+    def frame(self, step, fields=None):
+        """
+        Read the fields of a frame.
+
+        Parameters
+        ----------
+        step : int
+            Timestep of the frame.
+
+        fields : list
+            Names of the fields to read. The time is always read. Default = all.
+
+        Returns
+        -------
+        data : dict
+            Particles' data. Same keys as the ``checkpoint_<step>.npz`` files.
+
+        """
+        indx = self.index(step)
+        data = {key: self.read_static(key) for key in self.static_fields
+                if key in self.file.root and (fields is None or key in fields)}
+        for key in self.fields():
+            if key != 'step' and (fields is None or key in fields or key == 'time'):
+                data[key] = self.file.get_node(self.file.root, key)[indx]
+
+        return data
+
+
+class RawTrajectory(Trajectory):
+    """
+    Append-only raw binary store of the dumps of a simulation phase.
+
+    Each time dependent field is a file ``<field>.dat`` in the dump directory containing the frames one after the
+    other. The data type and shape of a frame of each field are saved in the header ``trajectory.json``. Fields that do
+    not change during the simulation are saved once as ``<field>.npy``. Readers get the fields as ``numpy.memmap``
+    arrays of shape (``frames``, ...), so that any range of frames, particles and components can be sliced without
+    copying or reading the whole trajectory in memory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    mode : str
+        ``'r'`` for reading, ``'a'`` for appending frames. Default = ``'r'``.
+
+    Attributes
+    ----------
+    fldr : str
+        Dump directory.
+
+    mode : str
+        Mode in which the trajectory was opened.
+
+    header : dict
+        Data type and shape of a frame of each time dependent field.
+
+    handles : dict
+        Files of each field opened for appending. Only in mode ``'a'``.
+
+    steps : numpy.ndarray
+        Timestep of each frame.
+
+    frames : dict
+        Frame index of each timestep.
+
+    """
+
+    def __init__(self, fldr, mode='r'):
+        self.fldr = fldr
+        self.filename = os.path.join(fldr, RAW_TRAJECTORY_HEADER)
+        self.mode = mode
+        self.handles = {}
+        self._maps = {}
+        self._isopen = True
+
+        if os.path.exists(self.filename):
+            with open(self.filename, 'r') as f:
+                self.header = json.load(f)
+        else:
+            self.header = {}
+
+        if 'step' in self.header:
+            self.steps = np.fromfile(self.data_file('step'), dtype=np.int64)
+        else:
+            self.steps = np.zeros(0, dtype=np.int64)
+
+        # Discard the incomplete frame of a run stopped while writing
+        if mode != 'r':
+            self.truncate(len(self.steps))
+
+        self.frames = {step: i for i, step in enumerate(self.steps)}
+
+    @property
+    def isopen(self):
+        """Whether the trajectory is open."""
+        return self._isopen
+
+    def close(self):
+        """Close the files opened for appending and release the memory maps."""
+        for handle in self.handles.values():
+            handle.close()
+        self.handles = {}
+        self._maps = {}
+        self._isopen = False
+
+    def data_file(self, field):
+        """
+        Path of the file of a time dependent field.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+
+        Returns
+        -------
+        filename : str
+            Path of ``<field>.dat``.
+
+        """
+        return os.path.join(self.fldr, field + '.dat')
+
+    def frame_size(self, field):
+        """
+        Size of a frame of a field in bytes.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field.
+
+        Returns
+        -------
+        size : int
+            Size in bytes.
+
+        """
+        return np.dtype(self.header[field]['dtype']).itemsize * int(np.prod(self.header[field]['shape']))
+
+    def fields(self):
+        """
+        Names of the time dependent fields.
+
+        Returns
+        -------
+        fields : list
+            Names of the fields with one row per frame, e.g. ``['acc', 'pos', 'step', 'time', 'vel']``.
+
+        """
+        return sorted(self.header.keys())
+
+    def append(self, step, time, **fields):
+        """
+        Append a frame. Appending a step that is not after the last one, as in a restart, removes the frames from
+        that step onward.
+
+        Parameters
+        ----------
+        step : int
+            Timestep of the frame.
+
+        time : float
+            Time of the frame.
+
+        **fields :
+            Particles' data, e.g. ``pos=ptcls.pos``.
+
+        """
+        if len(self.steps) > 0 and step <= self.steps[-1]:
+            self.truncate(np.searchsorted(self.steps, step))
+
+        fields = dict(fields)
+        fields['time'] = np.float64(time)
+        # The step is the last field written. Its length is the number of complete frames.
+        fields['step'] = np.int64(step)
+
+        new_fields = False
+        for key, value in fields.items():
+            value = np.asarray(value)
+            if key in self.static_fields:
+                filename = os.path.join(self.fldr, key + '.npy')
+                if not os.path.exists(filename):
+                    np.save(filename, value)
+                continue
+
+            if key not in self.header:
+                self.header[key] = {'dtype': value.dtype.str, 'shape': list(value.shape)}
+                new_fields = True
+
+        if new_fields:
+            with open(self.filename, 'w') as f:
+                json.dump(self.header, f, indent=2)
+
+        for key, value in fields.items():
+            if key in self.static_fields:
+                continue
+            if key not in self.handles:
+                self.handles[key] = open(self.data_file(key), 'ab')
+            value = np.ascontiguousarray(value, dtype=self.header[key]['dtype'])
+            self.handles[key].write(value.tobytes())
+
+        for handle in self.handles.values():
+            handle.flush()
+
+        self.frames[step] = len(self.steps)
+        self.steps = np.append(self.steps, step)
+        self._maps = {}
+
+    def truncate(self, no_frames):
+        """
+        Keep only the first ``no_frames`` frames.
+
+        Parameters
+        ----------
+        no_frames : int
+            Number of frames to keep.
+
+        """
+        for key in self.header:
+            filename = self.data_file(key)
+            size = no_frames * self.frame_size(key)
+            if os.path.exists(filename) and os.path.getsize(filename) > size:
+                if key in self.handles:
+                    self.handles[key].flush()
+                os.truncate(filename, size)
+
+        for step in self.steps[no_frames:]:
+            self.frames.pop(step, None)
+        self.steps = self.steps[:no_frames]
+        self._maps = {}
+
+    def memmap(self, field):
+        """
+        Read-only memory map of a time dependent field.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field, e.g. ``'vel'``.
+
+        Returns
+        -------
+        data : numpy.memmap
+            Data of all the frames. Shape = (``frames``, ...).
+
+        """
+        if field not in self._maps:
+            shape = (len(self.steps), *self.header[field]['shape'])
+            dtype = np.dtype(self.header[field]['dtype'])
+            if len(self.steps) == 0:
+                # Files of size zero cannot be memory mapped
+                self._maps[field] = np.zeros(shape, dtype=dtype)
+            else:
+                self._maps[field] = np.memmap(self.data_file(field), dtype=dtype, mode='r', shape=shape)
+
+        return self._maps[field]
+
+    def read(self, field, start=None, stop=None, stride=None):
+        """
+        Read a field for a range of frames.
+
+        Parameters
+        ----------
+        field : str
+            Name of the field, e.g. ``'vel'``.
+
+        start : int
+            First frame index. Default = first frame.
+
+        stop : int
+            Frame index after the last one. Default = number of frames.
+
+        stride : int
+            Frame stride. Default = 1.
+
+        Returns
+        -------
+        data : numpy.memmap
+            View of the frames. Shape = (``frames``, ...).
+
+        """
+        return self.memmap(field)[start:stop:stride]
+
+    def read_static(self, field):
+        """
+        Read a field that does not change during the simulation.
+
+        Parameters
+        ----------
+        field : str
+            ``'id'`` or ``'names'``.
+
+        Returns
+        -------
+        data : numpy.ndarray
+            Field's data.
+
+        """
+        return np.load(os.path.join(self.fldr, field + '.npy'))
+
+    def frame(self, step, fields=None):
+        """
+        Read the fields of a frame.
+
+        Parameters
+        ----------
+        step : int
+            Timestep of the frame.
+
+        fields : list
+            Names of the fields to read. The time is always read. Default = all.
+
+        Returns
+        -------
+        data : dict
+            Particles' data. Same keys as the ``checkpoint_<step>.npz`` files. The time dependent fields are views
+            of the memory maps.
+
+        """
+        indx = self.index(step)
+        data = {key: self.read_static(key) for key in self.static_fields
+                if os.path.exists(os.path.join(self.fldr, key + '.npy')) and (fields is None or key in fields)}
+        for key in self.fields():
+            if key != 'step' and (fields is None or key in fields or key == 'time'):
+                data[key] = self.memmap(key)[indx]
+
+        return data
+
+
+class Manifest:
+    """
+    Index of the dumps of a dump directory read from the append-only file ``manifest.csv``.
+
+    Each dump appends a row with its timestep, time, file, frame index in the file and saved fields. The row is written
+    after the dump, hence every step in the manifest is complete. A row whose step is not after the previous one, as in a
+    restart, replaces the rows from that step onward, as done by :meth:`Trajectory.append`.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the manifest file.
+
+    offset : int
+        Number of bytes already read.
+
+    steps : numpy.ndarray
+        Sorted timesteps of the dumps.
+
+    entries : dict
+        Row of each timestep. Keys: ``time``, ``file``, ``frame``, ``fields``.
+
+    """
+
+    columns = ['step', 'time', 'file', 'frame', 'fields']
+
+    def __init__(self, fldr):
+        self.filename = os.path.join(fldr, MANIFEST_FILE)
+        self.offset = 0
+        self.steps = np.zeros(0, dtype=np.int64)
+        self.entries = {}
+        self.update()
+
+    def __repr__(self):
+        return 'Manifest({}, dumps = {})'.format(self.filename, len(self.steps))
+
+    def __len__(self):
+        return len(self.steps)
+
+    @staticmethod
+    def append(fldr, step, time, filename, frame, fields):
+        """
+        Append the row of a dump to the manifest of a dump directory. The file is created at the first row.
+
+        Parameters
+        ----------
+        fldr : str
+            Dump directory.
+
+        step : int
+            Timestep of the dump.
+
+        time : float
+            Time of the dump.
+
+        filename : str
+            Name of the file containing the dump.
+
+        frame : int
+            Frame index of the dump in the file. 0 for ``npz`` files.
+
+        fields : list
+            Names of the saved fields.
+
+        """
+        manifest_file = os.path.join(fldr, MANIFEST_FILE)
+        new = not os.path.exists(manifest_file)
+        if new:
+            # Forget the manifest of dumps deleted in this process, e.g. by the preprocessing runs
+            _manifests.pop(fldr, None)
+        with open(manifest_file, 'a', newline='') as f:
+            w = csv.writer(f)
+            if new:
+                w.writerow(Manifest.columns)
+            w.writerow([step, repr(float(time)), filename, frame, ' '.join(fields)])
+
+    def update(self):
+        """Read the rows appended since the last read. A last row not yet completed is skipped."""
+        size = os.path.getsize(self.filename)
+        if size < self.offset:
+            # The file was replaced
+            self.offset = 0
+            self.steps = np.zeros(0, dtype=np.int64)
+            self.entries = {}
+        elif size == self.offset:
+            return
+
+        with open(self.filename, 'rb') as f:
+            f.seek(self.offset)
+            text = f.read()
+        text = text[:text.rfind(b'\n') + 1]
+        self.offset += len(text)
+
+        steps = list(self.steps)
+        for row in csv.reader(text.decode().splitlines()):
+            if row[0] == self.columns[0]:
+                continue
+            step = int(row[0])
+            if steps and step <= steps[-1]:
+                keep = int(np.searchsorted(steps, step))
+                for old in steps[keep:]:
+                    self.entries.pop(old, None)
+                del steps[keep:]
+            steps.append(step)
+            self.entries[step] = {'time': float(row[1]), 'file': row[2], 'frame': int(row[3]),
+                                  'fields': row[4].split()}
+
+        self.steps = np.array(steps, dtype=np.int64)
+
+    def entry(self, step):
+        """
+        Row of a timestep.
+
+        Parameters
+        ----------
+        step : int
+            Timestep.
+
+        Returns
+        -------
+        entry : dict
+            Time, file, frame index and fields of the dump.
+
+        """
+        try:
+            return self.entries[step]
+        except KeyError:
+            raise KeyError('Step {} is not in the manifest {}.'.format(step, self.filename))
+
+    @staticmethod
+    def last(fldr):
+        """
+        Timestep of the last dump of a dump directory read from the end of its manifest, without reading the whole file.
+
+        Parameters
+        ----------
+        fldr : str
+            Dump directory.
+
+        Returns
+        -------
+        step : int
+            Timestep of the last row. ``None`` if the manifest has no rows.
+
+        """
+        with open(os.path.join(fldr, MANIFEST_FILE), 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            block = 4096
+            while True:
+                f.seek(max(size - block, 0))
+                text = f.read(size - max(size - block, 0))
+                # Complete rows only
+                lines = text[:text.rfind(b'\n')].split(b'\n')
+                if len(lines) > 1 or block >= size:
+                    break
+                block *= 2
+
+        row = lines[-1].decode().split(',')
+        return None if row[0] == Manifest.columns[0] else int(row[0])
+
+
+class DumpReader:
+    """
+    Iterator over the dumps of a list of timesteps that reads the next dumps in background threads while the current
+    one is processed.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    steps : iterable
+        Timesteps of the dumps, in the order they are returned.
+
+    fields : list
+        Names of the fields to read. The time is always read. Default = all.
+
+    read_ahead : int
+        Largest number of dumps read in advance. Together with the current one, these are the only dumps in memory.
+        Default = 4.
+
+    threads : int
+        Number of reading threads. HDF5 trajectories are read by a single thread, since the file handle cannot be
+        shared. Default = 2.
+
+    Examples
+    --------
+    >>> for step, data in DumpReader(dump_dir, range(0, 1000, 10), fields=['pos']):
+    ...     nk = calc_nk(data['pos'], k_list, box_lengths)
+
+    """
+
+    def __init__(self, fldr, steps, fields=None, read_ahead=4, threads=2):
+        self.fldr = fldr
+        self.steps = list(steps)
+        self.fields = fields
+        self.read_ahead = max(read_ahead, 1)
+        # Open the trajectory or the manifest in this thread
+        trajectory = open_trajectory(fldr)
+        if trajectory is None:
+            open_manifest(fldr)
+        elif not isinstance(trajectory, RawTrajectory):
+            threads = 1
+        self.threads = max(threads, 1)
+
+    def __repr__(self):
+        return 'DumpReader({}, dumps = {})'.format(self.fldr, len(self.steps))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        with ThreadPoolExecutor(self.threads) as pool:
+            pending = collections.deque()
+            steps = iter(self.steps)
+            for step in steps:
+                pending.append((step, pool.submit(self.load, step)))
+                if len(pending) == self.read_ahead:
+                    break
+
+            while pending:
+                step, future = pending.popleft()
+                data = future.result()
+                for next_step in steps:
+                    pending.append((next_step, pool.submit(self.load, next_step)))
+                    break
+                yield step, data
+
+    def load(self, step):
+        """
+        Load a dump. The frames of raw trajectories are copied from the memory maps so that they are read here.
+
+        Parameters
+        ----------
+        step : int
+            Timestep of the dump.
+
+        Returns
+        -------
+        data : dict
+            Particles' data.
+
+        """
+        data = load_dump(self.fldr, step, self.fields)
+        for key, value in data.items():
+            if isinstance(value, np.memmap):
+                data[key] = np.array(value)
+
+        return data
+
+
+def stream_dir(dump_dir, stream):
+    """
+    Directory of a dump stream.
+
+    Parameters
+    ----------
+    dump_dir : str
+        Dump directory of the phase.
+
+    stream : str
+        Name of the stream.
+
+    Returns
+    -------
+    fldr : str
+        Directory ``dumps_<stream>`` next to the dump directory.
+
+    """
+    return os.path.join(os.path.dirname(dump_dir), 'dumps_' + stream)
+
+
+def open_trajectory(fldr):
+    """
+    Reader of the trajectory of a dump directory. Readers are kept open and reused.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    trajectory : sarkas.utilities.trajectory.Trajectory, sarkas.utilities.trajectory.RawTrajectory
+        Reader. ``None`` if the directory contains ``checkpoint_<step>.npz`` files instead.
+
+    """
+    trajectory = _readers.get(fldr)
+    if trajectory is None or not trajectory.isopen:
+        if os.path.exists(os.path.join(fldr, TRAJECTORY_FILE)):
+            trajectory = Trajectory(os.path.join(fldr, TRAJECTORY_FILE), 'r')
+        elif os.path.exists(os.path.join(fldr, RAW_TRAJECTORY_HEADER)):
+            trajectory = RawTrajectory(fldr, 'r')
+        else:
+            return None
+        _readers[fldr] = trajectory
+
+    return trajectory
+
+
+def close_trajectory(fldr):
+    """
+    Close the reader of the trajectory of a dump directory, if any. Needed before writing to the trajectory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    """
+    trajectory = _readers.pop(fldr, None)
+    if trajectory is not None:
+        trajectory.close()
+
+
+@atexit.register
+def close_readers():
+    """Close all the readers opened by :func:`open_trajectory`."""
+    for fldr in list(_readers):
+        close_trajectory(fldr)
+
+
+def open_manifest(fldr):
+    """
+    Manifest of a dump directory. Manifests are kept in memory and updated with the rows appended since last read.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    manifest : sarkas.utilities.trajectory.Manifest
+        Manifest. ``None`` if the directory does not have one, e.g. dumps saved by older versions.
+
+    """
+    if not os.path.exists(os.path.join(fldr, MANIFEST_FILE)):
+        _manifests.pop(fldr, None)
+        return None
+
+    # Dumps can be loaded by the threads of a DumpReader
+    with _manifests_lock:
+        manifest = _manifests.get(fldr)
+        if manifest is None:
+            manifest = Manifest(fldr)
+            _manifests[fldr] = manifest
+        else:
+            manifest.update()
+
+    return manifest
+
+
+def dump_steps(fldr):
+    """
+    Timesteps of the dumps saved in a dump directory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    steps : numpy.ndarray
+        Sorted timesteps of the frames of the trajectory or of the dumps in the manifest. The ``checkpoint_<step>.npz``
+        files are listed only if the directory has no manifest.
+
+    """
+    trajectory = open_trajectory(fldr)
+    if trajectory is not None:
+        return trajectory.steps
+
+    manifest = open_manifest(fldr)
+    if manifest is not None:
+        return manifest.steps
+
+    prefix, suffix = CHECKPOINT_FILE.split('{}')
+    steps = [int(name[len(prefix):-len(suffix)]) for name in os.listdir(fldr)
+             if name.startswith(prefix) and name.endswith(suffix)]
+    return np.sort(np.array(steps, dtype=np.int64))
+
+
+def load_dump(fldr, it, fields=None):
+    """
+    Load the particles' data of a dump.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    it : int
+        Timestep of the dump.
+
+    fields : list
+        Names of the fields to load. The time is always loaded. Default = all.
+
+    Returns
+    -------
+    data : dict
+        Particles' data, ``id`` and ``names`` included also when they are saved once for all the dumps.
+
+    """
+    trajectory = open_trajectory(fldr)
+    if trajectory is not None:
+        return trajectory.frame(it, fields)
+
+    manifest = open_manifest(fldr)
+    filename = manifest.entry(it)['file'] if manifest is not None else CHECKPOINT_FILE.format(it)
+    # The arrays of a npz file are read only when accessed
+    with np.load(os.path.join(fldr, filename), allow_pickle=True) as npz:
+        data = {key: npz[key] for key in npz.files if fields is None or key in fields or key == 'time'}
+
+    static_file = os.path.join(fldr, STATIC_FILE)
+    if os.path.exists(static_file):
+        with np.load(static_file, allow_pickle=True) as npz:
+            for key in npz.files:
+                if key not in data and (fields is None or key in fields):
+                    data[key] = npz[key]
+
+    return data
+
+
+def load_checkpoint(fldr, it):
+    """
+    Load the particles' data needed for restarting from a timestep. This is the full precision ``restart_<step>.npz``
+    file, if saved, or else the dump.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    it : int
+        Timestep.
+
+    Returns
+    -------
+    data : dict
+        Particles' data. Writable copies, since the frames of raw trajectories are read-only memory maps.
+
+    """
+    data = {}
+    restart_file = os.path.join(fldr, RESTART_FILE.format(it))
+    if os.path.exists(restart_file):
+        with np.load(restart_file, allow_pickle=True) as npz:
+            data = dict(npz)
+
+    for key, value in load_dump(fldr, it).items():
+        data.setdefault(key, value)
+
+    return {key: np.array(value) for key, value in data.items()}
+
+
+def count_dumps(fldr):
+    """
+    Number of dumps saved in a dump directory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    no_dumps : int
+        Number of frames of the trajectory file or number of ``npz`` files.
+
+    """
+    return len(dump_steps(fldr))
+
+
+def last_dump(fldr):
+    """
+    Timestep of the last dump saved in a dump directory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    step : int
+        Timestep of the last dump.
+
+    """
+    if open_trajectory(fldr) is None and os.path.exists(os.path.join(fldr, MANIFEST_FILE)):
+        step = Manifest.last(fldr)
+        if step is not None:
+            return step
+
+    return int(dump_steps(fldr)[-1])
+
+
+def missing_dumps(fldr, dump_step, start=0, stop=None):
+    """
+    Timesteps of the dumps missing in a dump directory, e.g. because a run was stopped while saving them.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    dump_step : int
+        Interval of timesteps between dumps.
+
+    start : int
+        First timestep expected. Default = 0.
+
+    stop : int
+        Timestep after the last one expected. Default = last dump + 1.
+
+    Returns
+    -------
+    steps : numpy.ndarray
+        Timesteps of ``range(start, stop, dump_step)`` without a dump.
+
+    """
+    steps = dump_steps(fldr)
+    if stop is None:
+        stop = steps[-1] + 1 if len(steps) > 0 else start
+
+    return np.setdiff1d(np.arange(start, stop, dump_step), steps)
+
+
+def dump_size(fldr):
+    """
+    Size of one dump saved in a dump directory.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    Returns
+    -------
+    size : float
+        Size of the directory divided by the number of dumps in bytes.
+
+    """
+    size = sum(os.path.getsize(os.path.join(fldr, name)) for name in os.listdir(fldr))
+    return size / max(count_dumps(fldr), 1)
+
+
+def read_dumps(fldr, field, start, stop, step):
+    """
+    Read a field from the dumps of the timesteps ``range(start, stop, step)``.
+
+    Parameters
+    ----------
+    fldr : str
+        Dump directory.
+
+    field : str
+        Name of the field, e.g. ``'vel'``.
+
+    start : int
+        First timestep.
+
+    stop : int
+        Timestep after the last one.
+
+    step : int
+        Interval of timesteps between dumps.
+
+    Returns
+    -------
+    data : numpy.ndarray
+        Data of the dumps. Shape = (``dumps``, ...). For a raw binary trajectory and evenly spaced frames it is a view
+        of the memory map and no data is copied.
+
+    time : numpy.ndarray
+        Time of each dump.
+
+    """
+    steps = np.arange(start, stop, step)
+    missing = np.setdiff1d(steps, dump_steps(fldr))
+    if len(missing) > 0:
+        raise KeyError('Dumps of the steps {} are missing in {}.'.format(missing, fldr))
+
+    trajectory = open_trajectory(fldr)
+
+    if trajectory is None:
+        data = None
+        time = np.zeros(len(steps))
+        for it, (dump, datap) in enumerate(DumpReader(fldr, steps, [field])):
+            if data is None:
+                data = np.zeros((len(steps), *datap[field].shape), dtype=datap[field].dtype)
+            data[it] = datap[field]
+            time[it] = datap["time"]
+        return data, time
+
+    indices = np.array([trajectory.index(it) for it in steps])
+    stride = indices[1] - indices[0] if len(indices) > 1 else 1
+    if stride > 0 and np.all(np.diff(indices) == stride):
+        frames = slice(indices[0], indices[-1] + 1, stride)
+        return trajectory.read(field, frames.start, frames.stop, frames.step), \
+            trajectory.read('time', frames.start, frames.stop, frames.step)
+
+    # Frames not evenly spaced
+    data = np.stack([trajectory.read(field, indx, indx + 1)[0] for indx in indices])
+    time = np.array([trajectory.read('time', indx, indx + 1)[0] for indx in indices])
+    return data, time